@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+batch.py
+
+Headless batch processing of cadnano2 designs. Each input .json design is
+run through a pipeline of stages
+
+    decode -> autostaple -> autobreak -> sequence -> export
+
+and the time spent in each stage is reported per design.
+
+Usage:
+    python -m cadnano2.batch [options] design.json [design.json ...]
+    python -m cadnano2.batch --help
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cadnano2.cadnano as cadnano
+import cadnano2.util as util
+
+STAGES = ('decode', 'autostaple', 'autobreak', 'sequence', 'export')
+MESH_FORMATS = ('obj', 'ply', 'glb')
+MESH_DETAILS = ('helix', 'strand', 'base')
+
+# same defaults as the autobreak config dialog
+DEFAULT_AUTOBREAK_SETTINGS = {
+    'minStapleLegLen': 3,
+    'minStapleLen': 15,
+    'maxStapleLen': 60,
+    'tgtStapleLen': 49,
+    'workers': 1,
+    'solver': 'dp',
+    'tokenCacheFile': None,
+}
+
+
+def initHeadless(useQt=True):
+    """
+    Initializes cadnano without a GUI and returns the app object.
+
+    views.styles builds QFonts when it is imported, which Qt only allows once
+    a QGuiApplication exists, so when PyQt is available one is created on
+    the offscreen platform.
+
+    With useQt=False the model runs on the stand-in classes of
+    cadnano2.dummyqt and PyQt is never imported, as after a plain
+    cadnano.initAppWithoutGui. Either choice only works before the model
+    is first imported, see util.chooseQtFramework.
+    """
+    app = cadnano.initAppWithoutGui([])
+    if useQt and util.chosenQtFramework is None:
+        util.qtFrameworkList = ['PyQt', 'Dummy']
+    if util.usingDummyQt():
+        return app
+    try:
+        from PyQt6.QtGui import QGuiApplication
+    except ImportError:
+        return app
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app.qApp = QGuiApplication([])
+    return app
+# end def
+
+
+def helixOrder(part):
+    """
+    Returns the (row, col) list used when encoding part. Mirrors the path
+    view order: the imported order if there is one, else by helix number.
+    """
+    if part._importedVHelixOrder:
+        return list(part._importedVHelixOrder)
+    vhs = sorted(part.getVirtualHelices(), key=lambda vh: vh.number())
+    return [vh.coord() for vh in vhs]
+# end def
+
+
+def scaffoldSequence(nameOrPath):
+    """
+    Returns the sequence named nameOrPath in cadnano2.data.dnasequences, or
+    the contents of the file at nameOrPath with whitespace removed.
+    """
+    from cadnano2.data.dnasequences import sequences
+    if nameOrPath in sequences:
+        return sequences[nameOrPath]
+    with open(nameOrPath) as f:
+        return ''.join(f.read().split()).upper()
+# end def
+
+
+class BatchJob(object):
+    """
+    Runs the pipeline stages on a single design file and records the time
+    each one takes. Stages are run in STAGES order; skipped stages don't
+    appear in timings.
+    """
+    def __init__(self, path, options):
+        self.path = path
+        self.options = options
+        self.document = None
+        self.part = None
+        self.timings = {}
+        self.outputs = []
+    # end def
+
+    def run(self, stages):
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            t0 = time.perf_counter()
+            getattr(self, 'stage_' + stage)()
+            self.timings[stage] = time.perf_counter() - t0
+            if self.options.verify and self.part is not None:
+                errors = self.part.verifyOligos(markErrors=False)
+                if errors:
+                    raise ValueError("%d oligo lengths are out of date after "
+                                     "%s: %r" % (len(errors), stage, errors))
+            if self.document is not None:
+                # nothing is going to be undone, so don't hold on to it
+                self.document.undoStack().clear()
+        return self.timings
+    # end def
+
+    def stage_decode(self):
+        from cadnano2.model.document import Document
+        from cadnano2.model.io.decoder import decodePath
+        from cadnano2.model.enum import LatticeType
+        latticeType = {None: None,
+                       'honeycomb': LatticeType.Honeycomb,
+                       'square': LatticeType.Square}[self.options.lattice]
+        self.document = Document()
+        decodePath(self.document, self.path, latticeType)
+        self.part = self.document.selectedPart()
+        if self.part is None:
+            raise ValueError("%s contains no part" % self.path)
+        if self.options.lazySequences:
+            self.part.setLazySequences(True)
+    # end def
+
+    def stage_autostaple(self):
+        self.part.autoStaple()
+    # end def
+
+    def stage_autobreak(self):
+        from cadnano2.plugins.autobreak import autobreak
+        settings = dict(DEFAULT_AUTOBREAK_SETTINGS)
+        settings.update(self.options.autobreakSettings)
+        settings['stapleScorer'] = autobreak.tgtLengthStapleScorer
+        autobreak.breakStaples(self.part, settings)
+    # end def
+
+    def stage_sequence(self):
+        if self.options.scaffold is None:
+            return
+        sequence = scaffoldSequence(self.options.scaffold)
+        start = self.options.scaffoldStart
+        if start is not None:
+            vhNum, idx = start
+            vh = self.part.virtualHelix(vhNum)
+            strand = vh.scaffoldStrandSet().getStrand(idx) if vh else None
+            if strand is None:
+                raise ValueError("no scaffold at %d[%d]" % (vhNum, idx))
+            strand.oligo().applySequence(sequence, useUndoStack=False)
+        else:
+            for oligo in list(self.part.oligos()):
+                if not oligo.isStaple():
+                    oligo.applySequence(sequence, useUndoStack=False)
+    # end def
+
+    def stage_export(self):
+        from cadnano2.model.io.encoder import encode
+        outDir = self.options.outdir or os.path.dirname(self.path)
+        if self.options.outdir:
+            os.makedirs(outDir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        if 'csv' in self.options.formats:
+            fname = os.path.join(outDir, stem + '_staples.csv')
+            output = self.part.getStapleSequences()
+            with open(fname, 'w') as f:
+                f.write(output)
+            self.outputs.append(fname)
+        if 'json' in self.options.formats:
+            fname = os.path.join(outDir, stem + '_processed.json')
+            with open(fname, 'w') as f:
+                encode(self.document, helixOrder(self.part), f)
+            self.outputs.append(fname)
+        if 'binary' in self.options.formats:
+            from cadnano2.model.io.binaryencoder import encodeBinary
+            fname = os.path.join(outDir, stem + '_processed.cn2b')
+            with open(fname, 'wb') as f:
+                encodeBinary(self.document, helixOrder(self.part), f)
+            self.outputs.append(fname)
+        meshFormats = [fmt for fmt in MESH_FORMATS \
+                       if fmt in self.options.formats]
+        if meshFormats:
+            from cadnano2.views.solidview.helixmesh import MeshDetail, \
+                                                          instancedPartMesh
+            from cadnano2.views.solidview.meshexport import writeMesh
+            detail = getattr(MeshDetail, self.options.meshDetail.title())
+            mesh = instancedPartMesh(self.part, detail)
+            if 'obj' in meshFormats or 'ply' in meshFormats:
+                flat = mesh.flatten()
+            for fmt in meshFormats:
+                fname = os.path.join(outDir, stem + '.' + fmt)
+                writeMesh(mesh if fmt == 'glb' else flat, fname)
+                self.outputs.append(fname)
+    # end def
+# end class
+
+
+def runBatch(paths, stages=STAGES, options=None):
+    """
+    Runs stages on each design in paths. Returns a list of
+    (path, timings, error) tuples where timings maps stage name to seconds
+    and error is None or the exception that stopped the design's pipeline.
+    """
+    if options is None:
+        options = parseArgs([])
+    results = []
+    for path in paths:
+        job = BatchJob(path, options)
+        try:
+            job.run(stages)
+            error = None
+        except Exception as e:
+            error = e
+        results.append((path, job.timings, error))
+    return results
+# end def
+
+
+def formatTimings(results, stages):
+    """Returns a plain text table of per-stage timings in seconds."""
+    nameWidth = max([len(os.path.basename(p)) for p, t, e in results] + [6])
+    header = "%-*s" % (nameWidth, "design")
+    header += "".join(" %10s" % s for s in stages) + " %10s" % "total"
+    lines = [header]
+    for path, timings, error in results:
+        line = "%-*s" % (nameWidth, os.path.basename(path))
+        for stage in stages:
+            if stage in timings:
+                line += " %10.3f" % timings[stage]
+            else:
+                line += " %10s" % "-"
+        line += " %10.3f" % sum(timings.values())
+        if error is not None:
+            line += "  FAILED: %r" % error
+        lines.append(line)
+    return "\n".join(lines)
+# end def
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(prog='cadnano2-batch',
+                description="Run cadnano2 designs through a headless "
+                            "decode/autostaple/autobreak/sequence/export "
+                            "pipeline and report per-stage timings.")
+    parser.add_argument('designs', nargs='*',
+                help=".json (or binary .cn2b) design files")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                help="comma-separated stages to run (default: %(default)s)")
+    parser.add_argument('--lattice', choices=('honeycomb', 'square'),
+                help="lattice type of .json designs (default: guessed from "
+                     "the number of bases; binary designs record their own)")
+    parser.add_argument('--scaffold', default=None,
+                help="scaffold sequence name (e.g. p7308) or sequence file")
+    parser.add_argument('--scaffold-start', dest='scaffoldStart',
+                default=None, metavar='VH:IDX',
+                help="apply the scaffold sequence to the oligo at VH:IDX "
+                     "only (default: every scaffold oligo)")
+    parser.add_argument('--lazy-sequences', dest='lazySequences',
+                action='store_true',
+                help="keep sequences in one buffer per helix instead of a "
+                     "string per strand")
+    parser.add_argument('--formats', default='csv',
+                help="comma-separated export formats: csv, json, binary, "
+                     "and obj, ply or glb for a 3D mesh of the strands "
+                     "(default: %(default)s)")
+    parser.add_argument('--mesh-detail', dest='meshDetail', default='base',
+                choices=MESH_DETAILS,
+                help="detail of obj/ply/glb meshes: a capsule per helix, a "
+                     "half cylinder per strand, or the twisted solid view "
+                     "shape (default: %(default)s). glb stores each shape "
+                     "once per strand length and places it per strand")
+    parser.add_argument('--outdir', default=None,
+                help="directory for exported files (default: next to "
+                     "each design)")
+    parser.add_argument('--min-length', dest='minStapleLen', type=int)
+    parser.add_argument('--max-length', dest='maxStapleLen', type=int)
+    parser.add_argument('--target-length', dest='tgtStapleLen', type=int)
+    parser.add_argument('--min-leg-length', dest='minStapleLegLen', type=int)
+    parser.add_argument('--workers', dest='workers', type=int,
+                help="processes used to solve autobreak oligos (default: 1, "
+                     "0 = one per cpu)")
+    parser.add_argument('--solver', dest='solver',
+                choices=('dp', 'networkx', 'check'),
+                help="autobreak staple graph solver (default: dp; 'check' "
+                     "also runs networkx and reports disagreements)")
+    parser.add_argument('--token-cache', dest='tokenCacheFile',
+                default=None, metavar='FILE',
+                help="load autobreak solutions from FILE and save them back "
+                     "to it, so later runs can reuse them")
+    parser.add_argument('--verify', action='store_true',
+                help="after each stage, check every oligo length against a "
+                     "full walk of its strands")
+    parser.add_argument('--timings', default=None, metavar='FILE',
+                help="also write the timings to FILE as JSON")
+    parser.add_argument('--no-qt', dest='useQt', action='store_false',
+                help="run the model on the dummy Qt classes, without "
+                     "importing PyQt")
+    options = parser.parse_args(argv)
+
+    options.stages = [s.strip() for s in options.stages.split(',') if s.strip()]
+    for stage in options.stages:
+        if stage not in STAGES:
+            parser.error("unknown stage %r (choose from %s)" % \
+                                            (stage, ', '.join(STAGES)))
+    options.formats = [f.strip() for f in options.formats.split(',')]
+    if any(fmt in MESH_FORMATS for fmt in options.formats):
+        try:
+            import numpy
+        except ImportError:
+            parser.error("obj, ply and glb export need NumPy "
+                         "(pip install cadnano2[mesh])")
+    if options.scaffoldStart is not None:
+        try:
+            vhNum, idx = options.scaffoldStart.split(':')
+            options.scaffoldStart = (int(vhNum), int(idx))
+        except ValueError:
+            parser.error("--scaffold-start must look like VH:IDX")
+    options.autobreakSettings = dict((k, getattr(options, k)) \
+                                     for k in DEFAULT_AUTOBREAK_SETTINGS \
+                                     if getattr(options, k) is not None)
+    return options
+# end def
+
+
+def main(argv=None):
+    options = parseArgs(sys.argv[1:] if argv is None else argv)
+    if not options.designs:
+        print("No designs given.", file=sys.stderr)
+        return 2
+    if 'decode' not in options.stages:
+        print("The decode stage is required.", file=sys.stderr)
+        return 2
+    initHeadless(options.useQt)
+    results = runBatch(options.designs, options.stages, options)
+    print(formatTimings(results, options.stages))
+    if 'autobreak' in options.stages:
+        from cadnano2.plugins.autobreak import autobreak
+        stats = autobreak.token_cache.stats()
+        print("autobreak token cache: %(size)d entries, %(hits)d hits, "
+              "%(misses)d misses" % stats)
+    if options.timings:
+        with open(options.timings, 'w') as f:
+            json.dump([{'design': path,
+                        'timings': timings,
+                        'error': None if error is None else repr(error)}
+                       for path, timings, error in results], f, indent=1)
+    return 1 if any(e is not None for p, t, e in results) else 0
+# end def
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,8 +20,13 @@ class HeadlessCadnano(object):
     def isInMaya(self):
         return False
     class prefs():
+        honeycombRows = 30
+        honeycombCols = 32
+        honeycombSteps = 2
         squareRows = 50
         squareCols = 50
+        squareSteps = 2
+        undoMemoryBudget = 0  # MB, 0 for no limit
     def isGui(self):
         return False
 # end def
@@ -33,6 +38,10 @@ def app(appArgs=None):
     return initAppWithoutGui(appArgs)
 
 def initAppWithoutGui(appArgs=sys.argv):
+    # without a QApplication the model runs on the dummy Qt classes,
+    # unless a Qt framework has already been picked
+    if util.chosenQtFramework is None:
+        util.qtFrameworkList = ['Dummy']
     global sharedApp
     sharedApp = HeadlessCadnano()
     # loadAllPlugins()
@@ -2,7 +2,7 @@ import io
 import os
 from ..cadnano import app
 from ..model.document import Document
-from ..model.io.decoder import decode
+from ..model.io.decoder import decodeFile
 from ..model.io.encoder import encode
 from ..views.documentwindow import DocumentWindow
 from ..views import styles
@@ -659,7 +659,7 @@ class DocumentController():
         self.newDocument(fname=fname)
 
         with io.open(fname, 'r', encoding='utf-8') as fd:
-            decode(self._document, fd.read())
+            decodeFile(self._document, fd)
 
         if hasattr(self, "filesavedialog"):  # user did save
             if self.fileopendialog is not None:
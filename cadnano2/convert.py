@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+convert.py
+
+Converts cadnano2 designs between the legacy .json format and the compact
+binary format of model/io/binaryencoder.py. The direction is picked from
+the input: binary files start with the 'CN2B' magic, anything else is
+read as legacy .json.
+
+Usage:
+    python -m cadnano2.convert design.json design.cn2b
+    python -m cadnano2.convert design.cn2b design.json
+"""
+
+import argparse
+import os
+import sys
+
+
+def guessLatticeType(numBases):
+    """
+    Returns the lattice type the GUI would pick for a legacy design with
+    numBases bases without asking: square if numBases is only a multiple
+    of 32, honeycomb otherwise (the headless decoder's default).
+    """
+    from cadnano2.model.enum import LatticeType
+    if numBases % 32 == 0 and numBases % 21 != 0:
+        return LatticeType.Square
+    return LatticeType.Honeycomb
+# end def
+
+
+def jsonToBinary(jsonPath, binPath, latticeType=None, compress=True):
+    """
+    Converts the legacy design at jsonPath to a binary design at binPath.
+    The vstrands are streamed and reduced to LegacyHelix records, so no
+    model is built. latticeType defaults to guessLatticeType.
+    """
+    from cadnano2.model.io import jsonstream
+    from cadnano2.model.io.binaryencoder import packHelices
+    from cadnano2.model.io.legacydecoder import readLegacyHelix
+    helices = []
+
+    def readHelix(helix):
+        helices.append(readLegacyHelix(helix))
+
+    with open(jsonPath, 'rb') as f:
+        obj = jsonstream.streamObject(f, {'vstrands': readHelix})
+    if not helices:
+        raise ValueError("%s has no vstrands" % jsonPath)
+    numBases = helices[0].numBases
+    if latticeType is None:
+        latticeType = guessLatticeType(numBases)
+    name = obj.get('name', os.path.basename(jsonPath))
+    data = packHelices(name, latticeType, numBases, helices, compress)
+    with open(binPath, 'wb') as f:
+        f.write(data)
+# end def
+
+
+def binaryToJson(binPath, jsonPath):
+    """
+    Converts the binary design at binPath to legacy .json at jsonPath by
+    decoding it into a Document and saving that with the legacy encoder.
+    """
+    from cadnano2.batch import helixOrder
+    from cadnano2.model.document import Document
+    from cadnano2.model.io.binarydecoder import decodeBinary
+    from cadnano2.model.io.encoder import encode
+    document = Document()
+    with open(binPath, 'rb') as f:
+        decodeBinary(document, f)
+    with open(jsonPath, 'w') as f:
+        encode(document, helixOrder(document.selectedPart()), f)
+# end def
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cadnano2-convert',
+                description="Convert a cadnano2 design between legacy .json "
+                            "and the compact binary format.")
+    parser.add_argument('input', help="design to convert")
+    parser.add_argument('output', help="converted design")
+    parser.add_argument('--lattice', choices=('honeycomb', 'square'),
+                help="lattice type of a .json input (default: guessed from "
+                     "the number of bases)")
+    parser.add_argument('--no-compress', dest='compress', action='store_false',
+                help="don't zlib-compress binary output")
+    options = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from cadnano2.batch import initHeadless
+    initHeadless()
+    from cadnano2.model.enum import LatticeType
+    from cadnano2.model.io.binarydecoder import isBinaryDesign
+    with open(options.input, 'rb') as f:
+        isBinary = isBinaryDesign(f.read(4))
+    if isBinary:
+        binaryToJson(options.input, options.output)
+    else:
+        latticeType = {None: None,
+                       'honeycomb': LatticeType.Honeycomb,
+                       'square': LatticeType.Square}[options.lattice]
+        jsonToBinary(options.input, options.output, latticeType,
+                     options.compress)
+    inSize = os.path.getsize(options.input)
+    outSize = os.path.getsize(options.output)
+    print("%s (%d bytes) -> %s (%d bytes)" % (options.input, inSize,
+                                              options.output, outSize))
+    return 0
+# end def
+
+
+if __name__ == '__main__':
+    sys.exit(main())
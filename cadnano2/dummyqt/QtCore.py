@@ -1,29 +1,117 @@
-QObject = object
+"""
+Stand-ins for the QtCore classes the model uses, so that cadnano2.model
+runs without Qt. util.qtWrapImport hands these out when the 'Dummy'
+framework is chosen.
+"""
+
 
 class Qt(object):
     pass
 
-class pyqtSignal(object):
-    def __init__(self, *args):
-        """ We don't actually do anything with argtypes because
-        the real Qt will perform checks in the Gui version of
-        cadnano which should suffice. """
-        self.signalEmitters = {}
-        self.argtypes = args
-    def __get__(self, emitter):
-        try:
-            return self.signalEmitters.get(emitter)
-        except KeyError:
-            self.signalEmitters[emitter] = pyqtBoundSignal()
-            return emitter
+
+class QObject(object):
+    """
+    Keeps the parent/children links of a QObject: a parent holds on to
+    its children, as it owns them in Qt.
+    """
+    def __init__(self, parent=None, *args, **kwargs):
+        self._parent = None
+        self._children = None
+        if isinstance(parent, QObject):
+            self.setParent(parent)
+    # end def
+
+    def parent(self):
+        return self._parent
+    # end def
+
+    def setParent(self, parent):
+        if parent is self._parent:
+            return
+        if self._parent is not None:
+            del self._parent._children[id(self)]
+        self._parent = parent
+        if parent is not None:
+            if parent._children is None:
+                parent._children = {}
+            parent._children[id(self)] = self
+    # end def
+
+    def children(self):
+        return list(self._children.values()) if self._children else []
+    # end def
+
+    def deleteLater(self):
+        self.setParent(None)
+    # end def
+# end class
+
 
 class pyqtBoundSignal(object):
+    """
+    A signal of one object. emit calls the connected slots in order;
+    with nothing connected it is a loop over an empty tuple.
+    """
+    __slots__ = ('_slots',)
+
     def __init__(self):
-        self.targets = {}
-    def connect(self, target):
-        self.targets.add(target)
-    def disconnect(self, target):
-        self.targets.remove(target)
+        self._slots = ()
+    # end def
+
+    def connect(self, slot):
+        if isinstance(slot, pyqtBoundSignal):
+            slot = slot.emit
+        self._slots = self._slots + (slot,)
+    # end def
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self._slots = ()
+            return
+        if isinstance(slot, pyqtBoundSignal):
+            slot = slot.emit
+        slots = list(self._slots)
+        try:
+            slots.remove(slot)
+        except ValueError:
+            raise TypeError("disconnect() failed between signal and slot")
+        self._slots = tuple(slots)
+    # end def
+
     def emit(self, *args):
-        for t in self.targets:
-            t(*args)
\ No newline at end of file
+        for slot in self._slots:
+            slot(*args)
+    # end def
+# end class
+
+
+class pyqtSignal(object):
+    """
+    Class attribute declaring a signal. The argument types aren't checked,
+    the GUI's real Qt does that. The first access from an instance stores
+    a pyqtBoundSignal in the instance's __dict__ under the same name, so
+    later accesses are plain attribute lookups and every access returns
+    the same object, as PyQt's bound signals compare equal.
+    """
+    def __init__(self, *types, **kwargs):
+        self._name = None
+    # end def
+
+    def __set_name__(self, owner, name):
+        self._name = name
+    # end def
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        bound = obj.__dict__[self._name] = pyqtBoundSignal()
+        return bound
+    # end def
+# end class
+
+
+def pyqtSlot(*types, **kwargs):
+    def decorator(func):
+        return func
+    return decorator
+# end def
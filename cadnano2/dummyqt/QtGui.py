@@ -1,95 +1,409 @@
+"""
+Stand-ins for the QtGui classes the model uses: a pure-Python undo stack
+with macros, and the small parts of QColor and QFont that views.styles
+needs to load.
+"""
+
+import re
+
+from .QtCore import QObject, pyqtSignal
+
+
 class QUndoCommand(object):
-    children = []
-    name = "untitled"
-    def undo(self):
-        for c in reversed(self.children):
-            c.undo()
+    """
+    Like QUndoCommand, a command with child commands: the default redo
+    redoes the children in order and undo undoes them in reverse.
+    QUndoCommand(parent), QUndoCommand(text) and QUndoCommand(text, parent)
+    are accepted.
+    """
+    # kept out of __dict__, which util.releaseUndoCommand empties
+    __slots__ = ('_text', '_children', '_obsolete', '__dict__')
+
+    def __init__(self, *args):
+        self._text = ''
+        self._children = []
+        self._obsolete = False
+        parent = None
+        for arg in args:
+            if isinstance(arg, QUndoCommand):
+                parent = arg
+            elif isinstance(arg, str):
+                self._text = arg
+        if parent is not None:
+            parent._children.append(self)
+    # end def
+
+    def text(self):
+        return self._text
+    # end def
+
+    def setText(self, text):
+        self._text = text
+    # end def
+
+    def id(self):
+        return -1
+    # end def
+
+    def mergeWith(self, command):
+        return False
+    # end def
+
+    def isObsolete(self):
+        return self._obsolete
+    # end def
+
+    def setObsolete(self, obsolete):
+        self._obsolete = obsolete
+    # end def
+
+    def childCount(self):
+        return len(self._children)
+    # end def
+
+    def child(self, index):
+        if 0 <= index < len(self._children):
+            return self._children[index]
+        return None
+    # end def
+
     def redo(self):
-        for c in self.children:
-            c.redo()
-
-class QUndoStack(object):
-    undoCmds = []
-    macroStack = []  # list of lists
-    macroNameStack = []
-    index = 0
-    clean = True
+        for command in self._children:
+            command.redo()
+    # end def
+
+    def undo(self):
+        for command in reversed(self._children):
+            command.undo()
+    # end def
+# end class
+
+
+class QUndoStack(QObject):
+    """
+    A pure-Python QUndoStack: the commands before index() are done, the
+    ones after it can be redone, and pushing a command drops those. A
+    macro collects the commands pushed between beginMacro and endMacro
+    into one command; macros nest. Clean state, the undo limit and
+    obsolete commands follow Qt's rules.
+    """
+    canRedoChanged = pyqtSignal(bool)
+    canUndoChanged = pyqtSignal(bool)
+    cleanChanged = pyqtSignal(bool)
+    indexChanged = pyqtSignal(int)
+    redoTextChanged = pyqtSignal(str)
+    undoTextChanged = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super(QUndoStack, self).__init__(parent)
+        self._commands = []
+        self._macroStack = []
+        self._index = 0
+        self._cleanIndex = 0
+        self._undoLimit = 0
+    # end def
+
+    def count(self):
+        return len(self._commands)
+    # end def
+
+    def index(self):
+        return self._index
+    # end def
+
+    def command(self, index):
+        if 0 <= index < len(self._commands):
+            return self._commands[index]
+        return None
+    # end def
+
+    def text(self, index):
+        command = self.command(index)
+        return command.text() if command is not None else ''
+    # end def
+
+    def canUndo(self):
+        return not self._macroStack and self._index > 0
+    # end def
+
+    def canRedo(self):
+        return not self._macroStack and self._index < len(self._commands)
+    # end def
+
+    def undoText(self):
+        return self.text(self._index - 1) if self.canUndo() else ''
+    # end def
+
+    def redoText(self):
+        return self.text(self._index) if self.canRedo() else ''
+    # end def
+
     def isClean(self):
-        return self.clean
+        return not self._macroStack and self._cleanIndex == self._index
+    # end def
+
+    def cleanIndex(self):
+        return self._cleanIndex
+    # end def
+
     def setClean(self):
-        self.clean = True
-    def clean(self):
-        self.clean = True
-        self.undoCmds = []
-        self.index = 0
-    def beginMacro(self, macroName):
-        self.macroStack.append([])
-        self.macroNameStack.append(macroName)
-        self.clean = False
-    def push(self, cmd):
-        if self.macroStack:
-            self.macroStack[-1].append(cmd)
+        wasClean = self.isClean()
+        self._cleanIndex = self._index
+        if not wasClean and self.isClean():
+            self.cleanChanged.emit(True)
+    # end def
+
+    def resetClean(self):
+        wasClean = self.isClean()
+        self._cleanIndex = -1
+        if wasClean:
+            self.cleanChanged.emit(False)
+    # end def
+
+    def undoLimit(self):
+        return self._undoLimit
+    # end def
+
+    def setUndoLimit(self, limit):
+        """As in Qt, this only has an effect while the stack is empty."""
+        if self._commands or limit == self._undoLimit:
+            return
+        self._undoLimit = limit
+    # end def
+
+    def isActive(self):
+        return True
+    # end def
+
+    def push(self, command):
+        command.redo()
+        if self._macroStack:
+            self._macroStack[-1]._children.append(command)
+            return
+        self._dropRedoCommands()
+        self._commands.append(command)
+        self._checkUndoLimit()
+        self._setIndex(self._index + 1)
+    # end def
+
+    def beginMacro(self, text):
+        command = QUndoCommand(text)
+        if self._macroStack:
+            self._macroStack[-1]._children.append(command)
         else:
-            self.undoCmds.append(cmd)
-            self.index = len(self.undoCmds) - 1
-        cmd.redo()
-        self.clean = False
+            self._dropRedoCommands()
+            self._commands.append(command)
+            if self._index == self._cleanIndex:
+                self.cleanChanged.emit(False)
+            self.canUndoChanged.emit(False)
+            self.canRedoChanged.emit(False)
+        self._macroStack.append(command)
+    # end def
+
     def endMacro(self):
-        l = len(self.macroStack)
-        if l == 0:
-            assert(False)  # Can't end a macro that wasn't begun
-        cmd = QUndoCommand()
-        cmd.children = self.macroStack.pop()
-        cmd.name = self.macroNameStack.pop()
-        if l == 1:
-            self.undoCmds.append(cmd)
-            self.index = len(self.undoCmds) - 1
-        else:
-            self.macroStack[-1].append(cmd)
-        self.clean = False
+        if not self._macroStack:
+            raise RuntimeError("QUndoStack.endMacro(): no matching beginMacro()")
+        self._macroStack.pop()
+        if not self._macroStack:
+            self._checkUndoLimit()
+            self._setIndex(self._index + 1, wasClean=False)
+    # end def
+
     def undo(self):
-        assert(not self.macroStack)  # Can't undo in the middle of a macro!
-        if self.index > 0:
-            cmd = self.undoCmds[self.index]
-            self.index = self.index - 1
-            cmd.undo()
+        if self._index == 0 or self._macroStack:
+            return
+        wasClean = self.isClean()
+        self._setIndex(self._undoCommand(self._index - 1), wasClean)
+    # end def
+
     def redo(self):
-        assert(not macroStack)  # Can't redo in the middle of a macro
-        if self.index < len(self.undoCmds) - 1:
-            cmd = self.undoCmds[self.index + 1]
-            self.index = self.index + 1
-            cmd.redo()
+        if self._index == len(self._commands) or self._macroStack:
+            return
+        wasClean = self.isClean()
+        self._setIndex(self._redoCommand(self._index), wasClean)
+    # end def
+
+    def setIndex(self, index):
+        if self._macroStack:
+            return
+        index = max(0, min(index, len(self._commands)))
+        wasClean = self.isClean()
+        i = self._index
+        while i < index:
+            nextI = self._redoCommand(i)
+            if nextI == i:
+                index -= 1  # an obsolete command was deleted
+            i = nextI
+        while i > index:
+            i = self._undoCommand(i - 1)
+        self._setIndex(index, wasClean)
+    # end def
+
+    def clear(self):
+        if not self._commands and not self._macroStack:
+            return
+        wasClean = self.isClean()
+        self._macroStack = []
+        self._commands = []
+        self._index = 0
+        self._cleanIndex = 0
+        self.indexChanged.emit(0)
+        self.canUndoChanged.emit(False)
+        self.canRedoChanged.emit(False)
+        self.undoTextChanged.emit('')
+        self.redoTextChanged.emit('')
+        if not wasClean:
+            self.cleanChanged.emit(True)
+    # end def
+
+    def _undoCommand(self, i):
+        """
+        Undoes command i, deleting it instead if it is obsolete. Returns
+        the new index.
+        """
+        command = self._commands[i]
+        if not command.isObsolete():
+            command.undo()
+        if command.isObsolete():
+            self._deleteCommand(i)
+        return i
+    # end def
+
+    def _redoCommand(self, i):
+        """
+        Redoes command i, deleting it instead if it is obsolete. Returns
+        the new index.
+        """
+        command = self._commands[i]
+        if not command.isObsolete():
+            command.redo()
+        if command.isObsolete():
+            self._deleteCommand(i)
+            return i
+        return i + 1
+    # end def
+
+    def _deleteCommand(self, i):
+        del self._commands[i]
+        if self._cleanIndex > i:
+            self._cleanIndex = -1
+    # end def
+
+    def _dropRedoCommands(self):
+        del self._commands[self._index:]
+        if self._cleanIndex > self._index:
+            self._cleanIndex = -1
+    # end def
+
+    def _checkUndoLimit(self):
+        limit = self._undoLimit
+        if limit <= 0 or self._macroStack or limit >= len(self._commands):
+            return
+        drop = len(self._commands) - limit
+        del self._commands[:drop]
+        self._index -= drop
+        if self._cleanIndex != -1:
+            if self._cleanIndex < drop:
+                self._cleanIndex = -1
+            else:
+                self._cleanIndex -= drop
+    # end def
+
+    def _setIndex(self, index, wasClean=None):
+        if wasClean is None:
+            wasClean = self.isClean()
+        self._index = index
+        self.indexChanged.emit(index)
+        self.canUndoChanged.emit(self.canUndo())
+        self.undoTextChanged.emit(self.undoText())
+        self.canRedoChanged.emit(self.canRedo())
+        self.redoTextChanged.emit(self.redoText())
+        if wasClean != self.isClean():
+            self.cleanChanged.emit(not wasClean)
+    # end def
+# end class
+
 
 class QColor(object):
-    r = 0
-    g = 0
-    b = 0
-    a = 0
+    """An RGBA color, QColor(r, g, b[, a]), QColor('#rrggbb') or a copy."""
     def __init__(self, *args):
-        if len(args) == 1:
-            assert(type(args[0]) == str)
-            hvals = re.findall('[0-9a-fA-F]{2}', args[0])
-            hvals = [int(hv, 16) for hv in hvals]
-        elif len(args) == 3:
-            hvals = list(args)
-        elif len(args) == 4:
-            hvals = list(args)
+        if len(args) == 1 and isinstance(args[0], QColor):
+            hvals = list(args[0].getRgb())
+        elif len(args) == 1 and isinstance(args[0], str):
+            hvals = [int(hv, 16) for hv in
+                     re.findall('[0-9a-fA-F]{2}', args[0])]
         else:
-            hvals = []
+            hvals = [int(v) for v in args]
         while len(hvals) < 3:
             hvals.append(0)
         if len(hvals) < 4:
             hvals.append(255)
         for hv in hvals:
             assert(0 <= hv <= 255)
-        r, g, b, a = hvals
+        self._r, self._g, self._b, self._a = hvals[:4]
+    # end def
+
+    def __eq__(self, other):
+        return isinstance(other, QColor) and self.getRgb() == other.getRgb()
+    # end def
+
+    def __ne__(self, other):
+        return not self == other
+    # end def
+
+    def __hash__(self):
+        return hash(self.getRgb())
+    # end def
+
+    def red(self):
+        return self._r
+    # end def
+
+    def green(self):
+        return self._g
+    # end def
+
+    def blue(self):
+        return self._b
+    # end def
+
+    def alpha(self):
+        return self._a
+    # end def
+
+    def setAlpha(self, alpha):
+        self._a = alpha
+    # end def
+
+    def getRgb(self):
+        return self._r, self._g, self._b, self._a
+    # end def
+
+    def name(self):
+        return "#%02x%02x%02x" % (self._r, self._g, self._b)
+    # end def
+
+    def isValid(self):
+        return True
+    # end def
+# end class
+
 
 class QFont(object):
     dummy = True
     Bold = None
+
+    class Weight(object):
+        Normal = 400
+        Bold = 700
+    # end class
+
     def __init__(self, *args):
         pass
+# end class
+
 
 class QFontMetricsF(object):
     def __init__(self, *args):
         pass
+# end class
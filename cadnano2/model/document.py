@@ -5,6 +5,8 @@ from .parts.honeycombpart import HoneycombPart
 from .parts.squarepart import SquarePart
 from .parts.part import Part
 from .strand import Strand
+from .strandstate import PartStrandState
+from contextlib import contextmanager
 from operator import itemgetter
 import cadnano2.util as util
 import cadnano2.cadnano as cadnano
@@ -20,7 +22,7 @@ class Document(QObject):
     """
     def __init__(self):
         super(Document, self).__init__()
-        self._undoStack = QUndoStack()
+        self._undoStack = QUndoStack(self)
         self._parts = []
         self._assemblies = []
         self._controller = None
@@ -29,7 +31,22 @@ class Document(QObject):
         self._selectionDict = {}
         # the added list is what was recently selected or deselected
         self._selectedChangedDict = {}
-        cadnano.app().documentWasCreatedSignal.emit(self)
+        # view-refresh signals held back by beginBatchUpdates
+        self._batchDepth = 0
+        self._pendingSignals = None
+        # [part, desc, depth, stateBefore] while a compact macro is open
+        self._compactMacro = None
+        # bytes the undo history may hold on to, None for no limit
+        budget = cadnano.app().prefs.undoMemoryBudget
+        self._undoMemoryBudget = budget * 2**20 if budget else None
+        # [command, cost] for each command on the undoStack; the first
+        # _releasedCount were released to fit the budget
+        self._undoCosts = []
+        self._undoMemoryUsage = 0
+        self._releasedCount = 0
+        self._undoStack.indexChanged.connect(self.undoStackIndexChangedSlot)
+        if cadnano.app().isGui():
+            cadnano.app().documentWasCreatedSignal.emit(self)
 
     ### SIGNALS ###
     documentPartAddedSignal = pyqtSignal(object, QObject)  # doc, part
@@ -46,6 +63,10 @@ class Document(QObject):
 
 
     ### SLOTS ###
+    def undoStackIndexChangedSlot(self, index):
+        self._updateUndoMemoryUsage()
+        self._enforceUndoMemoryBudget()
+    # end def
 
     ### ACCESSORS ###
     def undoStack(self):
@@ -56,6 +77,19 @@ class Document(QObject):
         """
         return self._undoStack
 
+    def undoMemoryBudget(self):
+        return self._undoMemoryBudget
+    # end def
+
+    def undoMemoryUsage(self):
+        """
+        Returns the bytes held by the commands on the undoStack, as
+        estimated by util.undoMemoryCost when each was pushed. Released
+        commands count for nothing.
+        """
+        return self._undoMemoryUsage
+    # end def
+
     def parts(self):
         """Returns a list of parts associated with the document."""
         return self._parts
@@ -469,6 +503,144 @@ class Document(QObject):
         self._selectedPart = newPart
     # end def
 
+    def setUndoMemoryBudget(self, budget):
+        """
+        Limits the undo history to about budget bytes (see undoMemoryUsage),
+        or lifts the limit if budget is None. When the history outgrows the
+        budget its oldest commands are released (see
+        util.releaseUndoCommand) until it fits again, always keeping the
+        last command done; QUndoStack deletes them when they are reached,
+        so undo stops there.
+        """
+        self._undoMemoryBudget = budget
+        self._enforceUndoMemoryBudget()
+    # end def
+
+    def _updateUndoMemoryUsage(self):
+        """
+        Brings _undoCosts in line with the undoStack. Undoing a released
+        command deletes it, and pushing drops the commands that could be
+        redone and adds one at the top, so only the ends need checking.
+        """
+        stack = self._undoStack
+        costs = self._undoCosts
+        count = stack.count()
+        index = stack.index()
+        while index < self._releasedCount and len(costs) > count and \
+              stack.command(index) is not costs[index][0]:
+            del costs[index]
+            self._releasedCount -= 1
+        while costs and (len(costs) > count or
+                         stack.command(len(costs) - 1) is not costs[-1][0]):
+            self._undoMemoryUsage -= costs.pop()[1]
+        for i in range(len(costs), count):
+            command = stack.command(i)
+            cost = util.undoMemoryCost(command)
+            costs.append([command, cost])
+            self._undoMemoryUsage += cost
+        self._releasedCount = min(self._releasedCount, len(costs))
+    # end def
+
+    def _enforceUndoMemoryBudget(self):
+        budget = self._undoMemoryBudget
+        if budget is None or self._undoMemoryUsage <= budget:
+            return
+        costs = self._undoCosts
+        last = self._undoStack.index() - 1
+        i = self._releasedCount
+        while self._undoMemoryUsage > budget and i < last:
+            util.releaseUndoCommand(costs[i][0])
+            self._undoMemoryUsage -= costs[i][1]
+            costs[i][1] = 0
+            i += 1
+        self._releasedCount = i
+    # end def
+
+    def beginCompactMacro(self, part, desc=None):
+        """
+        Starts a compact macro on part. Until the matching endCompactMacro,
+        commands run through util.execCommandList are applied without
+        being pushed, and endCompactMacro pushes one Part.StrandStateCommand
+        that restores the strands and oligos of part from before or after
+        the macro. Used for edits that run thousands of commands, such as
+        autostaple and autobreak. Compact macros nest; inner ones join the
+        outermost.
+        """
+        compactMacro = self._compactMacro
+        if compactMacro is not None:
+            compactMacro[2] += 1
+            return
+        self._compactMacro = [part, desc, 1, PartStrandState(part)]
+    # end def
+
+    def endCompactMacro(self):
+        compactMacro = self._compactMacro
+        compactMacro[2] -= 1
+        if compactMacro[2] > 0:
+            return
+        self._compactMacro = None
+        part, desc, depth, before = compactMacro
+        c = Part.StrandStateCommand(part, before, desc)
+        if not c.isEmpty():
+            self._undoStack.push(c)
+    # end def
+
+    def isCompactingMacro(self):
+        return self._compactMacro is not None
+    # end def
+
+    def emitSignal(self, signal, *args):
+        """
+        Emits signal with args, or queues it if a batch update is open.
+        Only signals that ask the views to redraw from the current model
+        state should come through here: a queued signal is sent once per
+        (signal, args) pair however often it was queued, in the order of
+        its last queueing, when the outermost batch ends.
+        """
+        pending = self._pendingSignals
+        if pending is None:
+            signal.emit(*args)
+            return
+        key = (signal, args)
+        pending.pop(key, None)
+        pending[key] = None
+    # end def
+
+    def beginBatchUpdates(self):
+        """
+        Starts holding back the signals sent through emitSignal. Batches
+        nest; endBatchUpdates must be called once for each call.
+        """
+        if self._batchDepth == 0:
+            self._pendingSignals = {}
+        self._batchDepth += 1
+    # end def
+
+    def endBatchUpdates(self):
+        """Ends a batch, flushing the queued signals if it is the last."""
+        self._batchDepth -= 1
+        if self._batchDepth > 0:
+            return
+        pending, self._pendingSignals = self._pendingSignals, None
+        for signal, args in pending:
+            signal.emit(*args)
+    # end def
+
+    @contextmanager
+    def batchUpdates(self):
+        """
+        Context manager form of begin/endBatchUpdates:
+
+            with document.batchUpdates():
+                ...  # model edits; views redraw once at the end
+        """
+        self.beginBatchUpdates()
+        try:
+            yield self
+        finally:
+            self.endBatchUpdates()
+    # end def
+
     ### PRIVATE SUPPORT METHODS ###
     def _addPart(self, part, useUndoStack=True):
         """Add part to the document via AddPartCommand."""
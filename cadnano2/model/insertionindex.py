@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+insertionindex.py
+
+A sorted index of the insertions and skips of one VirtualHelix, kept next
+to the Part's per-coord insertion dict. Strands ask it which insertions
+fall in a base range and what their lengths add up to without sorting or
+scanning the dict.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+
+
+class InsertionIndex(object):
+    """
+    InsertionIndex keeps the base indices that carry an insertion in a
+    sorted list, with the insertion lengths in a parallel list. Prefix sums
+    of the lengths are rebuilt lazily on the first range-sum query after a
+    change, so a burst of edits (e.g. a file import) costs one rebuild and
+    every query after it is a pair of bisects.
+
+    The Add/Remove/ChangeInsertion commands of Strand keep it in step with
+    Part.insertions().
+    """
+    def __init__(self):
+        self._idxs = []
+        self._lengths = []
+        self._prefix = None  # _prefix[i] == sum(self._lengths[:i])
+    # end def
+
+    def __len__(self):
+        return len(self._idxs)
+    # end def
+
+    def __contains__(self, idx):
+        i = bisect_left(self._idxs, idx)
+        return i < len(self._idxs) and self._idxs[i] == idx
+    # end def
+
+    def _range(self, idxL, idxH):
+        """Returns the slice bounds of the entries in [idxL, idxH]."""
+        return bisect_left(self._idxs, idxL), bisect_right(self._idxs, idxH)
+    # end def
+
+    def add(self, idx, length):
+        i = bisect_left(self._idxs, idx)
+        if i < len(self._idxs) and self._idxs[i] == idx:
+            self._lengths[i] = length
+        else:
+            self._idxs.insert(i, idx)
+            self._lengths.insert(i, length)
+        self._prefix = None
+    # end def
+
+    def remove(self, idx):
+        i = bisect_left(self._idxs, idx)
+        if i < len(self._idxs) and self._idxs[i] == idx:
+            del self._idxs[i]
+            del self._lengths[i]
+            self._prefix = None
+    # end def
+
+    def setLength(self, idx, length):
+        self.add(idx, length)
+    # end def
+
+    def shift(self, delta):
+        """Moves every entry by delta bases, for a change of minBase."""
+        self._idxs = [idx + delta for idx in self._idxs]
+    # end def
+
+    def idxsBetween(self, idxL, idxH):
+        """Returns the sorted indices with an insertion in [idxL, idxH]."""
+        lo, hi = self._range(idxL, idxH)
+        return self._idxs[lo:hi]
+    # end def
+
+    def lengthsBetween(self, idxL, idxH):
+        """Returns the lengths of the insertions in idxsBetween order."""
+        lo, hi = self._range(idxL, idxH)
+        return self._lengths[lo:hi]
+    # end def
+
+    def hasAnyBetween(self, idxL, idxH):
+        lo, hi = self._range(idxL, idxH)
+        return hi > lo
+    # end def
+
+    def lengthBetween(self, idxL, idxH):
+        """Returns the summed insertion length over [idxL, idxH]."""
+        lo, hi = self._range(idxL, idxH)
+        if hi <= lo:
+            return 0
+        return self._prefixSums()[hi] - self._prefix[lo]
+    # end def
+
+    def position(self, idx):
+        """
+        Returns where base idx starts in a sequence that runs left to right
+        along the whole helix from base 0, i.e. idx plus the length of the
+        insertions below idx.
+        """
+        return idx + self._prefixSums()[bisect_left(self._idxs, idx)]
+    # end def
+
+    def _prefixSums(self):
+        if self._prefix is None:
+            self._prefix = [0]
+            self._prefix.extend(accumulate(self._lengths))
+        return self._prefix
+    # end def
+# end class
@@ -0,0 +1,124 @@
+"""
+binarydecoder.py
+
+Reads the compact binary format written by binaryencoder. The sections
+are unpacked into LegacyHelix records, which import_legacy_helices then
+installs exactly like a legacy .json import, minus the per-base parsing.
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+
+from cadnano2.model.enum import StrandType
+from .binaryencoder import MAGIC, VERSION, FLAG_ZLIB, HEADER, COUNT, SECTIONS
+from .legacydecoder import LegacyHelix, import_legacy_helices
+
+
+def isBinaryDesign(data):
+    """Returns True if the bytes data start like a binary design file."""
+    return data[:len(MAGIC)] == MAGIC
+# end def
+
+
+def unpackInts(data, offset, count):
+    """Returns count little-endian int32s of data starting at offset."""
+    a = array('i')
+    if a.itemsize != 4:
+        return list(struct.unpack_from('<%di' % count, data, offset))
+    a.frombytes(data[offset:offset + 4 * count])
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a
+# end def
+
+
+def unpackCount(data, offset):
+    """Returns the uint32 count at offset in data."""
+    if offset + COUNT.size > len(data):
+        raise ValueError("Truncated binary design.")
+    return COUNT.unpack_from(data, offset)[0]
+# end def
+
+
+def unpackHelices(data):
+    """
+    Returns (name, latticeType, numBases, helices) for the binary file
+    contents data, where helices is a list of LegacyHelix in file order.
+    """
+    if len(data) < HEADER.size or not isBinaryDesign(data):
+        raise ValueError("Not a cadnano2 binary design.")
+    magic, version, flags, latticeType, numBases, numHelices = \
+                                                    HEADER.unpack_from(data)
+    if version > VERSION:
+        raise ValueError("Binary design version %d is newer than this "
+                         "cadnano (%d)." % (version, VERSION))
+    body = data[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            raise ValueError("Truncated binary design.")
+    offset = 0
+    nameLength = unpackCount(body, offset)
+    offset += COUNT.size
+    if offset + nameLength > len(body):
+        raise ValueError("Truncated binary design.")
+    name = body[offset:offset + nameLength].decode('utf-8')
+    offset += nameLength
+    rows = {}
+    for section, cols in SECTIONS:
+        count = unpackCount(body, offset)
+        offset += COUNT.size
+        n = count * len(cols)
+        if offset + 4 * n > len(body):
+            raise ValueError("Truncated binary design.")
+        rows[section] = (unpackInts(body, offset, n), len(cols))
+        offset += 4 * n
+    # end for
+
+    def iterRows(section):
+        values, width = rows[section]
+        for i in range(0, len(values), width):
+            yield values[i:i + width]
+
+    helices = []
+    for num, row, col in iterRows('helices'):
+        lh = LegacyHelix(num, row, col)
+        lh.numBases = numBases
+        helices.append(lh)
+    if len(helices) != numHelices:
+        raise ValueError("Binary design has %d helices, expected %d." % \
+                                                (len(helices), numHelices))
+    for i, strandType, low, high in iterRows('segments'):
+        lh = helices[i]
+        segments = lh.scafSegments if strandType == StrandType.Scaffold \
+                                   else lh.stapSegments
+        segments.extend((low, high))
+    for i, strandType, idx, toNum, toIdx in iterRows('xovers'):
+        lh = helices[i]
+        xovers = lh.scafXovers if strandType == StrandType.Scaffold \
+                               else lh.stapXovers
+        xovers.append((idx, toNum, toIdx))
+    for i, idx, length in iterRows('insertions'):
+        helices[i].insertions.append((idx, length))
+    for i, strandType, idx, rgb in iterRows('colors'):
+        lh = helices[i]
+        colors = lh.scafColors if strandType == StrandType.Scaffold \
+                               else lh.stapColors
+        colors.append((idx, rgb))
+    return name, latticeType, numBases, helices
+# end def
+
+
+def decodeBinary(document, data):
+    """
+    Populates document from data, the bytes of a binary design file or a
+    binary file object.
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        data = data.read()
+    name, latticeType, numBases, helices = unpackHelices(data)
+    import_legacy_helices(document, helices, latticeType, askLatticeType=False)
+# end def
@@ -0,0 +1,143 @@
+"""
+binaryencoder.py
+
+Writes a compact binary alternative to the legacy .json format. Instead of
+four ints per base per strand type, a file stores what the model is made
+of: the strand intervals of each helix, the 3' crossovers, the bases with
+an insertion or skip, and the oligo colors.
+
+Layout (all integers little-endian):
+
+    header  magic 'CN2B', uint16 version, uint16 flags, uint8 lattice
+            type, 3 pad bytes, uint32 number of bases, uint32 number of
+            helices
+    body    (zlib compressed if flags & FLAG_ZLIB)
+            uint32 length + utf-8 design name
+            then one section per entry of SECTIONS: uint32 row count and
+            count * width int32s, where helix is an index into the
+            helices section and type is a StrandType
+
+The binary decoder turns these straight into LegacyHelix records, so a
+load skips the per-base arrays entirely.
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+
+from cadnano2.model.enum import StrandType
+from .legacydecoder import LegacyHelix
+
+MAGIC = b'CN2B'
+VERSION = 1
+FLAG_ZLIB = 1
+HEADER = struct.Struct('<4sHHB3xII')
+COUNT = struct.Struct('<I')
+
+# section name, columns
+SECTIONS = (('helices', ('num', 'row', 'col')),
+            ('segments', ('helix', 'type', 'low', 'high')),
+            ('xovers', ('helix', 'type', 'idx', 'toNum', 'toIdx')),
+            ('insertions', ('helix', 'idx', 'length')),
+            ('colors', ('helix', 'type', 'idx', 'rgb')))
+
+
+def packInts(values):
+    """Returns values as little-endian int32 bytes."""
+    a = array('i', values)
+    if a.itemsize != 4:
+        return struct.pack('<%di' % len(a), *a)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+# end def
+
+
+def legacyHelixFromVirtualHelix(part, vh):
+    """
+    Returns a LegacyHelix for vh with the same content legacyencoder
+    writes for it, read from the strands rather than per base.
+    """
+    row, col = vh.coord()
+    lh = LegacyHelix(vh.number(), row, col)
+    lh.numBases = part.maxBaseIdx() + 1
+    for strandType, segments, xovers in \
+                ((StrandType.Scaffold, lh.scafSegments, lh.scafXovers),
+                 (StrandType.Staple, lh.stapSegments, lh.stapXovers)):
+        strandSet = vh.scaffoldStrandSet() if strandType == StrandType.Scaffold \
+                                           else vh.stapleStrandSet()
+        for strand in strandSet:
+            segments.extend(strand.idxs())
+            s3p = strand.connection3p()
+            if s3p != None:
+                xovers.append((strand.idx3Prime(),
+                               s3p.virtualHelix().number(), s3p.idx5Prime()))
+    # end for
+    for idx, insertion in sorted(part.insertions()[(row, col)].items()):
+        if insertion.length() != 0:
+            lh.insertions.append((idx, insertion.length()))
+    # colors, the same way legacyencoder picks them
+    for strand in vh.stapleStrandSet():
+        if strand.connection5p() == None:
+            c = str(strand.oligo().color())[1:]  # drop the hash
+            lh.stapColors.append([strand.idx5Prime(), int(c, 16)])
+    for strand in vh.scaffoldStrandSet():
+        if strand.connection5p() == None or \
+           (strand == strand.oligo().strand5p() and strand.oligo().isLoop()):
+            c = str(strand.oligo().color())[1:]  # drop the hash
+            lh.scafColors.append([strand.idx5Prime(), int(c, 16)])
+    return lh
+# end def
+
+
+def packHelices(name, latticeType, numBases, helices, compress=True):
+    """Returns the binary file contents for a list of LegacyHelix."""
+    columns = dict((section, []) for section, cols in SECTIONS)
+    for i, lh in enumerate(helices):
+        columns['helices'].extend((lh.num, lh.row, lh.col))
+        for strandType, segments, xovers in \
+                    ((StrandType.Scaffold, lh.scafSegments, lh.scafXovers),
+                     (StrandType.Staple, lh.stapSegments, lh.stapXovers)):
+            for j in range(0, len(segments) - 1, 2):
+                columns['segments'].extend((i, strandType,
+                                            segments[j], segments[j + 1]))
+            for idx, toNum, toIdx in xovers:
+                columns['xovers'].extend((i, strandType, idx, toNum, toIdx))
+        for idx, length in lh.insertions:
+            columns['insertions'].extend((i, idx, length))
+        for strandType, colors in ((StrandType.Scaffold, lh.scafColors),
+                                   (StrandType.Staple, lh.stapColors)):
+            for idx, rgb in colors:
+                columns['colors'].extend((i, strandType, idx, rgb))
+    # end for
+    nameBytes = name.encode('utf-8')
+    body = [COUNT.pack(len(nameBytes)), nameBytes]
+    for section, cols in SECTIONS:
+        values = columns[section]
+        body.append(COUNT.pack(len(values) // len(cols)))
+        body.append(packInts(values))
+    body = b''.join(body)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 9)
+        flags |= FLAG_ZLIB
+    header = HEADER.pack(MAGIC, VERSION, flags, latticeType,
+                         numBases, len(helices))
+    return header + body
+# end def
+
+
+def encodeBinary(document, helixOrderList, io, compress=True):
+    """
+    Writes the selected part of document to the binary file object io,
+    with the helices in helixOrderList order like encoder.encode.
+    """
+    from os.path import basename
+    part = document.selectedPart()
+    helices = [legacyHelixFromVirtualHelix(part, part.virtualHelixAtCoord(coord))
+               for coord in helixOrderList]
+    name = basename(str(getattr(io, 'name', '')))
+    io.write(packHelices(name, part.crossSectionType(), part.maxBaseIdx() + 1,
+                         helices, compress))
+# end def
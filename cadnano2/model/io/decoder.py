@@ -1,6 +1,7 @@
-import json
-from .legacydecoder import import_legacy_dict
-from cadnano2.ui.dialogs.ui_latticetype import Ui_LatticeType
+from . import jsonstream
+from .binarydecoder import decodeBinary, isBinaryDesign
+from .legacydecoder import import_legacy_helices, readLegacyHelix
+from cadnano2.convert import guessLatticeType
 import cadnano2.util as util
 import cadnano2.cadnano as cadnano
 if cadnano.app().isGui():  # headless:
@@ -27,7 +28,52 @@ def decode(document, string):
     #     dialogLT.buttonBox.setStandardButtons(QDialogButtonBox.Ok)
     #     dialog.exec()
     #     return
-    packageObject = json.loads(string)
+    decodeStream(document, string)
+
+
+def decodeFile(document, f):
+    """
+    Same as decode, but reads the design from the file object f instead of
+    a string, so the file never has to be held in memory as a whole.
+    """
+    decodeStream(document, f)
+
+
+def decodePath(document, path, latticeType=None):
+    """
+    Decodes the design file at path, which may be legacy .json or the
+    binary format written by binaryencoder. latticeType is passed on to
+    decodeStream for .json; binary designs record their own.
+    """
+    with open(path, 'rb') as f:
+        data = f.read(4)
+        if isBinaryDesign(data):
+            decodeBinary(document, data + f.read())
+        else:
+            f.seek(0)
+            decodeStream(document, f, latticeType)
+
+
+def decodeStream(document, source, latticeType=None):
+    """
+    Decodes the design in source (a file object or string) one vstrand at
+    a time: each is reduced to a LegacyHelix as soon as it is parsed and
+    its per-base arrays are dropped, so peak memory stays close to the
+    size of the final model rather than of the parsed JSON.
+
+    Legacy .json doesn't record the lattice type. If latticeType is None,
+    the GUI asks for it and headless decoding takes
+    convert.guessLatticeType of the number of bases.
+    """
+    helices = []
+
+    def readHelix(helix):
+        helices.append(readLegacyHelix(helix))
+
+    packageObject = jsonstream.streamObject(source, {'vstrands': readHelix})
 
     if packageObject.get('.format', None) != 'caDNAno2':
-        import_legacy_dict(document, packageObject)
\ No newline at end of file
+        askLatticeType = latticeType is None
+        if askLatticeType and helices and not cadnano.app().isGui():
+            latticeType = guessLatticeType(helices[0].numBases)
+        import_legacy_helices(document, helices, latticeType, askLatticeType)
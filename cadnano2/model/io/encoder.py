@@ -1,8 +1,6 @@
-from json import dumps
-from .legacyencoder import legacy_dict_from_doc
+from .legacyencoder import write_legacy_json
 
 
 def encode(document, helixOrderList, io):
-    obj = legacy_dict_from_doc(document, io.name, helixOrderList)
-    json_string = dumps(obj, separators=(',',':'))  # compact encoding
-    io.write(json_string)
+    # compact encoding, written one vstrand at a time
+    write_legacy_json(document, io.name, helixOrderList, io)
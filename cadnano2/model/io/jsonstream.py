@@ -0,0 +1,151 @@
+"""
+jsonstream.py
+
+An incremental reader for a JSON file whose top level is an object with
+one or more very large array members (e.g. the 'vstrands' of a legacy
+design). The elements of those arrays are decoded and handed to a
+callback one at a time, so only one element needs to be in memory at
+once. Everything else in the object is decoded normally.
+
+Only the standard library is used: the file is read in chunks and each
+value is decoded with json.JSONDecoder.raw_decode.
+"""
+
+import codecs
+import json
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = ' \t\n\r'
+
+
+class JSONStreamReader(object):
+    """
+    Decodes JSON values one at a time from a file object, or from a string
+    that is already in memory.
+    """
+    def __init__(self, f, chunkSize=CHUNK_SIZE):
+        self._file = f
+        self._chunkSize = chunkSize
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._bytesDecoder = codecs.getincrementaldecoder('utf-8')()
+        if isinstance(f, str):
+            self._file = None
+            self._buffer = f
+            self._eof = True
+    # end def
+
+    def _fill(self, size=None):
+        """
+        Drops the consumed part of the buffer and appends up to size more
+        characters. Returns False at the end of the file.
+        """
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self._chunkSize)
+        if not chunk:
+            self._eof = True
+            return False
+        if isinstance(chunk, bytes):
+            # a multibyte character may be split between two reads
+            chunk = self._bytesDecoder.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+    # end def
+
+    def _error(self, message):
+        return ValueError("%s at offset %d of the buffered input" % \
+                                                        (message, self._pos))
+    # end def
+
+    def peek(self):
+        """Returns the next non-whitespace character, or '' at the end."""
+        while True:
+            buf = self._buffer
+            pos = self._pos
+            n = len(buf)
+            while pos < n and buf[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                return ''
+    # end def
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self._error("expected %r" % char)
+        self._pos += 1
+    # end def
+
+    def value(self):
+        """
+        Decodes and returns the next value. If it doesn't fit in the buffer
+        more is read, doubling the read size each time so a value is
+        decoded at most O(log(size)) times.
+        """
+        self.peek()
+        size = self._chunkSize
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # a number can end at the end of the buffer without being done
+            if end == len(self._buffer) and self._fill(size):
+                size *= 2
+                continue
+            self._pos = end
+            return obj
+    # end def
+# end class
+
+
+def streamObject(f, arrayHandlers, chunkSize=CHUNK_SIZE):
+    """
+    Reads the JSON object in file object (or string) f. For each key in
+    arrayHandlers the value must be an array, and arrayHandlers[key](element)
+    is called for each of its elements in order instead of keeping them.
+    Returns a dict of the object's other members.
+    """
+    reader = JSONStreamReader(f, chunkSize)
+    result = {}
+    reader.expect('{')
+    if reader.peek() == '}':
+        return result
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise reader._error("expected an object key")
+        reader.expect(':')
+        handler = arrayHandlers.get(key)
+        if handler is None:
+            result[key] = reader.value()
+        else:
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    handler(reader.value())
+                    if reader.peek() == ',':
+                        reader.expect(',')
+                    else:
+                        reader.expect(']')
+                        break
+            # end if
+        # end if
+        if reader.peek() == ',':
+            reader.expect(',')
+        else:
+            reader.expect('}')
+            return result
+    # end while
+# end def
@@ -32,18 +32,106 @@ INSERTION = "insertion"
 DELETION = "deletion"
 
 
+class LegacyHelix(object):
+    """
+    The parts of a legacy 'vstrands' entry that import_legacy_helices
+    needs, without the per-base arrays: strand segments as (low, high)
+    bounds, 3' crossovers, and only the bases that carry an insertion or
+    skip. readLegacyHelix() builds one per vstrand, so the raw arrays of a
+    helix can be dropped as soon as it has been read.
+    """
+    def __init__(self, num, row, col):
+        self.num = num
+        self.row = row
+        self.col = col
+        self.numBases = 0
+        self.lengthsMatch = True
+        self.scafSegments = []
+        self.scafXovers = []
+        self.stapSegments = []
+        self.stapXovers = []
+        self.insertions = []  # (baseIdx, insertion + skip length)
+        self.stapColors = []
+        self.scafColors = []
+    # end def
+# end class
+
+
+def readLegacyHelix(helix):
+    """Returns a LegacyHelix with the contents of the vstrand dict helix."""
+    vhNum = helix['num']
+    lh = LegacyHelix(vhNum, helix['row'], helix['col'])
+    scaf = helix['scaf']
+    stap = helix['stap']
+    insertions = helix['loop']
+    skips = helix['skip']
+    lh.numBases = len(scaf)
+    lh.lengthsMatch = len(scaf) == len(stap) and \
+                      len(scaf) == len(insertions) and \
+                      len(insertions) == len(skips)
+    lh.scafSegments, lh.scafXovers = readSegments(StrandType.Scaffold,
+                                                  vhNum, scaf)
+    lh.stapSegments, lh.stapXovers = readSegments(StrandType.Staple,
+                                                  vhNum, stap)
+    for baseIdx in range(len(stap)):
+        sumOfInsertSkip = insertions[baseIdx] + skips[baseIdx]
+        if sumOfInsertSkip != 0:
+            lh.insertions.append((baseIdx, sumOfInsertSkip))
+    lh.stapColors = helix['stap_colors']
+    lh.scafColors = helix.get('scaf_colors', [])
+    return lh
+# end def
+
+
+def readSegments(strandType, vhNum, bases):
+    """
+    Returns (segments, xovers) for the (fiveVH, fiveIdx, threeVH, threeIdx)
+    list bases of one strand type: the flat list of segment endpoints
+    (low, high, low, high, ...) and the (idx, threeVH, threeIdx) 3' crossovers.
+    """
+    segments = []
+    xovers = []
+    for i in range(len(bases)):
+        fiveVH, fiveIdx, threeVH, threeIdx = bases[i]
+        if fiveVH == -1 and threeVH == -1:
+            continue  # null base
+        if isSegmentStartOrEnd(strandType, vhNum, i, fiveVH,\
+                               fiveIdx, threeVH, threeIdx):
+            segments.append(i)
+        if fiveVH != vhNum and threeVH != vhNum:  # special case
+            segments.append(i)  # end segment on a double crossover
+        if is3primeXover(strandType, vhNum, i, threeVH, threeIdx):
+            xovers.append((i, threeVH, threeIdx))
+    return segments, xovers
+# end def
+
+
 def import_legacy_dict(document, obj, latticeType=LatticeType.Honeycomb):
     """
     Parses a dictionary (obj) created from reading a json file and uses it
     to populate the given document with model data.
     """
-    numBases = len(obj['vstrands'][0]['scaf'])
+    helices = [readLegacyHelix(helix) for helix in obj['vstrands']]
+    import_legacy_helices(document, helices, latticeType)
+# end def
+
+
+def import_legacy_helices(document, helices, latticeType=LatticeType.Honeycomb,
+                                                        askLatticeType=True):
+    """
+    Populates the given document with model data from a list of
+    LegacyHelix, one per entry of the legacy file's 'vstrands'. Unless
+    askLatticeType is False, the GUI guesses the lattice type from the
+    number of bases and asks the user when that is ambiguous.
+    """
+    numBases = helices[0].numBases
     if cadnano.app().isGui():
         # from ui.dialogs.ui_latticetype import Ui_LatticeType
         # util.qtWrapImport('QtGui', globals(),  ['QDialog', 'QDialogButtonBox'])
         dialog = QDialog()
         dialogLT = Ui_LatticeType()
         dialogLT.setupUi(dialog)
+    if cadnano.app().isGui() and askLatticeType:
         # DETERMINE LATTICE TYPE
         if numBases % 21 == 0 and numBases % 32 == 0:
             if dialog.exec() == 1:
@@ -64,9 +152,9 @@ def import_legacy_dict(document, obj, latticeType=LatticeType.Honeycomb):
 
     # DETERMINE MAX ROW,COL
     maxRowJson = maxColJson = 0
-    for helix in obj['vstrands']:
-        maxRowJson = max(maxRowJson, int(helix['row'])+1)
-        maxColJson = max(maxColJson, int(helix['col'])+1)
+    for helix in helices:
+        maxRowJson = max(maxRowJson, int(helix.row)+1)
+        maxColJson = max(maxColJson, int(helix.col)+1)
 
     # CREATE PART ACCORDING TO LATTICE TYPE
     if latticeType == LatticeType.Honeycomb:
@@ -76,11 +164,11 @@ def import_legacy_dict(document, obj, latticeType=LatticeType.Honeycomb):
         part = HoneycombPart(document=document, maxRow=nRows, maxCol=nCols, maxSteps=steps)
     elif latticeType == LatticeType.Square:
         isSQ100 = True  # check for custom SQ100 format
-        for helix in obj['vstrands']:
-            if helix['col'] != 0:
+        for helix in helices:
+            if helix.col != 0:
                 isSQ100 = False
                 break
-        if isSQ100:
+        if isSQ100 and cadnano.app().isGui() and askLatticeType:
             dialogLT.label.setText("Is this a SQ100 file?")
             if dialog.exec() == 1:
                 nRows, nCols = 100, 1
@@ -99,13 +187,9 @@ def import_legacy_dict(document, obj, latticeType=LatticeType.Honeycomb):
     # POPULATE VIRTUAL HELICES
     orderedCoordList = []
     vhNumToCoord = {}
-    for helix in obj['vstrands']:
-        vhNum = helix['num']
-        row = helix['row']
-        col = helix['col']
-        scaf= helix['scaf']
-        coord = (row, col)
-        vhNumToCoord[vhNum] = coord
+    for helix in helices:
+        coord = (helix.row, helix.col)
+        vhNumToCoord[helix.num] = coord
         orderedCoordList.append(coord)
     # make sure we retain the original order
     for vhNum in sorted(vhNumToCoord.keys()):
@@ -113,121 +197,78 @@ def import_legacy_dict(document, obj, latticeType=LatticeType.Honeycomb):
         part.createVirtualHelix(row, col, useUndoStack=False)
     part.setImportedVHelixOrder(orderedCoordList)
 
-    # INSTALL STRANDS AND COLLECT XOVER LOCATIONS
-    numHelixes = len(obj['vstrands'])-1
-    scaf_seg = defaultdict(list)
-    scaf_xo = defaultdict(list)
-    stap_seg = defaultdict(list)
-    stap_xo = defaultdict(list)
-    try:
-        for helix in obj['vstrands']:
-            vhNum = helix['num']
-            row = helix['row']
-            col = helix['col']
-            scaf = helix['scaf']
-            stap = helix['stap']
-            insertions = helix['loop']
-            skips = helix['skip']
-            vh = part.virtualHelixAtCoord((row, col))
-            scafStrandSet = vh.scaffoldStrandSet()
-            stapStrandSet = vh.stapleStrandSet()
-            assert(len(scaf)==len(stap) and len(stap)==part.maxBaseIdx()+1 and\
-                   len(scaf)==len(insertions) and len(insertions)==len(skips))
-            # read scaffold segments and xovers
-            for i in range(len(scaf)):
-                fiveVH, fiveIdx, threeVH, threeIdx = scaf[i]
-                if fiveVH == -1 and threeVH == -1:
-                    continue  # null base
-                if isSegmentStartOrEnd(StrandType.Scaffold, vhNum, i, fiveVH,\
-                                       fiveIdx, threeVH, threeIdx):
-                    scaf_seg[vhNum].append(i)
-                if fiveVH != vhNum and threeVH != vhNum:  # special case
-                    scaf_seg[vhNum].append(i)  # end segment on a double crossover
-                if is3primeXover(StrandType.Scaffold, vhNum, i, threeVH, threeIdx):
-                    scaf_xo[vhNum].append((i, threeVH, threeIdx))
-            assert (len(scaf_seg[vhNum]) % 2 == 0)
-            # install scaffold segments
-            for i in range(0, len(scaf_seg[vhNum]), 2):
-                lowIdx = scaf_seg[vhNum][i]
-                highIdx = scaf_seg[vhNum][i+1]
-                scafStrandSet.createStrand(lowIdx, highIdx, useUndoStack=False)
-            # read staple segments and xovers
-            for i in range(len(stap)):
-                fiveVH, fiveIdx, threeVH, threeIdx = stap[i]
-                if fiveVH == -1 and threeVH == -1:
-                    continue  # null base
-                if isSegmentStartOrEnd(StrandType.Staple, vhNum, i, fiveVH,\
-                                       fiveIdx, threeVH, threeIdx):
-                    stap_seg[vhNum].append(i)
-                if fiveVH != vhNum and threeVH != vhNum:  # special case
-                    stap_seg[vhNum].append(i)  # end segment on a double crossover
-                if is3primeXover(StrandType.Staple, vhNum, i, threeVH, threeIdx):
-                    stap_xo[vhNum].append((i, threeVH, threeIdx))
-            assert (len(stap_seg[vhNum]) % 2 == 0)
-            # install staple segments
-            for i in range(0, len(stap_seg[vhNum]), 2):
-                lowIdx = stap_seg[vhNum][i]
-                highIdx = stap_seg[vhNum][i+1]
-                stapStrandSet.createStrand(lowIdx, highIdx, useUndoStack=False)
-    except AssertionError:
-        if not cadnano.app().isGui():
-            print("Unrecognized file format.")
-        else:
-            dialogLT.label.setText("Unrecognized file format.")
-            dialogLT.buttonBox.setStandardButtons(QDialogButtonBox.StandardButton.Ok)
-            dialog.exec()
+    # the views redraw each strand and oligo once, after the last edit
+    with document.batchUpdates():
+        # INSTALL STRANDS AND COLLECT XOVER LOCATIONS
+        scaf_xo = defaultdict(list)
+        stap_xo = defaultdict(list)
+        try:
+            for helix in helices:
+                vhNum = helix.num
+                vh = part.virtualHelixAtCoord((helix.row, helix.col))
+                scafStrandSet = vh.scaffoldStrandSet()
+                stapStrandSet = vh.stapleStrandSet()
+                assert(helix.lengthsMatch and helix.numBases==part.maxBaseIdx()+1)
+                scaf_seg = helix.scafSegments
+                assert (len(scaf_seg) % 2 == 0)
+                scaf_xo[vhNum] = helix.scafXovers
+                # install scaffold segments
+                for i in range(0, len(scaf_seg), 2):
+                    lowIdx = scaf_seg[i]
+                    highIdx = scaf_seg[i+1]
+                    scafStrandSet.createStrand(lowIdx, highIdx, useUndoStack=False)
+                stap_seg = helix.stapSegments
+                assert (len(stap_seg) % 2 == 0)
+                stap_xo[vhNum] = helix.stapXovers
+                # install staple segments
+                for i in range(0, len(stap_seg), 2):
+                    lowIdx = stap_seg[i]
+                    highIdx = stap_seg[i+1]
+                    stapStrandSet.createStrand(lowIdx, highIdx, useUndoStack=False)
+        except AssertionError:
+            if not cadnano.app().isGui():
+                print("Unrecognized file format.")
+            else:
+                dialogLT.label.setText("Unrecognized file format.")
+                dialogLT.buttonBox.setStandardButtons(QDialogButtonBox.StandardButton.Ok)
+                dialog.exec()
 
-    # INSTALL XOVERS
-    for helix in obj['vstrands']:
-        vhNum = helix['num']
-        row = helix['row']
-        col = helix['col']
-        scaf = helix['scaf']
-        stap = helix['stap']
-        insertions = helix['loop']
-        skips = helix['skip']
-        fromVh = part.virtualHelixAtCoord((row, col))
-        scafStrandSet = fromVh.scaffoldStrandSet()
-        stapStrandSet = fromVh.stapleStrandSet()
-        # install scaffold xovers
-        for (idx5p, toVhNum, idx3p) in scaf_xo[vhNum]:
-            # idx3p is 3' end of strand5p, idx5p is 5' end of strand3p
-            strand5p = scafStrandSet.getStrand(idx5p)
-            toVh = part.virtualHelixAtCoord(vhNumToCoord[toVhNum])
-            strand3p = toVh.scaffoldStrandSet().getStrand(idx3p)
-            part.createXover(strand5p, idx5p, strand3p, idx3p, useUndoStack=False)
-        # install staple xovers
-        for (idx5p, toVhNum, idx3p) in stap_xo[vhNum]:
-            # idx3p is 3' end of strand5p, idx5p is 5' end of strand3p
-            strand5p = stapStrandSet.getStrand(idx5p)
-            toVh = part.virtualHelixAtCoord(vhNumToCoord[toVhNum])
-            strand3p = toVh.stapleStrandSet().getStrand(idx3p)
-            part.createXover(strand5p, idx5p, strand3p, idx3p, useUndoStack=False)
+        # INSTALL XOVERS
+        for helix in helices:
+            vhNum = helix.num
+            fromVh = part.virtualHelixAtCoord((helix.row, helix.col))
+            scafStrandSet = fromVh.scaffoldStrandSet()
+            stapStrandSet = fromVh.stapleStrandSet()
+            # install scaffold xovers
+            for (idx5p, toVhNum, idx3p) in scaf_xo[vhNum]:
+                # idx3p is 3' end of strand5p, idx5p is 5' end of strand3p
+                strand5p = scafStrandSet.getStrand(idx5p)
+                toVh = part.virtualHelixAtCoord(vhNumToCoord[toVhNum])
+                strand3p = toVh.scaffoldStrandSet().getStrand(idx3p)
+                part.createXover(strand5p, idx5p, strand3p, idx3p, useUndoStack=False)
+            # install staple xovers
+            for (idx5p, toVhNum, idx3p) in stap_xo[vhNum]:
+                # idx3p is 3' end of strand5p, idx5p is 5' end of strand3p
+                strand5p = stapStrandSet.getStrand(idx5p)
+                toVh = part.virtualHelixAtCoord(vhNumToCoord[toVhNum])
+                strand3p = toVh.stapleStrandSet().getStrand(idx3p)
+                part.createXover(strand5p, idx5p, strand3p, idx3p, useUndoStack=False)
 
-    # SET DEFAULT COLOR
-    for oligo in part.oligos():
-        if oligo.isStaple():
-            defaultColor = styles.DEFAULT_STAP_COLOR
-        else:
-            defaultColor = styles.DEFAULT_SCAF_COLOR
-        oligo.applyColor(defaultColor, useUndoStack=False)
+        # SET DEFAULT COLOR
+        for oligo in part.oligos():
+            if oligo.isStaple():
+                defaultColor = styles.DEFAULT_STAP_COLOR
+            else:
+                defaultColor = styles.DEFAULT_SCAF_COLOR
+            oligo.applyColor(defaultColor, useUndoStack=False)
 
-    # COLORS, INSERTIONS, SKIPS
-    for helix in obj['vstrands']:
-        vhNum = helix['num']
-        row = helix['row']
-        col = helix['col']
-        scaf = helix['scaf']
-        stap = helix['stap']
-        insertions = helix['loop']
-        skips = helix['skip']
-        vh = part.virtualHelixAtCoord((row, col))
-        scafStrandSet = vh.scaffoldStrandSet()
-        stapStrandSet = vh.stapleStrandSet()
-        # install insertions and skips
-        for baseIdx in range(len(stap)):
-            sumOfInsertSkip = insertions[baseIdx] + skips[baseIdx]
-            if sumOfInsertSkip != 0:
+        # COLORS, INSERTIONS, SKIPS
+        for helix in helices:
+            vh = part.virtualHelixAtCoord((helix.row, helix.col))
+            scafStrandSet = vh.scaffoldStrandSet()
+            stapStrandSet = vh.stapleStrandSet()
+            # install insertions and skips
+            for baseIdx, sumOfInsertSkip in helix.insertions:
                 scaf_strand = scafStrandSet.getStrand(baseIdx)
                 stap_strand = stapStrandSet.getStrand(baseIdx)
                 if scaf_strand:
@@ -235,15 +276,14 @@ def import_legacy_dict(document, obj, latticeType=LatticeType.Honeycomb):
                 elif stap_strand:
                     stap_strand.addInsertion(baseIdx, sumOfInsertSkip, useUndoStack=False)
 
-        # populate staple colors
-        for baseIdx, colorNumber in helix['stap_colors']:
-            color = QColor((colorNumber>>16)&0xFF, (colorNumber>>8)&0xFF, colorNumber&0xFF).name()
-            strand = stapStrandSet.getStrand(baseIdx)
-            strand.oligo().applyColor(color, useUndoStack=False)
+            # populate staple colors
+            for baseIdx, colorNumber in helix.stapColors:
+                color = QColor((colorNumber>>16)&0xFF, (colorNumber>>8)&0xFF, colorNumber&0xFF).name()
+                strand = stapStrandSet.getStrand(baseIdx)
+                strand.oligo().applyColor(color, useUndoStack=False)
 
-        # populate scaffold colors, if any
-        if 'scaf_colors' in helix:
-            for baseIdx, colorNumber in helix['scaf_colors']:
+            # populate scaffold colors, if any
+            for baseIdx, colorNumber in helix.scafColors:
                 color = QColor((colorNumber>>16)&0xFF, (colorNumber>>8)&0xFF, colorNumber&0xFF).name()
                 strand = scafStrandSet.getStrand(baseIdx)
                 strand.oligo().applyColor(color, useUndoStack=False)
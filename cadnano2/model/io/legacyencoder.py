@@ -1,3 +1,4 @@
+from json import dumps
 from os.path import basename
 from cadnano2.model.enum import StrandType
 
@@ -10,28 +11,8 @@ def legacy_dict_from_doc(document, fname, helixOrderList):
     vhList = []
     for row, col in helixOrderList:
         vh = part.virtualHelixAtCoord((row, col))
-        # insertions and skips
-        insertionDict = part.insertions()[(row, col)]
-        insts = [0 for i in range(numBases)]
-        skips = [0 for i in range(numBases)]
-        for idx, insertion in insertionDict.items():
-            if insertion.isSkip():
-                skips[idx] = insertion.length()
-            else:
-                insts[idx] = insertion.length()
-        # colors
-        stapColors = []
-        for strand in vh.stapleStrandSet():
-            if strand.connection5p() == None:
-                c = str(strand.oligo().color())[1:]  # drop the hash
-                stapColors.append([strand.idx5Prime(), int(c, 16)])
-        scafColors = set()
-        for strand in vh.scaffoldStrandSet():
-            if strand.connection5p() == None or \
-               (strand == strand.oligo().strand5p() and strand.oligo().isLoop()):
-                c = str(strand.oligo().color())[1:]  # drop the hash
-                scafColors.add((strand.idx5Prime(), int(c, 16)))
-
+        insts, skips, stapColors, scafColors = \
+                            legacy_helix_extras(part, vh, numBases)
         vhDict = {"row": row,
                   "col": col,
                   "num": vh.number(),
@@ -42,8 +23,81 @@ def legacy_dict_from_doc(document, fname, helixOrderList):
                   "scafLoop": [],
                   "stapLoop": [],
                   "stap_colors": stapColors,
-                  "scaf_colors": list(scafColors)}
+                  "scaf_colors": scafColors}
         vhList.append(vhDict)
     bname = basename(str(fname))
     obj = {"name": bname, "vstrands": vhList}
     return obj
+
+
+def legacy_helix_extras(part, vh, numBases):
+    """
+    Returns the (loop, skip, stap_colors, scaf_colors) lists of the legacy
+    vstrand of vh.
+    """
+    # insertions and skips
+    insertionDict = part.insertions()[vh.coord()]
+    insts = [0]*numBases
+    skips = [0]*numBases
+    for idx, insertion in insertionDict.items():
+        if insertion.isSkip():
+            skips[idx] = insertion.length()
+        else:
+            insts[idx] = insertion.length()
+    # colors
+    stapColors = []
+    for strand in vh.stapleStrandSet():
+        if strand.connection5p() == None:
+            c = str(strand.oligo().color())[1:]  # drop the hash
+            stapColors.append([strand.idx5Prime(), int(c, 16)])
+    scafColors = set()
+    for strand in vh.scaffoldStrandSet():
+        if strand.connection5p() == None or \
+           (strand == strand.oligo().strand5p() and strand.oligo().isLoop()):
+            c = str(strand.oligo().color())[1:]  # drop the hash
+            scafColors.add((strand.idx5Prime(), int(c, 16)))
+    return insts, skips, stapColors, list(scafColors)
+
+
+def legacy_array_json(flat):
+    """
+    Returns the compact JSON text of a legacy per-base array, given the
+    flat 4-ints-per-base form from StrandSet.getLegacyFlatArray. The text
+    is produced by a single format operation over the ints, without a
+    list per base.
+    """
+    n = len(flat) // 4
+    if n == 0:
+        return "[]"
+    return "[" + ("[%d,%d,%d,%d]," * n)[:-1] % tuple(flat.tolist()) + "]"
+
+
+def write_legacy_json(document, fname, helixOrderList, io):
+    """
+    Writes the same text as dumps(legacy_dict_from_doc(...)) with compact
+    separators to io, one vstrand at a time, formatting the scaf and stap
+    arrays straight from the flat legacy arrays.
+    """
+    part = document.selectedPart()
+    numBases = part.maxBaseIdx()+1
+
+    def compact(obj):
+        return dumps(obj, separators=(',', ':'))
+
+    io.write('{"name":%s,"vstrands":[' % compact(basename(str(fname))))
+    for i, (row, col) in enumerate(helixOrderList):
+        vh = part.virtualHelixAtCoord((row, col))
+        insts, skips, stapColors, scafColors = \
+                            legacy_helix_extras(part, vh, numBases)
+        scaf = vh.scaffoldStrandSet().getLegacyFlatArray()
+        stap = vh.stapleStrandSet().getLegacyFlatArray()
+        if i > 0:
+            io.write(',')
+        io.write('{"row":%s,"col":%s,"num":%s,"scaf":%s,"stap":%s,'
+                 '"loop":%s,"skip":%s,"scafLoop":[],"stapLoop":[],'
+                 '"stap_colors":%s,"scaf_colors":%s}' % \
+                 (compact(row), compact(col), compact(vh.number()),
+                  legacy_array_json(scaf), legacy_array_json(stap),
+                  compact(insts), compact(skips),
+                  compact(stapColors), compact(scafColors)))
+    io.write(']}')
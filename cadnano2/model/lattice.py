@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+lattice.py
+
+A table of the x, y position of every (row, column) of a part's lattice,
+with a grid of buckets over it so the lattice point under an x, y
+position is found without scanning the lattice. Tables depend only on the
+part's class, dimensions and the scale factor, so they are cached and
+shared by every part, view and batch tool with the same ones.
+
+The positions come from the part's own latticeCoordToPositionXY, called
+once with whole arrays of rows and columns when NumPy is importable and
+once per lattice point otherwise.
+"""
+
+from math import floor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_cache = {}
+
+
+def latticeGeometry(part, scaleFactor=1.0):
+    """
+    Returns the LatticeGeometry of part at scaleFactor, building it on
+    first use.
+    """
+    key = (part.__class__, part._maxRow, part._maxCol, part.radius(),
+           scaleFactor)
+    geometry = _cache.get(key)
+    if geometry is None:
+        geometry = _cache[key] = LatticeGeometry(part, scaleFactor)
+    return geometry
+# end def
+
+
+class LatticeGeometry(object):
+    """
+    x[row][col], y[row][col]: the position of each lattice point, as
+        returned by latticeCoordToPositionXY. NumPy arrays of shape
+        (maxRow, maxCol) when NumPy is available, lists of lists otherwise.
+    radius: the helix radius at this scale factor.
+
+    Each bucket is a square the size of a helix diameter and lists the
+    lattice points whose helix overlaps it, so coordAt checks at most a
+    handful of points.
+    """
+    def __init__(self, part, scaleFactor=1.0):
+        self.maxRow, self.maxCol = maxRow, maxCol = part._maxRow, part._maxCol
+        self.scaleFactor = scaleFactor
+        self.radius = radius = part.radius() * scaleFactor
+        toXY = part.latticeCoordToPositionXY
+        if np is not None:
+            rows, cols = np.indices((maxRow, maxCol))
+            self.x, self.y = toXY(rows, cols, scaleFactor)
+            xs, ys = self.x.tolist(), self.y.tolist()
+        else:
+            xs = [[0.0] * maxCol for row in range(maxRow)]
+            ys = [[0.0] * maxCol for row in range(maxRow)]
+            for row in range(maxRow):
+                for col in range(maxCol):
+                    xs[row][col], ys[row][col] = toXY(row, col, scaleFactor)
+            self.x, self.y = xs, ys
+        self._xs, self._ys = xs, ys
+        self._bucketSize = size = 2 * radius
+        self._buckets = buckets = {}
+        for row in range(maxRow):
+            for col in range(maxCol):
+                x, y = xs[row][col], ys[row][col]
+                for bx in range(int(floor((x - radius) / size)),
+                                int(floor((x + radius) / size)) + 1):
+                    for by in range(int(floor((y - radius) / size)),
+                                    int(floor((y + radius) / size)) + 1):
+                        buckets.setdefault((bx, by), []).append((row, col))
+    # end def
+
+    def positionXY(self, row, col):
+        """Returns the (x, y) position of lattice point (row, col)."""
+        return self._xs[row][col], self._ys[row][col]
+    # end def
+
+    def coordAt(self, x, y):
+        """
+        Returns the (row, col) of the lattice point within one helix radius
+        of x, y, or None if x, y isn't on a helix of the lattice.
+        """
+        size = self._bucketSize
+        candidates = self._buckets.get((int(floor(x / size)),
+                                        int(floor(y / size))))
+        if candidates is None:
+            return None
+        xs, ys = self._xs, self._ys
+        best, bestDist = None, self.radius * self.radius
+        for row, col in candidates:
+            dx, dy = x - xs[row][col], y - ys[row][col]
+            dist = dx * dx + dy * dy
+            if dist <= bestDist:
+                best, bestDist = (row, col), dist
+        return best
+    # end def
+
+    def spatialLattice(self):
+        """Yields x, y, row, col for every lattice point, row by row."""
+        xs, ys = self._xs, self._ys
+        for row in range(self.maxRow):
+            xRow, yRow = xs[row], ys[row]
+            for col in range(self.maxCol):
+                yield xRow[col], yRow[col], row, col
+    # end def
+# end class
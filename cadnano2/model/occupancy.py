@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+occupancy.py
+
+Optional per-base arrays that mirror the strands, crossovers and
+insertions of a VirtualHelix so per-base questions can be answered with
+array slices instead of walking StrandSets. The layer is only built when
+NumPy is importable; VirtualHelix.occupancy() returns None otherwise and
+callers fall back to the StrandSet queries.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EMPTY = -1
+
+
+def isAvailable():
+    return np is not None
+# end def
+
+
+def idxArray(idxs):
+    """Returns idxs as an index array suitable for the query methods."""
+    return np.array(idxs, dtype=np.intp)
+# end def
+
+
+def shifted(array, offset, fill):
+    """
+    Returns a copy of a 1D array where result[i] == array[i + offset],
+    padding positions that fall outside array with fill.
+    """
+    result = np.full_like(array, fill)
+    n = len(array)
+    if offset >= n or -offset >= n:
+        return result
+    if offset >= 0:
+        result[:n - offset] = array[offset:]
+    else:
+        result[-offset:] = array[:n + offset]
+    return result
+# end def
+
+
+class BaseOccupancy(object):
+    """
+    BaseOccupancy holds, for each base of a VirtualHelix:
+
+    strandLow[strandType, i]: the lowIdx of the strand covering base i, or
+        EMPTY. Two bases belong to the same strand iff their entries match.
+    xover[strandType, i]: True where the covering strand's hasXoverAt(i)
+        would return True.
+
+    The arrays are kept in sync by the StrandSet list helpers; nothing
+    here talks to the model directly. Insertion lengths are read from the
+    InsertionIndex returned by insertionIndex(), which the Part keeps in
+    step with its insertions (including when minBase changes), instead of
+    from a copy here.
+    """
+
+    def __init__(self, length, insertionIndex):
+        length = max(int(length), 0)
+        self.strandLow = np.full((2, length), EMPTY, dtype=np.int32)
+        self.xover = np.zeros((2, length), dtype=bool)
+        self._insertionIndex = insertionIndex
+    # end def
+
+    def __len__(self):
+        return self.strandLow.shape[1]
+    # end def
+
+    def _ensureLength(self, length):
+        """Grows the arrays (never shrinks) so that they hold length bases."""
+        oldLength = len(self)
+        if length <= oldLength:
+            return
+        newLength = max(length, 2 * oldLength)
+        strandLow = np.full((2, newLength), EMPTY, dtype=np.int32)
+        strandLow[:, :oldLength] = self.strandLow
+        xover = np.zeros((2, newLength), dtype=bool)
+        xover[:, :oldLength] = self.xover
+        self.strandLow = strandLow
+        self.xover = xover
+    # end def
+
+    ### METHODS FOR UPDATING THE ARRAYS ###
+    def addStrand(self, strandType, lowIdx, highIdx, xoverLow, xoverHigh):
+        self._ensureLength(highIdx + 1)
+        self.strandLow[strandType, lowIdx:highIdx + 1] = lowIdx
+        self.setXovers(strandType, lowIdx, highIdx, xoverLow, xoverHigh)
+    # end def
+
+    def removeStrand(self, strandType, lowIdx, highIdx):
+        self.strandLow[strandType, lowIdx:highIdx + 1] = EMPTY
+        self.xover[strandType, lowIdx:highIdx + 1] = False
+    # end def
+
+    def setXovers(self, strandType, lowIdx, highIdx, xoverLow, xoverHigh):
+        """
+        Mirrors Strand.hasXoverAt, which checks the high end first, so a
+        single base strand only reports its high connection.
+        """
+        self.xover[strandType, lowIdx] = xoverLow
+        self.xover[strandType, highIdx] = xoverHigh
+    # end def
+
+    def clearStrands(self, strandType):
+        self.strandLow[strandType] = EMPTY
+        self.xover[strandType] = False
+    # end def
+
+    ### METHODS FOR QUERYING THE ARRAYS ###
+    def hasStrandAt(self, strandType, idx):
+        if idx < 0 or idx >= len(self):
+            return False
+        return self.strandLow[strandType, idx] != EMPTY
+    # end def
+
+    def hasXoverAt(self, strandType, idx):
+        if idx < 0 or idx >= len(self):
+            return False
+        return bool(self.xover[strandType, idx])
+    # end def
+
+    def noXoverAt(self, strandType, idxs):
+        """
+        Vectorized StrandSet.hasNoStrandAtOrNoXover for an index array.
+        Indices past the end of the arrays are treated as empty.
+        """
+        length = len(self)
+        if len(idxs) == 0 or idxs.max() < length:
+            return ~self.xover[strandType, idxs]
+        result = np.ones(len(idxs), dtype=bool)
+        inRange = idxs < length
+        result[inRange] = ~self.xover[strandType, idxs[inRange]]
+        return result
+    # end def
+
+    def presence(self, strandType, lowIdx=0, highIdx=None):
+        """Returns a bool array of populated bases in [lowIdx, highIdx]."""
+        if highIdx is None:
+            highIdx = len(self) - 1
+        return self.strandLow[strandType, lowIdx:highIdx + 1] != EMPTY
+    # end def
+
+    def insertionLength(self, lowIdx=0, highIdx=None):
+        """
+        Returns an int array of the insertion (or skip) length at each base
+        in [lowIdx, highIdx], 0 where there is none.
+        """
+        if highIdx is None:
+            highIdx = len(self) - 1
+        result = np.zeros(max(highIdx - lowIdx + 1, 0), dtype=np.int32)
+        index = self._insertionIndex()
+        idxs = index.idxsBetween(lowIdx, highIdx)
+        if idxs:
+            result[idxArray(idxs) - lowIdx] = index.lengthsBetween(lowIdx,
+                                                                   highIdx)
+        return result
+    # end def
+
+    def totalInsertionLength(self, lowIdx, highIdx):
+        return self._insertionIndex().lengthBetween(lowIdx, highIdx)
+    # end def
+
+    def xoverIdxs(self, strandType):
+        """Returns the indices of all crossover endpoints of strandType."""
+        return np.flatnonzero(self.xover[strandType])
+    # end def
+
+    def xoverConflictMask(self, strandType):
+        """
+        Returns a bool array that is True at each idx where Part.autoStaple
+        must not place a staple crossover because of strandType (scaffold)
+        crossovers nearby: a crossover at idx-4 or idx+5, or a crossover
+        next to idx that sits on the end of a helix segment. This is the
+        vectorized form of Part._isNearScaffoldXover.
+        """
+        low = self.strandLow[strandType]
+        present = low != EMPTY
+        xo = self.xover[strandType]
+
+        def x(k):
+            return shifted(xo, k, False)
+
+        def gap(k):
+            return ~shifted(present, k, False)
+
+        def same(j, k):
+            lj = shifted(low, j, EMPTY)
+            return (lj != EMPTY) & (lj == shifted(low, k, EMPTY))
+
+        # the checks on the strand at idx itself are implied by the
+        # checks on its neighbors at idx-1 and idx+1
+        return (x(-4) | x(5) |
+                (x(-1) & gap(-2)) |
+                (same(-1, -2) & x(-2) & gap(-3)) |
+                (x(1) & gap(2)) |
+                (same(1, 2) & x(2) & gap(3)))
+    # end def
+# end class
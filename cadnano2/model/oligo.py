@@ -3,7 +3,7 @@
 
 import cadnano2.util as util
 import copy
-from .strand import Strand
+from .strand import Strand, sixb
 # import Qt stuff into the module namespace with PySide, PyQt4 independence
 util.qtWrapImport('QtCore', globals(), ['pyqtSignal', 'QObject'])
 util.qtWrapImport('QtGui', globals(), ['QUndoCommand'])
@@ -85,6 +85,10 @@ class Oligo(QObject):
         self._strand5p = strand
     # end def
 
+    def document(self):
+        return self._part.document()
+    # end def
+
     def undoStack(self):
         return self._part.undoStack()
     # end def
@@ -187,6 +191,10 @@ class Oligo(QObject):
     # end def
 
     def refreshLength(self):
+        """
+        Sets the length from a walk over all strands. Commands keep the
+        length up to date by delta, so this is only needed to repair it.
+        """
         temp = self.strand5p()
         if not temp:
             return
@@ -196,6 +204,20 @@ class Oligo(QObject):
         self.setLength(length)
     # end def
 
+    def verifyLength(self):
+        """
+        Returns True if the length kept up to date by delta matches a full
+        walk of the strands with their lengths recomputed from scratch.
+        """
+        temp = self.strand5p()
+        if not temp:
+            return True
+        length = 0
+        for strand in temp.generator3pStrand():
+            length += strand.totalLength(cached=False)
+        return length == self._length
+    # end def
+
     def removeFromPart(self):
         """
         This method merely disconnects the object from the model.
@@ -216,8 +238,8 @@ class Oligo(QObject):
         before = self.shouldHighlight()
         self._length = length
         if before != self.shouldHighlight():
-            self.oligoSequenceClearedSignal.emit(self)
-            self.oligoAppearanceChangedSignal.emit(self)
+            self.document().emitSignal(self.oligoSequenceClearedSignal, self)
+            self.document().emitSignal(self.oligoAppearanceChangedSignal, self)
     # end def
 
     def strandMergeUpdate(self, oldStrandLow, oldStrandHigh, newStrand):
@@ -289,13 +311,13 @@ class Oligo(QObject):
         def redo(self):
             olg = self._oligo
             olg.setColor(self._newColor)
-            olg.oligoAppearanceChangedSignal.emit(olg)
+            olg.document().emitSignal(olg.oligoAppearanceChangedSignal, olg)
         # end def
 
         def undo(self):
             olg = self._oligo
             olg.setColor(self._oldColor)
-            olg.oligoAppearanceChangedSignal.emit(olg)
+            olg.document().emitSignal(olg.oligoAppearanceChangedSignal, olg)
         # end def
     # end class
 
@@ -309,47 +331,67 @@ class Oligo(QObject):
         # end def
 
         def redo(self):
-            olg = self._oligo
-            nS = ''.join(self._newSequence) if self._newSequence else None
-            nS_original = self._newSequence
-            oligoList = [olg]
-            for strand in olg.strand5p().generator3pStrand():
-                usedSeq, nS = strand.setSequence(nS)
-                # get the compliment ahead of time
-                usedSeq = util.comp(usedSeq) if usedSeq else None
-                compSS = strand.strandSet().complementStrandSet()
-                for compStrand in compSS._findOverlappingRanges(strand):
-                    subUsedSeq = compStrand.setComplementSequence(usedSeq, strand)
-                    oligoList.append(compStrand.oligo())
-                # end for
-                # as long as the new Applied Sequence is not None
-                if nS == None and nS_original:
-                    break
-            # end for
-            for oligo in oligoList:
-                oligo.oligoSequenceAddedSignal.emit(oligo)
+            self._applySequence(self._newSequence)
         # end def
 
         def undo(self):
-            olg = self._oligo
-            oS = ''.join(self._oldSequence) if self._oldSequence else None
-
-            oligoList = [olg]
+            self._applySequence(self._oldSequence)
+        # end def
 
+        def _applySequence(self, sequence):
+            """
+            Gives each strand of the oligo its slice of sequence, 5' to 3',
+            and updates the overlapping complement strands in bulk: the
+            complement bases are laid into one bytearray track per
+            virtualhelix, and each complement strand then copies all of its
+            overlaps from that track at once (Strand.setComplementTrack).
+            A sequence of None clears the oligo and those overlaps.
+            """
+            olg = self._oligo
+            seq = ''.join(sequence) if sequence else None
+            maxBaseIdx = olg.part().maxBaseIdx()
+            tracks = {}
+            compRanges = {}  # complement strand: [(lowIdx, highIdx), ...]
+            offset = 0
             for strand in olg.strand5p().generator3pStrand():
-                usedSeq, oS = strand.setSequence(oS)
-
-                # get the compliment ahead of time
-                usedSeq = util.comp(usedSeq) if usedSeq else None
+                vh = strand.virtualHelix()
+                index = strand.insertionIndex()
+                track = tracks.get(vh)
+                if track is None:
+                    track = bytearray(b' ') * index.position(maxBaseIdx + 1)
+                    tracks[vh] = track
+                if seq is None:
+                    strand.setSequence(None)
+                else:
+                    length = strand.totalLength()
+                    usedSeq, unused = strand.setSequence(
+                                                seq[offset:offset + length])
+                    offset += length
+                    if not strand.isDrawn5to3():
+                        usedSeq = usedSeq[::-1]
+                    bases = sixb(util.comp(usedSeq))
+                    a = index.position(strand.lowIdx())
+                    track[a:a + len(bases)] = bases
+                sLowIdx, sHighIdx = strand.idxs()
                 compSS = strand.strandSet().complementStrandSet()
                 for compStrand in compSS._findOverlappingRanges(strand):
-                    subUsedSeq = compStrand.setComplementSequence(usedSeq, strand)
-                    oligoList.append(compStrand.oligo())
+                    cLowIdx, cHighIdx = compStrand.idxs()
+                    compRanges.setdefault(compStrand, []).append(
+                        util.overlap(sLowIdx, sHighIdx, cLowIdx, cHighIdx))
                 # end for
-            # for
-
+            # end for
+            oligoList = [olg]
+            oligoSet = set(oligoList)
+            for compStrand, ranges in compRanges.items():
+                compStrand.setComplementTrack(
+                                    tracks[compStrand.virtualHelix()], ranges)
+                compOligo = compStrand.oligo()
+                if compOligo not in oligoSet:
+                    oligoSet.add(compOligo)
+                    oligoList.append(compOligo)
+            # end for
             for oligo in oligoList:
-                oligo.oligoSequenceAddedSignal.emit(oligo)
+                oligo.document().emitSignal(oligo.oligoSequenceAddedSignal, oligo)
         # end def
     # end class
     class ApplyColorCommand(QUndoCommand):
@@ -363,13 +405,13 @@ class Oligo(QObject):
         def redo(self):
             olg = self._oligo
             olg.setColor(self._newColor)
-            olg.oligoAppearanceChangedSignal.emit(olg)
+            olg.document().emitSignal(olg.oligoAppearanceChangedSignal, olg)
         # end def
 
         def undo(self):
             olg = self._oligo
             olg.setColor(self._oldColor)
-            olg.oligoAppearanceChangedSignal.emit(olg)
+            olg.document().emitSignal(olg.oligoAppearanceChangedSignal, olg)
         # end def
     # end class
 
@@ -393,11 +435,12 @@ class Oligo(QObject):
                 strandSet._doc.removeStrandFromSelection(strand)
                 isInSet, overlap, sSetIdx = strandSet._findIndexOfRangeFor(strand)
                 sIList.append(sSetIdx)
-                strandSet._strandList.pop(sSetIdx)
+                strandSet._popFromStrandList(sSetIdx)
                 # Emit a signal to notify on completion
                 strand.strandRemovedSignal.emit(strand)
                 # for updating the Slice View displayed helices
-                strandSet.part().partStrandChangedSignal.emit(strandSet.part(), strandSet.virtualHelix())
+                part.document().emitSignal(strandSet.part().partStrandChangedSignal,
+                                           strandSet.part(), strandSet.virtualHelix())
             # end def
             # set the 3p strand for the undo
             self._strand3p = strand
@@ -416,11 +459,12 @@ class Oligo(QObject):
             for strand in s3p.generator5pStrand():
                 strandSet = strand.strandSet()
                 sSetIdx = sIList.pop(-1)
-                strandSet._strandList.insert(sSetIdx, strand)
+                strandSet._addToStrandList(strand, sSetIdx)
                 # Emit a signal to notify on completion
                 strandSet.strandsetStrandAddedSignal.emit(strandSet, strand)
                 # for updating the Slice View displayed helices
-                part.partStrandChangedSignal.emit(strandSet.part(), strandSet.virtualHelix())
+                part.document().emitSignal(part.partStrandChangedSignal,
+                                           strandSet.part(), strandSet.virtualHelix())
             # end def
 
             # add Oligo to part but don't set parent to None?
@@ -79,13 +79,14 @@ class HoneycombPart(Part):
     # end def
 
     def latticeCoordToPositionXY(self, row, column, scaleFactor=1.0):
-        """make sure self._radius is a float"""
+        """
+        make sure self._radius is a float. row and column may also be
+        NumPy integer arrays, which is how lattice.LatticeGeometry calls it.
+        """
         radius = self._radius
         x = column*radius*root3
-        if self.isOddParity(row, column):   # odd parity
-            y = row*radius*3 + radius
-        else:                               # even parity
-            y = row*radius*3
+        # odd parity helices sit one radius lower
+        y = row*radius*3 + radius*self.isOddParity(row, column)
         return scaleFactor*x, scaleFactor*y
     # end def
 
@@ -100,6 +101,7 @@ class HoneycombPart(Part):
         else:
             # even parity
             row = int(rowTemp/3 + 0.5)
+        return row, column
     # end def
 
     ########################## Archiving / Unarchiving #########################
@@ -2,15 +2,21 @@
 # encoding: utf-8
 
 from heapq import heapify, heappush, heappop
-from itertools import product
+from itertools import islice, product
 from collections import defaultdict
 import random
+import sys
 
 from cadnano2.model.enum import StrandType
 from cadnano2.model.virtualhelix import VirtualHelix
 from cadnano2.model.strand import Strand
 from cadnano2.model.oligo import Oligo
 from cadnano2.model.strandset import StrandSet
+from cadnano2.model import occupancy
+from cadnano2.model import lattice
+from cadnano2.model.insertionindex import InsertionIndex
+from cadnano2.model.strandstate import StrandStateDiff
+from cadnano2.model.snapshot import PartSnapshot
 from cadnano2.views import styles
 
 import cadnano2.util as util
@@ -55,6 +61,8 @@ class Part(QObject):
         super(Part, self).__init__(parent=self._document)
         # Data structure
         self._insertions = defaultdict(dict)  # dict of insertions per virtualhelix
+        self._insertionIndices = defaultdict(InsertionIndex)  # same, sorted
+        self._sequenceBuffers = None  # {(coord, strandType): bytearray}
         self._oligos = set()
         self._coordToVirtualHelix = {}
         self._numberToVirtualHelix = {}
@@ -73,6 +81,10 @@ class Part(QObject):
         self._activeBaseIndex = self._step
         self._activeVirtualHelix = None
         self._activeVirtualHelixIdx = None
+        # potentialCrossoverList cache, keyed on virtualHelix
+        self._potentialXovers = {}
+        self._potentialXoverSites = None
+        self._potentialXoverMaxBase = None
 
     # end def
 
@@ -197,6 +209,36 @@ class Part(QObject):
         return self._insertions
     # end def
 
+    def insertionIndex(self, coord):
+        """Return the InsertionIndex of the insertions at coord."""
+        return self._insertionIndices[coord]
+    # end def
+
+    def lazySequences(self):
+        """
+        True if strand sequences are kept in one buffer per virtualhelix
+        and strand type instead of a string per strand.
+        """
+        return self._sequenceBuffers is not None
+    # end def
+
+    def sequenceBuffer(self, coord, strandType):
+        """
+        Return the sequence buffer of strandType at coord (lazy sequence
+        mode only), grown to cover every base. The buffer holds one byte per
+        base and insertion base, left to right, with base idx starting at
+        insertionIndex(coord).position(idx); ' ' is an unassigned base.
+        """
+        key = (coord, strandType)
+        buf = self._sequenceBuffers.get(key)
+        if buf is None:
+            buf = self._sequenceBuffers[key] = bytearray()
+        length = self.insertionIndex(coord).position(self._maxBase + 1)
+        if len(buf) < length:
+            buf.extend(b' ' * (length - len(buf)))
+        return buf
+    # end def
+
     def isEvenParity(self, row, column):
         """Should be overridden when subclassing."""
         raise NotImplementedError
@@ -267,143 +309,161 @@ class Part(QObject):
         epDict = {}  # keyed on StrandSet
         cmds = []
 
-        # clear existing staple strands
-        # part.verifyOligos()
+        # the whole of autostaple is one compact undo step
+        with util.superMacro(part, desc="Auto-Staple", compact=True):
+            # clear existing staple strands
+            # part.verifyOligos()
 
-        for o in list(part.oligos()):
-            if not o.isStaple():
-                continue
-            c = Oligo.RemoveOligoCommand(o)
-            cmds.append(c)
-        # end for
-        util.execCommandList(part, cmds, desc="Clear staples")
-        cmds = []
-
-        # create strands that span all bases where scaffold is present
-        for vh in part.getVirtualHelices():
-            segments = []
-            scafSS = vh.scaffoldStrandSet()
-            for strand in scafSS:
-                lo, hi = strand.idxs()
-                if len(segments) == 0:
-                    segments.append([lo, hi])  # insert 1st strand
-                elif segments[-1][1] == lo - 1:
-                    segments[-1][1] = hi  # extend
-                else:
-                    segments.append([lo, hi])  # insert another strand
-            stapSS = vh.stapleStrandSet()
-            epDict[stapSS] = []
-            for i in range(len(segments)):
-                lo, hi = segments[i]
-                epDict[stapSS].extend(segments[i])
-                c = StrandSet.CreateStrandCommand(stapSS, lo, hi, i)
+            for o in list(part.oligos()):
+                if not o.isStaple():
+                    continue
+                c = Oligo.RemoveOligoCommand(o)
                 cmds.append(c)
-        util.execCommandList(part, cmds, desc="Add tmp strands", useUndoStack=False)
-        cmds = []
+            # end for
+            util.execCommandList(part, cmds, desc="Clear staples")
+            cmds = []
+
+            # create strands that span all bases where scaffold is present
+            for vh in part.getVirtualHelices():
+                segments = []
+                scafSS = vh.scaffoldStrandSet()
+                for strand in scafSS:
+                    lo, hi = strand.idxs()
+                    if len(segments) == 0:
+                        segments.append([lo, hi])  # insert 1st strand
+                    elif segments[-1][1] == lo - 1:
+                        segments[-1][1] = hi  # extend
+                    else:
+                        segments.append([lo, hi])  # insert another strand
+                stapSS = vh.stapleStrandSet()
+                epDict[stapSS] = []
+                for i in range(len(segments)):
+                    lo, hi = segments[i]
+                    epDict[stapSS].extend(segments[i])
+                    c = StrandSet.CreateStrandCommand(stapSS, lo, hi, i)
+                    cmds.append(c)
+            util.execCommandList(part, cmds, desc="Add tmp strands", useUndoStack=False)
+            cmds = []
 
-        # determine where xovers should be installed
-        for vh in part.getVirtualHelices():
-            stapSS = vh.stapleStrandSet()
-            scafSS = vh.scaffoldStrandSet()
-            is5to3 = stapSS.isDrawn5to3()
-            potentialXovers = part.potentialCrossoverList(vh)
-            for neighborVh, idx, strandType, isLowIdx in potentialXovers:
-                if strandType != StrandType.Staple:
-                    continue
-                if isLowIdx and is5to3:
-                    strand = stapSS.getStrand(idx)
-                    neighborSS = neighborVh.stapleStrandSet()
-                    nStrand = neighborSS.getStrand(idx)
-                    if strand == None or nStrand == None:
-                        continue
-                    # check for bases on both strands at [idx-1:idx+3]
-                    if not (strand.lowIdx() < idx and strand.highIdx() > idx + 1):
-                        continue
-                    if not (nStrand.lowIdx() < idx and nStrand.highIdx() > idx + 1):
+            # determine where xovers should be installed
+            for vh in part.getVirtualHelices():
+                stapSS = vh.stapleStrandSet()
+                scafSS = vh.scaffoldStrandSet()
+                is5to3 = stapSS.isDrawn5to3()
+                occ = vh.occupancy()
+                if occ is not None:
+                    conflicts = occ.xoverConflictMask(StrandType.Scaffold)
+                else:
+                    conflicts = None
+                potentialXovers = part.potentialCrossoverList(vh)
+                for neighborVh, idx, strandType, isLowIdx in potentialXovers:
+                    if strandType != StrandType.Staple:
                         continue
-
-                    # check for nearby scaffold xovers
-                    scafStrandL = scafSS.getStrand(idx-4)
-                    scafStrandH = scafSS.getStrand(idx+5)
-                    if scafStrandL:
-                        if scafStrandL.hasXoverAt(idx-4):
-                            continue
-                    if scafStrandH:
-                        if scafStrandH.hasXoverAt(idx+5):
-                            continue
-
-                    # disable edge xovers
-                    scafStrandL1 = scafSS.getStrand(idx-1)
-                    scafStrandM = scafSS.getStrand(idx)
-                    scafStrandH1 = scafSS.getStrand(idx+1)
-                    if scafStrandL1:
-                        if scafStrandL1.hasXoverAt(idx-1) and not vh.hasStrandAtIdx(idx-2):
-                            continue
-                        if scafStrandL1.hasXoverAt(idx-2) and not vh.hasStrandAtIdx(idx-3):
-                            continue
-                    if scafStrandM:
-                        if scafStrandM.hasXoverAt(idx-1) and not vh.hasStrandAtIdx(idx-2):
+                    if isLowIdx and is5to3:
+                        strand = stapSS.getStrand(idx)
+                        neighborSS = neighborVh.stapleStrandSet()
+                        nStrand = neighborSS.getStrand(idx)
+                        if strand == None or nStrand == None:
                             continue
-                        if scafStrandM.hasXoverAt(idx+1) and not vh.hasStrandAtIdx(idx+2):
+                        # check for bases on both strands at [idx-1:idx+3]
+                        if not (strand.lowIdx() < idx and strand.highIdx() > idx + 1):
                             continue
-                    if scafStrandH1:
-                        if scafStrandH1.hasXoverAt(idx+1) and not vh.hasStrandAtIdx(idx+2):
+                        if not (nStrand.lowIdx() < idx and nStrand.highIdx() > idx + 1):
                             continue
-                        if scafStrandH1.hasXoverAt(idx+2) and not vh.hasStrandAtIdx(idx+3):
-                            continue
-
-                    # Finally, add the xovers to install
-                    epDict[stapSS].extend([idx, idx+1])
-                    epDict[neighborSS].extend([idx, idx+1])
 
-        # clear temporary staple strands
-        for vh in part.getVirtualHelices():
-            stapSS = vh.stapleStrandSet()
-            for strand in stapSS:
-                c = StrandSet.RemoveStrandCommand(stapSS, strand, 0)
-                cmds.append(c)
-        util.execCommandList(part, cmds, desc="Rm tmp strands", useUndoStack=False)
-        cmds = []
+                        # check for nearby scaffold xovers and edge xovers
+                        if conflicts is not None:
+                            if conflicts[idx]:
+                                continue
+                        elif part._isNearScaffoldXover(vh, idx):
+                            continue
 
-        util.beginSuperMacro(part, desc="Auto-Staple")
+                        # Finally, add the xovers to install
+                        epDict[stapSS].extend([idx, idx+1])
+                        epDict[neighborSS].extend([idx, idx+1])
 
-        for stapSS, epList in epDict.items():
-            assert (len(epList) % 2 == 0)
-            epList = sorted(epList)
-            ssIdx = 0
-            for i in range(0, len(epList),2):
-                lo, hi = epList[i:i+2]
-                c = StrandSet.CreateStrandCommand(stapSS, lo, hi, ssIdx)
-                cmds.append(c)
-                ssIdx += 1
-        util.execCommandList(part, cmds, desc="Create strands")
-        cmds = []
+            # clear temporary staple strands
+            for vh in part.getVirtualHelices():
+                stapSS = vh.stapleStrandSet()
+                for strand in stapSS:
+                    c = StrandSet.RemoveStrandCommand(stapSS, strand, 0)
+                    cmds.append(c)
+            util.execCommandList(part, cmds, desc="Rm tmp strands", useUndoStack=False)
+            cmds = []
+
+            for stapSS, epList in epDict.items():
+                assert (len(epList) % 2 == 0)
+                epList = sorted(epList)
+                ssIdx = 0
+                for i in range(0, len(epList),2):
+                    lo, hi = epList[i:i+2]
+                    c = StrandSet.CreateStrandCommand(stapSS, lo, hi, ssIdx)
+                    cmds.append(c)
+                    ssIdx += 1
+            util.execCommandList(part, cmds, desc="Create strands")
+            cmds = []
 
-        # create crossovers wherever possible (from strand5p only)
-        for vh in part.getVirtualHelices():
-            stapSS = vh.stapleStrandSet()
-            is5to3 = stapSS.isDrawn5to3()
-            potentialXovers = part.potentialCrossoverList(vh)
-            for neighborVh, idx, strandType, isLowIdx in potentialXovers:
-                if strandType != StrandType.Staple:
-                    continue
-                if (isLowIdx and is5to3) or (not isLowIdx and not is5to3):
-                    strand = stapSS.getStrand(idx)
-                    neighborSS = neighborVh.stapleStrandSet()
-                    nStrand = neighborSS.getStrand(idx)
-                    if strand == None or nStrand == None:
+            # create crossovers wherever possible (from strand5p only)
+            for vh in part.getVirtualHelices():
+                stapSS = vh.stapleStrandSet()
+                is5to3 = stapSS.isDrawn5to3()
+                potentialXovers = part.potentialCrossoverList(vh)
+                for neighborVh, idx, strandType, isLowIdx in potentialXovers:
+                    if strandType != StrandType.Staple:
                         continue
-                    if idx in strand.idxs() and idx in nStrand.idxs():
-                        # only install xovers on pre-split strands
-                        part.createXover(strand, idx, nStrand, idx, updateOligo=False)
+                    if (isLowIdx and is5to3) or (not isLowIdx and not is5to3):
+                        strand = stapSS.getStrand(idx)
+                        neighborSS = neighborVh.stapleStrandSet()
+                        nStrand = neighborSS.getStrand(idx)
+                        if strand == None or nStrand == None:
+                            continue
+                        if idx in strand.idxs() and idx in nStrand.idxs():
+                            # only install xovers on pre-split strands
+                            part.createXover(strand, idx, nStrand, idx, updateOligo=False)
 
-        c = Part.RefreshOligosCommand(part)
-        cmds.append(c)
-        util.execCommandList(part, cmds, desc="Assign oligos")
+            c = Part.RefreshOligosCommand(part)
+            cmds.append(c)
+            util.execCommandList(part, cmds, desc="Assign oligos")
 
-        cmds = []
-        util.endSuperMacro(part)
+    # end def
 
+    def _isNearScaffoldXover(self, vh, idx):
+        """
+        Returns True if a staple crossover at idx would be too close to a
+        scaffold crossover of vh for autoStaple. Used when the occupancy
+        arrays aren't available; see BaseOccupancy.xoverConflictMask.
+        """
+        scafSS = vh.scaffoldStrandSet()
+        # check for nearby scaffold xovers
+        scafStrandL = scafSS.getStrand(idx-4)
+        scafStrandH = scafSS.getStrand(idx+5)
+        if scafStrandL:
+            if scafStrandL.hasXoverAt(idx-4):
+                return True
+        if scafStrandH:
+            if scafStrandH.hasXoverAt(idx+5):
+                return True
+
+        # disable edge xovers
+        scafStrandL1 = scafSS.getStrand(idx-1)
+        scafStrandM = scafSS.getStrand(idx)
+        scafStrandH1 = scafSS.getStrand(idx+1)
+        if scafStrandL1:
+            if scafStrandL1.hasXoverAt(idx-1) and not vh.hasStrandAtIdx(idx-2):
+                return True
+            if scafStrandL1.hasXoverAt(idx-2) and not vh.hasStrandAtIdx(idx-3):
+                return True
+        if scafStrandM:
+            if scafStrandM.hasXoverAt(idx-1) and not vh.hasStrandAtIdx(idx-2):
+                return True
+            if scafStrandM.hasXoverAt(idx+1) and not vh.hasStrandAtIdx(idx+2):
+                return True
+        if scafStrandH1:
+            if scafStrandH1.hasXoverAt(idx+1) and not vh.hasStrandAtIdx(idx+2):
+                return True
+            if scafStrandH1.hasXoverAt(idx+2) and not vh.hasStrandAtIdx(idx+3):
+                return True
+        return False
     # end def
 
     def verifyOligoStrandCounts(self):
@@ -419,26 +479,21 @@ class Part(QObject):
         # print "# stap oligos:", len(stapOligos), "# stap strands:", total_stap_strands
 
 
-    def verifyOligos(self):
-        total_errors = 0
-        total_passed = 0
-
+    def verifyOligos(self, markErrors=True):
+        """
+        Verify mode for the incrementally maintained oligo lengths: walks
+        every oligo, recomputing each strand's length from scratch, and
+        returns the oligos whose length disagrees. These are colored red
+        if markErrors is True.
+        """
+        errors = []
         for o in list(self.oligos()):
-            oL = o.length()
-            a = 0
-            gen = o.strand5p().generator3pStrand()
-
-            for s in gen:
-                a += s.totalLength()
-            # end for
-            if oL != a:
-                total_errors += 1
-                # print "wtf", total_errors, "oligoL", oL, "strandsL", a, "isStaple?", o.isStaple()
-                o.applyColor('#ff0000')
-            else:
-                total_passed += 1
+            if not o.verifyLength():
+                errors.append(o)
+                if markErrors:
+                    o.applyColor('#ff0000')
         # end for
-        # print "Total Passed: ", total_passed, "/", total_passed+total_errors
+        return errors
     # end def
 
     def removeVirtualHelices(self, useUndoStack=True):
@@ -530,6 +585,8 @@ class Part(QObject):
         ss3p = strand3p.strandSet()
         if ss5p.strandType() != ss3p.strandType():
             return
+        if useUndoStack and self._document.isCompactingMacro():
+            useUndoStack = False  # the compact macro records the result
         if useUndoStack:
             self.undoStack().beginMacro("Create Xover")
         if ss5p.isScaffold() and useUndoStack:  # ignore on import
@@ -701,12 +758,23 @@ class Part(QObject):
         Returns a generator that yields the XY spatial lattice points to draw
         relative to the part origin.
         """
-        # nested for loop in one line
-        latticeCoordToPositionXY = self.latticeCoordToPositionXY
-        for latticeCoord in product(list(range(self._maxRow)), list(range(self._maxCol))):
-            row, col = latticeCoord
-            x, y = latticeCoordToPositionXY(row, col, scaleFactor)
-            yield x, y, row, col
+        return lattice.latticeGeometry(self, scaleFactor).spatialLattice()
+    # end def
+
+    def latticeGeometry(self, scaleFactor=1.0):
+        """
+        Returns the cached lattice.LatticeGeometry of this part: the x, y
+        of every lattice point and a spatial index over them.
+        """
+        return lattice.latticeGeometry(self, scaleFactor)
+    # end def
+
+    def latticeCoordAt(self, x, y, scaleFactor=1.0):
+        """
+        Returns the (row, column) of the helix covering x, y, or None if
+        there is none. x, y is in the frame of latticeCoordToPositionXY.
+        """
+        return lattice.latticeGeometry(self, scaleFactor).coordAt(x, y)
     # end def
 
     def getPreXoversHigh(self, strandType, neighborType, minIdx=0, maxIdx=None):
@@ -758,7 +826,12 @@ class Part(QObject):
     # end def
 
     def newPart(self):
-        return Part(self._document)
+        """Returns an empty Part of the same class and dimensions."""
+        part = self.__class__(document=self._document,
+                              maxRow=self._maxRow, maxCol=self._maxCol)
+        part._minBase = self._minBase
+        part._maxBase = self._maxBase
+        return part
     # end def
 
     def removeOligo(self, oligo):
@@ -807,10 +880,10 @@ class Part(QObject):
             part = self._part
             aVH =  part.activeVirtualHelix()
             if aVH:
-                part.partStrandChangedSignal.emit(part, aVH)
+                part.document().emitSignal(part.partStrandChangedSignal, part, aVH)
             for oligo in part._oligos:
                 for strand in oligo.strand5p().generator3pStrand():
-                    strand.strandUpdateSignal.emit(strand)
+                    strand._doc.emitSignal(strand.strandUpdateSignal, strand)
         # end def
             
         def undo(self):
@@ -820,10 +893,10 @@ class Part(QObject):
             part = self._part
             aVH =  part.activeVirtualHelix()
             if aVH:
-                part.partStrandChangedSignal.emit(part, aVH)
+                part.document().emitSignal(part.partStrandChangedSignal, part, aVH)
             for oligo in part._oligos:
                 for strand in oligo.strand5p().generator3pStrand():
-                    strand.strandUpdateSignal.emit(strand)
+                    strand._doc.emitSignal(strand.strandUpdateSignal, strand)
         # end def
     # end def
 
@@ -839,6 +912,32 @@ class Part(QObject):
                                                     useUndoStack=useUndoStack)
     # end def
 
+    def setLazySequences(self, enabled):
+        """
+        Switches between keeping a sequence string on every strand and
+        keeping one buffer per virtualhelix and strand type that
+        Strand.sequence() slices on demand. With buffers, splitting,
+        merging and resizing strands don't copy any sequence data. The
+        current strand sequences are carried over either way.
+        """
+        if enabled == self.lazySequences():
+            return
+        strands = [strand for vh in self._coordToVirtualHelix.values()
+                   for strandSet in vh.getStrandSets() for strand in strandSet]
+        if enabled:
+            sequences = [(strand, strand._sequence) for strand in strands]
+            self._sequenceBuffers = {}
+            for strand, seq in sequences:
+                strand._sequence = None
+                if seq:
+                    strand.setSequence(seq)
+        else:
+            sequences = [(strand, strand.sequence()) for strand in strands]
+            self._sequenceBuffers = None
+            for strand, seq in sequences:
+                strand._sequence = seq or None
+    # end def
+
     def setActiveBaseIndex(self, idx):
         self._activeBaseIndex = idx
         self.partActiveSliceIndexSignal.emit(self, idx)
@@ -847,7 +946,7 @@ class Part(QObject):
     def setActiveVirtualHelix(self, virtualHelix, idx=None):
         self._activeVirtualHelix = virtualHelix
         self._activeVirtualHelixIdx = idx
-        self.partStrandChangedSignal.emit(self, virtualHelix)
+        self.document().emitSignal(self.partStrandChangedSignal, self, virtualHelix)
     # end def
 
     def selectPreDecorator(self, selectionList):
@@ -907,6 +1006,7 @@ class Part(QObject):
         of virtualHelix references
         """
         self._coordToVirtualHelix[virtualHelix.coord()] = virtualHelix
+        self._invalidatePotentialXovers(virtualHelix)
     # end def
 
     def _removeVirtualHelix(self, virtualHelix):
@@ -914,9 +1014,130 @@ class Part(QObject):
         private method for adding a virtualHelix to the Parts data structure
         of virtualHelix references
         """
+        self._invalidatePotentialXovers(virtualHelix)
         del self._coordToVirtualHelix[virtualHelix.coord()]
     # end def
 
+    def _spliceSequenceBuffers(self, coord, idx, oldLength, newLength):
+        """
+        Called by the insertion commands before the insertion at idx
+        changes from oldLength to newLength (0 for none), so the buffers at
+        coord keep every other base in place.
+        """
+        if self._sequenceBuffers is None:
+            return
+        start = self.insertionIndex(coord).position(idx)
+        oldEnd = start + 1 + oldLength  # a skip (-1) has no bases
+        newEnd = start + 1 + newLength
+        for strandType in (StrandType.Scaffold, StrandType.Staple):
+            buf = self.sequenceBuffer(coord, strandType)
+            if newEnd > oldEnd:
+                buf[oldEnd:oldEnd] = b' ' * (newEnd - oldEnd)
+            else:
+                del buf[newEnd:oldEnd]
+    # end def
+
+    def _potentialXoverCache(self):
+        """
+        Returns the potentialCrossoverList cache, dropping it if the part
+        has been resized since it was filled.
+        """
+        if self._potentialXoverMaxBase != self._maxBase:
+            self._potentialXovers = {}
+            self._potentialXoverSites = None
+            self._potentialXoverMaxBase = self._maxBase
+        return self._potentialXovers
+    # end def
+
+    def _getPotentialXoverSites(self):
+        """
+        Returns, for each neighbor direction, the candidate crossover indices
+        as sites[direction][strandType][0 if isLowIdx else 1]. These only
+        depend on the lattice and the part length, so they're computed once.
+        """
+        if self._potentialXoverSites is None:
+            # these are the list of crossover points simplified
+            # they depend on whether the strandType is scaffold or staple
+            # create a list of crossover points for each neighbor of the form
+            # [(_scafL[i], _scafH[i], _stapL[i], _stapH[i]), ...]
+            lutsNeighbor = zip(self._scafL, self._scafH,
+                               self._stapL, self._stapH)
+            numBases = self.maxBaseIdx()
+            # create a range for the helical length dimension of the Part,
+            # incrementing by the lattice step size.
+            baseRange = range(0, numBases, self._step)
+            sites = []
+            for lut in lutsNeighbor:
+                # (_scafL[i], _scafH[i]), (_stapL[i], _stapH[i]) )
+                # so we can pair by StrandType
+                perType = []
+                for pts in (lut[0:2], lut[2:4]):
+                    perEnd = []
+                    for pt in pts:
+                        idxs = [i + j for i, j in product(baseRange, pt) \
+                                                    if i + j < numBases]
+                        if occupancy.isAvailable():
+                            idxs = occupancy.idxArray(idxs)
+                        perEnd.append(idxs)
+                    perType.append(perEnd)
+                sites.append(perType)
+            self._potentialXoverSites = sites
+        return self._potentialXoverSites
+    # end def
+
+    def _computePotentialCrossovers(self, virtualHelices):
+        """
+        Fills the potentialCrossoverList cache for virtualHelices. Uses the
+        occupancy arrays when available to test all candidate sites of a
+        neighbor pair at once.
+        """
+        cache = self._potentialXoverCache()
+        sites = self._getPotentialXoverSites()
+        sTs = (StrandType.Scaffold, StrandType.Staple)
+        for vh in virtualHelices:
+            ret = []
+            fromOcc = vh.occupancy()
+            fromStrandSets = vh.getStrandSets()
+            neighbors = self.getVirtualHelixNeighbors(vh)
+            for neighbor, nSites in zip(neighbors, sites):
+                if not neighbor:
+                    continue
+                toOcc = neighbor.occupancy()
+                toStrandSets = neighbor.getStrandSets()
+                for fromSS, toSS, pts, st in \
+                                zip(fromStrandSets, toStrandSets, nSites, sTs):
+                    for idxs, isLowIdx in zip(pts, (True, False)):
+                        if fromOcc is not None and toOcc is not None:
+                            ok = fromOcc.noXoverAt(st, idxs) & \
+                                                toOcc.noXoverAt(st, idxs)
+                            ret.extend((neighbor, index, st, isLowIdx) \
+                                            for index in idxs[ok].tolist())
+                        else:
+                            ret.extend((neighbor, index, st, isLowIdx) \
+                                for index in idxs \
+                                if fromSS.hasNoStrandAtOrNoXover(index) and \
+                                    toSS.hasNoStrandAtOrNoXover(index))
+                    # end for
+                # end for
+            # end for
+            cache[vh] = ret
+        # end for
+    # end def
+
+    def _invalidatePotentialXovers(self, virtualHelix):
+        """
+        Drops the cached potentialCrossoverList of virtualHelix and its
+        neighbors. Called whenever strands of virtualHelix change.
+        """
+        cache = self._potentialXovers
+        if not cache:
+            return
+        cache.pop(virtualHelix, None)
+        for neighbor in self.getVirtualHelixNeighbors(virtualHelix):
+            if neighbor is not None:
+                cache.pop(neighbor, None)
+    # end def
+
     def _reserveHelixIDNumber(self, parityEven=True, requestedIDnum=None):
         """
         Reserves and returns a unique numerical label appropriate for a
@@ -1016,62 +1237,54 @@ class Part(QObject):
 
     ### PUBLIC SUPPORT METHODS ###
     def shallowCopy(self):
+        """
+        Returns a new Part with copies of this Part's containers, holding
+        the same VirtualHelix, Oligo and Insertion objects.
+        """
         part = self.newPart()
-        part._virtualHelices = dict(self._virtualHelices)
+        part._coordToVirtualHelix = dict(self._coordToVirtualHelix)
+        part._numberToVirtualHelix = dict(self._numberToVirtualHelix)
         part._oligos = set(self._oligos)
+        for coord, vhDict in self._insertions.items():
+            part._insertions[coord] = dict(vhDict)
+            index = part._insertionIndices[coord]
+            for idx, insertion in vhDict.items():
+                index.add(idx, insertion.length())
+        part._minBase = self._minBase
         part._maxBase = self._maxBase
         return part
     # end def
 
     def deepCopy(self):
         """
-        1) Create a new part
-        2) copy the VirtualHelices
-        3) Now you need to map the ORIGINALs Oligos onto the COPY's Oligos
-        To do this you can for each Oligo in the ORIGINAL
-            a) get the strand5p() of the ORIGINAL
-            b) get the corresponding strand5p() in the COPY based on
-                i) lookup the hash idNum of the ORIGINAL strand5p() VirtualHelix
-                ii) get the StrandSet() that you created in Step 2 for the
-                StrandType of the original using the hash idNum
-        """
-        # 1) new part
+        Returns a new Part, in the same document but not one of its parts,
+        with a copy of this Part's design made through a PartSnapshot.
+        """
         part = self.newPart()
-        for key, vhelix in self._virtualHelices:
-            # 2) Copy VirtualHelix
-            part._virtualHelices[key] = vhelix.deepCopy(part)
-        # end for
-        # 3) Copy oligos
-        for oligo, val in self._oligos:
-            strandGenerator = oligo.strand5p().generator3pStrand()
-            strandType = oligo.strand5p().strandType()
-            newOligo = oligo.deepCopy(part)
-            lastStrand = None
-            for strand in strandGenerator:
-                idNum = strand.virtualHelix().number()
-                newVHelix = part._virtualHelices[idNum]
-                newStrandSet = newVHelix().getStrandSetByType(strandType)
-                newStrand = strand.deepCopy(newStrandSet, newOligo)
-                if lastStrand:
-                    lastStrand.setConnection3p(newStrand)
-                else:
-                    # set the first condition
-                    newOligo.setStrand5p(newStrand)
-                newStrand.setConnection5p(lastStrand)
-                newStrandSet.addStrand(newStrand)
-                lastStrand = newStrand
-            # end for
-            # check loop condition
-            if oligo.isLoop():
-                s5p = newOligo.strand5p()
-                lastStrand.set3pconnection(s5p)
-                s5p.set5pconnection(lastStrand)
-            # add to part
-            oligo.add()
-        # end for
+        PartSnapshot(self).restore(part)
         return part
     # end def
 
+    def snapshot(self):
+        """
+        Returns a PartSnapshot of the design, see model/snapshot.py. It
+        holds no model objects, so it can be kept, compared or pickled.
+        """
+        return PartSnapshot(self)
+    # end def
+
+    def restoreSnapshot(self, snapshot):
+        """
+        Puts the design captured by snapshot back. Every Strand and Oligo
+        is replaced by a new object, and the undo history refers to the
+        old ones, so it is cleared; the document stays modified.
+        """
+        snapshot.restore(self)
+        undoStack = self.undoStack()
+        undoStack.clear()
+        undoStack.resetClean()
+    # end def
+
     def areSameOrNeighbors(self, virtualHelixA, virtualHelixB):
         """
         returns True or False
@@ -1092,69 +1305,44 @@ class Part(QObject):
         strandType is from the enum (StrandType.Scaffold, StrandType.Staple)
         isLowIdx is whether or not it's the at the low index (left in the Path
         view) of a potential Xover site
-        """
-        vh = virtualHelix
-        ret = []  # LUT = Look Up Table
-        part = self
-        # these are the list of crossover points simplified
-        # they depend on whether the strandType is scaffold or staple
-        # create a list of crossover points for each neighbor of the form
-        # [(_scafL[i], _scafH[i], _stapL[i], _stapH[i]), ...]
-        lutsNeighbor = list(
-                            zip(
-                                part._scafL,
-                                part._scafH,
-                                part._stapL,
-                                part._stapH
-                                )
-                            )
-
-        sTs = (StrandType.Scaffold, StrandType.Staple)
-        numBases = part.maxBaseIdx()
-
-        # create a range for the helical length dimension of the Part,
-        # incrementing by the lattice step size.
-        baseRange = list(range(0, numBases, part._step))
 
-        if idx != None:
-            baseRange = [x for x in baseRange if x >= idx - 3 * part._step and \
-                                        x <= idx + 2 * part._step]
+        If idx is given, only sites in the lattice periods from
+        idx - 3 * step to idx + 2 * step are returned.
 
+        Lists are cached per virtualHelix (see potentialCrossoverMap).
+        """
+        vh = virtualHelix
         if vh is None:
             return
+        cache = self._potentialXoverCache()
+        if vh not in cache:
+            missing = [x for x in self._coordToVirtualHelix.values() \
+                                                    if x not in cache]
+            if vh not in missing:
+                missing.append(vh)
+            self._computePotentialCrossovers(missing)
+        ret = cache[vh]
+        if idx is None:
+            return list(ret)
+        # every site lies in the lattice period that starts at
+        # index - index % step, since the LUT offsets are less than step
+        step = self._step
+        lo, hi = idx - 3 * step, idx + 2 * step
+        return [x for x in ret if lo <= x[1] - x[1] % step <= hi]
+    # end def
 
-        fromStrandSets = vh.getStrandSets()
-        neighbors = self.getVirtualHelixNeighbors(vh)
-
-        # print neighbors, lutsNeighbor
-        for neighbor, lut in zip(neighbors, lutsNeighbor):
-            if not neighbor:
-                continue
-
-            # now arrange again for iteration
-            # (_scafL[i], _scafH[i]), (_stapL[i], _stapH[i]) )
-            # so we can pair by StrandType
-            lutScaf = lut[0:2]
-            lutStap = lut[2:4]
-            lut = (lutScaf, lutStap)
-
-            toStrandSets = neighbor.getStrandSets()
-            for fromSS, toSS, pts, st in zip(fromStrandSets, toStrandSets, lut, sTs):
-                # test each period of each lattice for each StrandType
-                for pt, isLowIdx in zip(pts, (True, False)):
-                    for i, j in product(baseRange, pt):
-                        index = i + j
-                        if index < numBases:
-                            if fromSS.hasNoStrandAtOrNoXover(index) and \
-                                    toSS.hasNoStrandAtOrNoXover(index):
-                                ret.append((neighbor, index, st, isLowIdx))
-                            # end if
-                        # end if
-                    # end for
-                # end for
-            # end for
-        # end for
-        return ret
+    def potentialCrossoverMap(self):
+        """
+        Returns a dict mapping each virtualHelix in the part to its
+        potentialCrossoverList. Only helices that changed since the last call
+        (or that neighbor one that did) are recomputed, in a single pass.
+        """
+        cache = self._potentialXoverCache()
+        missing = [vh for vh in self._coordToVirtualHelix.values() \
+                                                    if vh not in cache]
+        if missing:
+            self._computePotentialCrossovers(missing)
+        return dict(cache)
     # end def
 
     def possibleXoverAt(self, fromVirtualHelix, toVirtualHelix, strandType, idx):
@@ -1267,11 +1455,11 @@ class Part(QObject):
             vh3p = ss3.virtualHelix()
             st3p = ss3.strandType()
 
-            part.partActiveVirtualHelixChangedSignal.emit(part, vh5p)
+            part.document().emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                       part, vh5p)
             # strand5p.strandXover5pChangedSignal.emit(strand5p, strand3p)
-            if self._updateOligo:
-                strand5p.strandUpdateSignal.emit(strand5p)
-                strand3p.strandUpdateSignal.emit(strand3p)
+            part.document().emitSignal(strand5p.strandUpdateSignal, strand5p)
+            part.document().emitSignal(strand3p.strandUpdateSignal, strand3p)
         # end def
 
         def undo(self):
@@ -1312,11 +1500,11 @@ class Part(QObject):
             vh3p = ss3.virtualHelix()
             st3p = ss3.strandType()
 
-            part.partActiveVirtualHelixChangedSignal.emit(part, vh5p)
+            part.document().emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                       part, vh5p)
             # strand5p.strandXover5pChangedSignal.emit(strand5p, strand3p)
-            if self._updateOligo:
-                strand5p.strandUpdateSignal.emit(strand5p)
-                strand3p.strandUpdateSignal.emit(strand3p)
+            part.document().emitSignal(strand5p.strandUpdateSignal, strand5p)
+            part.document().emitSignal(strand3p.strandUpdateSignal, strand3p)
         # end def
     # end class
 
@@ -1331,60 +1519,182 @@ class Part(QObject):
 
         Hence, we disable oligo assignment during the xover creation step,
         and then do it all in one pass at the end with this command.
+
+        Every staple strand is visited once: each unvisited strand's chain
+        of xover links is walked in both directions, and the chain keeps
+        the oligo of the strand it was reached from. Only strands whose
+        oligo actually changes are reassigned, and the old assignments,
+        the merged-away oligos and the surviving oligos' old 5' strand,
+        loop flag and length are recorded so undo can put them back.
+
+        The reassigned strands are the only ones that notify the views,
+        through strandHasNewOligoSignal, which the enclosing batch update
+        sends once per strand. The crossovers redraw from their own
+        CreateXoverCommand.
         """
         def __init__(self, part):
             super(Part.RefreshOligosCommand, self).__init__()
             self._part = part
+            self._oldOligos = []    # (strand, oldOligo) of reassigned strands
+            self._removedOligos = []
+            self._oldOligoStates = []  # (oligo, strand5p, isLoop, length)
         # end def
 
-        def redo(self):
-            visited = {}
+        def _chains(self):
+            """
+            Yields (strand, chain) for each chain of connected staple
+            strands, where chain runs 5' to 3' and strand is the first
+            strand of the chain in VirtualHelix and StrandSet order.
+            """
+            visited = set()
             for vh in self._part.getVirtualHelices():
-                stapSS = vh.stapleStrandSet()
-                for strand in stapSS:
-                    visited[strand] = False
+                for strand in vh.stapleStrandSet():
+                    if strand in visited:
+                        continue
+                    chain = list(strand.generator5pStrand())
+                    chain.reverse()
+                    if strand.connection3p() != chain[0]:  # not a loop
+                        chain.extend(islice(strand.generator3pStrand(), 1, None))
+                    visited.update(chain)
+                    yield strand, chain
+            # end for
+        # end def
 
-            for strand in list(visited.keys()):
-                if visited[strand]:
-                    continue
-                visited[strand] = True
+        def redo(self):
+            oldOligos = self._oldOligos = []
+            removedOligos = self._removedOligos = []
+            oldOligoStates = self._oldOligoStates = []
+            removed = set()
+            for strand, chain in self._chains():
                 startOligo = strand.oligo()
-                strand5gen = strand.generator5pStrand()
-                # this gets the oligo and burns a strand in the generator
-                strand5 = next(strand5gen)
-                for strand5 in strand5gen:
-                    oligo5 = strand5.oligo()
-                    if oligo5 != startOligo:
-                        oligo5.removeFromPart()
-                        Strand.setOligo(strand5, startOligo)  # emits strandHasNewOligoSignal
-                    visited[strand5] = True
+                oldOligoStates.append((startOligo, startOligo.strand5p(),
+                                       startOligo.isLoop(), startOligo.length()))
+                length = 0
+                for strandI in chain:
+                    length += strandI.totalLength()
+                    oligoI = strandI.oligo()
+                    if oligoI != startOligo:
+                        if oligoI not in removed:
+                            removed.add(oligoI)
+                            removedOligos.append(oligoI)
+                            oligoI.removeFromPart()
+                        oldOligos.append((strandI, oligoI))
+                        Strand.setOligo(strandI, startOligo)  # emits strandHasNewOligoSignal
                 # end for
-                startOligo.setStrand5p(strand5)
-                # is it a loop?
-                if strand.connection3p() == strand5:
+                startOligo.setStrand5p(chain[0])
+                if chain[0].connection5p() == chain[-1]:
                     startOligo.setLoop(True)
-                else:
-                    strand3gen = strand.generator3pStrand()
-                    strand3 = next(strand3gen)   # burn one
-                    for strand3 in strand3gen:
-                        oligo3 = strand3.oligo()
-                        if oligo3 != startOligo:
-                            oligo3.removeFromPart()
-                            Strand.setOligo(strand3, startOligo)  # emits strandHasNewOligoSignal
-                        visited[strand3] = True
-                    # end for
-                startOligo.refreshLength()
+                startOligo.setLength(length)
             # end for
+        # end def
 
-            oligoSet = set()
-            for strand in list(visited.keys()):
-                oligoSet.add(strand.oligo())
-                strand.strandUpdateSignal.emit(strand)
+        def undo(self):
+            for oligo in self._removedOligos:
+                oligo.addToPart(self._part)
+            for strand, oligo in reversed(self._oldOligos):
+                Strand.setOligo(strand, oligo)  # emits strandHasNewOligoSignal
+            for oligo, strand5p, isLoop, length in reversed(self._oldOligoStates):
+                oligo.setStrand5p(strand5p)
+                oligo.setLoop(isLoop)
+                oligo.setLength(length)
+        # end def
+    # end class
+
+    class StrandStateCommand(QUndoCommand):
+        """
+        StrandStateCommand stands in for a compacted macro (see
+        Document.beginCompactMacro): instead of the commands that ran, it
+        keeps a StrandStateDiff of the StrandSets and oligos they changed,
+        and undo/redo restore the before or after side of it.
+
+        The macro has already been applied when the command is pushed, so
+        the first redo does nothing.
+        """
+        def __init__(self, part, before, desc=None):
+            super(Part.StrandStateCommand, self).__init__()
+            if desc:
+                self.setText(desc)
+            self._part = part
+            self._diff = StrandStateDiff(before, part)
+            self._applied = True
+            self._memoryCost = None
+        # end def
+
+        def isEmpty(self):
+            return self._diff.isEmpty()
+        # end def
+
+        def memoryCost(self):
+            """Returns the approximate size in bytes of the kept states."""
+            if self._memoryCost is None:
+                self._memoryCost = sys.getsizeof(self) + \
+                                   self._diff.memoryCost()
+            return self._memoryCost
+        # end def
+
+        def redo(self):
+            if self._applied:
+                self._applied = False
+                return
+            self._restore(after=True)
         # end def
 
         def undo(self):
-            """Doesn't reassign """
-            pass
+            self._restore(after=False)
+        # end def
+
+        def _restore(self, after):
+            """Restores the after states if after is True, else the before
+            states."""
+            i = 2 if after else 1
+            part = self._part
+            doc = part.document()
+            diff = self._diff
+            strandTable, oligoTable = diff.strandTable, diff.oligoTable
+            partOligos = part.oligos()
+            with doc.batchUpdates():
+                for item in diff.oligos:
+                    olg, state = oligoTable[item[0]], item[i]
+                    if state is None:
+                        if olg in partOligos:
+                            olg.removeFromPart()
+                    elif olg not in partOligos:
+                        olg.addToPart(part)
+                for item in diff.strandSets:
+                    strandSet, start, beforeRun, afterRun = item
+                    current, target = (beforeRun, afterRun) if after \
+                                      else (afterRun, beforeRun)
+                    currentStrands = set(current.strands(strandTable))
+                    targetStrands = target.strands(strandTable)
+                    targetSet = set(targetStrands)
+                    for strand in currentStrands:
+                        if strand not in targetSet:
+                            doc.removeStrandFromSelection(strand)
+                            strand.strandRemovedSignal.emit(strand)
+                    target.restore(strandSet, start, current,
+                                   strandTable, oligoTable)
+                    for strand in targetStrands:
+                        if strand in currentStrands:
+                            doc.emitSignal(strand.strandHasNewOligoSignal,
+                                           strand)
+                            doc.emitSignal(strand.strandUpdateSignal, strand)
+                        else:
+                            strandSet.strandsetStrandAddedSignal.emit(
+                                                            strandSet, strand)
+                    doc.emitSignal(part.partStrandChangedSignal,
+                                   part, strandSet.virtualHelix())
+                # end for
+                for item in diff.oligos:
+                    olg, state = oligoTable[item[0]], item[i]
+                    if state is None:
+                        continue
+                    strand5p, isLoop, length, color = state
+                    olg.setStrand5p(strandTable[strand5p])
+                    olg.setLoop(isLoop)
+                    olg.setLength(length)
+                    olg.setColor(color)
+                    doc.emitSignal(olg.oligoAppearanceChangedSignal, olg)
+            # end with
         # end def
     # end class
 
@@ -1454,10 +1764,11 @@ class Part(QObject):
             vh3p = ss3.virtualHelix()
             st3p = ss3.strandType()
 
-            part.partActiveVirtualHelixChangedSignal.emit(part, vh5p)
+            part.document().emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                       part, vh5p)
             # strand5p.strandXover5pChangedSignal.emit(strand5p, strand3p)
-            strand5p.strandUpdateSignal.emit(strand5p)
-            strand3p.strandUpdateSignal.emit(strand3p)
+            part.document().emitSignal(strand5p.strandUpdateSignal, strand5p)
+            part.document().emitSignal(strand3p.strandUpdateSignal, strand3p)
         # end def
 
         def undo(self):
@@ -1498,10 +1809,11 @@ class Part(QObject):
             vh3p = ss3.virtualHelix()
             st3p = ss3.strandType()
 
-            part.partActiveVirtualHelixChangedSignal.emit(part, vh5p)
+            part.document().emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                       part, vh5p)
             # strand5p.strandXover5pChangedSignal.emit(strand5p, strand3p)
-            strand5p.strandUpdateSignal.emit(strand5p)
-            strand3p.strandUpdateSignal.emit(strand3p)
+            part.document().emitSignal(strand5p.strandUpdateSignal, strand5p)
+            part.document().emitSignal(strand3p.strandUpdateSignal, strand3p)
         # end def
     # end class
 
@@ -1560,11 +1872,11 @@ class Part(QObject):
                 for strand in sList:
                     sSet.removeStrand(strand)
                 # end for
-                sSet._strandList = []
+                sSet._setStrandList([])
             #end for
             for vh in self._vhs:
                 # for updating the Slice View displayed helices
-                part.partStrandChangedSignal.emit(part, vh)
+                part.document().emitSignal(part.partStrandChangedSignal, part, vh)
             # end for
             self._oligos.clear()
         # end def
@@ -1578,11 +1890,11 @@ class Part(QObject):
                 for strand in sList:
                     sSet.strandsetStrandAddedSignal.emit(sSet, strand)
                 # end for
-                sSet._strandList = sList
+                sSet._setStrandList(sList)
             #end for
             for vh in self._vhs:
                 # for updating the Slice View displayed helices
-                part.partStrandChangedSignal.emit(part, vh)
+                part.document().emitSignal(part.partStrandChangedSignal, part, vh)
             # end for
             for olg in self._oligos:
                 part.addOligo(olg)
@@ -1622,7 +1934,7 @@ class Part(QObject):
             part._minBase -= self._minDelta
             part._maxBase -= self._maxDelta
             if self._minDelta != 0:
-                self.deltaMinDimension(part, self._minDelta)
+                self.deltaMinDimension(part, -self._minDelta)
             for vh in part._coordToVirtualHelix.values():
                 part.partVirtualHelixResizedSignal.emit(part, vh.coord())
             if self._oldActiveIdx != part.activeBaseIndex():
@@ -1636,16 +1948,26 @@ class Part(QObject):
             strands
             insertions
             """
-            for vhDict in part._insertions.values():
-                for insertion in vhDict:
+            for coord, vhDict in part._insertions.items():
+                insertions = list(vhDict.values())
+                vhDict.clear()
+                for insertion in insertions:
                     insertion.updateIdx(minDimensionDelta)
+                    vhDict[insertion.idx()] = insertion
                 # end for
+                part._insertionIndices[coord].shift(minDimensionDelta)
+            # end for
+            for buf in (part._sequenceBuffers or {}).values():
+                if minDimensionDelta > 0:
+                    buf[0:0] = b' ' * minDimensionDelta
+                else:
+                    del buf[:-minDimensionDelta]
             # end for
             for vh in part._coordToVirtualHelix.values():
-                for strand in vh.scaffoldStrand().generatorStrand():
-                    strand.updateIdxs(minDimensionDelta)
-                for strand in vh.stapleStrand().generatorStrand():
-                    strand.updateIdxs(minDimensionDelta)
+                for strandSet in vh.getStrandSets():
+                    for strand in strandSet.generatorStrand():
+                        strand.updateIdxs(minDimensionDelta)
+                    strandSet._rebuildIdxLists()
             # end for
         # end def
     # end class
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+plain.py
+
+Plain-data records of a Part, for handing a design to multiprocessing
+workers. The model objects are QObjects with signals and parents and
+can't be pickled; a PlainPart holds the same design in __slots__ records
+of flat int arrays, which pickle small and fast. This module imports
+nothing from Qt or the rest of the model, so a worker can unpickle a
+PlainPart and analyze it, solve autobreak or export sequences without
+loading PyQt:
+
+    plain = to_plain(part)                  # in the GUI or batch process
+    results = pool.map(analyze, [plain])    # analyze(plain) runs Qt-free
+    from_plain(plain, document, part)       # back into the model
+
+to_plain and from_plain go through a PartSnapshot (model/snapshot.py),
+and only import the model when they are called.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class HelixRecords(object):
+    """Helix i has number numbers[i] at lattice coord (rows[i], cols[i])."""
+    __slots__ = ('numbers', 'rows', 'cols')
+
+    def __init__(self):
+        self.numbers = array('i')
+        self.rows = array('i')
+        self.cols = array('i')
+    # end def
+
+    def __len__(self):
+        return len(self.numbers)
+    # end def
+# end class
+
+
+class StrandRecords(object):
+    """
+    Strand i spans bases low[i] to high[i] of helix helix[i] (an index
+    into the HelixRecords), in the scaffold (strandType 0) or staple (1)
+    StrandSet. strand5p[i] and strand3p[i] are the strands it connects
+    to, -1 for none, and oligo[i] indexes the OligoRecords. Strands are
+    in order of helix, strand type and low index.
+    """
+    __slots__ = ('helix', 'strandType', 'low', 'high',
+                 'strand5p', 'strand3p', 'oligo')
+
+    def __init__(self):
+        self.helix = array('i')
+        self.strandType = array('b')
+        self.low = array('i')
+        self.high = array('i')
+        self.strand5p = array('i')
+        self.strand3p = array('i')
+        self.oligo = array('i')
+    # end def
+
+    def __len__(self):
+        return len(self.low)
+    # end def
+# end class
+
+
+class XoverRecords(object):
+    """
+    Crossover i goes from the 3' end of strand strand5p[i], at base
+    idx5p[i], to the 5' end of strand strand3p[i], at base idx3p[i], as
+    in Part.createXover. It is derived from the strand connections.
+    """
+    __slots__ = ('strand5p', 'idx5p', 'strand3p', 'idx3p')
+
+    def __init__(self):
+        self.strand5p = array('i')
+        self.idx5p = array('i')
+        self.strand3p = array('i')
+        self.idx3p = array('i')
+    # end def
+
+    def __len__(self):
+        return len(self.strand5p)
+    # end def
+# end class
+
+
+class InsertionRecords(object):
+    """
+    Insertion i adds length[i] bases (-1 for a skip) at base idx[i] of
+    helix helix[i]. Insertions are in order of helix and idx.
+    """
+    __slots__ = ('helix', 'idx', 'length')
+
+    def __init__(self):
+        self.helix = array('i')
+        self.idx = array('i')
+        self.length = array('i')
+    # end def
+
+    def __len__(self):
+        return len(self.idx)
+    # end def
+# end class
+
+
+class OligoRecords(object):
+    """
+    Oligo i starts at strand strand5p[i], is length[i] bases long and has
+    color colors[i]; isLoop[i] is 1 if it is circular.
+    """
+    __slots__ = ('strand5p', 'isLoop', 'length', 'colors')
+
+    def __init__(self):
+        self.strand5p = array('i')
+        self.isLoop = array('b')
+        self.length = array('i')
+        self.colors = []
+    # end def
+
+    def __len__(self):
+        return len(self.strand5p)
+    # end def
+# end class
+
+
+class PlainPart(object):
+    """
+    The design of a Part as plain records. sequences maps a strand index
+    to its sequence, for strands that have one. helixOrder and
+    helixIdState carry the rest of the Part state that from_plain puts
+    back.
+    """
+    __slots__ = ('latticeType', 'minBase', 'maxBase', 'maxRow', 'maxCol',
+                 'helices', 'strands', 'xovers', 'insertions', 'oligos',
+                 'sequences', 'helixOrder', 'helixIdState')
+
+    def __init__(self):
+        self.latticeType = 0
+        self.minBase = self.maxBase = 0
+        self.maxRow = self.maxCol = 0
+        self.helices = HelixRecords()
+        self.strands = StrandRecords()
+        self.xovers = XoverRecords()
+        self.insertions = InsertionRecords()
+        self.oligos = OligoRecords()
+        self.sequences = {}
+        self.helixOrder = None
+        self.helixIdState = ((), (), (), -1, -2)
+    # end def
+
+    def isDrawn5to3(self, i):
+        """Same as Strand.isDrawn5to3 for strand i."""
+        helices = self.helices
+        h = self.strands.helix[i]
+        isEven = (helices.rows[h] % 2) == (helices.cols[h] % 2)
+        return isEven == (self.strands.strandType[i] == 0)
+    # end def
+
+    def idx5Prime(self, i):
+        strands = self.strands
+        return strands.low[i] if self.isDrawn5to3(i) else strands.high[i]
+    # end def
+
+    def idx3Prime(self, i):
+        strands = self.strands
+        return strands.high[i] if self.isDrawn5to3(i) else strands.low[i]
+    # end def
+
+    def totalLength(self, i):
+        """Same as Strand.totalLength for strand i."""
+        strands, insertions = self.strands, self.insertions
+        h = strands.helix[i]
+        lo = bisect_left(insertions.helix, h)
+        hi = bisect_right(insertions.helix, h, lo)
+        lo = bisect_left(insertions.idx, strands.low[i], lo, hi)
+        hi = bisect_right(insertions.idx, strands.high[i], lo, hi)
+        return strands.high[i] - strands.low[i] + 1 + \
+               sum(insertions.length[lo:hi])
+    # end def
+
+    def oligoStrands(self, k):
+        """Returns the strands of oligo k from 5' to 3'."""
+        strand3p = self.strands.strand3p
+        first = i = self.oligos.strand5p[k]
+        result = []
+        while i >= 0:
+            result.append(i)
+            i = strand3p[i]
+            if i == first:
+                break
+        return result
+    # end def
+
+    def oligoSequence(self, k, forExport=False):
+        """
+        Returns the sequence of oligo k, with ' ' for unassigned bases, or
+        '?' if forExport as in Oligo.sequenceExport.
+        """
+        blank = '?' if forExport else ' '
+        result = []
+        for i in self.oligoStrands(k):
+            sequence = self.sequences.get(i)
+            if sequence:
+                result.append(sequence.replace(' ', blank) if forExport
+                              else sequence)
+            else:
+                result.append(blank * self.totalLength(i))
+        return ''.join(result)
+    # end def
+
+    def stapleSequences(self):
+        """Same text as Part.getStapleSequences, in oligo order."""
+        numbers = self.helices.numbers
+        helix = self.strands.helix
+        lines = ["Start,End,Sequence,Length,Color\n"]
+        for k in range(len(self.oligos)):
+            strands = self.oligoStrands(k)
+            if self.strands.strandType[strands[0]] != 1:
+                continue
+            if self.oligos.isLoop[k]:
+                raise ValueError("staple oligo %d is a loop" % k)
+            first, last = strands[0], strands[-1]
+            seq = self.oligoSequence(k, forExport=True)
+            lines.append("%d[%d],%d[%d],%s,%s,%s\n" % \
+                         (numbers[helix[first]], self.idx5Prime(first),
+                          numbers[helix[last]], self.idx3Prime(last),
+                          seq, len(seq), self.oligos.colors[k]))
+        return ''.join(lines)
+    # end def
+# end class
+
+
+def _ints(data):
+    result = array('i')
+    result.frombytes(data)
+    return result
+# end def
+
+
+def to_plain(part):
+    """Returns a PlainPart of the design of part."""
+    from cadnano2.model.snapshot import PartSnapshot
+    snapshot = PartSnapshot(part)
+    plain = PlainPart()
+    plain.latticeType = snapshot.latticeType
+    plain.minBase, plain.maxBase = snapshot.minBase, snapshot.maxBase
+    plain.maxRow, plain.maxCol = snapshot.maxRow, snapshot.maxCol
+    plain.helixOrder = snapshot.helixOrder
+    plain.helixIdState = snapshot.helixIdState
+
+    helices = plain.helices
+    helixOfCoord = {}
+    for h, (number, row, col) in enumerate(snapshot.helices):
+        helices.numbers.append(number)
+        helices.rows.append(row)
+        helices.cols.append(col)
+        helixOfCoord[(row, col)] = h
+
+    strands = plain.strands
+    counts = _ints(snapshot.strandCounts)
+    for j, count in enumerate(counts):
+        strands.helix.extend([j // 2] * count)
+        strands.strandType.extend([j % 2] * count)
+    idxs = _ints(snapshot.strandIdxs)
+    strands.low = idxs[0::2]
+    strands.high = idxs[1::2]
+    links = _ints(snapshot.strandLinks)
+    strands.strand5p = links[0::3]
+    strands.strand3p = links[1::3]
+    strands.oligo = links[2::3]
+
+    xovers = plain.xovers
+    for i, i3p in enumerate(strands.strand3p):
+        if i3p >= 0:
+            xovers.strand5p.append(i)
+            xovers.idx5p.append(plain.idx3Prime(i))
+            xovers.strand3p.append(i3p)
+            xovers.idx3p.append(plain.idx5Prime(i3p))
+
+    insertions = plain.insertions
+    for h, items in sorted((helixOfCoord[coord], items)
+                           for coord, items in snapshot.insertions
+                           if coord in helixOfCoord):
+        for idx, length in items:
+            insertions.helix.append(h)
+            insertions.idx.append(idx)
+            insertions.length.append(length)
+
+    oligos = plain.oligos
+    for strand5p, isLoop, length, color in snapshot.oligos:
+        oligos.strand5p.append(strand5p)
+        oligos.isLoop.append(1 if isLoop else 0)
+        oligos.length.append(length)
+        oligos.colors.append(color)
+    plain.sequences = dict(snapshot.sequences)
+    return plain
+# end def
+
+
+def from_plain(plain, document, part=None):
+    """
+    Returns a Part with the design of plain: part if given, which gets
+    the design as in Part.restoreSnapshot, or else a new Part added to
+    document.
+    """
+    from cadnano2.model.snapshot import PartSnapshot
+    snapshot = PartSnapshot(None)
+    snapshot.latticeType = plain.latticeType
+    snapshot.minBase, snapshot.maxBase = plain.minBase, plain.maxBase
+    snapshot.maxRow, snapshot.maxCol = plain.maxRow, plain.maxCol
+    helices = plain.helices
+    snapshot.helices = tuple(zip(helices.numbers, helices.rows, helices.cols))
+
+    strands = plain.strands
+    counts = array('i', [0]) * (2 * len(helices))
+    for h, strandType in zip(strands.helix, strands.strandType):
+        counts[2*h + strandType] += 1
+    idxs = array('i', [0]) * (2 * len(strands))
+    idxs[0::2] = strands.low
+    idxs[1::2] = strands.high
+    links = array('i', [0]) * (3 * len(strands))
+    links[0::3] = strands.strand5p
+    links[1::3] = strands.strand3p
+    links[2::3] = strands.oligo
+    snapshot.strandCounts = counts.tobytes()
+    snapshot.strandIdxs = idxs.tobytes()
+    snapshot.strandLinks = links.tobytes()
+
+    oligos = plain.oligos
+    snapshot.oligos = tuple((strand5p, bool(isLoop), length, color)
+                            for strand5p, isLoop, length, color in
+                            zip(oligos.strand5p, oligos.isLoop,
+                                oligos.length, oligos.colors))
+    insertions = plain.insertions
+    byCoord = {}
+    for h, idx, length in zip(insertions.helix, insertions.idx,
+                              insertions.length):
+        coord = (helices.rows[h], helices.cols[h])
+        byCoord.setdefault(coord, []).append((idx, length))
+    snapshot.insertions = tuple(sorted((coord, tuple(items))
+                                       for coord, items in byCoord.items()))
+    snapshot.sequences = tuple(sorted(plain.sequences.items()))
+    snapshot.helixOrder = plain.helixOrder
+    snapshot.helixIdState = plain.helixIdState
+
+    if part is not None:
+        part.restoreSnapshot(snapshot)
+        return part
+    from cadnano2.model.enum import LatticeType
+    from cadnano2.model.parts.honeycombpart import HoneycombPart
+    from cadnano2.model.parts.squarepart import SquarePart
+    if plain.latticeType == LatticeType.Square:
+        partClass = SquarePart
+    else:
+        partClass = HoneycombPart
+    part = partClass(document=document,
+                     maxRow=plain.maxRow, maxCol=plain.maxCol)
+    part._minBase, part._maxBase = plain.minBase, plain.maxBase
+    document._addPart(part, useUndoStack=False)
+    snapshot.restore(part)
+    return part
+# end def
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+snapshot.py
+
+A PartSnapshot holds the whole design of a Part (helices, strand bounds,
+crossovers, oligos, insertions, colors and sequences) as plain data:
+ints, strings, tuples and bytes, with no reference to a model object.
+It can be put back into the Part it was taken from or into another one,
+and it pickles as is. See Part.snapshot, Part.restoreSnapshot and
+Part.deepCopy.
+"""
+
+from array import array
+
+from cadnano2.model.decorators.insertion import Insertion
+from cadnano2.model.oligo import Oligo
+from cadnano2.model.strand import Strand
+from cadnano2.model.virtualhelix import VirtualHelix
+
+
+def _unpackInts(data):
+    result = array('i')
+    result.frombytes(data)
+    return result
+# end def
+
+
+class PartSnapshot(object):
+    """
+    The strands are numbered in order of helix number, then scaffold
+    before staple StrandSet, then low to high index; the oligos are
+    numbered in order of their first strand. Connections refer to those
+    numbers, so two snapshots of the same design are equal.
+
+    latticeType, maxRow, maxCol, minBase, maxBase:  Part dimensions
+    helices:        ((number, row, col), ...) in number order
+    strandCounts:   int array bytes, scaffold and staple count per helix
+    strandIdxs:     int array bytes, (low, high) per strand
+    strandLinks:    int array bytes, (5' strand, 3' strand, oligo) per
+                    strand, -1 for no connection
+    oligos:         ((strand5p, isLoop, length, color), ...)
+    insertions:     (((row, col), ((idx, length), ...)), ...)
+    sequences:      ((strand, sequence), ...) for strands with a sequence
+    helixOrder:     the imported helix order as a tuple of coords, or None
+    helixIdState:   the helix number bookkeeping of the Part
+
+    PartSnapshot(None) is empty, for filling in from other plain data
+    (see model/plain.py).
+    """
+    def __init__(self, part):
+        if part is None:
+            return
+        self.latticeType = part.crossSectionType()
+        self.maxRow, self.maxCol = part._maxRow, part._maxCol
+        self.minBase, self.maxBase = part._minBase, part._maxBase
+
+        vhs = sorted(part.getVirtualHelices(), key=lambda vh: vh.number())
+        self.helices = tuple((vh.number(),) + vh.coord() for vh in vhs)
+        counts = array('i')
+        idxs = array('i')
+        strands = []
+        for vh in vhs:
+            for strandSet in vh.getStrandSets():
+                strandList = strandSet._strandList
+                counts.append(len(strandList))
+                for strand in strandList:
+                    idxs.append(strand._baseIdxLow)
+                    idxs.append(strand._baseIdxHigh)
+                strands.extend(strandList)
+        # end for
+        strandNum = dict((strand, i) for i, strand in enumerate(strands))
+        oligoNum = {}
+        oligos = []
+        links = array('i')
+        sequences = []
+        for i, strand in enumerate(strands):
+            olg = strand._oligo
+            if olg not in oligoNum:
+                oligoNum[olg] = len(oligos)
+                oligos.append((olg, strand))
+            links.append(strandNum.get(strand._strand5p, -1))
+            links.append(strandNum.get(strand._strand3p, -1))
+            links.append(oligoNum[olg])
+            sequence = strand.sequence()
+            if sequence:
+                sequences.append((i, sequence))
+        # end for
+        self.strandCounts = counts.tobytes()
+        self.strandIdxs = idxs.tobytes()
+        self.strandLinks = links.tobytes()
+        self.oligos = tuple((strandNum.get(olg._strand5p, strandNum[strand]),
+                             olg._isLoop, olg._length, olg._color)
+                            for olg, strand in oligos)
+        self.sequences = tuple(sequences)
+
+        self.insertions = tuple(sorted(
+                (coord, tuple(sorted((idx, insertion.length())
+                                     for idx, insertion in vhDict.items())))
+                for coord, vhDict in part._insertions.items() if vhDict))
+        order = part._importedVHelixOrder
+        self.helixOrder = tuple(map(tuple, order)) if order else None
+        self.helixIdState = (tuple(part.oddRecycleBin),
+                             tuple(part.evenRecycleBin),
+                             tuple(sorted(part.reserveBin)),
+                             part._highestUsedOdd, part._highestUsedEven)
+    # end def
+
+    def __eq__(self, other):
+        return isinstance(other, PartSnapshot) and \
+               self.__dict__ == other.__dict__
+    # end def
+
+    def __ne__(self, other):
+        return not self == other
+    # end def
+
+    def numberOfStrands(self):
+        return len(self.strandIdxs) // (2 * array('i').itemsize)
+    # end def
+
+    def restore(self, part):
+        """
+        Replaces the design of part with the captured one, part must have
+        the captured lattice type. Helices whose number and coord don't
+        match are removed or created, and every strand and oligo is
+        replaced by a new object; the views are told through the usual
+        signals. Nothing is pushed on the undo stack.
+        """
+        if part.crossSectionType() != self.latticeType:
+            raise TypeError("snapshot of a different lattice type")
+        doc = part.document()
+        with doc.batchUpdates():
+            self._removeStrands(part)
+            if (part._minBase, part._maxBase) != (self.minBase, self.maxBase):
+                part.resizeVirtualHelices(self.minBase - part._minBase,
+                                          self.maxBase - part._maxBase,
+                                          useUndoStack=False)
+            if (part._maxRow, part._maxCol) != (self.maxRow, self.maxCol):
+                part._maxRow, part._maxCol = self.maxRow, self.maxCol
+                part.partDimensionsChangedSignal.emit(part)
+            vhs = self._restoreHelices(part)
+            self._restoreInsertions(part)
+            self._restoreStrands(part, vhs)
+        # end with
+    # end def
+
+    def _removeStrands(self, part):
+        doc = part.document()
+        for vh in part.getVirtualHelices():
+            for strandSet in vh.getStrandSets():
+                for strand in strandSet._strandList:
+                    doc.removeStrandFromSelection(strand)
+                    strand.strandRemovedSignal.emit(strand)
+                    strand.setParent(None)
+                strandSet._setStrandList([])
+        # end for
+        for olg in list(part.oligos()):
+            olg.removeFromPart()
+    # end def
+
+    def _restoreHelices(self, part):
+        """Returns the VirtualHelix of each entry of self.helices."""
+        wanted = set(self.helices)
+        for vh in part.getVirtualHelices():
+            if (vh.number(),) + vh.coord() not in wanted:
+                if part._activeVirtualHelix is vh:
+                    part._activeVirtualHelix = None
+                    part._activeVirtualHelixIdx = None
+                VirtualHelix.RemoveVirtualHelixCommand(part, vh).redo()
+                vh.setNumber(None)  # must come before setPart(None)
+                vh.setPart(None)
+        # end for
+        vhs = []
+        for number, row, col in self.helices:
+            vh = part.virtualHelixAtCoord((row, col))
+            if vh is None:
+                vh = VirtualHelix(part, row, col, number)
+                part._addVirtualHelix(vh)
+                part.partVirtualHelixAddedSignal.emit(part, vh)
+            vhs.append(vh)
+        # end for
+        part.partActiveSliceResizeSignal.emit(part)
+
+        oddBin, evenBin, reserveBin, highestOdd, highestEven = \
+                                                        self.helixIdState
+        part.oddRecycleBin = list(oddBin)
+        part.evenRecycleBin = list(evenBin)
+        part.reserveBin = set(reserveBin)
+        part._highestUsedOdd = highestOdd
+        part._highestUsedEven = highestEven
+        if self.helixOrder is not None:
+            part.setImportedVHelixOrder(list(self.helixOrder))
+        return vhs
+    # end def
+
+    def _restoreInsertions(self, part):
+        insertions = part._insertions
+        indices = part._insertionIndices
+        insertions.clear()
+        indices.clear()
+        for coord, items in self.insertions:
+            vhDict = insertions[coord]
+            index = indices[coord]
+            for idx, length in items:
+                vhDict[idx] = Insertion(idx, length)
+                index.add(idx, length)
+        # end for
+        if part.lazySequences():
+            part._sequenceBuffers = {}
+    # end def
+
+    def _restoreStrands(self, part, vhs):
+        doc = part.document()
+        counts = _unpackInts(self.strandCounts)
+        idxs = _unpackInts(self.strandIdxs)
+        links = _unpackInts(self.strandLinks)
+
+        strandSets = []
+        strandLists = []
+        strands = []
+        i = 0
+        for vh in vhs:
+            for strandSet in vh.getStrandSets():
+                count = counts[len(strandSets)]
+                strandList = [Strand(strandSet, idxs[2*j], idxs[2*j + 1])
+                              for j in range(i, i + count)]
+                i += count
+                strandSets.append(strandSet)
+                strandLists.append(strandList)
+                strands.extend(strandList)
+        # end for
+
+        oligos = []
+        for strand5p, isLoop, length, color in self.oligos:
+            olg = Oligo(part, color)
+            olg._strand5p = strands[strand5p]
+            olg._isLoop = isLoop
+            olg._length = length
+            part.addOligo(olg)
+            oligos.append(olg)
+        # end for
+        for j, strand in enumerate(strands):
+            i5p, i3p, iOlg = links[3*j:3*j + 3]
+            strand._strand5p = strands[i5p] if i5p >= 0 else None
+            strand._strand3p = strands[i3p] if i3p >= 0 else None
+            strand._oligo = oligos[iOlg]
+        # end for
+        for j, sequence in self.sequences:
+            strands[j].setSequence(sequence)
+
+        for strandSet, strandList in zip(strandSets, strandLists):
+            strandSet._setStrandList(strandList)
+            for strand in strandList:
+                strandSet.strandsetStrandAddedSignal.emit(strandSet, strand)
+        # end for
+        for vh in vhs:
+            doc.emitSignal(part.partStrandChangedSignal, part, vh)
+    # end def
+# end class
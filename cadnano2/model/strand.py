@@ -51,6 +51,7 @@ class Strand(QObject):
         self._strand5p = None  # 5' connection to another strand
         self._strand3p = None  # 3' connection to another strand
         self._sequence = None
+        self._totalLength = None  # cached by totalLength()
 
         self._decorators = {}
         self._modifiers = {}
@@ -186,6 +187,10 @@ class Strand(QObject):
 
     def sequence(self, forExport=False):
         seq = self._sequence
+        span = self._sequenceSpan()
+        if span is not None:
+            buf, start, end = span
+            seq = self._decodeSpan(buf[start:end])
         if seq:
             return util.markwhite(seq) if forExport else seq
         elif forExport:
@@ -209,22 +214,74 @@ class Strand(QObject):
         Applies sequence string from 5' to 3'
         return the tuple (used, unused) portion of the sequenceString
         """
+        span = self._sequenceSpan()
         if sequenceString == None:
             self._sequence = None
+            if span is not None:
+                buf, start, end = span
+                buf[start:end] = b' ' * (end - start)
             return None, None
         length = self.totalLength()
         if len(sequenceString) < length:
             bonus = length - len(sequenceString)
             sequenceString += ''.join([' ' for x in range(bonus)])
         temp = sequenceString[0:length]
-        self._sequence = temp
+        if span is None:
+            self._sequence = temp
+        else:
+            buf, start, end = span
+            buf[start:end] = self._encodeSpan(temp)
         return temp, sequenceString[length:]
     # end def
 
-    def reapplySequence(self):
+    def _sequenceSpan(self, lowIdx=None, highIdx=None):
+        """
+        In lazy sequence mode (Part.lazySequences) return (buffer, start,
+        end), where buffer[start:end] holds bases lowIdx to highIdx of this
+        strand (all of it by default) left to right. Otherwise None.
+        """
+        part = self.part()
+        if not part.lazySequences():
+            return None
+        if lowIdx is None:
+            lowIdx, highIdx = self._baseIdxLow, self._baseIdxHigh
+        coord = self.virtualHelix().coord()
+        index = part.insertionIndex(coord)
+        return (part.sequenceBuffer(coord, self.strandType()),
+                index.position(lowIdx), index.position(highIdx + 1))
+    # end def
+
+    def _decodeSpan(self, bases):
+        """
+        Returns the 5' to 3' sequence of the left to right bytes bases, or
+        None if they are all unassigned.
+        """
+        if not bases.strip():
+            return None
+        if not self._isDrawn5to3:
+            bases.reverse()
+        return bases.decode('ascii')
+    # end def
+
+    def _encodeSpan(self, sequence):
+        """Returns the 5' to 3' string sequence as left to right bytes."""
+        bases = sequence.encode('ascii', 'replace')
+        return bases if self._isDrawn5to3 else bases[::-1]
+    # end def
+
+    def reapplySequence(self, idxs=None):
         """
+        Rebuilds the sequence from the complementary strands.
+
+        In lazy sequence mode only the bases in the (lowIdx, highIdx) ranges
+        of idxs are rebuilt if it is given, e.g. the bases a resize added;
+        the rest of the buffer is already up to date. Otherwise the whole
+        strand is.
         """
         compSS = self.strandSet().complementStrandSet()
+        if self.part().lazySequences():
+            self._reapplySequenceSpans(compSS, idxs or [self.idxs()])
+            return
 
         # the strand sequence will need to be regenerated from scratch
         # as there are no guarantees about the entirety of the strand moving
@@ -240,6 +297,29 @@ class Strand(QObject):
         # end for
     # end def
 
+    def _reapplySequenceSpans(self, compSS, idxs):
+        """
+        Lazy sequence mode reapplySequence: each range is cleared, then the
+        complement of the other strand type's buffer is copied in wherever a
+        complementary strand covers it.
+        """
+        buf = None
+        for lowIdx, highIdx in idxs:
+            lowIdx = max(lowIdx, self._baseIdxLow)
+            highIdx = min(highIdx, self._baseIdxHigh)
+            if lowIdx > highIdx:
+                continue
+            buf, start, end = self._sequenceSpan(lowIdx, highIdx)
+            buf[start:end] = b' ' * (end - start)
+            for compStrand in compSS.getOverlappingStrands(lowIdx, highIdx):
+                cLowIdx, cHighIdx = compStrand.idxs()
+                oLowIdx, oHighIdx = util.overlap(lowIdx, highIdx,
+                                                 cLowIdx, cHighIdx)
+                compBuf, a, b = compStrand._sequenceSpan(oLowIdx, oHighIdx)
+                buf[a:b] = compBuf[a:b].translate(util.complementBytes)
+        # end for
+    # end def
+
     def getComplementStrands(self):
         """
         return the list of complement strands that overlap with this strand
@@ -301,6 +381,20 @@ class Strand(QObject):
         # only get the characters we're using, while we're at it, make it the
         # reverse compliment
 
+        span = self._sequenceSpan(lowIdx, highIdx)
+        if span is not None:
+            # lazy sequence mode: write the overlap straight into the buffer
+            buf, a, b = span
+            if sequenceString is None:
+                buf[a:b] = b' ' * (b - a)
+            else:
+                useSeq = sequenceString[::-1] if self._isDrawn5to3 \
+                                                else sequenceString
+                offset = strand.insertionIndex().position(cLowIdx)
+                buf[a:b] = useSeq[a - offset:b - offset].encode('ascii',
+                                                                'replace')
+            return self.sequence() or None
+
         totalLength = self.totalLength()
 
         # see if we are applying
@@ -340,6 +434,46 @@ class Strand(QObject):
         return self._sequence
     # end def
 
+    def setComplementTrack(self, track, ranges):
+        """
+        Bulk version of setComplementSequence used when a whole oligo's
+        sequence is applied at once.
+
+        track is a bytearray of the complement bases of the entire
+        virtualhelix, left to right, where base idx starts at
+        insertionIndex().position(idx). The bases of each (lowIdx, highIdx)
+        overlap in ranges are copied from it in a single pass over this
+        strand's sequence; the rest of the sequence is left as it was.
+
+        return the new sequence
+        """
+        index = self.insertionIndex()
+        span = self._sequenceSpan()
+        if span is not None:
+            # lazy sequence mode: the track lines up with the buffer
+            buf = span[0]
+            for lowIdx, highIdx in ranges:
+                a = index.position(lowIdx)
+                b = index.position(highIdx + 1)
+                buf[a:b] = track[a:b]
+            return self.sequence() or None
+        start = index.position(self._baseIdxLow)
+        if self._sequence is None:
+            seq = bytearray(b' ') * self.totalLength()
+        elif self._isDrawn5to3:
+            seq = bytearray(sixb(self._sequence))
+        else:
+            seq = bytearray(sixb(self._sequence[::-1]))
+        for lowIdx, highIdx in ranges:
+            a = index.position(lowIdx)
+            b = index.position(highIdx + 1)
+            seq[a - start:b - start] = track[a:b]
+        if not self._isDrawn5to3:
+            seq.reverse()
+        self._sequence = seq.decode('utf-8') if seq.strip() else None
+        return self._sequence
+    # end def
+
     ### PUBLIC METHODS FOR QUERYING THE MODEL ###
     def connection3p(self):
         return self._strand3p
@@ -385,7 +519,12 @@ class Strand(QObject):
         """
         seqList = []
         isDrawn5to3 = self._isDrawn5to3
-        seq = self._sequence if isDrawn5to3 else self._sequence[::-1]
+        span = self._sequenceSpan()
+        if span is not None:
+            buf, start, end = span
+            seq = buf[start:end].decode('ascii')
+        else:
+            seq = self._sequence if isDrawn5to3 else self._sequence[::-1]
         # assumes a sequence has been applied correctly and is up to date
         tL = self.totalLength()
 
@@ -520,46 +659,44 @@ class Strand(QObject):
         """
         includes the length of insertions in addition to the bases
         """
-        tL = 0
-        insertions = self.insertionsOnStrand(idxL, idxH)
-        for insertion in insertions:
-            tL += insertion.length()
-        return tL
+        return self.insertionIndex().lengthBetween(idxL, idxH)
+    # end def
+
+    def insertionIndex(self):
+        """Returns the InsertionIndex of this strand's virtualhelix."""
+        return self.part().insertionIndex(self.virtualHelix().coord())
     # end def
 
     def insertionsOnStrand(self, idxL=None, idxH=None):
         """
         if passed indices it will use those as a bounds
         """
-        insertions = []
         coord = self.virtualHelix().coord()
         insertionsDict = self.part().insertions()[coord]
-        sortedIndices = sorted(insertionsDict.keys())
         if idxL == None:
             idxL, idxH = self.idxs()
-        for index in sortedIndices:
-            insertion = insertionsDict[index]
-            if idxL <= insertion.idx() <= idxH:
-                insertions.append(insertion)
-            # end if
-        # end for
-        return insertions
+        return [insertionsDict[idx] for idx in \
+                        self.part().insertionIndex(coord).idxsBetween(idxL, idxH)]
     # end def
 
     def length(self):
         return self._baseIdxHigh - self._baseIdxLow + 1
     # end def
 
-    def totalLength(self):
+    def totalLength(self, cached=True):
         """
         includes the length of insertions in addition to the bases
-        """
-        tL = 0
-        insertions = self.insertionsOnStrand()
 
-        for insertion in insertions:
-            tL += insertion.length()
-        return tL + self.length()
+        The result is cached until the strand is resized or an insertion
+        on it changes; cached=False recomputes it (for verifying).
+        """
+        tL = self._totalLength
+        if tL is None or not cached:
+            tL = self.length() + \
+                        self.insertionIndex().lengthBetween(*self.idxs())
+            if cached:
+                self._totalLength = tL
+        return tL
     # end def
 
     ### PUBLIC METHODS FOR EDITING THE MODEL ###
@@ -666,21 +803,25 @@ class Strand(QObject):
 
     def setConnection3p(self, strand):
         self._strand3p = strand
+        self._strandSet._updateStrandConnections(self)
     # end def
 
     def setConnection5p(self, strand):
         self._strand5p = strand
+        self._strandSet._updateStrandConnections(self)
     # end def
 
     def setIdxs(self, idxs):
+        self._strandSet._updateStrandIdxs(self, idxs)
         self._baseIdxLow = idxs[0]
         self._baseIdxHigh = idxs[1]
+        self._totalLength = None
     # end def
 
     def setOligo(self, newOligo, emitSignal=True):
         self._oligo = newOligo
         if emitSignal:
-            self.strandHasNewOligoSignal.emit(self)
+            self._doc.emitSignal(self.strandHasNewOligoSignal, self)
     # end def
 
     def setStrandSet(self, strandSet):
@@ -774,15 +915,11 @@ class Strand(QObject):
 
     def hasInsertion(self):
         """
-        Iterate through dict of insertions for this strand's virtualhelix
-        and return True of any of the indices overlap with the strand.
+        Return True if any insertion of this strand's virtualhelix falls
+        within the strand's indices.
         """
-        coord = self.virtualHelix().coord()
-        insts = self.part().insertions()[coord]
-        for i in range(self._baseIdxLow, self._baseIdxHigh+1):
-            if i in insts:
-                return True
-        return False
+        return self.insertionIndex().hasAnyBetween(self._baseIdxLow,
+                                                   self._baseIdxHigh)
     # end def
 
     def hasInsertionAt(self, idx):
@@ -861,11 +998,12 @@ class Strand(QObject):
             std.oligo().incrementLength(self.delta)
             std.setIdxs(nI)
             if strandSet.isStaple():
-                
-                std.reapplySequence()
+                oI = self.oldIndices
+                std.reapplySequence([(nI[0], oI[0] - 1), (oI[1] + 1, nI[1])])
             std.strandResizedSignal.emit(std, nI)
             # for updating the Slice View displayed helices
-            part.partStrandChangedSignal.emit(part, strandSet.virtualHelix())
+            part.document().emitSignal(part.partStrandChangedSignal,
+                                       part, strandSet.virtualHelix())
             std5p = std.connection5p()
             if std5p:
                 std5p.strandResizedSignal.emit(std5p, std5p.idxs())
@@ -880,10 +1018,12 @@ class Strand(QObject):
             std.oligo().decrementLength(self.delta)
             std.setIdxs(oI)
             if strandSet.isStaple():
-                std.reapplySequence()
+                nI = self.newIdxs
+                std.reapplySequence([(oI[0], nI[0] - 1), (nI[1] + 1, oI[1])])
             std.strandResizedSignal.emit(std, oI)
             # for updating the Slice View displayed helices
-            part.partStrandChangedSignal.emit(part, strandSet.virtualHelix())
+            part.document().emitSignal(part.partStrandChangedSignal,
+                                       part, strandSet.virtualHelix())
             std5p = std.connection5p()
             if std5p:
                 std5p.strandResizedSignal.emit(std5p, std5p.idxs())
@@ -896,6 +1036,8 @@ class Strand(QObject):
             self._strand = strand
             coord = strand.virtualHelix().coord()
             self._insertions = strand.part().insertions()[coord]
+            self._index = strand.part().insertionIndex(coord)
+            self._coord = coord
             self._idx = idx
             self._length = length
             self._insertion = Insertion(idx, length)
@@ -908,6 +1050,12 @@ class Strand(QObject):
             cStrand = self._compStrand
             inst = self._insertion
             self._insertions[self._idx] = inst
+            self._strand.part()._spliceSequenceBuffers(self._coord, self._idx,
+                                                       0, inst.length())
+            self._index.add(self._idx, inst.length())
+            strand._totalLength = None
+            if cStrand:
+                cStrand._totalLength = None
             strand.oligo().incrementLength(inst.length())
             strand.strandInsertionAddedSignal.emit(strand, inst)
             if cStrand:
@@ -924,6 +1072,12 @@ class Strand(QObject):
                 cStrand.oligo().decrementLength(inst.length())
             idx = self._idx
             del self._insertions[idx]
+            self._strand.part()._spliceSequenceBuffers(self._coord, idx,
+                                                       inst.length(), 0)
+            self._index.remove(idx)
+            strand._totalLength = None
+            if cStrand:
+                cStrand._totalLength = None
             strand.strandInsertionRemovedSignal.emit(strand, idx)
             if cStrand:
                 cStrand.strandInsertionRemovedSignal.emit(cStrand, idx)
@@ -937,6 +1091,8 @@ class Strand(QObject):
             self._idx = idx
             coord = strand.virtualHelix().coord()
             self._insertions = strand.part().insertions()[coord]
+            self._index = strand.part().insertionIndex(coord)
+            self._coord = coord
             self._insertion = self._insertions[idx]
             self._compStrand = \
                         strand.strandSet().complementStrandSet().getStrand(idx)
@@ -951,6 +1107,12 @@ class Strand(QObject):
                 cStrand.oligo().decrementLength(inst.length())
             idx = self._idx
             del self._insertions[idx]
+            self._strand.part()._spliceSequenceBuffers(self._coord, idx,
+                                                       inst.length(), 0)
+            self._index.remove(idx)
+            strand._totalLength = None
+            if cStrand:
+                cStrand._totalLength = None
             strand.strandInsertionRemovedSignal.emit(strand, idx)
             if cStrand:
                 cStrand.strandInsertionRemovedSignal.emit(cStrand, idx)
@@ -963,6 +1125,12 @@ class Strand(QObject):
             inst = self._insertion
             strand.oligo().incrementLength(inst.length())
             self._insertions[self._idx] = inst
+            self._strand.part()._spliceSequenceBuffers(self._coord, self._idx,
+                                                       0, inst.length())
+            self._index.add(self._idx, inst.length())
+            strand._totalLength = None
+            if cStrand:
+                cStrand._totalLength = None
             strand.strandInsertionAddedSignal.emit(strand, inst)
             if cStrand:
                 cStrand.oligo().incrementLength(inst.length())
@@ -981,6 +1149,8 @@ class Strand(QObject):
             self._strand = strand
             coord = strand.virtualHelix().coord()
             self._insertions = strand.part().insertions()[coord]
+            self._index = strand.part().insertionIndex(coord)
+            self._coord = coord
             self._idx = idx
             self._newLength = newLength
             self._oldLength = self._insertions[idx].length()
@@ -993,6 +1163,12 @@ class Strand(QObject):
             cStrand = self._compStrand
             inst = self._insertions[self._idx]
             inst.setLength(self._newLength)
+            self._strand.part()._spliceSequenceBuffers(self._coord, self._idx,
+                                        self._oldLength, self._newLength)
+            self._index.setLength(self._idx, self._newLength)
+            strand._totalLength = None
+            if cStrand:
+                cStrand._totalLength = None
             strand.oligo().incrementLength(self._newLength - self._oldLength)
             strand.strandInsertionChangedSignal.emit(strand, inst)
             if cStrand:
@@ -1006,6 +1182,12 @@ class Strand(QObject):
             cStrand = self._compStrand
             inst = self._insertions[self._idx]
             inst.setLength(self._oldLength)
+            self._strand.part()._spliceSequenceBuffers(self._coord, self._idx,
+                                        self._newLength, self._oldLength)
+            self._index.setLength(self._idx, self._oldLength)
+            strand._totalLength = None
+            if cStrand:
+                cStrand._totalLength = None
             strand.oligo().decrementLength(self._newLength - self._oldLength)
             strand.strandInsertionChangedSignal.emit(strand, inst)
             if cStrand:
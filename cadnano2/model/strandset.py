@@ -1,4 +1,6 @@
 import random
+from array import array
+from bisect import bisect_left, bisect_right
 from operator import itemgetter
 from itertools import repeat
 
@@ -7,6 +9,11 @@ from .oligo import Oligo
 from .enum import StrandType
 from cadnano2.views import styles
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 import cadnano2.util as util
 # import cadnano2.util as util
 # import Qt stuff into the module namespace with PySide, PyQt4 independence
@@ -29,8 +36,13 @@ class StrandSet(QObject):
         self._virtualHelix = virtualHelix
         self._doc = virtualHelix.document()
         self._strandList = []
+        # parallel sorted arrays of strand bounds, kept in sync with
+        # _strandList so that point and range queries can use bisect
+        self._lowIdxList = []
+        self._highIdxList = []
+        # per-base arrays shared with the virtualHelix (None without NumPy)
+        self._occupancy = virtualHelix.occupancy()
         self._undoStack = None
-        self._lastStrandSetIndex = None
         self._strandType = strandType
     # end def
 
@@ -114,30 +126,12 @@ class StrandSet(QObject):
         Returns the (tight) bounds of the contiguous stretch of unpopulated
         bases that includes the baseIdx.
         """
-        lowIdx, highIdx = 0, self.partMaxBaseIdx()  # init the return values
-        lenStrands = len(self._strandList)
-
-        # not sure how to set this up this to help in caching
-        # lastIdx = self._lastStrandSetIndex
-
-        if lenStrands == 0:  # empty strandset, just return the part bounds
-            return (lowIdx, highIdx)
-
-        low = 0              # index of the first (left-most) strand
-        high = lenStrands    # index of the last (right-most) strand
-        while low < high:    # perform binary search to find empty region
-            mid = (low + high) // 2
-            midStrand = self._strandList[mid]
-            mLow, mHigh = midStrand.idxs()
-            if baseIdx < mLow:  # baseIdx is to the left of crntStrand
-                high = mid   # continue binary search to the left
-                highIdx = mLow - 1  # set highIdx to left of crntStrand
-            elif baseIdx > mHigh:   # baseIdx is to the right of crntStrand
-                low = mid + 1    # continue binary search to the right
-                lowIdx = mHigh + 1  # set lowIdx to the right of crntStrand
-            else:
-                return (None, None)  # baseIdx was not empty
-        self._lastStrandSetIndex = (low + high) // 2  # set cache
+        lowList, highList = self._lowIdxList, self._highIdxList
+        i = bisect_left(highList, baseIdx)
+        if i < len(lowList) and lowList[i] <= baseIdx:
+            return (None, None)  # baseIdx was not empty
+        lowIdx = highList[i - 1] + 1 if i > 0 else 0
+        highIdx = lowList[i] - 1 if i < len(lowList) else self.partMaxBaseIdx()
         return (lowIdx, highIdx)
     # end def
 
@@ -186,7 +180,7 @@ class StrandSet(QObject):
     def createDeserializedStrand(self, baseIdxLow, baseIdxHigh, useUndoStack=False):
         """
         Passes a strand to AddStrandCommand that was read in from file input.
-        Omits the step of checking _couldStrandInsertAtLastIndex, since
+        Omits the interactive bounds checking of createStrand, since
         we assume that deserialized strands will not cause collisions.
         """
         boundsLow, boundsHigh = self.getBoundsOfEmptyRegionContaining(baseIdxLow)
@@ -332,84 +326,137 @@ class StrandSet(QObject):
 
     def hasStrandAt(self, idxLow, idxHigh):
         """
+        Returns True if any strand overlaps the range [idxLow, idxHigh].
         """
-        dummyStrand = Strand(self, idxLow, idxHigh)
-        strandList = [s for s in self._findOverlappingRanges(dummyStrand)]
-        dummyStrand._strandSet = None
-        dummyStrand.setParent(None)
-        dummyStrand.deleteLater()
-        dummyStrand = None
-        return len(strandList) > 0
+        i = bisect_left(self._highIdxList, idxLow)
+        return i < len(self._lowIdxList) and self._lowIdxList[i] <= idxHigh
     # end def
 
     def getOverlappingStrands(self, idxLow, idxHigh):
-        dummyStrand = Strand(self, idxLow, idxHigh)
-        strandList = [s for s in self._findOverlappingRanges(dummyStrand)]
-        dummyStrand._strandSet = None
-        dummyStrand.setParent(None)
-        dummyStrand.deleteLater()
-        dummyStrand = None
-        return strandList
+        lo, hi = self._overlapSlice(idxLow, idxHigh)
+        return self._strandList[lo:hi]
     # end def
 
     def hasStrandAtAndNoXover(self, idx):
-        dummyStrand = Strand(self, idx, idx)
-        strandList = [s for s in self._findOverlappingRanges(dummyStrand)]
-        dummyStrand._strandSet = None
-        dummyStrand.setParent(None)
-        dummyStrand.deleteLater()
-        dummyStrand = None
-        if len(strandList) > 0:
-            return False if strandList[0].hasXoverAt(idx) else True
-        else:
+        strand = self.getStrand(idx)
+        if strand is None:
             return False
+        return False if strand.hasXoverAt(idx) else True
     # end def
 
     def hasNoStrandAtOrNoXover(self, idx):
-        dummyStrand = Strand(self, idx, idx)
-        strandList = [s for s in self._findOverlappingRanges(dummyStrand)]
-        dummyStrand._strandSet = None
-        dummyStrand.setParent(None)
-        dummyStrand.deleteLater()
-        dummyStrand = None
-        if len(strandList) > 0:
-            return False if strandList[0].hasXoverAt(idx) else True
-        else:
+        strand = self.getStrand(idx)
+        if strand is None:
             return True
+        return False if strand.hasXoverAt(idx) else True
     # end def
 
     def getIndexToInsert(self, idxLow, idxHigh):
         """
+        Returns a tuple (canInsert, idx) where idx is the strandSet index at
+        which a strand spanning [idxLow, idxHigh] would be inserted, or None
+        if such a strand would overlap an existing one.
         """
-        canInsert = True
-        dummyStrand = Strand(self, idxLow, idxHigh)
-        if self._couldStrandInsertAtLastIndex(dummyStrand):
-            return canInsert, self._lastStrandSetIndex
-        isInSet, overlap, idx = self._findIndexOfRangeFor(dummyStrand)
-        dummyStrand._strandSet = None
-        dummyStrand.setParent(None)
-        dummyStrand.deleteLater()
-        dummyStrand = None
-        if overlap:
-            canInsert = False
-        return canInsert, idx
+        i = bisect_left(self._highIdxList, idxLow)
+        if i < len(self._lowIdxList) and self._lowIdxList[i] <= idxHigh:
+            return False, None
+        return True, i
     # end def
 
     def getStrand(self, baseIdx):
         """Returns the strand that overlaps with baseIdx."""
-        dummyStrand = Strand(self, baseIdx, baseIdx)
-        strandList = [s for s in self._findOverlappingRanges(dummyStrand)]
-        dummyStrand._strandSet = None
-        dummyStrand.setParent(None)
-        dummyStrand.deleteLater()
-        dummyStrand = None
-        return strandList[0] if len(strandList) > 0 else None
+        i = bisect_left(self._highIdxList, baseIdx)
+        if i < len(self._lowIdxList) and self._lowIdxList[i] <= baseIdx:
+            return self._strandList[i]
+        return None
     # end def
 
     def getLegacyArray(self):
-        """docstring for getLegacyArray"""
+        """
+        Returns the legacy per-base [5'vh, 5'idx, 3'vh, 3'idx] list of
+        lists. Built from getLegacyFlatArray.
+        """
+        flat = self.getLegacyFlatArray()
+        if np is not None:
+            return flat.reshape(-1, 4).tolist()
+        flat = flat.tolist()
+        return [flat[i:i + 4] for i in range(0, len(flat), 4)]
+    # end def
+
+    def getLegacyFlatArray(self):
+        """
+        Returns the legacy array flattened to 4 ints per base: a NumPy int
+        array if NumPy is available, else an array('i'). Bases covered by
+        strands are filled in bulk and then the strand ends are patched,
+        in the same order getLegacyArray always has.
+        """
+        if np is None:
+            return self._legacyFlatArrayFallback()
         num = self._virtualHelix.number()
-        ret = [[-1, -1, -1, -1] for i in range(self.part().maxBaseIdx() + 1)]
+        n = self.part().maxBaseIdx() + 1
+        ret = np.full((n, 4), -1, dtype=np.int64)
+        if not self._strandList:
+            return ret.reshape(-1)
+        lo = np.array(self._lowIdxList, dtype=np.intp)
+        hi = np.array(self._highIdxList, dtype=np.intp)
+        multi = hi > lo
+        marks = np.zeros(n + 1, dtype=np.intp)
+        np.add.at(marks, lo, 1)
+        np.add.at(marks, hi + 1, -1)
+        covered = np.flatnonzero(np.cumsum(marks[:n]) > 0)
+        # the xover ends, as (index into the strand list, vh number, idx)
+        conn5p, conn3p = [], []
+        for i, strand in enumerate(self._strandList):
+            s5p = strand.connection5p()
+            if s5p != None:
+                conn5p.append((i, s5p.virtualHelix().number(), s5p.idx3Prime()))
+            s3p = strand.connection3p()
+            if s3p != None:
+                conn3p.append((i, s3p.virtualHelix().number(), s3p.idx5Prime()))
+        conn5p = np.array(conn5p, dtype=np.intp).reshape(-1, 3)
+        conn3p = np.array(conn3p, dtype=np.intp).reshape(-1, 3)
+        ret[covered, 0] = num
+        ret[covered, 2] = num
+        if self.isDrawn5to3():
+            ret[covered, 1] = covered - 1
+            ret[covered, 3] = covered + 1
+            # first base: 5' xover if necessary
+            ret[lo, 0:2] = -1
+            ret[lo[conn5p[:, 0]], 0:2] = conn5p[:, 1:3]
+            # last base: 3' xover if necessary (a single base strand keeps
+            # its first base 3' entry and loses its 5' xover)
+            ret[hi, 0] = num
+            ret[hi, 1] = hi - 1
+            ret[hi[multi], 2:4] = -1
+            ret[hi[conn3p[:, 0]], 2:4] = conn3p[:, 1:3]
+        else:
+            ret[covered, 1] = covered + 1
+            ret[covered, 3] = covered - 1
+            # first base: 3' xover if necessary
+            ret[lo[multi], 2:4] = -1
+            ret[lo[conn3p[:, 0]], 2:4] = conn3p[:, 1:3]
+            # last base: 5' xover if necessary (a single base strand keeps
+            # its first base 5' entry and loses its 3' xover)
+            ret[hi, 2] = num
+            ret[hi, 3] = hi - 1
+            ret[hi[multi], 0:2] = -1
+            ret[hi[conn5p[:, 0]], 0:2] = conn5p[:, 1:3]
+        return ret.reshape(-1)
+    # end def
+
+    def _legacyFlatArrayFallback(self):
+        """getLegacyFlatArray without NumPy, using strided array slices."""
+        num = self._virtualHelix.number()
+        n = self.part().maxBaseIdx() + 1
+        ret = array('i', [-1]) * (4 * n)
+
+        def fillRange(col, start, stop, values):
+            if isinstance(values, int):
+                values = array('i', [values]) * (stop - start)
+            else:
+                values = array('i', values)
+            ret[4 * start + col:4 * stop:4] = values
+        # end def
         if self.isDrawn5to3():
             for strand in self._strandList:
                 lo, hi = strand.idxs()
@@ -417,23 +464,23 @@ class StrandSet(QObject):
                 # map the first base (5' xover if necessary)
                 s5p = strand.connection5p()
                 if s5p != None:
-                    ret[lo][0] = s5p.virtualHelix().number()
-                    ret[lo][1] = s5p.idx3Prime()
-                ret[lo][2] = num
-                ret[lo][3] = lo + 1
+                    ret[4 * lo] = s5p.virtualHelix().number()
+                    ret[4 * lo + 1] = s5p.idx3Prime()
+                ret[4 * lo + 2] = num
+                ret[4 * lo + 3] = lo + 1
                 # map the internal bases
-                for idx in range(lo + 1, hi):
-                    ret[idx][0] = num
-                    ret[idx][1] = idx - 1
-                    ret[idx][2] = num
-                    ret[idx][3] = idx + 1
+                if hi > lo + 1:
+                    fillRange(0, lo + 1, hi, num)
+                    fillRange(1, lo + 1, hi, range(lo, hi - 1))
+                    fillRange(2, lo + 1, hi, num)
+                    fillRange(3, lo + 1, hi, range(lo + 2, hi + 1))
                 # map the last base (3' xover if necessary)
-                ret[hi][0] = num
-                ret[hi][1] = hi - 1
+                ret[4 * hi] = num
+                ret[4 * hi + 1] = hi - 1
                 s3p = strand.connection3p()
                 if s3p != None:
-                    ret[hi][2] = s3p.virtualHelix().number()
-                    ret[hi][3] = s3p.idx5Prime()
+                    ret[4 * hi + 2] = s3p.virtualHelix().number()
+                    ret[4 * hi + 3] = s3p.idx5Prime()
                 # end if
             # end for
         # end if
@@ -442,25 +489,25 @@ class StrandSet(QObject):
                 lo, hi = strand.idxs()
                 assert strand.idx3Prime() == lo and strand.idx5Prime() == hi
                 # map the first base (3' xover if necessary)
-                ret[lo][0] = num
-                ret[lo][1] = lo + 1
+                ret[4 * lo] = num
+                ret[4 * lo + 1] = lo + 1
                 s3p = strand.connection3p()
                 if s3p != None:
-                    ret[lo][2] = s3p.virtualHelix().number()
-                    ret[lo][3] = s3p.idx5Prime()
+                    ret[4 * lo + 2] = s3p.virtualHelix().number()
+                    ret[4 * lo + 3] = s3p.idx5Prime()
                 # map the internal bases
-                for idx in range(lo + 1, hi):
-                    ret[idx][0] = num
-                    ret[idx][1] = idx + 1
-                    ret[idx][2] = num
-                    ret[idx][3] = idx - 1
+                if hi > lo + 1:
+                    fillRange(0, lo + 1, hi, num)
+                    fillRange(1, lo + 1, hi, range(lo + 2, hi + 1))
+                    fillRange(2, lo + 1, hi, num)
+                    fillRange(3, lo + 1, hi, range(lo, hi - 1))
                 # map the last base (5' xover if necessary)
-                ret[hi][2] = num
-                ret[hi][3] = hi - 1
+                ret[4 * hi + 2] = num
+                ret[4 * hi + 3] = hi - 1
                 s5p = strand.connection5p()
                 if s5p != None:
-                    ret[hi][0] = s5p.virtualHelix().number()
-                    ret[hi][1] = s5p.idx3Prime()
+                    ret[4 * hi] = s5p.virtualHelix().number()
+                    ret[4 * hi + 1] = s5p.idx3Prime()
                 # end if
             # end for
         return ret
@@ -470,144 +517,136 @@ class StrandSet(QObject):
     def _addToStrandList(self, strand, idx):
         """Inserts strand into the _strandList at idx."""
         self._strandList.insert(idx, strand)
+        self._lowIdxList.insert(idx, strand.lowIdx())
+        self._highIdxList.insert(idx, strand.highIdx())
+        self._strandsChanged()
+        if self._occupancy is not None:
+            self._occupancy.addStrand(self._strandType,
+                                      strand.lowIdx(), strand.highIdx(),
+                                      strand.connectionLow() is not None,
+                                      strand.connectionHigh() is not None)
 
     def _removeFromStrandList(self, strand):
         """Remove strand from _strandList."""
         self._doc.removeStrandFromSelection(strand)  # make sure the strand is no longer selected
-        self._strandList.remove(strand)
-
-    def _couldStrandInsertAtLastIndex(self, strand):
-        """Verification of insertability based on cached last index."""
-        lastInd = self._lastStrandSetIndex
-        strandList = self._strandList
-        if lastInd == None or lastInd > (len(strandList) - 1):
-            self._lastStrandSetIndex = None
-            return False
-        else:
-            sTestHigh = strandList[lastInd].lowIdx() if lastInd < len(strandList) else self.partMaxBaseIdx()
-            sTestLow = strandList[lastInd - 1].highIdx() if lastInd > 0 else - 1
-            sLow, sHigh = strand.idxs()
-            if sTestLow < sLow and sHigh < sTestHigh:
-                return True
-            else:
-                return False
-
-    def _findOverlappingRanges(self, qstrand, useCache=False):
+        isInSet, overlap, idx = self._findIndexOfRangeFor(strand)
+        if not isInSet:
+            raise ValueError("%s is not in %s" % (strand, self))
+        self._popFromStrandList(idx)
+
+    def _popFromStrandList(self, idx):
+        """Removes and returns the strand at idx in _strandList."""
+        lowIdx = self._lowIdxList.pop(idx)
+        highIdx = self._highIdxList.pop(idx)
+        self._strandsChanged()
+        if self._occupancy is not None:
+            self._occupancy.removeStrand(self._strandType, lowIdx, highIdx)
+        return self._strandList.pop(idx)
+
+    def _setStrandList(self, strandList):
+        """Replaces _strandList wholesale and rebuilds the index arrays."""
+        self._strandList = strandList
+        self._rebuildIdxLists()
+
+    def _rebuildIdxLists(self):
         """
-        a binary search for the strands in self._strandList overlapping with
-        a query strands, or qstrands, indices.
-
-        Useful for operations on complementary strands such as applying a
-        sequence
+        Regenerates the index arrays from _strandList. Needed after strands
+        are shifted in bulk (see Strand.updateIdxs).
+        """
+        self._lowIdxList = [strand.lowIdx() for strand in self._strandList]
+        self._highIdxList = [strand.highIdx() for strand in self._strandList]
+        self._strandsChanged()
+        occ = self._occupancy
+        if occ is not None:
+            occ.clearStrands(self._strandType)
+            for strand in self._strandList:
+                occ.addStrand(self._strandType,
+                              strand.lowIdx(), strand.highIdx(),
+                              strand.connectionLow() is not None,
+                              strand.connectionHigh() is not None)
 
-        This is an generator for now
+    def _strandsChanged(self):
+        """Invalidates part-level caches that depend on this set's strands."""
+        self._virtualHelix.part()._invalidatePotentialXovers(self._virtualHelix)
 
-        Strategy:
-        1.
-            search the _strandList for a strand the first strand that has a
-            highIndex >= lowIndex of the query strand.
-            save that strandSet index as sSetIndexLow.
-            if No strand satisfies this condition, return an empty list
+    def _indexOfStrandInList(self, strand):
+        """
+        Returns the index of strand in _strandList, or None if the strand
+        isn't in this set. Must be called before the strand's bounds change.
+        """
+        i = bisect_left(self._highIdxList, strand.highIdx())
+        if i < len(self._strandList) and self._strandList[i] is strand:
+            return i
+        return None
 
-            Unless it matches the query strand's lowIndex exactly,
-            Step 1 is O(log N) where N in length of self._strandList to the max,
-            that is it needs to exhaust the search
+    def _updateStrandIdxs(self, strand, idxs):
+        """
+        Called by Strand.setIdxs before a strand takes on new bounds, so the
+        index arrays follow strands that are resized in place. Strands that
+        aren't in the set (e.g. the copies made by split and merge commands)
+        are ignored.
+        """
+        i = self._indexOfStrandInList(strand)
+        if i is None:
+            return
+        self._strandsChanged()
+        occ = self._occupancy
+        if occ is not None:
+            occ.removeStrand(self._strandType,
+                             self._lowIdxList[i], self._highIdxList[i])
+            occ.addStrand(self._strandType, idxs[0], idxs[1],
+                          strand.connectionLow() is not None,
+                          strand.connectionHigh() is not None)
+        self._lowIdxList[i] = idxs[0]
+        self._highIdxList[i] = idxs[1]
+
+    def _updateStrandConnections(self, strand):
+        """
+        Called by Strand.setConnection5p/3p so the crossover occupancy
+        follows connection changes of strands in this set.
+        """
+        if self._indexOfStrandInList(strand) is None:
+            return
+        self._strandsChanged()
+        occ = self._occupancy
+        if occ is None:
+            return
+        occ.setXovers(self._strandType, strand.lowIdx(), strand.highIdx(),
+                      strand.connectionLow() is not None,
+                      strand.connectionHigh() is not None)
 
-            conversely you could search for first strand that has a
-            lowIndex LESS than or equal to the lowIndex of the query strand.
+    def _overlapSlice(self, qLow, qHigh):
+        """
+        Returns the (start, stop) slice of _strandList containing the strands
+        that overlap [qLow, qHigh]. The slice is empty if none do.
+        """
+        start = bisect_left(self._highIdxList, qLow)
+        stop = bisect_right(self._lowIdxList, qHigh, lo=start)
+        return start, stop
 
-        2.
-            starting at self._strandList[sSetIndexLow] test each strand to see if
-            it's indexLow is LESS than or equal to qstrand.indexHigh.  If it is
-            yield/return that strand.  If it's GREATER than the indexHigh, or
-            you run out of strands to check, the generator terminates
+    def _findOverlappingRanges(self, qstrand):
         """
-        strandList = self._strandList
-        lenStrands = len(strandList)
-        if lenStrands == 0:
-            return
-        # end if
+        Returns an iterator over the strands in self._strandList overlapping
+        with a query strands, or qstrands, indices.
 
-        low = 0
-        high = lenStrands
-        qLow, qHigh = qstrand.idxs()
+        Useful for operations on complementary strands such as applying a
+        sequence.
 
-        # Step 1: get rangeIndexLow with a binary search
-        if useCache:  # or self.doesLastSetIndexMatch(qstrand, strandList):
-            # cache match!
-            sSetIndexLow = self._lastStrandSetIndex
-        else:
-            sSetIndexLow = -1
-            while low < high:
-                mid = (low + high) // 2
-                midStrand = strandList[mid]
-
-                # pre get indices from the currently tested strand
-                mLow, mHigh = midStrand.idxs()
-
-                if mHigh == qLow:
-                    # match, break out of while loop
-                    sSetIndexLow = mid
-                    break
-                elif mHigh > qLow:
-                    # store the candidate index
-                    sSetIndexLow = mid
-                    # adjust the high index to find a better candidate if
-                    # it exists
-                    high = mid
-                # end elif
-                else:  # mHigh < qLow
-                    # If a strand exists it must be a higher rangeIndex
-                    # leave the high the same
-                    low = mid + 1
-                #end elif
-            # end while
-        # end else
-
-        # Step 2: create a generator on matches
-        # match on whether the tempStrand's lowIndex is
-        # within the range of the qStrand
-        if sSetIndexLow > -1:
-            tempStrands = iter(strandList[sSetIndexLow:])
-            tempStrand = next(tempStrands)
-            qHigh += 1  # bump it up for a more efficient comparison
-            i = 0   # use this to
-            while tempStrand and tempStrand.lowIdx() < qHigh:
-                yield tempStrand
-                # use a next and a default to cause a break condition
-                tempStrand = next(tempStrands, None)
-                i += 1
-            # end while
-
-            # cache the last index we left of at
-            i = sSetIndexLow + i
-            """
-            if
-            1. we ran out of strands to test adjust
-                OR
-            2. the end condition tempStrands highIndex is still inside the
-            qstrand but not equal to the end point
-                adjust i down 1
-            otherwise
-            """
-            if not tempStrand or tempStrand.highIdx() < qHigh - 1:
-                i -= 1
-            # assign cache but double check it's a valid index
-            self._lastStrandSetIndex = i if -1 < i < lenStrands else None
-            return
-        else:
-            # no strand was found
-            # go ahead and clear the cache
-            self._lastStrandSetIndex = None if len(self._strandList) > 0 else 0
-            return
+        Because strands in a StrandSet never overlap, both _lowIdxList and
+        _highIdxList are sorted. The first overlapping strand is the first
+        one whose highIdx >= the query's lowIdx, and the last is the last one
+        whose lowIdx <= the query's highIdx, so both ends are found with a
+        bisect in O(log N).
+        """
+        start, stop = self._overlapSlice(*qstrand.idxs())
+        return iter(self._strandList[start:stop])
     # end def
 
     def getStrandIndex(self, strand):
-        try:
-            ind = self._strandList.index(strand)
-            return (True, ind)
-        except ValueError:
-            return (False, 0)
+        isInSet, overlap, idx = self._findIndexOfRangeFor(strand)
+        if isInSet:
+            return (True, idx)
+        return (False, 0)
     # end def
 
     def _findIndexOfRangeFor(self, strand):
@@ -629,99 +668,16 @@ class StrandSet(QObject):
             idx is the index where the strand could be inserted if found
             is False and overlap is False.
         """
-        # setup
-        strandList = self._strandList
-        lastIdx = self._lastStrandSetIndex
-        lenStrands = len(strandList)
-        # base case: empty list, can insert at 0
-        if lenStrands == 0:
-            return (False, False, 0)
-        # check cache
-        if lastIdx:
-            if lastIdx < lenStrands and strandList[lastIdx] == strand:
-                return (True, False, lastIdx)
-        # init search bounds
-        low, high = 0, lenStrands
         sLow, sHigh = strand.idxs()
-        # perform binary search
-        while low < high:
-            mid = (low + high) // 2
-            midStrand = strandList[mid]
-            mLow, mHigh = midStrand.idxs()
-            if midStrand == strand:
-                self._lastStrandSetIndex = mid
-                return (True, False, mid)
-            elif mHigh < sLow:
-                #  strand                [sLow----)
-                # mStrand  (----mHigh]
-                low = mid + 1  # search higher
-            elif mLow > sHigh:
-                #  strand  (----sHigh]
-                # mStrand                [mLow----)
-                high = mid  # search lower
-            else:
-                if mLow <= sLow <= mHigh:
-                    # overlap: right side of mStrand
-                    #  strand         [sLow---------------)
-                    # mStrand  [mLow----------mHigh]
-                    self._lastStrandSetIndex = None
-                    return (False, True, None)
-                elif mLow <= sHigh <= mHigh:
-                    # overlap: left side of mStrand
-                    #  strand  (--------------sHigh]
-                    # mStrand         [mLow-----------mHigh]
-                    self._lastStrandSetIndex = None
-                    return (False, True, None)
-                elif sLow <= mLow and mHigh <= sHigh:
-                    # overlap: strand encompases existing
-                    #  strand  [sLow-------------------sHigh]
-                    # mStrand         [mLow----mHigh]
-                    # note: inverse case is already covered above
-                    self._lastStrandSetIndex = None
-                    return (False, True, None)
-                else:
-                    # strand not in set, here's where you'd insert it
-                    self._lastStrandSetIndex = mid
-                    return (False, False, mid)
-            # end else
-        self._lastStrandSetIndex = low
-        return (False, False, low)
-    # end def
-
-    def _doesLastSetIndexMatch(self, qstrand, strandList):
-        """
-        strandList is passed to save a lookup
-        """
-        lSI = self._lastStrandSetIndex
-        if lSI:
-            qLow, qHigh = qstrand.idxs()
-            tempStrand = strandList[lSI]
-            tLow, tHigh = tempStrand.idxs()
-            if not (qLow <= tLow <= qHigh or qLow <= tHigh <= qHigh):
-                return False
-            else:  # get a difference
-                dif = abs(qLow - tLow)
-                # check neighboring strandList just in case
-                difLow = dif + 1
-                if lSI > 0:
-                    tLow, tHigh = strand[lSI - 1].idxs()
-                    if qLow <= tLow <= qHigh or qLow <= tHigh <= qHigh:
-                        difLow = abs(qLow - tLow)
-                difHigh = dif + 1
-                if lSI < len(strand) - 1:
-                    tLow, tHigh = strand[lSI + 1].idxs()
-                    if qLow <= tLow <= qHigh or qLow <= tHigh <= qHigh:
-                        difHigh = abs(qLow - tLow)
-                # check that the cached strand is in fact the right guy
-                if dif < difLow and dif < difHigh:
-                    return True
-                else:
-                    False
-            # end else
-        # end if
-        else:
-            return False
-        # end else
+        highList = self._highIdxList
+        lenStrands = len(highList)
+        i = bisect_left(highList, sHigh)
+        if i < lenStrands and self._strandList[i] is strand:
+            return (True, False, i)
+        i = bisect_left(highList, sLow)
+        if i < lenStrands and self._lowIdxList[i] <= sHigh:
+            return (False, True, None)
+        return (False, False, i)
     # end def
 
     ### COMMANDS ###
@@ -747,7 +703,7 @@ class StrandSet(QObject):
             # Add the new strand to the StrandSet strandList
             strand = self._strand
             strandSet = self._strandSet
-            strandSet._strandList.insert(self._sSetIdx, strand)
+            strandSet._addToStrandList(strand, self._sSetIdx)
             # Set up the new oligo
             oligo = self._newOligo
             oligo.setStrand5p(strand)
@@ -756,10 +712,13 @@ class StrandSet(QObject):
 
             if strandSet.isStaple():
                 strand.reapplySequence()
+            elif strandSet.part().lazySequences():
+                strand.setSequence(None)  # clear what the buffer held there
             # Emit a signal to notify on completion
             strandSet.strandsetStrandAddedSignal.emit(strandSet, strand)
             # for updating the Slice View displayed helices
-            strandSet.part().partStrandChangedSignal.emit(strandSet.part(), strandSet.virtualHelix())
+            strandSet._doc.emitSignal(strandSet.part().partStrandChangedSignal,
+                                      strandSet.part(), strandSet.virtualHelix())
         # end def
 
         def undo(self):
@@ -767,7 +726,7 @@ class StrandSet(QObject):
             strand = self._strand
             strandSet = self._strandSet
             strandSet._doc.removeStrandFromSelection(strand)
-            strandSet._strandList.pop(self._sSetIdx)
+            strandSet._popFromStrandList(self._sSetIdx)
             # Get rid of the new oligo
             oligo = self._newOligo
             oligo.setStrand5p(None)
@@ -776,7 +735,8 @@ class StrandSet(QObject):
             strand.strandRemovedSignal.emit(strand)
             strand.setOligo(None)
             # for updating the Slice View displayed helices
-            strandSet.part().partStrandChangedSignal.emit(strandSet.part(), strandSet.virtualHelix())
+            strandSet._doc.emitSignal(strandSet.part().partStrandChangedSignal,
+                                      strandSet.part(), strandSet.virtualHelix())
         # end def
     # end class
 
@@ -806,7 +766,6 @@ class StrandSet(QObject):
                 colorList = styles.stapColors if strandSet.isStaple() else [styles.scafColors[0]]
                 color = random.choice(colorList).name()
                 olg3p.setColor(color)
-                olg3p.refreshLength()
         # end def
 
         def redo(self):
@@ -815,7 +774,7 @@ class StrandSet(QObject):
             strandSet = self._strandSet
             # strandSet._removeFromStrandList(strand)
             strandSet._doc.removeStrandFromSelection(strand)
-            strandSet._strandList.pop(self._sSetIdx)
+            strandSet._popFromStrandList(self._sSetIdx)
             strand5p = self._oldStrand5p
             strand3p = self._oldStrand3p
             oligo = self._oligo
@@ -833,34 +792,42 @@ class StrandSet(QObject):
 
             # Clear connections and update oligos
             if strand5p != None:
+                length = 0
                 for s5p in oligo.strand5p().generator3pStrand():
+                    length += s5p.totalLength()
                     Strand.setOligo(s5p, olg5p)
-                olg5p.refreshLength()
+                olg5p.setLength(length)
                 olg5p.addToPart(strandSet.part())
                 if self._solo:
                     part = strandSet.part()
                     vh = strandSet.virtualHelix()
-                    part.partActiveVirtualHelixChangedSignal.emit(part, vh)
+                    strandSet._doc.emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                              part, vh)
                     #strand5p.strandXover5pChangedSignal.emit(strand5p, strand)
-                strand5p.strandUpdateSignal.emit(strand5p)
+                strandSet._doc.emitSignal(strand5p.strandUpdateSignal, strand5p)
             # end if
             if strand3p != None:
                 if not oligo.isLoop():
                     # apply 2nd oligo copy to all 3' downstream strands
+                    length = 0
                     for s3p in strand3p.generator3pStrand():
+                        length += s3p.totalLength()
                         Strand.setOligo(s3p, olg3p)
+                    olg3p.setLength(length)
                     olg3p.addToPart(strandSet.part())
                 if self._solo:
                     part = strandSet.part()
                     vh = strandSet.virtualHelix()
-                    part.partActiveVirtualHelixChangedSignal.emit(part, vh)
+                    strandSet._doc.emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                              part, vh)
                     # strand.strandXover5pChangedSignal.emit(strand, strand3p)
-                strand3p.strandUpdateSignal.emit(strand3p)
+                strandSet._doc.emitSignal(strand3p.strandUpdateSignal, strand3p)
             # end if
             # Emit a signal to notify on completion
             strand.strandRemovedSignal.emit(strand)
             # for updating the Slice View displayed helices
-            strandSet.part().partStrandChangedSignal.emit(strandSet.part(), strandSet.virtualHelix())
+            strandSet._doc.emitSignal(strandSet.part().partStrandChangedSignal,
+                                      strandSet.part(), strandSet.virtualHelix())
         # end def
 
         def undo(self):
@@ -898,27 +865,30 @@ class StrandSet(QObject):
             # Emit a signal to notify on completion
             strandSet.strandsetStrandAddedSignal.emit(strandSet, strand)
             # for updating the Slice View displayed helices
-            strandSet.part().partStrandChangedSignal.emit(strandSet.part(), strandSet.virtualHelix())
+            strandSet._doc.emitSignal(strandSet.part().partStrandChangedSignal,
+                                      strandSet.part(), strandSet.virtualHelix())
 
             # Restore connections to this strand
             if strand5p != None:
                 if self._solo:
                     part = strandSet.part()
                     vh = strandSet.virtualHelix()
-                    part.partActiveVirtualHelixChangedSignal.emit(part, vh)
+                    strandSet._doc.emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                              part, vh)
                     # strand5p.strandXover5pChangedSignal.emit(
                     #                                        strand5p, strand)
-                strand5p.strandUpdateSignal.emit(strand5p)
-                strand.strandUpdateSignal.emit(strand)
+                strandSet._doc.emitSignal(strand5p.strandUpdateSignal, strand5p)
+                strandSet._doc.emitSignal(strand.strandUpdateSignal, strand)
 
             if strand3p != None:
                 if self._solo:
                     part = strandSet.part()
                     vh = strandSet.virtualHelix()
-                    part.partActiveVirtualHelixChangedSignal.emit(part, vh)
+                    strandSet._doc.emitSignal(part.partActiveVirtualHelixChangedSignal,
+                                              part, vh)
                     # strand.strandXover5pChangedSignal.emit(strand, strand3p)
-                strand3p.strandUpdateSignal.emit(strand3p)
-                strand.strandUpdateSignal.emit(strand)
+                strandSet._doc.emitSignal(strand3p.strandUpdateSignal, strand3p)
+                strandSet._doc.emitSignal(strand.strandUpdateSignal, strand)
         # end def
     # end class
 
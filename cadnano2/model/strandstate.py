@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+strandstate.py
+
+Records what a large edit (e.g. autostaple or autobreak) did to the
+strands and oligos of a Part, so that it can be undone by restoring the
+states from before or after it instead of replaying thousands of
+commands. See Part.StrandStateCommand.
+
+PartStrandState is taken when the edit starts and only lives until it
+ends. StrandStateDiff then keeps, for each StrandSet that changed, the
+run of strands that differs between the two states, encoded as int
+arrays indexing into one table of Strands and one of Oligos. Sequences
+are kept only for strands whose bounds or sequence changed.
+
+The same Strand and Oligo objects are put back on restore, so commands
+further down the undo stack that hold references to them stay valid.
+"""
+
+import sys
+from array import array
+
+
+def _strandRecord(strand):
+    return (strand._baseIdxLow, strand._baseIdxHigh, strand._strand5p,
+            strand._strand3p, strand._oligo, strand.sequence())
+# end def
+
+
+class PartStrandState(object):
+    """
+    The strands of every StrandSet of a Part, with their bounds,
+    connections, oligo and sequence, plus the strand5p, isLoop, length and
+    color of each oligo in the Part.
+    """
+    def __init__(self, part):
+        self.strandSets = {}
+        for vh in part.getVirtualHelices():
+            for strandSet in vh.getStrandSets():
+                strands = tuple(strandSet._strandList)
+                self.strandSets[strandSet] = (strands,
+                                    [_strandRecord(s) for s in strands])
+        self.oligos = dict((olg, (olg._strand5p, olg._isLoop,
+                                  olg._length, olg._color))
+                           for olg in part.oligos())
+    # end def
+# end class
+
+
+class ObjectTable(object):
+    """
+    A list of objects that StrandRuns refer to by position, -1 being None.
+    """
+    def __init__(self):
+        self.objects = []
+        self._ids = {}
+    # end def
+
+    def __getitem__(self, i):
+        return None if i < 0 else self.objects[i]
+    # end def
+
+    def id(self, obj):
+        if obj is None:
+            return -1
+        i = self._ids.get(obj)
+        if i is None:
+            i = self._ids[obj] = len(self.objects)
+            self.objects.append(obj)
+        return i
+    # end def
+
+    def freeze(self):
+        """Drops the lookup used while building."""
+        self._ids = None
+    # end def
+# end class
+
+
+class StrandRun(object):
+    """
+    A run of consecutive strands of a StrandSet: their ids in the strand
+    table, their bounds as (low, high) pairs, their 5' and 3' connections
+    and oligo as (strand id, strand id, oligo id) triples, and a dict of
+    sequence by position for the strands whose sequence has to be set on
+    restore (None if there are none).
+    """
+    __slots__ = ('ids', 'idxs', 'links', 'sequences')
+
+    def __init__(self, strandTable, oligoTable, strands, records, other):
+        """
+        other maps the strands of the other state of the same run to their
+        records; the sequence of a strand is kept if it is set and the
+        strand is new or was resized or resequenced.
+        """
+        self.ids = ids = array('i')
+        self.idxs = idxs = array('i')
+        self.links = links = array('i')
+        sequences = {}
+        for pos, strand in enumerate(strands):
+            low, high, strand5p, strand3p, olg, seq = records[pos]
+            ids.append(strandTable.id(strand))
+            idxs.append(low)
+            idxs.append(high)
+            links.append(strandTable.id(strand5p))
+            links.append(strandTable.id(strand3p))
+            links.append(oligoTable.id(olg))
+            if seq:
+                otherRecord = other.get(strand)
+                if otherRecord is None or otherRecord[0] != low or \
+                   otherRecord[1] != high or otherRecord[5] != seq:
+                    sequences[pos] = seq
+        self.sequences = sequences or None
+    # end def
+
+    def strands(self, strandTable):
+        return [strandTable[i] for i in self.ids]
+    # end def
+
+    def restore(self, strandSet, start, current, strandTable, oligoTable):
+        """
+        Replaces the strands of current, which start at start in
+        strandSet, with the strands of this run.
+        """
+        idxs, links = self.idxs, self.links
+        strands = self.strands(strandTable)
+        for pos, strand in enumerate(strands):
+            strand._baseIdxLow = idxs[2*pos]
+            strand._baseIdxHigh = idxs[2*pos + 1]
+            strand._totalLength = None
+            strand._strand5p = strandTable[links[3*pos]]
+            strand._strand3p = strandTable[links[3*pos + 1]]
+            strand._oligo = oligoTable[links[3*pos + 2]]
+        strandList = strandSet._strandList
+        end = start + len(current.ids)
+        strandSet._setStrandList(strandList[:start] + strands +
+                                 strandList[end:])
+        # sequences go on once all bounds are back
+        sequences = self.sequences or {}
+        currentSequences = current.sequences or {}
+        currentPos = dict((i, pos) for pos, i in enumerate(current.ids))
+        for pos, strand in enumerate(strands):
+            seq = sequences.get(pos)
+            if seq is not None:
+                strand.setSequence(seq)
+                continue
+            i = currentPos.get(self.ids[pos])
+            if i is not None and i not in currentSequences and \
+               current.idxs[2*i:2*i + 2] == idxs[2*pos:2*pos + 2]:
+                continue  # same bounds and sequence as now
+            if strand.sequence():
+                strand.setSequence(None)
+    # end def
+
+    def memoryCost(self):
+        cost = sys.getsizeof(self) + sys.getsizeof(self.ids) + \
+               sys.getsizeof(self.idxs) + sys.getsizeof(self.links)
+        if self.sequences:
+            cost += sys.getsizeof(self.sequences) + \
+                    sum(sys.getsizeof(seq) for seq in self.sequences.values())
+        return cost
+    # end def
+# end class
+
+
+class StrandStateDiff(object):
+    """
+    What changed in a Part since a PartStrandState was taken.
+
+    strandSets is a list of (strandSet, start, beforeRun, afterRun), one
+    for each StrandSet that differs, where the StrandRuns cover the
+    strands from start up to the last one that differs. oligos is a list
+    of (oligo id, beforeState, afterState), one for each oligo that
+    differs, where an oligo state is (strand5p id, isLoop, length, color),
+    or None if the oligo isn't in the Part at that point. Helices must not
+    be added or removed in between.
+    """
+    def __init__(self, before, part):
+        self.strandTable = strandTable = ObjectTable()
+        self.oligoTable = oligoTable = ObjectTable()
+        self.strandSets = []
+        for strandSet, (strands0, records0) in before.strandSets.items():
+            strands1 = strandSet._strandList
+            n0, n1 = len(strands0), len(strands1)
+            start = 0
+            while start < n0 and start < n1 and \
+                  strands0[start] is strands1[start] and \
+                  records0[start] == _strandRecord(strands1[start]):
+                start += 1
+            if start == n0 == n1:
+                continue
+            end0, end1 = n0, n1
+            while end0 > start and end1 > start and \
+                  strands0[end0 - 1] is strands1[end1 - 1] and \
+                  records0[end0 - 1] == _strandRecord(strands1[end1 - 1]):
+                end0 -= 1
+                end1 -= 1
+            strands0 = strands0[start:end0]
+            strands1 = strands1[start:end1]
+            records0 = records0[start:end0]
+            records1 = [_strandRecord(s) for s in strands1]
+            beforeRun = StrandRun(strandTable, oligoTable, strands0, records0,
+                                  dict(zip(strands1, records1)))
+            afterRun = StrandRun(strandTable, oligoTable, strands1, records1,
+                                 dict(zip(strands0, records0)))
+            self.strandSets.append((strandSet, start, beforeRun, afterRun))
+        # end for
+        after = dict((olg, (olg._strand5p, olg._isLoop,
+                            olg._length, olg._color))
+                     for olg in part.oligos())
+        self.oligos = []
+        for olg in set(before.oligos) | set(after):
+            beforeState = before.oligos.get(olg)
+            afterState = after.get(olg)
+            if beforeState != afterState:
+                self.oligos.append((oligoTable.id(olg),
+                                    self._encodeOligo(beforeState),
+                                    self._encodeOligo(afterState)))
+        strandTable.freeze()
+        oligoTable.freeze()
+    # end def
+
+    def _encodeOligo(self, state):
+        if state is None:
+            return None
+        strand5p, isLoop, length, color = state
+        return (self.strandTable.id(strand5p), isLoop, length, color)
+    # end def
+
+    def isEmpty(self):
+        return not self.strandSets and not self.oligos
+    # end def
+
+    def memoryCost(self):
+        """Returns the approximate size in bytes of the kept data."""
+        cost = sys.getsizeof(self) + \
+               sys.getsizeof(self.strandTable.objects) + \
+               sys.getsizeof(self.oligoTable.objects) + \
+               sys.getsizeof(self.strandSets) + sys.getsizeof(self.oligos)
+        for strandSet, start, beforeRun, afterRun in self.strandSets:
+            cost += beforeRun.memoryCost() + afterRun.memoryCost()
+        for item in self.oligos:
+            cost += sum(sys.getsizeof(state) for state in item)
+        return cost
+    # end def
+# end class
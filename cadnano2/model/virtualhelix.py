@@ -4,6 +4,7 @@
 from .strandset import StrandSet
 import cadnano2.util as util
 from .enum import StrandType
+from . import occupancy
 
 # import Qt stuff into the module namespace with PySide, PyQt4 independence
 util.qtWrapImport('QtCore', globals(), ['pyqtSignal', 'QObject', 'Qt'])
@@ -24,6 +25,12 @@ class VirtualHelix(QObject):
         self._coord = (row, col) # col, row
         self._part = part
         self._doc = part.document()
+        # optional per-base arrays, kept in sync by the StrandSets
+        if occupancy.isAvailable():
+            self._occupancy = occupancy.BaseOccupancy(part.maxBaseIdx() + 1,
+                                                      self._insertionIndex)
+        else:
+            self._occupancy = None
         self._scafStrandSet = StrandSet(StrandType.Scaffold, self)
         self._stapStrandSet = StrandSet(StrandType.Staple, self)
         # If self._part exists, it owns self._number
@@ -96,6 +103,19 @@ class VirtualHelix(QObject):
         return self._part.undoStack()
     # end def
 
+    def occupancy(self):
+        """
+        Returns the BaseOccupancy arrays for this helix, or None if NumPy
+        isn't available.
+        """
+        return self._occupancy
+    # end def
+
+    def _insertionIndex(self):
+        # looked up each time, as the Part may replace the index
+        return self._part.insertionIndex(self._coord)
+    # end def
+
     ### METHODS FOR QUERYING THE MODEL ###
     def scaffoldIsOnTop(self):
         return self.isEvenParity()
@@ -131,6 +151,8 @@ class VirtualHelix(QObject):
     # end def
 
     def hasStrandAtIdx(self, idx):
+        if self._occupancy is not None:
+            return self._occupancy.hasStrandAt(StrandType.Scaffold, idx)
         return self._scafStrandSet.hasStrandAt(idx, idx)
     # end def
 
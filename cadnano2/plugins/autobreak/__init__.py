@@ -1,6 +1,8 @@
-from .autobreakconfig import AutobreakConfig
-import cadnano, util
-util.qtWrapImport('QtGui', globals(), ['QAction', 'QIcon', 'QPixmap'])
+import cadnano2.cadnano as cadnano
+import cadnano2.util as util
+if cadnano.app().isGui():  # the solver in autobreak.py also runs headless
+    from .autobreakconfig import AutobreakConfig
+    util.qtWrapImport('QtGui', globals(), ['QAction', 'QIcon', 'QPixmap'])
 
 
 class AutobreakHandler(object):
@@ -36,7 +38,8 @@ def documentWindowWasCreatedSlot(doc, win):
     doc.autobreakHandler = AutobreakHandler(doc, win)
 
 # Initialization
-for c in cadnano.app().documentControllers:
-    doc, win = c.document(), c.window()
-    doc.autobreakHandler = AutobreakHandler(doc, win)
-cadnano.app().documentWindowWasCreatedSignal.connect(documentWindowWasCreatedSlot)
+if cadnano.app().isGui():
+    for c in cadnano.app().documentControllers:
+        doc, win = c.document(), c.window()
+        doc.autobreakHandler = AutobreakHandler(doc, win)
+    cadnano.app().documentWindowWasCreatedSignal.connect(documentWindowWasCreatedSlot)
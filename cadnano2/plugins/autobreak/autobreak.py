@@ -7,6 +7,7 @@ from cadnano2.model.parts.part import Part
 from cadnano2.model.oligo import Oligo
 from multiprocessing import Pool, cpu_count
 from operator import itemgetter
+from .tokencache import TokenCache, tokenCacheKey
 
 try:
     from . import staplegraph
@@ -16,23 +17,155 @@ except Exception as e:
     print(e)
     nx = False
 
-token_cache = {}
+token_cache = TokenCache()
 
 def breakStaples(part, settings):
-    clearTokenCache()
+    """
+    Breaks the selected staple oligos of part, or all of them if none are
+    selected. settings may hold stapleScorer, minStapleLegLen, minStapleLen,
+    maxStapleLen and tgtStapleLen, plus workers: the number of processes
+    used to solve the oligos (1, the default, solves them one at a time in
+    this process; 0 or None uses one per cpu) and solver: one of
+    staplegraph.SOLVER_DP (the default), SOLVER_NX or SOLVER_CHECK.
+
+    Solutions are kept in token_cache between calls. If tokenCacheFile is
+    set, the cache is loaded from that file the first time it is seen and
+    saved back to it after every call.
+    """
+    cacheFile = settings.get('tokenCacheFile')
+    if cacheFile and not token_cache.hasLoaded(cacheFile):
+        token_cache.load(cacheFile)
     breakOligos = part.document().selectedOligos()
     if not breakOligos:
         breakOligos = part.oligos()
     else:
         part.document().clearAllSelected()
-    for o in list(breakOligos):
-        if not o.isStaple():
+    stapleOligos = [o for o in list(breakOligos) if o.isStaple()]
+    workers = settings.get('workers', 1)
+    # all the breaks are one compact undo step
+    with util.superMacro(part, desc="Auto-Break", compact=True):
+        if nx and workers != 1 and len(stapleOligos) > 1:
+            parallelBreakStaples(stapleOligos, settings, workers)
+        else:
+            for o in stapleOligos:
+                if nx:
+                    nxBreakStaple(o, settings)
+                else:
+                    print("Not breaking")
+                    # breakStaple(o, settings)
+    if cacheFile:
+        token_cache.save(cacheFile)
+# end def
+
+def parallelBreakStaples(oligos, settings, workers=None):
+    """
+    Same result as calling nxBreakStaple on each oligo, but solves the
+    staple graphs of all oligos in a process pool. Only nxPerformBreaks
+    touches the model, so the work is done in three phases: tokenize every
+    oligo, solve all unique token lists (and loop rotations) in parallel,
+    then apply the breaks one oligo at a time.
+    """
+    minStapleLegLen = settings.get('minStapleLegLen', 3)
+    minStapleLen = settings.get('minStapleLen', 30)
+    maxStapleLen = settings.get('maxStapleLen', 40)
+    tgtStapleLen = settings.get('tgtStapleLen', 35)
+    staple_limits = [minStapleLen, maxStapleLen, tgtStapleLen]
+
+    # tokenize everything before the model is modified
+    jobs = []  # (oligo, tokenList, cacheKey)
+    solutions = {}  # cacheKey -> (breakItems, shortestScoreIdx) or None
+    problems = {}  # cacheKey -> list of minimumPath arguments
+    for oligo in oligos:
+        tokenList = tokenizeOligo(oligo, settings)
+        if len(tokenList) == 0:
             continue
-        if nx:
-            nxBreakStaple(o, settings)
+        cacheKey = tokenCacheKey(tokenList, oligo.isLoop(), staple_limits)
+        jobs.append((oligo, tokenList, cacheKey))
+        if cacheKey in solutions or cacheKey in problems:
+            continue
+        solution = token_cache.get(cacheKey)
+        if solution is not None:
+            solutions[cacheKey] = solution
         else:
-            print("Not breaking")
-            # breakStaple(o, settings)
+            problems[cacheKey] = tokenListRotations(oligo, tokenList,
+                                                staple_limits, maxStapleLen,
+                                                settings.get('solver'))
+    # end for
+
+    # solve the unique problems in parallel
+    keys, tokenLists = [], []
+    for cacheKey, tLists in problems.items():
+        keys.extend([cacheKey] * len(tLists))
+        tokenLists.extend(tLists)
+    if tokenLists:
+        if not workers:
+            workers = cpu_count()
+        p = Pool(min(workers, len(tokenLists)))
+        try:
+            # returns ( [breakStart, [breakLengths, ], score], tokenIdx)
+            results = p.map(staplegraph.minimumPath, tokenLists)
+        finally:
+            p.close()
+            p.join()
+        resultsByKey = {}
+        for cacheKey, result in zip(keys, results):
+            resultsByKey.setdefault(cacheKey, []).append(result)
+        for cacheKey, oligoResults in resultsByKey.items():
+            solution = bestSolution(oligoResults)
+            solutions[cacheKey] = solution
+            if solution:
+                addToTokenCache(cacheKey, *solution)
+    # end if
+
+    # apply the breaks
+    for oligo, tokenList, cacheKey in jobs:
+        if solutions.get(cacheKey):
+            breakItems, shortestScoreIdx = solutions[cacheKey]
+            nxPerformBreaks(oligo, breakItems, tokenList, shortestScoreIdx, minStapleLegLen)
+        elif oligo.isLoop():
+            print("unbroken Loop", oligo, oligo.length())
+# end def
+
+def tokenListRotations(oligo, tokenList, staple_limits, maxStapleLen,
+                                                                solver=None):
+    """
+    Returns the list of minimumPath arguments for tokenList. A loop oligo
+    has no fixed start, so rotations of its token list are tried as well.
+    """
+    if solver is None:
+        solver = staplegraph.SOLVER_DP
+    tokenLists = [(tokenList, staple_limits, 0, solver)]
+    tokenCount = tokenList[0]
+    if oligo.isLoop():
+        lenList = len(tokenList)
+        for i in range(1, lenList):
+            if tokenCount > 2*maxStapleLen:
+                break
+            tL = tokenLists[i-1][0]
+            rotatedList =  tL[1:-1] + tL[0:1]   # assumes lenList > 1
+            tokenCount += rotatedList[0]
+            tokenLists.append((rotatedList, staple_limits, i, solver))
+        # end for
+    # end if
+    return tokenLists
+# end def
+
+def bestSolution(results):
+    """
+    Given the minimumPath results for each rotation of a token list, returns
+    (breakItems, shortestScoreIdx) for the best scoring one, or None if
+    none could be solved.
+    """
+    f = itemgetter(0)   # get the graph results
+    g = itemgetter(2)    # get the score
+    # so this is
+    scoreTuple = min(results, key=lambda x: g(f(x)) if x else 10000)
+    # ensure there's at least one result
+    if scoreTuple:
+        shortestScore, shortestScoreIdx = scoreTuple
+        breakItems = results[shortestScoreIdx][0][1]
+        return breakItems, shortestScoreIdx
+    return None
 # end def
 
 def nxBreakStaple(oligo, settings):
@@ -49,60 +182,34 @@ def nxBreakStaple(oligo, settings):
     # print "tkList", tokenList, oligo.length(), oligo.color()
     if len(tokenList) == 0:
         return
-    cacheString = stringifyToken(oligo, tokenList)
-    if cacheString in token_cache:
+    staple_limits = [minStapleLen, maxStapleLen, tgtStapleLen]
+    cacheKey = tokenCacheKey(tokenList, oligo.isLoop(), staple_limits)
+    solution = token_cache.get(cacheKey)
+    if solution is not None:
         # print "cacheHit!"
-        breakItems, shortestScoreIdx = token_cache[cacheString]
+        breakItems, shortestScoreIdx = solution
         nxPerformBreaks(oligo, breakItems, tokenList, shortestScoreIdx, minStapleLegLen)
     else:
-        staple_limits = [minStapleLen, maxStapleLen, tgtStapleLen] 
-        tokenLists = [(tokenList, staple_limits,0)]
-        tokenCount = tokenList[0]
-        if oligo.isLoop():
-            lenList = len(tokenList)
-            for i in range(1, lenList):
-                if tokenCount > 2*maxStapleLen:
-                    break
-                tL = tokenLists[i-1][0]
-                rotatedList =  tL[1:-1] + tL[0:1]   # assumes lenList > 1
-                tokenCount += rotatedList[0]
-                tokenLists.append((rotatedList, staple_limits, i))
-            # end for
-        # end if
-        # p = Pool(cpu_count() * 2)
-        # p = Pool(4)
+        tokenLists = tokenListRotations(oligo, tokenList, staple_limits,
+                                        maxStapleLen, settings.get('solver'))
         # returns ( [breakStart, [breakLengths, ], score], tokenIdx)
-        # results = p.map(staplegraph.minimumPath, tokenLists)
         results = list(map(staplegraph.minimumPath, tokenLists))
-
-        f = itemgetter(0)   # get the graph results
-        g = itemgetter(2)    # get the score
-        # so this is
-        scoreTuple = min(results, key=lambda x: g(f(x)) if x else 10000)
-        # ensure there's at least one result
-        if scoreTuple:
-            shortestScore, shortestScoreIdx = scoreTuple
-            breakItems = results[shortestScoreIdx][0][1]
-            addToTokenCache(cacheString, breakItems, shortestScoreIdx)
+        solution = bestSolution(results)
+        if solution:
+            breakItems, shortestScoreIdx = solution
+            addToTokenCache(cacheKey, breakItems, shortestScoreIdx)
             nxPerformBreaks(oligo, breakItems, tokenList, shortestScoreIdx, minStapleLegLen)
         else:
             if oligo.isLoop():
                 print("unbroken Loop", oligo, oligo.length())
 # end def
 
-def addToTokenCache(cacheString, breakItems, shortestScoreIdx):
-    token_cache[cacheString] = (breakItems, shortestScoreIdx)
+def addToTokenCache(cacheKey, breakItems, shortestScoreIdx):
+    token_cache.add(cacheKey, breakItems, shortestScoreIdx)
 # end def
 
 def clearTokenCache():
-    token_cache = {}
-# end def
-
-def stringifyToken(oligo, tokenList):
-    cacheString = str(tokenList)
-    if oligo.isLoop():
-        cacheString = 'L' + cacheString
-    return cacheString
+    token_cache.clear()
 # end def
 
 def tokenizeOligo(oligo, settings):
@@ -169,29 +276,31 @@ def nxPerformBreaks(oligo, breakItems, tokenList, startingToken, minStapleLegLen
         # print "the sum is ", sum(breakList[1]), "==", oligo.length(), "isLoop", oligo.isLoop()
         # print "the breakItems", breakItems
 
-        strand = oligo.strand5p()
-        if oligo.isLoop():
-            # start things off make first cut
-            length0 = sum(tokenList[0:startingToken+1])
-            strand, idx, is5to3 = getStrandAtLengthInOligo(strand, length0-minStapleLegLen)
-            sS = strand.strandSet()
-            found, sSIdx = sS.getStrandIndex(strand)
-            # found, overlap, sSIdx = sS._findIndexOfRangeFor(strand)
-            strand.split(idx, updateSequence=False)
-            strand = sS._strandList[sSIdx+1] if is5to3 else sS._strandList[sSIdx]
-
-        # now iterate through all the breaks
-        for b in breakItems[0:-1]:
-            if strand.oligo().length() > b:
-                strand, idx, is5to3 = getStrandAtLengthInOligo(strand, b)
+        try:
+            strand = oligo.strand5p()
+            if oligo.isLoop():
+                # start things off make first cut
+                length0 = sum(tokenList[0:startingToken+1])
+                strand, idx, is5to3 = getStrandAtLengthInOligo(strand, length0-minStapleLegLen)
                 sS = strand.strandSet()
                 found, sSIdx = sS.getStrandIndex(strand)
                 # found, overlap, sSIdx = sS._findIndexOfRangeFor(strand)
                 strand.split(idx, updateSequence=False)
                 strand = sS._strandList[sSIdx+1] if is5to3 else sS._strandList[sSIdx]
-            else:
-                raise Exception("Oligo length %d is shorter than break length %d" % (strand.oligo().length(), b))
-        util.endSuperMacro(part)
+
+            # now iterate through all the breaks
+            for b in breakItems[0:-1]:
+                if strand.oligo().length() > b:
+                    strand, idx, is5to3 = getStrandAtLengthInOligo(strand, b)
+                    sS = strand.strandSet()
+                    found, sSIdx = sS.getStrandIndex(strand)
+                    # found, overlap, sSIdx = sS._findIndexOfRangeFor(strand)
+                    strand.split(idx, updateSequence=False)
+                    strand = sS._strandList[sSIdx+1] if is5to3 else sS._strandList[sSIdx]
+                else:
+                    raise Exception("Oligo length %d is shorter than break length %d" % (strand.oligo().length(), b))
+        finally:
+            util.endSuperMacro(part)
 # end def
 
 def getStrandAtLengthInOligo(strandIn, length):
@@ -326,22 +435,21 @@ def breakStaple(oligo, settings):
 def performBreaks(part, fullBreakptSoln):
     """ fullBreakptSoln is in the format of an IBS (see breakStrands).
     This function performs the breaks proposed by the solution. """
-    util.beginSuperMacro(part, desc="Auto-Break")
-    breakList, oligo = [], None  # Only for logging purposes
-    if fullBreakptSoln != None:  # Skip the first breakpoint
-        fullBreakptSoln = fullBreakptSoln[1]
-    while fullBreakptSoln != None:
-        curNode = fullBreakptSoln[2]
-        fullBreakptSoln = fullBreakptSoln[1]  # Walk up the linked list
-        if fullBreakptSoln == None:  # Skip last breakpoint
-            break
-        pos, strand, idx, isTerminal = curNode
-        if strand.isDrawn5to3():
-            idx -= 1 # Our indices correspond to the left side of the base
-        strand.split(idx, updateSequence=False)
-        breakList.append(curNode)  # Logging purposes only
-    # print 'Breaks for %s at: %s'%(oligo, ' '.join(str(p) for p in breakList))
-    util.endSuperMacro(part)
+    with util.superMacro(part, desc="Auto-Break"):
+        breakList, oligo = [], None  # Only for logging purposes
+        if fullBreakptSoln != None:  # Skip the first breakpoint
+            fullBreakptSoln = fullBreakptSoln[1]
+        while fullBreakptSoln != None:
+            curNode = fullBreakptSoln[2]
+            fullBreakptSoln = fullBreakptSoln[1]  # Walk up the linked list
+            if fullBreakptSoln == None:  # Skip last breakpoint
+                break
+            pos, strand, idx, isTerminal = curNode
+            if strand.isDrawn5to3():
+                idx -= 1 # Our indices correspond to the left side of the base
+            strand.split(idx, updateSequence=False)
+            breakList.append(curNode)  # Logging purposes only
+        # print 'Breaks for %s at: %s'%(oligo, ' '.join(str(p) for p in breakList))
 
 def possibleBreakpoints(oligo, settings):
     """ Returns a list of possible breakpoints (nodes) in the format:
@@ -33,6 +33,7 @@ class AutobreakConfig(QDialog, autobreakconfig_ui.Ui_Dialog):
                 'minStapleLegLen' : self.minLegLengthSpinBox.value(),\
                 'minStapleLen'    : self.minLengthSpinBox.value(),\
                 'maxStapleLen'    : self.maxLengthSpinBox.value(),\
+                'workers'         : self.workersSpinBox.value(),\
             }
             self.handler.win.pathGraphicsView.setViewportUpdateOn(False)
             # print "pre verify"
@@ -11,14 +11,14 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 class Ui_Dialog(object):
     def setupUi(self, Dialog):
         Dialog.setObjectName("Dialog")
-        Dialog.resize(297, 264)
+        Dialog.resize(297, 294)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(Dialog.sizePolicy().hasHeightForWidth())
         Dialog.setSizePolicy(sizePolicy)
         self.layoutWidget = QtWidgets.QWidget(Dialog)
-        self.layoutWidget.setGeometry(QtCore.QRect(10, 0, 276, 251))
+        self.layoutWidget.setGeometry(QtCore.QRect(10, 0, 276, 281))
         self.layoutWidget.setObjectName("layoutWidget")
         self.verticalLayout = QtWidgets.QVBoxLayout(self.layoutWidget)
         self.verticalLayout.setContentsMargins(0, 0, 0, 0)
@@ -63,6 +63,15 @@ class Ui_Dialog(object):
         self.minLegLengthSpinBox.setProperty("value", 3)
         self.minLegLengthSpinBox.setObjectName("minLegLengthSpinBox")
         self.formLayout.setWidget(5, QtWidgets.QFormLayout.FieldRole, self.minLegLengthSpinBox)
+        self.workersLabel = QtWidgets.QLabel(self.layoutWidget)
+        self.workersLabel.setObjectName("workersLabel")
+        self.formLayout.setWidget(6, QtWidgets.QFormLayout.LabelRole, self.workersLabel)
+        self.workersSpinBox = QtWidgets.QSpinBox(self.layoutWidget)
+        self.workersSpinBox.setMinimum(0)
+        self.workersSpinBox.setMaximum(256)
+        self.workersSpinBox.setProperty("value", 1)
+        self.workersSpinBox.setObjectName("workersSpinBox")
+        self.formLayout.setWidget(6, QtWidgets.QFormLayout.FieldRole, self.workersSpinBox)
         self.verticalLayout.addLayout(self.formLayout)
         self.buttonBox = QtWidgets.QDialogButtonBox(self.layoutWidget)
         self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
@@ -77,7 +86,8 @@ class Ui_Dialog(object):
         Dialog.setTabOrder(self.targetLengthSpinBox, self.minLengthSpinBox)
         Dialog.setTabOrder(self.minLengthSpinBox, self.maxLengthSpinBox)
         Dialog.setTabOrder(self.maxLengthSpinBox, self.minLegLengthSpinBox)
-        Dialog.setTabOrder(self.minLegLengthSpinBox, self.buttonBox)
+        Dialog.setTabOrder(self.minLegLengthSpinBox, self.workersSpinBox)
+        Dialog.setTabOrder(self.workersSpinBox, self.buttonBox)
 
     def retranslateUi(self, Dialog):
         _translate = QtCore.QCoreApplication.translate
@@ -87,4 +97,6 @@ class Ui_Dialog(object):
         self.targetLengthLabel.setText(_translate("Dialog", "target length"))
         self.minLengthLabel.setText(_translate("Dialog", "min length"))
         self.minLegLengthLabel.setText(_translate("Dialog", "min distance to xover"))
+        self.workersLabel.setText(_translate("Dialog", "worker processes"))
+        self.workersSpinBox.setSpecialValueText(_translate("Dialog", "all cores"))
 
@@ -34,35 +34,135 @@ In order to have a positive and negative version of each node we eliminate '0'
 The graph need be directed to enforce the visitation of all nodes
 
 Dijkstra's algorithm and Floyd Warshall are supported solutions
+
+Since the graph is acyclic and every edge only reaches max_staple_length
+ahead, minimumPath solves it by default with minPathDP, a dynamic program
+that never builds the graph and doesn't need networkx. The networkx solvers
+are kept for cross-checking it.
 '''
 try:
     import networkx as nx
     # print("imported networkx")
-except:
-    print("trying embedded nx")
-    import include.networkx as nx
-    print("got embedded")
+except ImportError:
+    try:
+        import include.networkx as nx
+    except ImportError:
+        nx = None  # the default "dp" solver doesn't need networkx
 
 # the DEFINE parameters address the staple_limits argument parameters
 MIN_IND = 0     # minimum length index
 MAX_IND = 1     # maximum length index
 OPT_IND = 2     # optimum length index
 
+# solver backends for minimumPath
+SOLVER_DP = 'dp'        # minPathDP, the default
+SOLVER_NX = 'networkx'  # StapleGraph.minPathDijkstra, dp if no networkx
+SOLVER_CHECK = 'check'  # run both, and complain if the scores differ
+
 def minimumPath(tokenlist_and_staple_limits):
-    tokenList, staple_limits, idx = tokenlist_and_staple_limits
-    sg = StapleGraph(token_list_in=tokenList, staple_limits=staple_limits)
-    # print sg.graph().nodes(), sg.graph().edges()
-    # if len(sg.graph().nodes()) > 1:
-    #     print "total nodes:", len(sg.graph().nodes())
+    """
+    Takes a tuple (tokenList, staple_limits, idx) or
+    (tokenList, staple_limits, idx, solver) and returns (output, idx), where
+    output is [start_index, [L1, L2, ...LN], score], or None if the token
+    list can't be broken within staple_limits.
+    """
+    tokenList, staple_limits, idx = tokenlist_and_staple_limits[0:3]
+    if len(tokenlist_and_staple_limits) > 3:
+        solver = tokenlist_and_staple_limits[3]
+    else:
+        solver = SOLVER_DP
     try:
-        output = sg.minPathDijkstra()
+        if solver == SOLVER_NX and nx is not None:
+            sg = StapleGraph(token_list_in=tokenList, staple_limits=staple_limits)
+            output = sg.minPathDijkstra()
+        else:
+            output = minPathDP(tokenList, staple_limits)
+            if solver == SOLVER_CHECK and nx is not None:
+                crossCheck(tokenList, staple_limits, output)
         return (output, idx)
         # print "Solved!"
-    except:
+    except Exception:
         print("Oligo is unsolvable at current setttings for length")
         return None
-    # else: 
-    #     return None
+# end def
+
+def crossCheck(token_list, staple_limits, output):
+    """
+    Solves token_list with StapleGraph.minPathDijkstra and prints a warning
+    if its score differs from output's, the minPathDP solution. Ties may be
+    broken differently, so only the scores are compared.
+    """
+    try:
+        sg = StapleGraph(token_list_in=token_list, staple_limits=staple_limits)
+        nxOutput = sg.minPathDijkstra()
+    except Exception:
+        nxOutput = None
+    if nxOutput is None or nxOutput[2] != output[2]:
+        print("StapleGraph solvers disagree on", token_list, output, nxOutput)
+        return False
+    return True
+# end def
+
+def minPathDP(token_list, staple_limits):
+    """
+    Solves the same problem as StapleGraph.minPathDijkstra without building
+    a graph.
+
+    The StapleGraph is a DAG over the boundaries between tokens: an edge
+    from boundary i to boundary k+1 is a staple made of tokens i..k, and
+    every path from boundary 0 to boundary N is a way of breaking the
+    oligo. So the minimum path is a dynamic program over boundaries in
+    order, where each boundary only looks ahead as far as max_staple_length
+    allows, i.e. O(N*K) for K tokens per staple.
+
+    Edges follow the same rules as createGraph: the staple must be longer
+    than min_staple_length, every token but its last must start before
+    max_staple_length is reached, and no staple may span all N tokens.
+
+    Returns [start_index, [L1, L2, ...LN], score] like formatOutput, and
+    raises ValueError if there is no solution.
+    """
+    min_staple_length = staple_limits[MIN_IND]
+    max_staple_length = staple_limits[MAX_IND]
+    optimum_staple = staple_limits[OPT_IND]
+    n = len(token_list)
+    inf = float('inf')
+    cost = [inf] * (n + 1)  # cost[b] is the best score to reach boundary b
+    prev = [-1] * (n + 1)
+    cost[0] = 0
+    for i in range(n):
+        cost_i = cost[i]
+        if cost_i == inf:
+            continue
+        # a staple starting at token i may hold at most n-1 tokens
+        k_max = min(n, i + n - 1)
+        staple_length = 0
+        for k in range(i, k_max):
+            if staple_length >= max_staple_length:
+                break
+            staple_length += token_list[k]
+            if staple_length > min_staple_length:
+                # on ties prefer the predecessor with the lower cost, which
+                # is the one Dijkstra settles first, so both solvers almost
+                # always pick the same path and not just the same score
+                c = cost_i + abs(staple_length - optimum_staple)
+                if c < cost[k + 1] or \
+                        (c == cost[k + 1] and cost_i < cost[prev[k + 1]]):
+                    cost[k + 1] = c
+                    prev[k + 1] = i
+        # end for
+    # end for
+    if cost[n] == inf:
+        raise ValueError("no staple path for %s" % (token_list,))
+    lengths = []
+    b = n
+    while b > 0:
+        i = prev[b]
+        lengths.append(sum(token_list[i:b]))
+        b = i
+    lengths.reverse()
+    score = sum([abs(optimum_staple - x) for x in lengths])
+    return [0, lengths, score]
 # end def
 
 
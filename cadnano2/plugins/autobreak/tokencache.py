@@ -0,0 +1,145 @@
+"""
+tokencache.py
+
+A bounded cache of autobreak solutions. Oligos with the same token list
+and loop-ness break the same way for the same staple limits, so the best
+solution (the staple lengths and the rotation they start at) is stored
+under a key made of those limits plus a digest of the token list.
+
+The cache is an LRU: once it holds maxSize entries, the least recently
+used one is dropped for every new entry. It can be saved to and loaded
+from a JSON file so that solutions carry over between runs.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 4096
+FILE_VERSION = 1
+
+
+def tokenCacheKey(tokenList, isLoop, staple_limits):
+    """
+    Returns the cache key for tokenList: the loop flag and staple_limits
+    (min, max, target) in plain text, then a digest of the tokens.
+    """
+    digest = hashlib.blake2b(','.join(map(str, tokenList)).encode('ascii'),
+                             digest_size=16).hexdigest()
+    limits = ','.join(map(str, staple_limits))
+    return "%s%s:%d:%s" % ('L' if isLoop else 'S', limits,
+                           len(tokenList), digest)
+# end def
+
+
+class TokenCache(object):
+    """
+    Maps tokenCacheKey() keys to (breakItems, shortestScoreIdx) solutions.
+    hits and misses count the lookups made with get().
+    """
+    def __init__(self, maxSize=DEFAULT_MAX_SIZE):
+        self._entries = OrderedDict()
+        self._maxSize = maxSize
+        self._loadedPaths = set()
+        self.hits = 0
+        self.misses = 0
+    # end def
+
+    def __len__(self):
+        return len(self._entries)
+    # end def
+
+    def __contains__(self, key):
+        return key in self._entries
+    # end def
+
+    def maxSize(self):
+        return self._maxSize
+    # end def
+
+    def setMaxSize(self, maxSize):
+        self._maxSize = maxSize
+        self._evict()
+    # end def
+
+    def get(self, key):
+        """Returns the solution for key, or None, and counts the lookup."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+    # end def
+
+    def add(self, key, breakItems, shortestScoreIdx):
+        self._entries[key] = (list(breakItems), shortestScoreIdx)
+        self._entries.move_to_end(key)
+        self._evict()
+    # end def
+
+    def clear(self):
+        """Drops all entries and resets the counters."""
+        self._entries.clear()
+        self._loadedPaths.clear()
+        self.hits = 0
+        self.misses = 0
+    # end def
+
+    def stats(self):
+        """Returns a dict of size, maxSize, hits, misses and hitRate."""
+        lookups = self.hits + self.misses
+        return {'size': len(self._entries),
+                'maxSize': self._maxSize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': float(self.hits) / lookups if lookups else 0.0}
+    # end def
+
+    def _evict(self):
+        while len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+    # end def
+
+    ### PERSISTENCE ###
+    def save(self, path):
+        """
+        Writes the entries to path as JSON, least recently used first. The
+        file is written next to path and moved over it, so a failed save
+        never leaves a truncated cache behind.
+        """
+        data = {'version': FILE_VERSION,
+                'entries': [[key, breakItems, idx] for key, (breakItems, idx) \
+                                                in self._entries.items()]}
+        tmpPath = path + '.tmp'
+        with open(tmpPath, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmpPath, path)
+    # end def
+
+    def hasLoaded(self, path):
+        return os.path.abspath(path) in self._loadedPaths
+    # end def
+
+    def load(self, path):
+        """
+        Adds the entries saved at path. Returns the number of entries
+        read, or 0 if path doesn't exist or isn't a cache file of this
+        version.
+        """
+        self._loadedPaths.add(os.path.abspath(path))
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return 0
+        if not isinstance(data, dict) or data.get('version') != FILE_VERSION:
+            return 0
+        entries = data.get('entries', [])
+        for key, breakItems, idx in entries:
+            self.add(key, breakItems, idx)
+        return len(entries)
+    # end def
+# end class
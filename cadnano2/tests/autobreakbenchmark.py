@@ -0,0 +1,89 @@
+"""
+autobreakbenchmark.py
+
+Compares the autobreak staple graph solvers on the staple oligos of the
+functional test designs. Each design is decoded and autostapled headless,
+its staple oligos are tokenized the way autobreak.breakStaples does, and
+every resulting token list (including loop rotations) is solved with both
+staplegraph.minPathDP and the networkx StapleGraph.minPathDijkstra.
+
+Usage: python -m cadnano2.tests.autobreakbenchmark [design.json ...]
+"""
+
+import glob
+import os
+import sys
+import time
+
+from cadnano2 import batch
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+
+
+def designTokenLists(path, settings):
+    """Returns the minimumPath arguments for the staple oligos of path."""
+    from cadnano2.plugins.autobreak import autobreak
+    job = batch.BatchJob(path, batch.parseArgs([]))
+    job.run(['decode', 'autostaple'])
+    staple_limits = [settings['minStapleLen'], settings['maxStapleLen'],
+                     settings['tgtStapleLen']]
+    tokenLists = []
+    for oligo in job.part.oligos():
+        if not oligo.isStaple():
+            continue
+        tokenList = autobreak.tokenizeOligo(oligo, settings)
+        if tokenList:
+            tokenLists.extend(autobreak.tokenListRotations(oligo, tokenList,
+                                    staple_limits, settings['maxStapleLen']))
+    return tokenLists
+# end def
+
+
+def timeSolver(tokenLists, solver):
+    """Returns (seconds, results) for solving tokenLists with solver."""
+    from cadnano2.plugins.autobreak import staplegraph
+    t0 = time.perf_counter()
+    results = [staplegraph.minimumPath(t[0:3] + (solver,)) for t in tokenLists]
+    return time.perf_counter() - t0, results
+# end def
+
+
+def main(paths=None):
+    from cadnano2.plugins.autobreak import staplegraph
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(INPUT_DIR, '*.json')))
+    batch.initHeadless()
+    settings = dict(batch.DEFAULT_AUTOBREAK_SETTINGS)
+    print("%-28s %7s %10s %10s %8s %10s" % \
+            ("design", "lists", "dp (s)", "nx (s)", "speedup", "same path"))
+    mismatches = 0
+    for path in paths:
+        try:
+            tokenLists = designTokenLists(path, settings)
+        except Exception as e:
+            print("%-28s skipped: %r" % (os.path.basename(path), e))
+            continue
+        dpTime, dpResults = timeSolver(tokenLists, staplegraph.SOLVER_DP)
+        if staplegraph.nx is None:
+            nxTime, nxResults = None, dpResults
+        else:
+            nxTime, nxResults = timeSolver(tokenLists, staplegraph.SOLVER_NX)
+        samePath = 0
+        for a, b in zip(dpResults, nxResults):
+            if (a and a[0][2]) != (b and b[0][2]):
+                mismatches += 1
+                print("score mismatch:", a, b)
+            samePath += a == b
+        print("%-28s %7d %10.3f %10s %8s %10d" % (os.path.basename(path),
+                len(tokenLists), dpTime,
+                "-" if nxTime is None else "%.3f" % nxTime,
+                "-" if nxTime is None else "%.1fx" % (nxTime / max(dpTime, 1e-9)),
+                samePath))
+    # end for
+    return 1 if mismatches else 0
+# end def
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
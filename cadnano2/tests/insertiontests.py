@@ -0,0 +1,164 @@
+"""
+insertiontests.py
+
+InsertionIndex against the sorted-dict computations it replaced, on its
+own and as the Part and Strand keep it through adding, changing and
+removing insertions and skips, resizing the part, and undo and redo.
+
+Run with "python -m unittest cadnano2.tests.insertiontests" from the
+repository root.
+"""
+
+import random
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.model.document import Document
+from cadnano2.model.insertionindex import InsertionIndex
+
+
+def sortedLengthBetween(lengths, idxL, idxH):
+    """Sums the dict lengths over [idxL, idxH] the way Strand used to."""
+    total = 0
+    for idx in sorted(lengths.keys()):
+        if idxL <= idx <= idxH:
+            total += lengths[idx]
+    return total
+# end def
+
+
+def checkIndex(test, index, lengths, maxIdx):
+    """Compares every query of index with the dict lengths."""
+    test.assertEqual(len(index), len(lengths))
+    for idxL in range(-1, maxIdx + 2):
+        test.assertEqual(idxL in index, idxL in lengths)
+        below = sortedLengthBetween(lengths, min(lengths, default=0),
+                                    idxL - 1)
+        test.assertEqual(index.position(idxL), idxL + below)
+        for idxH in range(idxL, maxIdx + 2, 2):
+            idxs = [idx for idx in sorted(lengths) if idxL <= idx <= idxH]
+            test.assertEqual(index.idxsBetween(idxL, idxH), idxs)
+            test.assertEqual(index.lengthsBetween(idxL, idxH),
+                             [lengths[idx] for idx in idxs])
+            test.assertEqual(index.hasAnyBetween(idxL, idxH), bool(idxs))
+            test.assertEqual(index.lengthBetween(idxL, idxH),
+                             sortedLengthBetween(lengths, idxL, idxH))
+# end def
+
+
+class InsertionIndexTests(unittest.TestCase):
+    def testRandomEdits(self):
+        """Insertions and skips added, changed, removed and shifted."""
+        rand = random.Random(1)
+        index = InsertionIndex()
+        lengths = {}
+        for step in range(200):
+            action = rand.random()
+            idx = rand.randint(0, 40)
+            if action < 0.5:
+                length = rand.choice([-1, 1, 2, 5])
+                index.add(idx, length)
+                lengths[idx] = length
+            elif action < 0.7 and lengths:
+                idx = rand.choice(list(lengths))
+                length = rand.choice([-1, 3])
+                index.setLength(idx, length)
+                lengths[idx] = length
+            elif action < 0.95:
+                index.remove(idx)  # may not be there
+                lengths.pop(idx, None)
+            else:
+                delta = rand.choice([-2, 3])
+                index.shift(delta)
+                lengths = dict((i + delta, length)
+                               for i, length in lengths.items())
+            # query between edits, so the prefix sums are rebuilt often
+            checkIndex(self, index, lengths, 45)
+    # end def
+# end class
+
+
+class PartInsertionIndexTests(unittest.TestCase):
+    def setUp(self):
+        """A scaffold strand and two staple strands on one helix."""
+        document = Document()
+        self.part = part = document.addHoneycombPart()
+        part.createVirtualHelix(0, 0, useUndoStack=False)
+        self.vh = part.virtualHelixAtCoord((0, 0))
+        maxIdx = part.maxBaseIdx()
+        scaffoldSet = self.vh.scaffoldStrandSet()
+        stapleSet = self.vh.stapleStrandSet()
+        scaffoldSet.createStrand(0, maxIdx, useUndoStack=False)
+        stapleSet.createStrand(0, 15, useUndoStack=False)
+        stapleSet.createStrand(20, maxIdx, useUndoStack=False)
+    # end def
+
+    def insertionLengths(self):
+        insertions = self.part.insertions()[self.vh.coord()]
+        return dict((idx, insertion.length())
+                    for idx, insertion in insertions.items())
+    # end def
+
+    def check(self):
+        """The index and the strands agree with the insertion dict."""
+        lengths = self.insertionLengths()
+        index = self.part.insertionIndex(self.vh.coord())
+        checkIndex(self, index, lengths, self.part.maxBaseIdx())
+        for strandSet in self.vh.getStrandSets():
+            for strand in strandSet:
+                idxL, idxH = strand.idxs()
+                inside = sortedLengthBetween(lengths, idxL, idxH)
+                total = strand.length() + inside
+                self.assertEqual(strand.totalLength(), total)
+                self.assertEqual(strand.totalLength(cached=False), total)
+                self.assertEqual(
+                        strand.insertionLengthBetweenIdxs(idxL, idxH), inside)
+                self.assertEqual([insertion.idx() for insertion in
+                                  strand.insertionsOnStrand()],
+                                 [idx for idx in sorted(lengths)
+                                  if idxL <= idx <= idxH])
+                self.assertEqual(strand.hasInsertion(),
+                                 any(idxL <= idx <= idxH for idx in lengths))
+    # end def
+
+    def testEditsUndoAndRedo(self):
+        part = self.part
+        stack = part.undoStack()
+        scaffold = self.vh.scaffoldStrandSet().getStrand(0)
+        start = stack.count()
+        states = [self.insertionLengths()]
+
+        def step(action, *args):
+            action(*args)
+            self.check()
+            states.append(self.insertionLengths())
+
+        step(scaffold.addInsertion, 10, 3)
+        step(scaffold.addInsertion, 4, -1)
+        step(scaffold.addInsertion, 30, 1)
+        step(scaffold.addInsertion, 17, -1)  # no staple there
+        step(scaffold.changeInsertion, 10, 5)
+        step(scaffold.changeInsertion, 30, -1)
+        step(scaffold.removeInsertion, 4)
+        step(part.resizeVirtualHelices, 5, 5)
+        scaffold = self.vh.scaffoldStrandSet().getStrand(15)
+        step(scaffold.addInsertion, 8, 2)
+        step(scaffold.removeInsertion, 15)
+        self.assertEqual(stack.count() - start, len(states) - 1)
+        for state in reversed(states[:-1]):
+            stack.undo()
+            self.assertEqual(self.insertionLengths(), state)
+            self.check()
+        for state in states[1:]:
+            stack.redo()
+            self.assertEqual(self.insertionLengths(), state)
+            self.check()
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
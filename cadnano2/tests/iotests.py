@@ -0,0 +1,189 @@
+"""
+iotests.py
+
+Reading and writing designs: the binary .cn2b format against the legacy
+.json encoder, and the streaming .json reader against json.loads.
+
+Run with "python -m unittest cadnano2.tests.iotests" from the repository
+root.
+"""
+
+import glob
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.convert import guessLatticeType
+from cadnano2.model.document import Document
+from cadnano2.model.io import binaryencoder
+from cadnano2.model.io.binarydecoder import decodeBinary, unpackHelices
+from cadnano2.model.io.binaryencoder import encodeBinary
+from cadnano2.model.io.decoder import decodeFile, decodePath
+from cadnano2.model.io.jsonstream import streamObject
+from cadnano2.model.io.legacydecoder import import_legacy_dict
+from cadnano2.model.io.legacyencoder import write_legacy_json
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+DESIGNS = sorted(glob.glob(os.path.join(INPUT_DIR, '*.json')))
+
+
+def decodeDesign(path):
+    """Returns the document of the design file at path."""
+    document = Document()
+    decodePath(document, path)
+    return document
+# end def
+
+
+def legacyJson(document, name='design.json'):
+    """Returns the legacy .json text of document."""
+    part = document.selectedPart()
+    out = io.StringIO()
+    write_legacy_json(document, name, batch.helixOrder(part), out)
+    return out.getvalue()
+# end def
+
+
+def binaryDesign(document, compress=True):
+    """Returns the .cn2b bytes of document."""
+    out = io.BytesIO()
+    encodeBinary(document, batch.helixOrder(document.selectedPart()), out,
+                 compress)
+    return out.getvalue()
+# end def
+
+
+class BinaryDesignTests(unittest.TestCase):
+    def testRoundTrip(self):
+        """
+        Every functional test design comes back from .cn2b with the same
+        legacy .json as it had, compressed or not.
+        """
+        for path in DESIGNS:
+            document = decodeDesign(path)
+            expected = legacyJson(document)
+            for compress in (True, False):
+                copy = Document()
+                decodeBinary(copy, binaryDesign(document, compress))
+                self.assertEqual(legacyJson(copy), expected,
+                                 "%s, compress=%s" % (path, compress))
+    # end def
+
+    def testDecodePath(self):
+        """decodePath tells .cn2b files from .json by their magic."""
+        path = os.path.join(INPUT_DIR, 'simple42legacy.json')
+        document = decodeDesign(path)
+        tempDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempDir)
+        fname = os.path.join(tempDir, 'simple42legacy.cn2b')
+        with open(fname, 'wb') as f:
+            f.write(binaryDesign(document))
+        self.assertEqual(legacyJson(decodeDesign(fname)),
+                         legacyJson(document))
+    # end def
+
+    def testBadMagic(self):
+        data = binaryDesign(decodeDesign(DESIGNS[0]))
+        self.assertRaises(ValueError, unpackHelices, b'CN2X' + data[4:])
+        self.assertRaises(ValueError, unpackHelices, b'{"name":"x"}')
+    # end def
+
+    def testNewerVersion(self):
+        data = binaryDesign(decodeDesign(DESIGNS[0]))
+        magic, version, flags, latticeType, numBases, numHelices = \
+                                    binaryencoder.HEADER.unpack_from(data)
+        header = binaryencoder.HEADER.pack(magic, binaryencoder.VERSION + 1,
+                                           flags, latticeType, numBases,
+                                           numHelices)
+        self.assertRaisesRegex(ValueError, 'newer', unpackHelices,
+                               header + data[binaryencoder.HEADER.size:])
+    # end def
+
+    def testTruncated(self):
+        """A file cut short anywhere is a ValueError, not a bad design."""
+        document = decodeDesign(os.path.join(INPUT_DIR, 'simple42legacy.json'))
+        for compress in (True, False):
+            data = binaryDesign(document, compress)
+            unpackHelices(data)
+            for end in range(len(data)):
+                self.assertRaises(ValueError, unpackHelices, data[:end])
+    # end def
+# end class
+
+
+class JSONStreamTests(unittest.TestCase):
+    def streamed(self, f, chunkSize):
+        """Returns what streamObject reads from f, vstrands included."""
+        vstrands = []
+        obj = streamObject(f, {'vstrands': vstrands.append}, chunkSize)
+        obj['vstrands'] = vstrands
+        return obj
+    # end def
+
+    def testChunkSizes(self):
+        """Any chunk size, from bytes or text, reads what json.loads does."""
+        for path in DESIGNS:
+            with open(path, 'rb') as f:
+                data = f.read()
+            expected = json.loads(data.decode('utf-8'))
+            small = len(data) < 100000
+            for chunkSize in ((1, 2, 3, 7, 64, 1 << 20) if small
+                              else (1000, 1 << 20)):
+                self.assertEqual(self.streamed(io.BytesIO(data), chunkSize),
+                                 expected, "%s, %d" % (path, chunkSize))
+                self.assertEqual(self.streamed(
+                                    io.StringIO(data.decode('utf-8')),
+                                    chunkSize), expected)
+            self.assertEqual(self.streamed(data.decode('utf-8'), 1),
+                             expected)
+    # end def
+
+    def testSplitMultibyteCharacters(self):
+        """UTF-8 characters split between two reads come out whole."""
+        expected = {'name': 'h\u00e9lice \u20ac \U0001f9ec',
+                    'vstrands': [{'note': '\u00e9\U0001f9ec'}, 1.5e3, [],
+                                 '\u20ac'],
+                    'n': -12}
+        data = json.dumps(expected, ensure_ascii=False).encode('utf-8')
+        for chunkSize in range(1, 6):
+            self.assertEqual(self.streamed(io.BytesIO(data), chunkSize),
+                             expected)
+    # end def
+
+    def testTruncated(self):
+        """Input cut short anywhere raises ValueError."""
+        data = json.dumps({'name': 'x\u00e9', 'vstrands': [{'num': 12},
+                           {'num': 3}], 'n': 42}, ensure_ascii=False)
+        data = data.encode('utf-8')
+        for end in range(len(data)):
+            for chunkSize in (1, 4, 1 << 20):
+                self.assertRaises(ValueError, self.streamed,
+                                  io.BytesIO(data[:end]), chunkSize)
+    # end def
+
+    def testDecodeFileMatchesJsonLoads(self):
+        """decodeFile builds the same model as importing json.loads."""
+        for path in DESIGNS:
+            streamed = Document()
+            with open(path) as f:
+                decodeFile(streamed, f)
+            with open(path) as f:
+                obj = json.load(f)
+            numBases = len(obj['vstrands'][0]['scaf'])
+            loaded = Document()
+            import_legacy_dict(loaded, obj, guessLatticeType(numBases))
+            self.assertEqual(legacyJson(streamed), legacyJson(loaded), path)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
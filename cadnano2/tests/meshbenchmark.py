@@ -0,0 +1,105 @@
+"""
+meshbenchmark.py
+
+Times building the solid view helix mesh of the functional test designs.
+Each design is decoded and autostapled headless, then the vertices of
+every strand are built two ways: with helixmesh.partMesh, and with the
+per-vertex loop of HalfCylinderHelixNode.createMesh it replaced (one
+strand at a time, placed as the solid view places its transform nodes).
+The ring vertices of both are compared (partMesh adds a copy of the end
+rings for the caps), and the vertex count of the instanced mesh, which
+stores one shape per strand length, is shown next to the flat one.
+
+Usage: python -m cadnano2.tests.meshbenchmark [design.json ...]
+"""
+
+import glob
+import math
+import os
+import sys
+import time
+
+from cadnano2 import batch
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+
+
+def perVertexMesh(part, helixmesh):
+    """Returns the vertices of every strand of part, one at a time."""
+    rotation = math.radians(part.twistPerBase())
+    rotationOffset = math.radians(
+                        helixmesh.ROTATION_OFFSET[part.crossSectionType()])
+    totalNumBases = part.maxBaseIdx()
+    radius = part.radius()
+    rise = helixmesh.RISE / helixmesh.EDGES_PER_BASE
+    rotAng = -rotation / helixmesh.EDGES_PER_BASE
+    gap = rise / 6.0
+    numVerticesEnds = helixmesh.RING_SIZE
+    numFacesEnds = numVerticesEnds - 2
+    vtx = []
+    strands, low, high, xs, ys, startRotations, colors = \
+                                            helixmesh.partStrands(part)
+    for i in range(len(strands)):
+        startVal, endVal = int(low[i]), int(high[i])
+        x, y = xs[i], ys[i]
+        numMiddleSections = (endVal - startVal + 1) * \
+                            helixmesh.EDGES_PER_BASE - 1
+        startPos = -(endVal - totalNumBases / 2) * helixmesh.RISE
+        startingRotation = endVal * rotation + startRotations[i]
+        for k in range(numMiddleSections + 2):
+            pos = startPos + k * rise
+            if k == 0:
+                pos += gap
+            elif k == numMiddleSections + 1:
+                pos -= gap
+            vtx.append((x, y, pos))
+            for j in range(1, numVerticesEnds):
+                rad = (j * (180 / numFacesEnds) * math.pi) / 180
+                angle = startingRotation + rad + rotAng * k
+                vtx.append((x + radius * math.cos(angle),
+                            y - radius * math.sin(angle), pos))
+    # end for
+    return vtx
+# end def
+
+
+def main(paths=None):
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(INPUT_DIR, '*09_*.json')))
+    batch.initHeadless()
+    import numpy as np
+    from cadnano2.views.solidview import helixmesh
+    print("%-28s %8s %10s %10s %12s %10s %8s %6s" % \
+            ("design", "strands", "vertices", "instanced", "vertex (s)",
+             "numpy (s)", "speedup", "same"))
+    mismatches = 0
+    for path in paths:
+        job = batch.BatchJob(path, batch.parseArgs([]))
+        job.run(['decode', 'autostaple'])
+        part = job.part
+        t0 = time.perf_counter()
+        vtx = perVertexMesh(part, helixmesh)
+        vertexTime = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        mesh = helixmesh.partMesh(part)
+        numpyTime = time.perf_counter() - t0
+        capVertices = 2 * helixmesh.RING_SIZE
+        rings = np.concatenate([np.arange(start, end - capVertices)
+                                for start, end in zip(mesh.vertexStart[:-1],
+                                                      mesh.vertexStart[1:])])
+        same = len(vtx) == len(rings) and \
+               np.allclose(np.array(vtx), mesh.vertices[rings], atol=1e-4)
+        instanced = helixmesh.instancedPartMesh(part).numberOfVertices()
+        mismatches += not same
+        print("%-28s %8d %10d %10d %12.4f %10.4f %7.1fx %6s" % \
+                (os.path.basename(path), mesh.numberOfShapes(),
+                 len(mesh.vertices), instanced, vertexTime, numpyTime,
+                 vertexTime / max(numpyTime, 1e-9), same))
+    # end for
+    return 1 if mismatches else 0
+# end def
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
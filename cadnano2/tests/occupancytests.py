@@ -0,0 +1,144 @@
+"""
+occupancytests.py
+
+The BaseOccupancy arrays of each VirtualHelix against the StrandSet,
+Strand and Part queries they stand in for, through strand, crossover and
+insertion edits, resizing the part at both ends, and undo and redo.
+
+Run with "python -m unittest cadnano2.tests.occupancytests" from the
+repository root. Skipped when NumPy isn't installed.
+"""
+
+import os
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.model import occupancy
+from cadnano2.model.enum import StrandType
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+
+
+def decodeDesign(name):
+    """Returns the part of the functional test design name."""
+    job = batch.BatchJob(os.path.join(INPUT_DIR, name), batch.parseArgs([]))
+    job.run(['decode'])
+    return job.part
+# end def
+
+
+def designState(part):
+    """Returns the strand bounds, connections and insertions of part."""
+    strands = []
+    for vh in part.getVirtualHelices():
+        for strandSet in vh.getStrandSets():
+            for strand in strandSet:
+                strands.append((vh.coord(), strand.strandType(),
+                                strand.idxs(),
+                                strand.connectionLow() is not None,
+                                strand.connectionHigh() is not None))
+    insertions = sorted((coord, idx, insertion.length())
+                        for coord, insertions in part.insertions().items()
+                        for idx, insertion in insertions.items())
+    return sorted(strands), insertions, part.maxBaseIdx()
+# end def
+
+
+@unittest.skipUnless(occupancy.isAvailable(), "NumPy is not installed")
+class BaseOccupancyTests(unittest.TestCase):
+    def checkOccupancy(self, part):
+        """Compares every occupancy query with the model it mirrors."""
+        maxIdx = part.maxBaseIdx()
+        for vh in part.getVirtualHelices():
+            occ = vh.occupancy()
+            for strandSet in vh.getStrandSets():
+                strandType = strandSet.strandType()
+                idxs = occupancy.idxArray(range(maxIdx + 2))
+                noXover = occ.noXoverAt(strandType, idxs)
+                presence = occ.presence(strandType, 0, maxIdx)
+                for idx in range(-1, maxIdx + 2):
+                    strand = strandSet.getStrand(idx)
+                    self.assertEqual(occ.hasStrandAt(strandType, idx),
+                                     strand is not None)
+                    self.assertEqual(occ.hasXoverAt(strandType, idx),
+                                     bool(strand and strand.hasXoverAt(idx)))
+                    if idx < 0:
+                        continue
+                    self.assertEqual(noXover[idx],
+                                     strandSet.hasNoStrandAtOrNoXover(idx))
+                    if idx <= maxIdx:
+                        # the arrays only grow as far as strands reach
+                        present = idx < len(presence) and presence[idx]
+                        self.assertEqual(present and noXover[idx],
+                                     strandSet.hasStrandAtAndNoXover(idx))
+            conflicts = occ.xoverConflictMask(StrandType.Scaffold)
+            for idx in range(min(maxIdx + 1, len(conflicts))):
+                self.assertEqual(conflicts[idx],
+                                 part._isNearScaffoldXover(vh, idx),
+                                 (vh.coord(), idx))
+            insertions = part.insertions()[vh.coord()]
+            lengths = occ.insertionLength(0, maxIdx)
+            self.assertEqual(list(lengths),
+                             [insertions[idx].length() if idx in insertions
+                              else 0 for idx in range(maxIdx + 1)])
+            for low in range(0, maxIdx + 1, 7):
+                self.assertEqual(occ.totalInsertionLength(low, low + 10),
+                                 int(lengths[low:low + 11].sum()))
+    # end def
+
+    def testDesigns(self):
+        """The functional test designs as decoded and autostapled."""
+        for name in ('gap_vs_skip.json', 'loops_and_skips.json',
+                     'Nature09_squarenut.json'):
+            part = decodeDesign(name)
+            self.checkOccupancy(part)
+            part.autoStaple()
+            self.checkOccupancy(part)
+    # end def
+
+    def testEditsAndResizeUndoAndRedo(self):
+        """
+        Edits before and after resizing the part at its low end, which
+        shifts every strand and insertion, and undoing and redoing them.
+        """
+        part = decodeDesign('gap_vs_skip.json')
+        stack = part.undoStack()
+        start = stack.count()
+        states = [designState(part)]
+
+        def step(action, *args):
+            action(*args)
+            self.checkOccupancy(part)
+            states.append(designState(part))
+
+        vh = part.getVirtualHelices()[0]
+        scafSS = vh.scaffoldStrandSet()
+
+        step(part.autoStaple)
+        step(scafSS.getStrand(20).addInsertion, 20, 2)
+        step(part.resizeVirtualHelices, 5, 4)
+        step(scafSS.getStrand(18).addInsertion, 18, -1)
+        # grow the lowest scaffold strand into the new bases
+        strand = next(iter(scafSS))
+        step(strand.resize, (strand.lowIdx() - 3, strand.highIdx()))
+        step(part.resizeVirtualHelices, -2, -3)
+        step(scafSS.getStrand(16).removeInsertion, 16)  # the skip, shifted
+        self.assertEqual(stack.count() - start, len(states) - 1)
+        for state in reversed(states[:-1]):
+            stack.undo()
+            self.assertEqual(designState(part), state)
+            self.checkOccupancy(part)
+        for state in states[1:]:
+            stack.redo()
+            self.assertEqual(designState(part), state)
+            self.checkOccupancy(part)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+sequencebenchmark.py
+
+Times applying a scaffold sequence to the functional test designs. Each
+design is decoded and autostapled headless, then the scaffold sequence is
+applied to every scaffold oligo two ways: with the bulk
+Oligo.ApplySequenceCommand, and with the per-strand loop it replaced
+(Strand.setSequence plus Strand.setComplementSequence for each
+overlapping complement strand). The staple sequences of both are compared.
+
+Usage: python -m cadnano2.tests.sequencebenchmark [design.json ...]
+"""
+
+import glob
+import os
+import sys
+import time
+
+from cadnano2 import batch
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+REPEAT = 5
+
+
+def perStrandApply(oligo, sequence):
+    """Applies sequence to oligo one strand pair at a time."""
+    import cadnano2.util as util
+    nS = sequence
+    for strand in oligo.strand5p().generator3pStrand():
+        usedSeq, nS = strand.setSequence(nS)
+        usedSeq = util.comp(usedSeq) if usedSeq else None
+        compSS = strand.strandSet().complementStrandSet()
+        for compStrand in compSS._findOverlappingRanges(strand):
+            compStrand.setComplementSequence(usedSeq, strand)
+# end def
+
+
+def bulkApply(oligo, sequence):
+    oligo.applySequence(sequence, useUndoStack=False)
+# end def
+
+
+def strandSequences(part):
+    """Returns the sequence of every strand of part, in a fixed order."""
+    result = []
+    for vh in sorted(part.getVirtualHelices(), key=lambda vh: vh.number()):
+        for strandSet in vh.getStrandSets():
+            result.extend(strand.sequence() for strand in strandSet)
+    return result
+# end def
+
+
+def timeApply(part, oligos, sequence, apply):
+    """Returns (seconds per pass, strand sequences) for apply."""
+    for oligo in oligos:
+        oligo.applySequence(None, useUndoStack=False)
+    t0 = time.perf_counter()
+    for i in range(REPEAT):
+        for oligo in oligos:
+            apply(oligo, sequence)
+    seconds = (time.perf_counter() - t0) / REPEAT
+    return seconds, strandSequences(part)
+# end def
+
+
+def main(paths=None):
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(INPUT_DIR, 'Science09_*.json')))
+    batch.initHeadless()
+    sequence = batch.scaffoldSequence('p8064')
+    print("%-28s %8s %12s %10s %8s %6s" % \
+            ("design", "strands", "strand (s)", "bulk (s)", "speedup", "same"))
+    mismatches = 0
+    for path in paths:
+        job = batch.BatchJob(path, batch.parseArgs([]))
+        job.run(['decode', 'autostaple'])
+        part = job.part
+        oligos = [oligo for oligo in part.oligos() if not oligo.isStaple()]
+        numStrands = sum(len(list(oligo.strand5p().generator3pStrand()))
+                         for oligo in oligos)
+        strandTime, strandSeqs = timeApply(part, oligos, sequence,
+                                           perStrandApply)
+        bulkTime, bulkSeqs = timeApply(part, oligos, sequence, bulkApply)
+        same = strandSeqs == bulkSeqs
+        mismatches += not same
+        print("%-28s %8d %12.4f %10.4f %7.1fx %6s" % \
+                (os.path.basename(path), numStrands, strandTime, bulkTime,
+                 strandTime / max(bulkTime, 1e-9), same))
+    # end for
+    return 1 if mismatches else 0
+# end def
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
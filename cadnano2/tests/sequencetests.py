@@ -0,0 +1,166 @@
+"""
+sequencetests.py
+
+Strand sequences in lazy sequence mode, kept in one buffer per helix and
+strand type, against the per-strand sequence strings of the default mode,
+through applying sequences, splitting, merging, resizing, removing and
+re-creating strands, insertions, and undo and redo of all of it.
+
+Run with "python -m unittest cadnano2.tests.sequencetests" from the
+repository root.
+"""
+
+import random
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.model.document import Document
+from cadnano2.model.enum import StrandType
+
+
+def buildPart(lazy):
+    """
+    A honeycomb part with one helix holding a scaffold strand over every
+    base and staple strands at [0, 15] and [20, maxBaseIdx].
+    """
+    document = Document()
+    part = document.addHoneycombPart()
+    part.createVirtualHelix(0, 0, useUndoStack=False)
+    vh = part.virtualHelixAtCoord((0, 0))
+    maxIdx = part.maxBaseIdx()
+    vh.scaffoldStrandSet().createStrand(0, maxIdx, useUndoStack=False)
+    vh.stapleStrandSet().createStrand(0, 15, useUndoStack=False)
+    vh.stapleStrandSet().createStrand(20, maxIdx, useUndoStack=False)
+    part.setLazySequences(lazy)
+    return part
+# end def
+
+
+def strandSet(part, strandType):
+    vh = part.virtualHelixAtCoord((0, 0))
+    if strandType == StrandType.Scaffold:
+        return vh.scaffoldStrandSet()
+    return vh.stapleStrandSet()
+# end def
+
+
+def sequenceState(part):
+    """Returns the bounds and sequence of every strand of part."""
+    return [(strand.strandType(), strand.idxs(), strand.sequence())
+            for vh in part.getVirtualHelices()
+            for ss in vh.getStrandSets() for strand in ss]
+# end def
+
+
+def randomSequence(rand, length):
+    return ''.join(rand.choice('ACGT') for i in range(length))
+# end def
+
+
+class LazySequenceTests(unittest.TestCase):
+    def setUp(self):
+        self.parts = [buildPart(False), buildPart(True)]
+        self.assertFalse(self.parts[0].lazySequences())
+        self.assertTrue(self.parts[1].lazySequences())
+        self.rand = random.Random(1)
+    # end def
+
+    def check(self):
+        """Both parts have the same strands with the same sequences."""
+        plain, lazy = [sequenceState(part) for part in self.parts]
+        self.assertEqual(lazy, plain)
+        return plain
+    # end def
+
+    def testEditsUndoAndRedo(self):
+        scaf, stap = StrandType.Scaffold, StrandType.Staple
+        stacks = [part.undoStack() for part in self.parts]
+        starts = [stack.count() for stack in stacks]
+        states = [self.check()]
+
+        def step(edit, strandType, *args):
+            """Runs edit on the strand set of strandType in both parts."""
+            for part in self.parts:
+                edit(part, strandSet(part, strandType), *args)
+            states.append(self.check())
+
+        def applySequence(part, ss, idx, seq):
+            ss.getStrand(idx).oligo().applySequence(seq)
+
+        def split(part, ss, idx, baseIdx):
+            self.assertTrue(ss.splitStrand(ss.getStrand(idx), baseIdx))
+
+        def merge(part, ss, idx):
+            strand = ss.getStrand(idx)
+            ss.mergeStrands(strand, ss.getNeighbors(strand)[1])
+
+        def resize(part, ss, idx, idxs):
+            ss.getStrand(idx).resize(idxs)
+
+        def remove(part, ss, idx):
+            ss.removeStrand(ss.getStrand(idx))
+
+        def create(part, ss, low, high):
+            ss.createStrand(low, high)
+
+        def addInsertion(part, ss, idx, length):
+            ss.getStrand(idx).addInsertion(idx, length)
+
+        maxIdx = self.parts[0].maxBaseIdx()
+        seq = randomSequence(self.rand, maxIdx + 1)
+        step(applySequence, scaf, 0, seq)
+        step(split, stap, 0, 7)
+        step(merge, stap, 0)
+        step(resize, stap, 20, (17, maxIdx))  # grows over sequenced bases
+        step(resize, stap, 17, (25, maxIdx))
+        step(split, scaf, 0, 30)
+        step(merge, scaf, 0)
+        # the buffer under a removed staple still holds its bases, which
+        # the re-created staple has to rebuild from the scaffold
+        step(remove, stap, 0)
+        step(create, stap, 2, 12)
+        # a removed scaffold strand clears its sequence from the buffer
+        step(remove, scaf, 0)
+        step(create, scaf, 5, 30)
+        # an insertion clears the sequence and shifts the buffer after it
+        step(addInsertion, scaf, 10, 2)
+        step(applySequence, scaf, 5, randomSequence(self.rand, 28))
+        step(resize, scaf, 5, (3, 35))
+        step(split, scaf, 3, 20)
+        step(merge, scaf, 3)
+        step(addInsertion, scaf, 25, -1)
+        step(applySequence, scaf, 3, randomSequence(self.rand, 34))
+        step(split, stap, 25, 33)
+        for stack, start in zip(stacks, starts):
+            self.assertEqual(stack.count() - start, len(states) - 1)
+        for state in reversed(states[:-1]):
+            for stack in stacks:
+                stack.undo()
+            self.assertEqual(self.check(), state)
+        for state in states[1:]:
+            for stack in stacks:
+                stack.redo()
+            self.assertEqual(self.check(), state)
+    # end def
+
+    def testSwitchingModes(self):
+        """Sequences carry over when lazy mode is switched on and off."""
+        plain, lazy = self.parts
+        seq = randomSequence(self.rand, plain.maxBaseIdx() + 1)
+        for part in self.parts:
+            strandSet(part, StrandType.Scaffold).getStrand(0).oligo() \
+                                                    .applySequence(seq)
+        state = self.check()
+        lazy.setLazySequences(False)
+        plain.setLazySequences(True)
+        self.assertEqual(sequenceState(lazy), state)
+        self.assertEqual(sequenceState(plain), state)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+snapshottests.py
+
+Part.snapshot, Part.restoreSnapshot and Part.deepCopy on a populated
+design: strands, crossovers, oligos, insertions, colors and sequences
+must come back exactly as they were.
+
+Run with "python -m unittest cadnano2.tests.snapshottests" from the
+repository root.
+"""
+
+import os
+import pickle
+import random
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.model.document import Document
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+
+
+def decodeDesign(name):
+    """Returns the part of the functional test design name."""
+    job = batch.BatchJob(os.path.join(INPUT_DIR, name), batch.parseArgs([]))
+    job.run(['decode'])
+    return job.part
+# end def
+
+
+def strandKey(strand):
+    if strand is None:
+        return None
+    return (strand.virtualHelix().number(), strand.strandType(),
+            strand.lowIdx())
+# end def
+
+
+def designState(part):
+    """
+    Returns a comparable summary of the helices, strands, crossovers,
+    oligos, insertions, colors and sequences of part, read through the
+    model rather than through a PartSnapshot.
+    """
+    helices = sorted((vh.number(), vh.coord())
+                     for vh in part.getVirtualHelices())
+    strands = []
+    for vh in part.getVirtualHelices():
+        for strandSet in vh.getStrandSets():
+            for strand in strandSet:
+                strands.append((strandKey(strand), strand.highIdx(),
+                                strandKey(strand.connection5p()),
+                                strandKey(strand.connection3p()),
+                                strandKey(strand.oligo().strand5p()),
+                                strand.sequence()))
+    oligos = sorted((strandKey(oligo.strand5p()), oligo.length(),
+                     oligo.isLoop(), oligo.color())
+                    for oligo in part.oligos())
+    insertions = sorted((coord, idx, insertion.length())
+                        for coord, insertions in part.insertions().items()
+                        for idx, insertion in insertions.items())
+    return (helices, sorted(strands), oligos, insertions,
+            (part.minBaseIdx(), part.maxBaseIdx()))
+# end def
+
+
+def autoBreak(part):
+    from cadnano2.plugins.autobreak import autobreak
+    settings = dict(batch.DEFAULT_AUTOBREAK_SETTINGS)
+    settings['stapleScorer'] = autobreak.tgtLengthStapleScorer
+    autobreak.breakStaples(part, settings)
+# end def
+
+
+def populate(part):
+    """
+    Adds a skip and an insertion to the scaffold, autostaples and applies
+    a sequence to every scaffold oligo.
+    """
+    rand = random.Random(1)
+    added = 0
+    for vh in part.getVirtualHelices():
+        for strand in vh.scaffoldStrandSet():
+            if added < 2 and strand.length() > 10:
+                strand.addInsertion(strand.lowIdx() + 5, 2 if added else -1)
+                added += 1
+    part.autoStaple()
+    for oligo in list(part.oligos()):
+        if oligo.isStaple():
+            continue
+        oligo.applySequence(''.join(rand.choice('ACGT')
+                                    for i in range(oligo.length())))
+# end def
+
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.part = decodeDesign('Science09_beachball_v1.json')
+        populate(self.part)
+        self.state = designState(self.part)
+        self.assertTrue(any(strand[-1] for strand in self.state[1]))
+        self.assertTrue(self.state[3])
+    # end def
+
+    def checkRestored(self, part):
+        self.assertEqual(designState(part), self.state)
+        self.assertEqual(part.verifyOligos(markErrors=False), [])
+    # end def
+
+    def testRestoreAfterAutoStapleAndBreak(self):
+        part = self.part
+        snapshot = part.snapshot()
+        stack = part.undoStack()
+        while stack.canUndo():  # back to the decoded design
+            stack.undo()
+        part.autoStaple()
+        autoBreak(part)
+        self.assertNotEqual(designState(part), self.state)
+        part.restoreSnapshot(snapshot)
+        self.checkRestored(part)
+        self.assertEqual(part.snapshot(), snapshot)
+        self.assertEqual(part.undoStack().count(), 0)
+    # end def
+
+    def testRestoreLazySequences(self):
+        part = self.part
+        snapshot = part.snapshot()
+        part.setLazySequences(True)
+        autoBreak(part)
+        part.restoreSnapshot(snapshot)
+        self.checkRestored(part)
+        part.setLazySequences(False)
+        self.checkRestored(part)
+    # end def
+
+    def testRestoreIntoAnotherPart(self):
+        """A pickled snapshot fills an empty part of another document."""
+        snapshot = pickle.loads(pickle.dumps(self.part.snapshot()))
+        self.assertEqual(snapshot, self.part.snapshot())
+        part = Document().addHoneycombPart()
+        part.restoreSnapshot(snapshot)
+        self.checkRestored(part)
+    # end def
+
+    def testDeepCopy(self):
+        part = self.part
+        copy = part.deepCopy()
+        self.assertIsNot(copy, part)
+        self.assertNotIn(copy, part.document().parts())
+        self.checkRestored(copy)
+        self.assertEqual(copy.snapshot(), part.snapshot())
+        strands = set(strand for vh in part.getVirtualHelices()
+                      for strandSet in vh.getStrandSets()
+                      for strand in strandSet)
+        for vh in copy.getVirtualHelices():
+            self.assertIsNot(vh, part.virtualHelixAtCoord(vh.coord()))
+            for strandSet in vh.getStrandSets():
+                for strand in strandSet:
+                    self.assertNotIn(strand, strands)
+        self.assertTrue(set(copy.oligos()).isdisjoint(part.oligos()))
+        # editing the copy leaves the original alone
+        autoBreak(copy)
+        self.assertNotEqual(designState(copy), self.state)
+        self.checkRestored(part)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
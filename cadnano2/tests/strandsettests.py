@@ -0,0 +1,178 @@
+"""
+strandsettests.py
+
+The bisect index of StrandSet (_lowIdxList and _highIdxList) against a
+brute-force scan of its strands, through creating, removing, resizing,
+splitting and merging strands and undoing and redoing all of it.
+
+Run with "python -m unittest cadnano2.tests.strandsettests" from the
+repository root.
+"""
+
+import random
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.model.document import Document
+
+
+def strandBounds(strandSet):
+    return [strand.idxs() for strand in strandSet]
+# end def
+
+
+class _Range(object):
+    """Stands in for a strand as a query of _findOverlappingRanges."""
+    def __init__(self, low, high):
+        self._idxs = (low, high)
+    # end def
+
+    def idxs(self):
+        return self._idxs
+    # end def
+# end class
+
+
+class StrandSetIndexTests(unittest.TestCase):
+    def setUp(self):
+        """An empty honeycomb part with one helix."""
+        document = Document()
+        self.part = document.addHoneycombPart()
+        self.part.createVirtualHelix(0, 0, useUndoStack=False)
+        vh = self.part.virtualHelixAtCoord((0, 0))
+        self.strandSet = vh.stapleStrandSet()
+        self.maxIdx = self.part.maxBaseIdx()
+    # end def
+
+    def checkIndex(self):
+        """Compares every query of the index with a scan of the strands."""
+        ss = self.strandSet
+        strands = list(ss)
+        self.assertEqual(ss._lowIdxList, [s.lowIdx() for s in strands])
+        self.assertEqual(ss._highIdxList, [s.highIdx() for s in strands])
+        for i, strand in enumerate(strands):
+            self.assertEqual(ss._findIndexOfRangeFor(strand), (True, False, i))
+            self.assertEqual(ss.getStrandIndex(strand), (True, i))
+        baseIdxs = range(-1, self.maxIdx + 2)
+        for idx in baseIdxs:
+            covering = [s for s in strands if s.lowIdx() <= idx <= s.highIdx()]
+            self.assertIs(ss.getStrand(idx), covering[0] if covering else None)
+            if covering:
+                self.assertEqual(ss.getBoundsOfEmptyRegionContaining(idx),
+                                 (None, None))
+            elif 0 <= idx <= self.maxIdx:
+                low, high = ss.getBoundsOfEmptyRegionContaining(idx)
+                self.assertTrue(low <= idx <= high)
+                self.assertFalse(ss.hasStrandAt(low, high))
+                self.assertTrue(low == 0 or ss.getStrand(low - 1))
+                self.assertTrue(high == self.maxIdx or ss.getStrand(high + 1))
+        for low in baseIdxs:
+            for high in range(low, self.maxIdx + 2, 3):
+                overlapping = [s for s in strands
+                               if s.lowIdx() <= high and low <= s.highIdx()]
+                self.assertEqual(ss.hasStrandAt(low, high), bool(overlapping))
+                self.assertEqual(ss.getOverlappingStrands(low, high),
+                                 overlapping)
+                self.assertEqual(list(ss._findOverlappingRanges(
+                                        _Range(low, high))), overlapping)
+                insertAt = sum(1 for s in strands if s.highIdx() < low)
+                self.assertEqual(ss.getIndexToInsert(low, high),
+                                 (False, None) if overlapping
+                                 else (True, insertAt))
+    # end def
+
+    def testEditsUndoAndRedo(self):
+        ss = self.strandSet
+        stack = self.part.undoStack()
+        start = stack.count()
+        states = [strandBounds(ss)]
+
+        def step(action, *args):
+            action(*args)
+            self.checkIndex()
+            states.append(strandBounds(ss))
+
+        step(ss.createStrand, 10, 20)
+        step(ss.createStrand, 0, 5)
+        step(ss.createStrand, 30, 40)
+        step(ss.createStrand, 22, 25)
+        step(ss.getStrand(22).resize, (22, 28))
+        step(ss.getStrand(10).resize, (8, 21))
+        step(ss.splitStrand, ss.getStrand(30), 35)
+        step(ss.removeStrand, ss.getStrand(0))
+        step(ss.mergeStrands, ss.getStrand(8), ss.getStrand(22))
+        step(ss.getStrand(31).resize, (29, 33))
+        self.assertEqual(stack.count() - start, len(states) - 1)
+        for state in reversed(states[:-1]):
+            stack.undo()
+            self.assertEqual(strandBounds(ss), state)
+            self.checkIndex()
+        for state in states[1:]:
+            stack.redo()
+            self.assertEqual(strandBounds(ss), state)
+            self.checkIndex()
+    # end def
+
+    def testRandomEdits(self):
+        """Random edits, then undo and redo of all of them."""
+        ss = self.strandSet
+        stack = self.part.undoStack()
+        start = stack.count()
+        rand = random.Random(1)
+        states = [strandBounds(ss)]
+        while len(states) < 60:
+            strands = list(ss)
+            action = rand.choice(['create', 'create', 'remove', 'resize',
+                                  'split', 'merge'])
+            if action == 'create':
+                low, high = ss.getBoundsOfEmptyRegionContaining(
+                                            rand.randint(0, self.maxIdx))
+                if low is None:
+                    continue
+                low = rand.randint(low, high)
+                ss.createStrand(low, rand.randint(low, high))
+            elif not strands:
+                continue
+            elif action == 'remove':
+                ss.removeStrand(rand.choice(strands))
+            elif action == 'resize':
+                strand = rand.choice(strands)
+                lowStrand, highStrand = ss.getNeighbors(strand)
+                low = rand.randint(lowStrand.highIdx() + 1 if lowStrand
+                                   else 0, strand.highIdx())
+                high = rand.randint(low, highStrand.lowIdx() - 1
+                                    if highStrand else self.maxIdx)
+                if (low, high) == strand.idxs():
+                    continue
+                strand.resize((low, high))
+            elif action == 'split':
+                strand = rand.choice(strands)
+                baseIdx = rand.randint(*strand.idxs())
+                if not ss.splitStrand(strand, baseIdx):
+                    continue
+            else:
+                pairs = [(a, b) for a, b in zip(strands, strands[1:])
+                         if ss.strandsCanBeMerged(a, b)]
+                if not pairs:
+                    continue
+                ss.mergeStrands(*rand.choice(pairs))
+            self.checkIndex()
+            states.append(strandBounds(ss))
+        self.assertEqual(stack.count() - start, len(states) - 1)
+        for state in reversed(states[:-1]):
+            stack.undo()
+            self.assertEqual(strandBounds(ss), state)
+            self.checkIndex()
+        for state in states[1:]:
+            stack.redo()
+            self.assertEqual(strandBounds(ss), state)
+            self.checkIndex()
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+"""
+undotests.py
+
+Undo and redo of the compacted autostaple and autobreak steps, the undo
+memory budget of Document, and Part.RefreshOligosCommand. These run
+headless, without the GUI test harness.
+
+Run with "python -m unittest cadnano2.tests.undotests" from the
+repository root.
+"""
+
+import os
+import unittest
+
+from cadnano2 import batch
+
+batch.initHeadless()
+
+from cadnano2.model.document import Document
+from cadnano2.model.parts.part import Part
+import cadnano2.util as util
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'functionaltestinputs')
+
+
+def decodeDesign(name):
+    """Returns the part of the functional test design name."""
+    job = batch.BatchJob(os.path.join(INPUT_DIR, name), batch.parseArgs([]))
+    job.run(['decode'])
+    return job.part
+# end def
+
+
+def strandKey(strand):
+    if strand is None:
+        return None
+    return (strand.virtualHelix().number(), strand.strandType(),
+            strand.lowIdx())
+# end def
+
+
+def partState(part):
+    """
+    Returns a comparable summary of the strands, connections, oligos and
+    insertions of part.
+    """
+    strands = []
+    for vh in part.getVirtualHelices():
+        for strandSet in vh.getStrandSets():
+            for strand in strandSet:
+                strands.append((strandKey(strand), strand.highIdx(),
+                                strandKey(strand.connection5p()),
+                                strandKey(strand.connection3p()),
+                                strandKey(strand.oligo().strand5p())))
+    oligos = sorted((strandKey(oligo.strand5p()), oligo.length(),
+                     oligo.isLoop()) for oligo in part.oligos())
+    insertions = sorted((coord, idx, insertion.length())
+                        for coord, insertions in part.insertions().items()
+                        for idx, insertion in insertions.items())
+    return sorted(strands), oligos, insertions
+# end def
+
+
+def autoBreak(part):
+    from cadnano2.plugins.autobreak import autobreak
+    settings = dict(batch.DEFAULT_AUTOBREAK_SETTINGS)
+    settings['stapleScorer'] = autobreak.tgtLengthStapleScorer
+    autobreak.breakStaples(part, settings)
+# end def
+
+
+def addScaffoldInsertion(part, length=1):
+    """Adds an insertion in the middle of the first scaffold strand."""
+    for vh in part.getVirtualHelices():
+        for strand in vh.scaffoldStrandSet():
+            idx = (strand.lowIdx() + strand.highIdx()) // 2
+            if not strand.hasInsertionAt(idx):
+                strand.addInsertion(idx, length)
+                return
+# end def
+
+
+class CompactUndoTests(unittest.TestCase):
+    def testInterleavedUndoRedo(self):
+        """
+        A user edit, autostaple and autobreak are one undo step each, and
+        undoing and redoing them goes back through the same states.
+        """
+        part = decodeDesign('Science09_beachball_v1.json')
+        stack = part.undoStack()
+        states = [partState(part)]
+        for step in (addScaffoldInsertion, Part.autoStaple, autoBreak):
+            step(part)
+            self.assertEqual(part.verifyOligos(markErrors=False), [])
+            states.append(partState(part))
+        self.assertEqual(stack.index(), 3)
+        for i in (2, 1, 0):
+            stack.undo()
+            self.assertEqual(partState(part), states[i])
+            self.assertEqual(part.verifyOligos(markErrors=False), [])
+        for i in (1, 2, 3):
+            stack.redo()
+            self.assertEqual(partState(part), states[i])
+            self.assertEqual(part.verifyOligos(markErrors=False), [])
+    # end def
+# end class
+
+
+class SuperMacroTests(unittest.TestCase):
+    def testFailedAutoStapleEndsMacro(self):
+        """
+        An exception inside autoStaple still ends its compact macro and
+        batch update, so later signals and commands aren't held back.
+        """
+        part = decodeDesign('Science09_beachball_v1.json')
+        document = part.document()
+
+        def fail(command):
+            raise RuntimeError("refresh failed")
+
+        redo = Part.RefreshOligosCommand.redo
+        Part.RefreshOligosCommand.redo = fail
+        try:
+            self.assertRaises(RuntimeError, part.autoStaple)
+        finally:
+            Part.RefreshOligosCommand.redo = redo
+        self.assertFalse(document.isCompactingMacro())
+        self.assertEqual(document._batchDepth, 0)
+        index = part.undoStack().index()
+        addScaffoldInsertion(part)
+        self.assertEqual(part.undoStack().index(), index + 1)
+    # end def
+# end class
+
+
+class UndoMemoryBudgetTests(unittest.TestCase):
+    def setUp(self):
+        """An autostaple followed by two insertions."""
+        self.part = decodeDesign('Science09_beachball_v1.json')
+        self.document = self.part.document()
+        self.stack = self.part.undoStack()
+        self.states = [partState(self.part)]
+        self.costs = {}
+        for step in (Part.autoStaple, addScaffoldInsertion,
+                     addScaffoldInsertion):
+            step(self.part)
+            self.states.append(partState(self.part))
+            self.notePushed()
+    # end def
+
+    def notePushed(self):
+        """Records the cost of the command just pushed."""
+        command = self.stack.command(self.stack.index() - 1)
+        self.costs[command] = util.undoMemoryCost(command)
+    # end def
+
+    def stackUsage(self):
+        """The total cost of the commands on the stack when pushed."""
+        stack = self.stack
+        return sum(self.costs[stack.command(i)] for i in range(stack.count()))
+    # end def
+
+    def testUsageFollowsStack(self):
+        """The running total matches the commands on the stack as they are
+        undone, dropped by a push and redone."""
+        self.assertEqual(self.document.undoMemoryUsage(), self.stackUsage())
+        self.stack.undo()
+        self.stack.undo()
+        addScaffoldInsertion(self.part)
+        self.notePushed()
+        self.assertEqual(self.stack.count(), 2)
+        self.assertEqual(self.document.undoMemoryUsage(), self.stackUsage())
+        self.stack.undo()
+        self.stack.redo()
+        self.assertEqual(self.document.undoMemoryUsage(), self.stackUsage())
+    # end def
+
+    def testWithinBudget(self):
+        usage = self.document.undoMemoryUsage()
+        self.document.setUndoMemoryBudget(2 * usage)
+        self.assertEqual(self.document.undoMemoryUsage(), usage)
+        for i in (2, 1, 0):
+            self.stack.undo()
+            self.assertEqual(partState(self.part), self.states[i])
+    # end def
+
+    def testOverBudgetReleasesOldest(self):
+        """
+        Only the autostaple is released; the insertions can still be
+        undone, and undoing the autostaple then deletes it instead.
+        """
+        autoStaple = self.stack.command(0)
+        self.document.setUndoMemoryBudget(
+                        self.document.undoMemoryUsage() - 1)
+        self.assertTrue(autoStaple.isObsolete())
+        self.assertFalse(self.stack.command(1).isObsolete())
+        self.assertEqual(self.document.undoMemoryUsage(),
+                         self.stackUsage() - self.costs[autoStaple])
+        for i in (2, 1):
+            self.stack.undo()
+            self.assertEqual(partState(self.part), self.states[i])
+        self.stack.undo()
+        self.assertEqual(partState(self.part), self.states[1])
+        self.assertEqual(self.stack.count(), 2)
+        self.assertFalse(self.stack.canUndo())
+        self.assertEqual(self.document.undoMemoryUsage(), self.stackUsage())
+        self.assertEqual(self.part.verifyOligos(markErrors=False), [])
+        for i in (2, 3):
+            self.stack.redo()
+            self.assertEqual(partState(self.part), self.states[i])
+    # end def
+
+    def testLastCommandKept(self):
+        self.document.setUndoMemoryBudget(0)
+        self.assertEqual([self.stack.command(i).isObsolete()
+                          for i in range(3)], [True, True, False])
+        self.stack.undo()
+        self.assertEqual(partState(self.part), self.states[2])
+    # end def
+
+    def testLiftingBudget(self):
+        self.document.setUndoMemoryBudget(None)
+        self.assertEqual(self.stack.count(), 3)
+        self.assertIsNone(self.document.undoMemoryBudget())
+    # end def
+# end class
+
+
+class RefreshOligosCommandTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Two staple strands on each of two helices: the pair at [0, 20] is
+        joined into a loop by two crossovers and the pair at [30, 50] by
+        one, all without updating oligos, as autostaple does.
+        """
+        document = Document()
+        part = self.part = document.addHoneycombPart()
+        for coord in ((0, 0), (0, 1)):
+            part.createVirtualHelix(*coord, useUndoStack=False)
+        ss0 = part.virtualHelixAtCoord((0, 0)).stapleStrandSet()
+        ss1 = part.virtualHelixAtCoord((0, 1)).stapleStrandSet()
+        for low, high in ((0, 20), (30, 50)):
+            ss0.createStrand(low, high, useUndoStack=False)
+            ss1.createStrand(low, high, useUndoStack=False)
+        self.loop = ss0.getStrand(0), ss1.getStrand(0)
+        self.chain = ss0.getStrand(30), ss1.getStrand(30)
+        for strand5p, strand3p in (self.loop, self.loop[::-1], self.chain):
+            part.createXover(strand5p, strand5p.idx3Prime(),
+                             strand3p, strand3p.idx5Prime(),
+                             updateOligo=False, useUndoStack=False)
+    # end def
+
+    def oligoStates(self):
+        """Returns the oligo of each strand with its 5' strand, loop flag
+        and length."""
+        return [(strand.oligo(), strand.oligo().strand5p(),
+                 strand.oligo().isLoop(), strand.oligo().length())
+                for strand in self.loop + self.chain]
+    # end def
+
+    def testRedoMergesOligos(self):
+        util.execCommandList(self.part, [Part.RefreshOligosCommand(self.part)],
+                             desc="Assign oligos")
+        loop0, loop1 = self.loop
+        chain5p, chain3p = self.chain
+        self.assertIs(loop0.oligo(), loop1.oligo())
+        self.assertTrue(loop0.oligo().isLoop())
+        self.assertEqual(loop0.oligo().length(), 42)
+        self.assertIs(chain3p.oligo(), chain5p.oligo())
+        self.assertIs(chain5p.oligo().strand5p(), chain5p)
+        self.assertFalse(chain5p.oligo().isLoop())
+        self.assertEqual(chain5p.oligo().length(), 42)
+        self.assertEqual(self.part.verifyOligos(markErrors=False), [])
+    # end def
+
+    def testOnlyReassignedStrandsNotify(self):
+        notified = []
+        strands = self.loop + self.chain
+        oligos = [strand.oligo() for strand in strands]
+        for strand in strands:
+            strand.strandHasNewOligoSignal.connect(notified.append)
+            strand.strandUpdateSignal.connect(notified.append)
+        util.execCommandList(self.part, [Part.RefreshOligosCommand(self.part)],
+                             desc="Assign oligos")
+        changed = [strand for strand, oligo in zip(strands, oligos)
+                   if strand.oligo() is not oligo]
+        self.assertEqual(len(changed), 2)
+        self.assertEqual(sorted(map(id, notified)), sorted(map(id, changed)))
+    # end def
+
+    def testUndoRestoresOligos(self):
+        before = self.oligoStates()
+        oligos = set(self.part.oligos())
+        util.execCommandList(self.part, [Part.RefreshOligosCommand(self.part)],
+                             desc="Assign oligos")
+        self.assertNotEqual(self.oligoStates(), before)
+        self.part.undoStack().undo()
+        self.assertEqual(self.oligoStates(), before)
+        self.assertEqual(set(self.part.oligos()), oligos)
+        self.part.undoStack().redo()
+        self.assertEqual(self.part.verifyOligos(markErrors=False), [])
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -174,6 +174,14 @@ class Ui_Preferences(object):
         self.defaultToolLabel = QtWidgets.QLabel(self.settings)
         self.defaultToolLabel.setObjectName("defaultToolLabel")
         self.formLayout.setWidget(2, QtWidgets.QFormLayout.ItemRole.LabelRole, self.defaultToolLabel)
+        self.undoMemoryLabel = QtWidgets.QLabel(self.settings)
+        self.undoMemoryLabel.setObjectName("undoMemoryLabel")
+        self.formLayout.setWidget(4, QtWidgets.QFormLayout.ItemRole.LabelRole, self.undoMemoryLabel)
+        self.undoMemorySpinBox = QtWidgets.QSpinBox(self.settings)
+        self.undoMemorySpinBox.setMaximum(100000)
+        self.undoMemorySpinBox.setSingleStep(100)
+        self.undoMemorySpinBox.setObjectName("undoMemorySpinBox")
+        self.formLayout.setWidget(4, QtWidgets.QFormLayout.ItemRole.FieldRole, self.undoMemorySpinBox)
         self.verticalLayout_4.addLayout(self.formLayout)
         self.buttonBox = QtWidgets.QDialogButtonBox(self.settings)
         self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.StandardButton.RestoreDefaults)
@@ -238,6 +246,9 @@ class Ui_Preferences(object):
         self.defaultToolComboBox.setItemText(2, _translate("Preferences", "Paint"))
         self.defaultToolComboBox.setItemText(3, _translate("Preferences", "Add Seq"))
         self.defaultToolLabel.setText(_translate("Preferences", "Default tool at startup:"))
+        self.undoMemoryLabel.setText(_translate("Preferences", "Undo history memory:"))
+        self.undoMemorySpinBox.setSpecialValueText(_translate("Preferences", "Unlimited"))
+        self.undoMemorySpinBox.setSuffix(_translate("Preferences", " MB"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.settings), _translate("Preferences", "Settings"))
         item = self.pluginTableWidget.horizontalHeaderItem(0)
         item.setText(_translate("Preferences", "Path"))
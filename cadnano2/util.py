@@ -3,6 +3,7 @@ util
 Created by Jonathan deWerd.
 """
 import inspect
+from contextlib import contextmanager
 from traceback import extract_stack
 from random import Random
 import string
@@ -15,16 +16,16 @@ prng = Random()
 
 # qtWrapImport will try using each framework listed
 # in the qtFramework list until it finds one that works.
-# At that point, qtFramework becomes a string indicating
+# At that point, chosenQtFramework becomes a string indicating
 # the framework that will thereafer be used to load qt classes.
 #  Dummy   Uses dummy Qt classes (used by the model when loaded as a module)
-#  PyQt    Tries to load Qt classes from PyQt4
+#  PyQt    Tries to load Qt classes from PyQt6
 #  PySide  Tries to load Qt classes
 # The list is defined to consist only of the Dummy qt framework if util is the
 # only module that gets loaded. The main.py of applications actually using qt
 # need to redefine qtFramework to include PyQt and PySide.
 
-qtFrameworkList = ['PyQt', 'Dummy']
+qtFrameworkList = ['Dummy']
 chosenQtFramework = None
 # def qtWrapImport(name, globaldict, fromlist):
 #     """
@@ -77,35 +78,65 @@ def qtWrapImport(name, globaldict, fromlist):
 
     fromlist is a list of subclasses such as [QFont, QColor], or [QRectF]
     """
-    global qtWrapFramework  # This method is a stub. It gets swapped out for
-    global qtFrameworkList  # a framework-specific version when called
-    for trialFmwk in qtFrameworkList:
+    framework = chosenQtFramework or chooseQtFramework()
+    if framework == 'PyQt':
+        qtWrapImportFromPyQt(name, globaldict, fromlist)
+    elif framework == 'PySide':
+        qtWrapImportFromPySide(name, globaldict, fromlist)
+    else:
+        qtWrapImportFromDummy(name, globaldict, fromlist)
+
+
+def chooseQtFramework():
+    """
+    Picks the Qt framework for the rest of the process, on the first
+    qtWrapImport, and returns it. Classes from different frameworks can't
+    be mixed, so the choice is fixed from then on:
+
+    - PyQt if PyQt6 has already been imported (e.g. by a host application);
+    - else the CADNANO_QT_FRAMEWORK environment variable (PyQt, PySide or
+      Dummy) if set;
+    - else the first framework of qtFrameworkList that can be imported.
+      Dummy always can, so the model loads without Qt installed. The list
+      is only Dummy unless initAppWithGui (or batch.initHeadless) asks for
+      PyQt, because views.styles can't be imported under PyQt before a
+      QGuiApplication exists.
+    """
+    global chosenQtFramework
+    if chosenQtFramework is not None:
+        return chosenQtFramework
+    if 'PyQt6.QtCore' in sys.modules:
+        trialFmwks = ['PyQt']
+    elif os.environ.get('CADNANO_QT_FRAMEWORK'):
+        trialFmwks = [os.environ['CADNANO_QT_FRAMEWORK']]
+    else:
+        trialFmwks = qtFrameworkList
+    for trialFmwk in trialFmwks:
         if trialFmwk == 'PyQt':
             try:
                 import PyQt6
-                chosenQtFramework = 'PyQt'
-                qtWrapImport = qtWrapImportFromPyQt
-                return qtWrapImport(name, globaldict, fromlist)
             except ImportError:
-                pass
+                continue
         elif trialFmwk == 'PySide':
             try:
                 import PySide
-                chosenQtFramework = 'PySide'
-                qtWrapImport = qtWrapImportFromPySide
-                return qtWrapImport(name, globaldict, fromlist)
             except ImportError:
-                pass
-        elif trialFmwk == 'Dummy':
-            qtWrapImport = qtWrapImportFromDummy
-            return qtWrapImport(name, globaldict, fromlist)
-        else:
+                continue
+        elif trialFmwk != 'Dummy':
             raise NameError('Illegal qt framework %s'%trialFmwk)
-    assert(False)  # Have not found a suitable qt framework
+        chosenQtFramework = trialFmwk
+        return trialFmwk
+    raise ImportError("None of the qt frameworks %s is available" % \
+                                                        ', '.join(trialFmwks))
+
+
+def usingDummyQt():
+    """True if the model was loaded with the dummy Qt classes."""
+    return chooseQtFramework() == 'Dummy'
 
 
 def qtWrapImportFromDummy(name, globaldict, fromlist):
-    modName = 'dummyqt.%s'%(name)
+    modName = 'cadnano2.dummyqt.%s'%(name)
     imports = __import__(modName, globaldict, locals(), fromlist, 0)
     canary = object()
     for k in fromlist:
@@ -228,6 +259,7 @@ def strToDna(seqStr):
 
 
 complement = str.maketrans('ACGTacgt','TGCATGCA')
+complementBytes = bytes.maketrans(b'ACGTacgt', b'TGCATGCA')
 
 
 def rcomp(seqStr):
@@ -289,6 +321,17 @@ def starmapExec(f, tupleIter):
 # end def
 
 
+def batchDocument(modelObject):
+    """
+    Returns the Document whose batched signals modelObject's commands go
+    through (see Document.batchUpdates), or None if it has no document.
+    """
+    if hasattr(modelObject, 'beginBatchUpdates'):
+        return modelObject
+    return modelObject.document()
+# end def
+
+
 def execCommandList(modelObject, commands, desc=None, useUndoStack=True):
     """
     This is a wrapper for performing QUndoCommands, meant to ensure
@@ -296,23 +339,36 @@ def execCommandList(modelObject, commands, desc=None, useUndoStack=True):
 
     When using the undoStack, commands are pushed onto self.undoStack()
     as part of a macro with description desc. Otherwise, command redo
-    methods are called directly.
+    methods are called directly. Inside a compact macro (see
+    Document.beginCompactMacro) they are always called directly.
+
+    Either way the commands run inside a batch update of the document,
+    so the views redraw each changed object once when the list is done.
     """
-    if useUndoStack:
-        undoStackId = str(id(modelObject.undoStack()))[-4:]
-        # print "<QUndoStack %s> %s" % (undoStackId, desc)
-        modelObject.undoStack().beginMacro(desc)
-        for c in commands:
-            modelObject.undoStack().push(c)
-        modelObject.undoStack().endMacro()
-    else:
-        # print "<NoUndoStack> %s" % (desc)
-        for c in commands:
-            c.redo()
+    doc = batchDocument(modelObject)
+    if doc is not None:
+        doc.beginBatchUpdates()
+        if doc.isCompactingMacro():
+            useUndoStack = False
+    try:
+        if useUndoStack:
+            undoStackId = str(id(modelObject.undoStack()))[-4:]
+            # print "<QUndoStack %s> %s" % (undoStackId, desc)
+            modelObject.undoStack().beginMacro(desc)
+            for c in commands:
+                modelObject.undoStack().push(c)
+            modelObject.undoStack().endMacro()
+        else:
+            # print "<NoUndoStack> %s" % (desc)
+            for c in commands:
+                c.redo()
+    finally:
+        if doc is not None:
+            doc.endBatchUpdates()
 # end def
 
 
-def beginSuperMacro(modelObject, desc=None):
+def beginSuperMacro(modelObject, desc=None, compact=False):
     """
     SuperMacros can be used to nest multiple command lists.
 
@@ -320,14 +376,95 @@ def beginSuperMacro(modelObject, desc=None):
     In some cases, multiple command lists need to be executed separately
     because of dependency issues. (e.g. in part.autoStaple, strands
     must be completely 1. created and 2. split before 3. xover installation.)
+
+    A SuperMacro is also one batch update of the document, so the signals
+    of all its command lists are flushed together by endSuperMacro.
+
+    If compact is True, modelObject must be a Part, and the SuperMacro is
+    a compact macro (see Document.beginCompactMacro): it ends up on the
+    undoStack as a single command that restores the Part's strands.
+    SuperMacros begun inside a compact macro join it.
     """
+    doc = batchDocument(modelObject)
+    if doc is not None:
+        doc.beginBatchUpdates()
+        if compact or doc.isCompactingMacro():
+            doc.beginCompactMacro(modelObject, desc)
+            return
     modelObject.undoStack().beginMacro(desc)
 # end def
 
 
 def endSuperMacro(modelObject):
-    """Ends a SuperMacro. Should be called after beginSuperMacro."""
-    modelObject.undoStack().endMacro()
+    """
+    Ends a SuperMacro. Should be called after beginSuperMacro, in a finally
+    clause if anything in between can raise; superMacro does both.
+    """
+    doc = batchDocument(modelObject)
+    if doc is not None and doc.isCompactingMacro():
+        doc.endCompactMacro()
+    else:
+        modelObject.undoStack().endMacro()
+    if doc is not None:
+        doc.endBatchUpdates()
+# end def
+
+
+@contextmanager
+def superMacro(modelObject, desc=None, compact=False):
+    """
+    Context manager form of beginSuperMacro/endSuperMacro, which ends the
+    SuperMacro (and its batch update) even if the body raises:
+
+        with util.superMacro(part, desc="Auto-Staple", compact=True):
+            ...  # several execCommandList calls
+    """
+    beginSuperMacro(modelObject, desc, compact)
+    try:
+        yield
+    finally:
+        endSuperMacro(modelObject)
+# end def
+
+
+def undoMemoryCost(command):
+    """
+    Returns an estimate in bytes of what command keeps alive: the command,
+    its attributes (containers one level deep) and its child commands.
+    Commands can give their own figure with a memoryCost() method.
+    """
+    memoryCost = getattr(command, 'memoryCost', None)
+    if memoryCost is not None:
+        return memoryCost()
+    cost = sys.getsizeof(command)
+    attrs = getattr(command, '__dict__', None)
+    if attrs:
+        cost += sys.getsizeof(attrs)
+        for value in attrs.values():
+            cost += sys.getsizeof(value)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                cost += sum(sys.getsizeof(item) for item in value)
+            elif isinstance(value, dict):
+                cost += sum(sys.getsizeof(k) + sys.getsizeof(v)
+                            for k, v in value.items())
+    for i in range(command.childCount()):
+        cost += undoMemoryCost(command.child(i))
+    return cost
+# end def
+
+
+def releaseUndoCommand(command):
+    """
+    Marks command obsolete, so that QUndoStack deletes it instead of
+    undoing it, and drops the attributes of it and its child commands,
+    which are never undone or redone again.
+    """
+    command.setObsolete(True)
+    for i in range(command.childCount()):
+        releaseUndoCommand(command.child(i))
+    attrs = getattr(command, '__dict__', None)
+    if attrs:
+        attrs.clear()
 # end def
 
 
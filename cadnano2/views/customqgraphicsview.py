@@ -105,6 +105,7 @@ class CustomQGraphicsView(QGraphicsView):
     # end def
 
     levelOfDetailChangedSignal = pyqtSignal(bool)
+    viewportChangedSignal = pyqtSignal()  # pan, zoom or resize
 
     def __repr__(self):
         clsName = self.__class__.__name__
@@ -300,21 +301,13 @@ class CustomQGraphicsView(QGraphicsView):
             self._transformEnable = True
             QGraphicsView.keyPressEvent(self, event)
         elif event.key() == Qt.Key.Key_Left:
-            transform = self.sceneRootItem.transform()
-            transform.translate(self.keyPanDeltaX(), 0)
-            self.sceneRootItem.setTransform(transform)
+            self._panRoot(self.keyPanDeltaX(), 0)
         elif event.key() == Qt.Key.Key_Up:
-            transform = self.sceneRootItem.transform()
-            transform.translate(0, self.keyPanDeltaY())
-            self.sceneRootItem.setTransform(transform)
+            self._panRoot(0, self.keyPanDeltaY())
         elif event.key() == Qt.Key.Key_Right:
-            transform = self.sceneRootItem.transform()
-            transform.translate(-self.keyPanDeltaX(), 0)
-            self.sceneRootItem.setTransform(transform)
+            self._panRoot(-self.keyPanDeltaX(), 0)
         elif event.key() == Qt.Key.Key_Down:
-            transform = self.sceneRootItem.transform()
-            transform.translate(0, -self.keyPanDeltaY())
-            self.sceneRootItem.setTransform(transform)
+            self._panRoot(0, -self.keyPanDeltaY())
         elif event.key() == Qt.Key.Key_Plus:
             self.zoomIn(0.3)
         elif event.key() == Qt.Key.Key_Minus:
@@ -357,11 +350,7 @@ class CustomQGraphicsView(QGraphicsView):
                 xf = event.pos().x()
                 yf = event.pos().y()
                 factor = self.transform().m11()
-                transform = self.sceneRootItem.transform()
-
-                transform.translate((xf - self._x0)/factor,
-                                    (yf - self._y0)/factor)
-                self.sceneRootItem.setTransform(transform)
+                self._panRoot((xf - self._x0)/factor, (yf - self._y0)/factor)
                 self._x0 = xf
                 self._y0 = yf
             elif self._dollyZoomEnable == True:
@@ -453,18 +442,23 @@ class CustomQGraphicsView(QGraphicsView):
         self.scale(scaleChange, scaleChange)
 
         self.resetGL()
+        self.viewportChangedSignal.emit()
     # end def
 
     def zoomIn(self, fractionOfMax=0.5):
         currentScaleLevel = self.transform().m11()
         scaleChange = (fractionOfMax * self._scale_limit_max) / currentScaleLevel
         self.scale(scaleChange, scaleChange)
+        self.resetGL()
+        self.viewportChangedSignal.emit()
     # end def
 
     def zoomOut(self, fractionOfMin=1):
         currentScaleLevel = self.transform().m11()
         scaleChange = (fractionOfMin * self._scale_limit_min) / currentScaleLevel
         self.scale(scaleChange, scaleChange)
+        self.resetGL()
+        self.viewportChangedSignal.emit()
     # end def
 
     def dollyZoom(self, event):
@@ -526,6 +520,20 @@ class CustomQGraphicsView(QGraphicsView):
         self._scale_size *= self._scaleFitFactor
 
         self.resetGL()
+        self.viewportChangedSignal.emit()
+    # end def
+
+    def _panRoot(self, dx, dy):
+        """Pans by translating the sceneRootItem by dx, dy."""
+        transform = self.sceneRootItem.transform()
+        transform.translate(dx, dy)
+        self.sceneRootItem.setTransform(transform)
+        self.viewportChangedSignal.emit()
+    # end def
+
+    def resizeEvent(self, event):
+        QGraphicsView.resizeEvent(self, event)
+        self.viewportChangedSignal.emit()
     # end def
 
     def paintEvent(self, event):
@@ -1,11 +1,13 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from math import ceil
 from .activesliceitem import ActiveSliceItem
 from cadnano2.controllers.itemcontrollers.partitemcontroller import PartItemController
 from .prexoveritem import PreXoverItem
+from .strand.stranditem import StrandItem
 from .strand.xoveritem import XoverNode3
 from cadnano2.ui.mainwindow.svgbutton import SVGButton
 from cadnano2.views import styles
@@ -14,7 +16,8 @@ import cadnano2.util as util
 from cadnano2.cadnano import app
 
 # import Qt stuff into the module namespace with PySide, PyQt4 independence
-util.qtWrapImport('QtCore', globals(), ['QDir', 'QPointF', 'QRectF', 'Qt'])
+util.qtWrapImport('QtCore', globals(), ['QDir', 'QPointF', 'QRectF', 'Qt',
+                                        'QTimer'])
 util.qtWrapImport('QtGui', globals(), ['QBrush',
                                        'QPen'])
 util.qtWrapImport('QtWidgets', globals(), ['QGraphicsPathItem',
@@ -54,6 +57,13 @@ class PartItem(QGraphicsRectItem):
         self._initResizeButtons()
         self._proxyParent = ProxyParentItem(self)
         self._proxyParent.setFlag(QGraphicsItem.GraphicsItemFlag.ItemHasNoContents)
+        # virtualization: see setVirtualized
+        self._virtualized = False
+        self._strandItemPool = []
+        self._liveUpdatePending = False
+        view = viewroot.scene().views()[0]
+        view.viewportChangedSignal.connect(self._scheduleLiveUpdate)
+        mP.undoStack().indexChanged.connect(self._undoStackIndexChanged)
     # end def
 
     def proxy(self):
@@ -117,6 +127,10 @@ class PartItem(QGraphicsRectItem):
         self._activeSliceItem.removed()
         self.parentItem().removePartItem(self)
         scene = self.scene()
+        scene.views()[0].viewportChangedSignal.disconnect(self._scheduleLiveUpdate)
+        self._modelPart.undoStack().indexChanged.disconnect(
+                                                self._undoStackIndexChanged)
+        self._strandItemPool = None
         scene.removeItem(self)
         self._modelPart = None
         self._virtualHelixHash = None
@@ -153,6 +167,11 @@ class PartItem(QGraphicsRectItem):
         self._virtualHelixItemList.append(vhi)
         self._setVirtualHelixItemList(self._virtualHelixItemList)
         self._updateBoundingRect()
+        if not self._virtualized and \
+           len(self._virtualHelixItemList) >= styles.PATH_VIRTUALIZE_MIN_HELICES:
+            self.setVirtualized(True)
+        elif self._virtualized:
+            self._scheduleLiveUpdate()
     # end def
 
     def partVirtualHelixRenumberedSlot(self, sender, coord):
@@ -231,6 +250,119 @@ class PartItem(QGraphicsRectItem):
         return self.parentItem().window()
     # end def
 
+    ### VIRTUALIZATION ###
+    def isVirtualized(self):
+        return self._virtualized
+    # end def
+
+    def setVirtualized(self, boolval):
+        """
+        In virtualized mode only the VirtualHelixItems near the viewport
+        have StrandItems (with their caps, xovers and insertions); the
+        rest are placeholders that paint their strands as plain lines.
+        StrandItems of helices that leave the view go to a pool and are
+        rebound to the strands of helices that come into it. Parts turn
+        it on by themselves when they reach PATH_VIRTUALIZE_MIN_HELICES.
+        """
+        self._virtualized = boolval
+        if boolval:
+            self._scheduleLiveUpdate()
+        else:
+            for vhi in self._virtualHelixItemList:
+                vhi.buildStrandItems()
+            self._strandItemPool = []
+    # end def
+
+    def newStrandItem(self, strand, virtualHelixItem):
+        """Returns a StrandItem for strand, recycled if the pool has one."""
+        if self._strandItemPool:
+            strandItem = self._strandItemPool.pop()
+            strandItem.rebind(strand, virtualHelixItem)
+            return strandItem
+        return StrandItem(strand, virtualHelixItem, self._viewroot)
+    # end def
+
+    def recycleStrandItem(self, strandItem):
+        """Pools strandItem, or tears it down if the pool is full."""
+        if len(self._strandItemPool) >= styles.PATH_STRAND_ITEM_POOL_MAX:
+            strandItem.strandRemovedSlot(strandItem.strand())
+            return
+        strandItem.recycle()
+        self._strandItemPool.append(strandItem)
+    # end def
+
+    def _scheduleLiveUpdate(self):
+        """Updates the live helices once control returns to the event loop."""
+        if self._virtualized and not self._liveUpdatePending:
+            self._liveUpdatePending = True
+            QTimer.singleShot(0, self._updateLiveHelices)
+    # end def
+
+    def _undoStackIndexChanged(self, index):
+        """
+        Model edits can add xovers into the view from helices outside it,
+        and placeholders draw straight from the model.
+        """
+        if not self._virtualized:
+            return
+        for vhi in self._virtualHelixItemList:
+            if vhi.isPlaceholder():
+                vhi.update()
+        self._scheduleLiveUpdate()
+    # end def
+
+    def _liveVirtualHelixItems(self):
+        """
+        Returns the set of VirtualHelixItems that should have StrandItems:
+        the ones within the viewport plus a margin above and below it,
+        and the ones with xovers into those, which draw the xovers. None
+        are live when the view is zoomed out past showing details.
+        """
+        vhis = self._virtualHelixItemList
+        view = self.scene().views()[0]
+        if not vhis or not view.shouldShowDetails():
+            return set()
+        rect = self.mapRectFromScene(
+                    view.mapToScene(view.viewport().rect()).boundingRect())
+        margin = rect.height() * styles.PATH_VIRTUALIZE_MARGIN
+        helixHeight = vhis[0].boundingRect().height()
+        tops = [vhi.y() for vhi in vhis]
+        first = bisect_left(tops, rect.top() - margin - helixHeight)
+        last = bisect_right(tops, rect.bottom() + margin)
+        live = set(vhis[first:last])
+        itemForVirtualHelix = self.itemForVirtualHelix
+        for vhi in vhis[first:last]:
+            for strandSet in vhi.virtualHelix().getStrandSets():
+                for strand in strandSet:
+                    strand5p = strand.connection5p()
+                    if strand5p is not None:
+                        live.add(itemForVirtualHelix(strand5p.virtualHelix()))
+        return live
+    # end def
+
+    def _updateLiveHelices(self):
+        """
+        Builds the StrandItems of helices that became live and pools those
+        of helices that aren't anymore, unless they hold a selection.
+        Nothing changes while an item has the mouse grabbed.
+        """
+        self._liveUpdatePending = False
+        if not self._virtualized or self._virtualHelixItemList is None:
+            return
+        if self.scene().mouseGrabberItem() is not None:
+            self._liveUpdatePending = True
+            QTimer.singleShot(100, self._updateLiveHelices)
+            return
+        live = self._liveVirtualHelixItems()
+        for vhi in self._virtualHelixItemList:
+            if vhi not in live and not vhi.isPlaceholder() and \
+               not vhi.hasSelectedStrands():
+                vhi.releaseStrandItems()
+        for vhi in self._virtualHelixItemList:
+            if vhi in live:
+                vhi.buildStrandItems()
+    # end def
+
     ### PRIVATE METHODS ###
     def _addBasesClicked(self):
         part = self._modelPart
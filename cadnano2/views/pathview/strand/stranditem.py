@@ -134,6 +134,46 @@ class StrandItem(QGraphicsLineItem):
         scene.removeItem(self)
     # end def
 
+    def recycle(self):
+        """
+        Disconnects the item from its strand and takes it, its caps and
+        insertions out of the scene, keeping the graphics items so that
+        rebind can give them to another strand. Used by the PartItem's
+        pool when a virtual helix scrolls out of view.
+        """
+        self._controller.disconnectSignals()
+        self._controller = None
+        self._xover3pEnd.reset(None)
+        for insertionItem in self._insertionItems.values():
+            insertionItem.remove()
+        self._insertionItems = {}
+        scene = self.scene()
+        scene.removeItem(self._lowCap)
+        scene.removeItem(self._highCap)
+        scene.removeItem(self._dualCap)
+        scene.removeItem(self)
+        self._modelStrand = None
+        self._virtualHelixItem = None
+    # end def
+
+    def rebind(self, modelStrand, virtualHelixItem):
+        """
+        Puts a recycled item back in the scene as the StrandItem of
+        modelStrand on virtualHelixItem.
+        """
+        self._modelStrand = modelStrand
+        self._controller = StrandItemController(self, modelStrand)
+        self._strandFilter = modelStrand.strandFilter()
+        self._seqLabel.setRotation(0)
+        self.resetStrandItem(virtualHelixItem,
+                             modelStrand.strandSet().isDrawn5to3())
+        self._xover3pEnd.reset(virtualHelixItem)
+        self.refreshInsertionItems(modelStrand)
+        self._updateSequenceText()
+        self._updateColor(modelStrand)
+        self._updateAppearance(modelStrand)
+    # end def
+
     def strandUpdateSlot(self, strand):
         """
         Slot for just updating connectivity and color, and endpoint showing
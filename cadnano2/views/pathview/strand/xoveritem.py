@@ -278,6 +278,22 @@ class XoverItem(QGraphicsPathItem):
     # end def
 
     ### PUBLIC SUPPORT METHODS ###
+    def reset(self, virtualHelixItem):
+        """
+        Drops both nodes, hides the xover and moves it to the 5' end on
+        virtualHelixItem. Used when the StrandItem is recycled.
+        """
+        if self._node3:
+            self._node3.remove()
+            self._node3 = None
+        if self._node5:
+            self._node5.remove()
+            self._node5 = None
+        self._strand5p = None
+        self._virtualHelixItem = virtualHelixItem
+        self.hide()
+    # end def
+
     def hideIt(self):
         self.hide()
         if self._node3:
@@ -9,7 +9,8 @@ from cadnano2.views import styles
 from .virtualhelixhandleitem import VirtualHelixHandleItem
 import cadnano2.util as util
 # import Qt stuff into the module namespace with PySide, PyQt4 independence
-util.qtWrapImport('QtCore', globals(), ['pyqtSignal', 'QObject', 'Qt', 'QRectF'])
+util.qtWrapImport('QtCore', globals(), ['pyqtSignal', 'QObject', 'Qt', 'QPointF',
+                                        'QRectF'])
 util.qtWrapImport('QtGui', globals(), ['QBrush',
                                        'QPainterPath',
                                        'QPen',
@@ -21,6 +22,9 @@ util.qtWrapImport('QtWidgets', globals(), ['QGraphicsItem',
 
 
 _baseWidth = styles.PATH_BASE_WIDTH
+# grid paths by (canvasSize, subStepSize); QPainterPath is implicitly
+# shared, so every helix of a part draws the same path
+_gridPaths = {}
 # _gridPen = QPen(styles.minorgridstroke, styles.MINOR_GRID_STROKE_WIDTH)
 # _gridPen.setCosmetic(True)
 
@@ -41,6 +45,8 @@ class VirtualHelixItem(QGraphicsPathItem):
         self._lastStrandSet = None
         self._lastIdx = None
         self._scaffoldBackground = None
+        # a placeholder has no StrandItems and paints its strands itself
+        self._isPlaceholder = partItem.isVirtualized()
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
         self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
         self.setBrush(QBrush(Qt.BrushStyle.NoBrush))
@@ -75,7 +81,10 @@ class VirtualHelixItem(QGraphicsPathItem):
         controller for communication with the model, and for adding itself to
         its parent (which is *this* VirtualHelixItem, i.e. 'self').
         """
-        StrandItem(strand, self, self._viewroot)
+        if self._isPlaceholder:
+            self.update()
+        else:
+            self._partItem.newStrandItem(strand, self)
     # end def
 
     def decoratorAddedSlot(self, decorator):
@@ -177,9 +186,13 @@ class VirtualHelixItem(QGraphicsPathItem):
         bw = _baseWidth
         bw2 = 2 * bw
         part = self.part()
-        path = QPainterPath()
         subStepSize = part.subStepSize()
         canvasSize = part.maxBaseIdx()+1
+        path = _gridPaths.get((canvasSize, subStepSize))
+        if path is not None:
+            self.setPath(path)
+            return
+        path = QPainterPath()
         # border
         path.addRect(0, 0, bw * canvasSize, 2 * bw)
         # minor tick marks
@@ -210,6 +223,7 @@ class VirtualHelixItem(QGraphicsPathItem):
         path.moveTo(0, bw)
         path.lineTo(bw * canvasSize, bw)
 
+        _gridPaths[(canvasSize, subStepSize)] = path
         self.setPath(path)
 
         if self._modelVirtualHelix.scaffoldIsOnTop():
@@ -231,6 +245,69 @@ class VirtualHelixItem(QGraphicsPathItem):
         """Called by part on resize."""
         self.refreshPath()
 
+    ### VIRTUALIZATION ###
+    def isPlaceholder(self):
+        return self._isPlaceholder
+    # end def
+
+    def strandItems(self):
+        return [item for item in self.childItems()
+                if isinstance(item, StrandItem)]
+    # end def
+
+    def hasSelectedStrands(self):
+        """True if the document has any strand of this helix selected."""
+        document = self._partItem.document()
+        return any(document.isModelStrandSelected(strand)
+                   for strandSet in self._modelVirtualHelix.getStrandSets()
+                   for strand in strandSet)
+    # end def
+
+    def buildStrandItems(self):
+        """Turns a placeholder into a full item with a StrandItem per strand."""
+        if not self._isPlaceholder:
+            return
+        self._isPlaceholder = False
+        partItem = self._partItem
+        for strandSet in self._modelVirtualHelix.getStrandSets():
+            for strand in strandSet:
+                partItem.newStrandItem(strand, self)
+        self.update()
+    # end def
+
+    def releaseStrandItems(self):
+        """Turns the item into a placeholder, pooling its StrandItems."""
+        if self._isPlaceholder:
+            return
+        self._isPlaceholder = True
+        recycle = self._partItem.recycleStrandItem
+        for strandItem in self.strandItems():
+            recycle(strandItem)
+        self.update()
+    # end def
+
+    def paint(self, painter, option, widget=None):
+        QGraphicsPathItem.paint(self, painter, option, widget)
+        if self._isPlaceholder:
+            self._paintStrands(painter)
+    # end def
+
+    def _paintStrands(self, painter):
+        """Draws each strand as a line in its oligo's color."""
+        bw = _baseWidth
+        for strandSet in self._modelVirtualHelix.getStrandSets():
+            y = bw / 2 if self.isStrandTypeOnTop(strandSet.strandType()) \
+                       else 1.5 * bw
+            for strand in strandSet:
+                lowIdx, highIdx = strand.idxs()
+                pen = QPen(QColor(strand.oligo().color()),
+                           styles.PATH_STRAND_STROKE_WIDTH)
+                pen.setCapStyle(Qt.PenCapStyle.FlatCap)
+                painter.setPen(pen)
+                painter.drawLine(QPointF(lowIdx * bw, y),
+                                 QPointF((highIdx + 1) * bw, y))
+    # end def
+
     ### PUBLIC SUPPORT METHODS ###
     def setActive(self, idx):
         """Makes active the virtual helix associated with this item."""
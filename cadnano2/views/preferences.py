@@ -28,6 +28,7 @@ class Preferences(object):
         self.uiPrefs.autoScafComboBox.currentIndexChanged.connect(self.setAutoScaf)
         self.uiPrefs.defaultToolComboBox.currentIndexChanged.connect(self.setStartupTool)
         self.uiPrefs.zoomSpeedSlider.valueChanged.connect(self.setZoomSpeed)
+        self.uiPrefs.undoMemorySpinBox.valueChanged.connect(self.setUndoMemoryBudget)
         # self.uiPrefs.helixAddCheckBox.toggled.connect(self.setZoomToFitOnHelixAddition)
         self.uiPrefs.buttonBox.clicked.connect(self.handleButtonClick)
         self.uiPrefs.addPluginButton.clicked.connect(self.addPlugin)
@@ -61,6 +62,7 @@ class Preferences(object):
         self.startupToolIndex = self.qs.value("startupTool", styles.PREF_STARTUP_TOOL_INDEX)
         self.zoomSpeed = self.qs.value("zoomSpeed", styles.PREF_ZOOM_SPEED)
         self.zoomOnHelixAdd = self.qs.value("zoomOnHelixAdd", styles.PREF_ZOOM_AFTER_HELIX_ADD)
+        self.undoMemoryBudget = int(self.qs.value("undoMemoryBudget", styles.PREF_UNDO_MEMORY_BUDGET))
         self.qs.endGroup()
         self.uiPrefs.honeycombRowsSpinBox.setProperty("value", self.honeycombRows)
         self.uiPrefs.honeycombColsSpinBox.setProperty("value", self.honeycombCols)
@@ -71,6 +73,7 @@ class Preferences(object):
         self.uiPrefs.autoScafComboBox.setCurrentIndex(self.autoScafIndex)
         self.uiPrefs.defaultToolComboBox.setCurrentIndex(self.startupToolIndex)
         self.uiPrefs.zoomSpeedSlider.setProperty("value", self.zoomSpeed)
+        self.uiPrefs.undoMemorySpinBox.setProperty("value", self.undoMemoryBudget)
         ptw = self.uiPrefs.pluginTableWidget
         loadedPluginPaths = list(cadnano.loadedPlugins.keys())
         ptw.setRowCount(len(loadedPluginPaths))
@@ -90,6 +93,7 @@ class Preferences(object):
         self.uiPrefs.autoScafComboBox.setCurrentIndex(styles.PREF_AUTOSCAF_INDEX)
         self.uiPrefs.defaultToolComboBox.setCurrentIndex(styles.PREF_STARTUP_TOOL_INDEX)
         self.uiPrefs.zoomSpeedSlider.setProperty("value", styles.PREF_ZOOM_SPEED)
+        self.uiPrefs.undoMemorySpinBox.setProperty("value", styles.PREF_UNDO_MEMORY_BUDGET)
         # self.uiPrefs.helixAddCheckBox.setChecked(styles.PREF_ZOOM_AFTER_HELIX_ADD)
 
     def setHoneycombRows(self, rows):
@@ -146,6 +150,15 @@ class Preferences(object):
         self.qs.setValue("zoomSpeed", self.zoomSpeed)
         self.qs.endGroup()
 
+    def setUndoMemoryBudget(self, megabytes):
+        self.undoMemoryBudget = megabytes
+        self.qs.beginGroup("Preferences")
+        self.qs.setValue("undoMemoryBudget", self.undoMemoryBudget)
+        self.qs.endGroup()
+        budget = megabytes * 2**20 if megabytes else None
+        for documentController in cadnano.app().documentControllers:
+            documentController.document().setUndoMemoryBudget(budget)
+
     # def setZoomToFitOnHelixAddition(self, checked):
     #     self.zoomOnHelixAdd = checked
     #     self.qs.beginGroup("Preferences")
@@ -67,7 +67,7 @@ class EmptyHelixItem(QGraphicsEllipseItem):
 
         self.setNotHovered()
 
-        x, y = partItem.part().latticeCoordToPositionXY(row, column, partItem.scaleFactor())
+        x, y = partItem.latticeGeometry().positionXY(row, column)
         self.setPos(x, y)
         self._coord = (row, column)
         self.show()
@@ -101,6 +101,14 @@ class EmptyHelixItem(QGraphicsEllipseItem):
         return self._partItem.part()
     # end def
 
+    def partItem(self):
+        return self._partItem
+    # end def
+
+    def coord(self):
+        return self._coord
+    # end def
+
     def translateVH(self, delta):
         """
         used to update a child virtual helix position on a hover event
@@ -171,14 +179,13 @@ class EmptyHelixItem(QGraphicsEllipseItem):
 
     def mouseMoveEvent(self, event):
         partItem = self._partItem
-        posInParent = partItem.mapFromItem(self, QPointF(event.pos()))
-        # Qt doesn't have any way to ask for graphicsitem(s) at a
-        # particular position but it *can* do intersections, so we
-        # just use those instead
-        partItem.probe.setPos(posInParent)
-        for ci in partItem.probe.collidingItems():
-            if isinstance(ci, EmptyHelixItem):
-                self.dragSessionAction(ci)
+        posInParent = partItem.mapFromScene(event.scenePos())
+        # the lattice's spatial index finds the cell under the cursor, which
+        # only has an item once something happens to it
+        coord = partItem.latticeCoordAtPos(posInParent)
+        if coord is not None:
+            self.dragSessionAction(partItem.emptyHelixItemAt(*coord))
+            partItem.releaseEmptyHelixItem(*coord)
     # end def
 
     def autoScafMidSeam(self, strands):
@@ -311,12 +318,11 @@ class EmptyHelixItem(QGraphicsEllipseItem):
 
         if len(strands) > 1:
             autoScafType = app().prefs.getAutoScafType()
-            util.beginSuperMacro(part, "Auto-connect")
-            if autoScafType == "Mid-seam":
-                self.autoScafMidSeam(strands)
-            elif autoScafType == "Raster":
-                self.autoScafRaster(strands)
-            util.endSuperMacro(part)
+            with util.superMacro(part, "Auto-connect"):
+                if autoScafType == "Mid-seam":
+                    self.autoScafMidSeam(strands)
+                elif autoScafType == "Raster":
+                    self.autoScafRaster(strands)
 
     def decideAction(self, modifiers):
         """ On mouse press, an action (add scaffold at the active slice, add
@@ -28,10 +28,12 @@ class PartItem(QGraphicsItem):
         """
         Parent should be either a SliceRootItem, or an AssemblyItem.
 
-        Invariant: keys in _emptyhelixhash = range(_nrows) x range(_ncols)
-        where x is the cartesian product.
+        The empty lattice is drawn by a single EmptyLattice item. Keys in
+        _emptyhelixhash are the lattice coords that have an EmptyHelixItem:
+        the ones holding a virtual helix, and the ones being hovered or
+        dragged over.
 
-        Order matters for deselector, probe, and setlattice
+        Order matters for deselector, lattice, and setlattice
         """
         super(PartItem, self).__init__(parent)
         self._part = modelPart
@@ -43,12 +45,11 @@ class PartItem(QGraphicsItem):
         self._nrows, self._ncols = 0, 0
         self._rect = QRectF(0, 0, 0, 0)
         self._initDeselector()
+        self._lattice = PartItem.EmptyLattice(self)
         # Cache of VHs that were active as of last call to activeSliceChanged
         # If None, all slices will be redrawn and the cache will be filled.
         # Connect destructor. This is for removing a part from scenes.
-        self.probe = self.IntersectionProbe(self)
-        # initialize the PartItem with an empty set of old coords
-        self._setLattice([], modelPart.generatorFullLattice())
+        self._setLattice()
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemHasNoContents)  # never call paint
         self.setZValue(styles.ZPARTITEM)
         self._initModifierCircle()
@@ -108,7 +109,7 @@ class PartItem(QGraphicsItem):
         scene.removeItem(self)
 
         self._part = None
-        self.probe = None
+        self._lattice = None
         self._modCirc = None
 
         self.deselector = None
@@ -128,7 +129,7 @@ class PartItem(QGraphicsItem):
         view.centerOn(vhi)
         view.zoomIn()
         mC = self._modCirc
-        x,y = self._part.latticeCoordToPositionXY(row, col, self.scaleFactor())
+        x,y = self.latticeGeometry().positionXY(row, col)
         mC.setPos(x,y)
         if self._canShowModCirc:
             mC.show()
@@ -138,7 +139,7 @@ class PartItem(QGraphicsItem):
         vh = virtualHelix
         coords = vh.coord()
 
-        emptyHelixItem = self._emptyhelixhash[coords]
+        emptyHelixItem = self.emptyHelixItemAt(*coords)
         # TODO test to see if self._virtualHelixHash is necessary
         vhi = VirtualHelixItem(vh, emptyHelixItem)
         self._virtualHelixHash[coords] = vhi
@@ -169,6 +170,11 @@ class PartItem(QGraphicsItem):
         return self._scaleFactor
     # end def
 
+    def latticeGeometry(self):
+        """The part's lattice positions and spatial index in scene units."""
+        return self._part.latticeGeometry(self._scaleFactor)
+    # end def
+
     def setPart(self, newPart):
         self._part = newPart
     # end def
@@ -192,28 +198,22 @@ class PartItem(QGraphicsItem):
         self._emptyhelixhash[(row, column)] = helix
     # end def
 
-    def _killHelixItemAt(row, column):
+    def _killHelixItemAt(self, row, column):
         s = self._emptyhelixhash[(row, column)]
         s.scene().removeItem(s)
         del self._emptyhelixhash[(row, column)]
     # end def
 
-    def _setLattice(self, oldCoords, newCoords):
+    def _setLattice(self):
         """A private method used to change the number of rows,
         cols in response to a change in the dimensions of the
         part represented by the receiver"""
-        oldSet = set(oldCoords)
-        oldList = list(oldSet)
-        newSet = set(newCoords)
-        newList = list(newSet)
-        for coord in oldList:
-            if coord not in newSet:
-                self._killHelixItemAt(*coord)
-        # end for
-        for coord in newList:
-            if coord not in oldSet:
-                self._spawnEmptyHelixItemAt(*coord)
+        geometry = self.latticeGeometry()
+        for row, column in list(self._emptyhelixhash):
+            if row >= geometry.maxRow or column >= geometry.maxCol:
+                self._killHelixItemAt(row, column)
         # end for
+        self._lattice.setGeometry(geometry)
         # self._updateGeometry(newCols, newRows)
         # self.prepareGeometryChange()
         # the Deselector copies our rect so it changes too
@@ -222,11 +222,46 @@ class PartItem(QGraphicsItem):
     # end def
 
     ### PUBLIC SUPPORT METHODS ###
+    def emptyHelixItemAt(self, row, column):
+        """
+        Returns the EmptyHelixItem of lattice coord (row, column), creating
+        it if the cell doesn't have one yet.
+        """
+        helix = self._emptyhelixhash.get((row, column))
+        if helix is None:
+            self._spawnEmptyHelixItemAt(row, column)
+            helix = self._emptyhelixhash[(row, column)]
+        return helix
+    # end def
+
+    def releaseEmptyHelixItem(self, row, column):
+        """
+        Removes the EmptyHelixItem of (row, column) unless it holds a
+        virtual helix or is grabbing the mouse; the EmptyLattice draws the
+        cell again.
+        """
+        helix = self._emptyhelixhash.get((row, column))
+        if helix is None or helix.virtualHelixItem() is not None:
+            return
+        scene = helix.scene()
+        if scene is not None and scene.mouseGrabberItem() is helix:
+            return
+        self._killHelixItemAt(row, column)
+    # end def
+
+    def latticeCoordAtPos(self, pos):
+        """
+        Returns the lattice coord of the helix under pos, a point in the
+        receiver's coordinates, or None.
+        """
+        geometry = self.latticeGeometry()
+        # items are placed by their upper left corner
+        return geometry.coordAt(pos.x() - geometry.radius,
+                                pos.y() - geometry.radius)
+    # end def
+
     def getVirtualHelixItemByCoord(self, row, column):
-        if (row, column) in self._emptyhelixhash:
-            return self._virtualHelixHash[(row, column)]
-        else:
-            return None
+        return self._virtualHelixHash.get((row, column))
     # end def
 
     def paint(self, painter, option, widget=None):
@@ -254,7 +289,9 @@ class PartItem(QGraphicsItem):
         # self.window().statusBar().showMessage(statusString, timeout)
 
     def vhAtCoordsChanged(self, row, col):
-        self._emptyhelixhash[(row, col)].update()
+        helix = self._emptyhelixhash.get((row, col))
+        if helix is not None:
+            helix.update()
     # end def
 
     def zoomToFit(self):
@@ -286,8 +323,84 @@ class PartItem(QGraphicsItem):
         def paint(self, painter, option, widget=None):
             pass
 
-    class IntersectionProbe(QGraphicsItem):
+    class EmptyLattice(QGraphicsItem):
+        """
+        Draws every cell of the lattice as one path, cached as a pixmap,
+        so a cell only gets an EmptyHelixItem when it is hovered, dragged
+        over or holds a virtual helix. Hovering a cell gives it an item; a
+        press that arrives without a hover is passed on to the cell's item.
+        """
+        def __init__(self, partItem):
+            super(PartItem.EmptyLattice, self).__init__(partItem)
+            self._partItem = partItem
+            self._path = QPainterPath()
+            self._rect = QRectF()
+            self._hoverCoord = None
+            self._pressedItem = None
+            self.setAcceptHoverEvents(True)
+            self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+            self.setZValue(styles.ZSLICELATTICE)
+
+        def setGeometry(self, geometry):
+            """Rebuilds the path from a lattice.LatticeGeometry."""
+            path = QPainterPath()
+            path.setFillRule(Qt.FillRule.WindingFill)
+            diameter = 2 * geometry.radius
+            for x, y, row, col in geometry.spatialLattice():
+                path.addEllipse(x, y, diameter, diameter)
+            halfPen = EmptyHelixItem._defaultPen.widthF() / 2
+            self.prepareGeometryChange()
+            self._path = path
+            self._rect = path.boundingRect().adjusted(-halfPen, -halfPen,
+                                                      halfPen, halfPen)
+            self._hoverCoord = None
+            self.update()
+
         def boundingRect(self):
-            return QRectF(0, 0, .1, .1)
+            return self._rect
+
         def paint(self, painter, option, widget=None):
-            pass
+            painter.setPen(EmptyHelixItem._defaultPen)
+            painter.setBrush(EmptyHelixItem._defaultBrush)
+            painter.drawPath(self._path)
+
+        def hoverEnterEvent(self, event):
+            self._hoverAt(event.pos())
+
+        def hoverMoveEvent(self, event):
+            self._hoverAt(event.pos())
+
+        def hoverLeaveEvent(self, event):
+            self._hoverAt(event.pos())
+
+        def _hoverAt(self, pos):
+            """
+            Gives the cell under pos an item that shows the hover, and
+            releases the item of the cell hovered before.
+            """
+            partItem = self._partItem
+            coord = partItem.latticeCoordAtPos(pos)
+            if coord == self._hoverCoord:
+                return
+            if self._hoverCoord is not None:
+                partItem.releaseEmptyHelixItem(*self._hoverCoord)
+            self._hoverCoord = coord
+            if coord is not None:
+                partItem.emptyHelixItemAt(*coord).setHovered()
+
+        def mousePressEvent(self, event):
+            coord = self._partItem.latticeCoordAtPos(event.pos())
+            if coord is None:
+                event.ignore()  # let the Deselector have it
+                return
+            self._pressedItem = self._partItem.emptyHelixItemAt(*coord)
+            self._pressedItem.mousePressEvent(event)
+
+        def mouseMoveEvent(self, event):
+            if self._pressedItem is not None:
+                self._pressedItem.mouseMoveEvent(event)
+
+        def mouseReleaseEvent(self, event):
+            if self._pressedItem is not None:
+                self._pressedItem.mouseReleaseEvent(event)
+                self._pressedItem = None
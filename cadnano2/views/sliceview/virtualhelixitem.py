@@ -81,12 +81,15 @@ class VirtualHelixItem(QGraphicsEllipseItem):
     def virtualHelixRemovedSlot(self, virtualHelix):
         self._controller.disconnectSignals()
         self._controller = None
-        self._emptyHelixItem.setNotHovered()
+        emptyHelixItem = self._emptyHelixItem
+        emptyHelixItem.setNotHovered()
         self._virtualHelix = None
         self._emptyHelixItem = None
         self.scene().removeItem(self._label)
         self._label = None
         self.scene().removeItem(self)
+        # the empty cell goes back to being drawn by the lattice
+        emptyHelixItem.partItem().releaseEmptyHelixItem(*emptyHelixItem.coord())
     # end def
 
     def strandAddedSlot(self, sender, strand):
@@ -33,6 +33,8 @@ import maya.OpenMaya as OpenMaya
 import maya.OpenMayaMPx as OpenMayaMPx
 import math
 
+from cadnano2.views.solidview import helixmesh
+
 nodeName = "spHalfCylinderHelixNode"
 id = OpenMaya.MTypeId(0x00117701)
 
@@ -138,14 +140,10 @@ class HalfCylinderHelixNode(OpenMayaMPx.MPxNode):
         end = (middleBase - startVal)
         start = (endVal - middleBase)
         baseCount = start + end + 1
-        numVerticesEnds = 20
+        numVerticesEnds = helixmesh.RING_SIZE
         numMiddleSections = int(baseCount * edgesPerBase) - 1
-        rise = riseAttr / edgesPerBase
-        start_pos = -start * (riseAttr)
         numVerticesTotal = (numVerticesEnds * 2) + \
                             numMiddleSections * numVerticesEnds
-        rot_ang = -rotationAttr / edgesPerBase
-        gap = rise / 6.0
 
         numFacesEnds = numVerticesEnds - 2
         numFacesTotal = (numVerticesEnds - 2) * 2 + \
@@ -153,59 +151,22 @@ class HalfCylinderHelixNode(OpenMayaMPx.MPxNode):
         numFaceConnects = ((numVerticesEnds - 2) * 2 * 3) + \
                            (numVerticesEnds * (numMiddleSections + 1) * 4)
 
-        vtx = []
-        rotation = 0
-        starting_rotation = endVal * rotationAttr + \
-                            (math.pi * (not parity)) + rotationOffset + \
-                            (math.pi * strandType)
-
-        # Create Endpoint verts
-        vtx.append(OpenMaya.MFloatPoint(0.0, start_pos + gap, 0.0))
-        self.end3DPos = OpenMaya.MFloatPoint(0.0, start_pos + gap, 0.0)
-        #print start_pos + gap
-        for i in range(1, numVerticesEnds):
-            val = i * (180 / (numFacesEnds))
-            rad = (val * math.pi) / 180
-            vtx.append(OpenMaya.MFloatPoint(radius * \
-                                math.cos(starting_rotation + rad),
-                                start_pos + gap,
-                                radius * math.sin(starting_rotation + rad)))
-        # Create Middle verts
-        for i in range(0, numMiddleSections):
-            rotation = rot_ang * (i + 1)
-            pos = rise * (i + 1)
-            vtx.append(OpenMaya.MFloatPoint(0.0, start_pos + pos, 0.0))
-            for i in range(1, numVerticesEnds):
-                val = i * (180 / (numFacesEnds))
-                rad = (val * math.pi) / 180
-                #print "vrt %d, %f %f" % (i, val, rad)
-                x = radius * math.cos(starting_rotation + rad + rotation)
-                y = radius * math.sin(starting_rotation + rad + rotation)
-                vtx.append(OpenMaya.MFloatPoint(x, start_pos + pos, y))
-
-        # Create EndPiece verts
-        vtx.append(OpenMaya.MFloatPoint(0.0,
-                            start_pos + (numMiddleSections + 1) * rise - gap,
-                            0.0))
-        self.start3DPos = OpenMaya.MFloatPoint(0.0,
-                            start_pos + (numMiddleSections + 1) * rise - gap,
-                             0.0)
-        for i in range(1, numVerticesEnds):
-            rotation = rot_ang * (1 + numMiddleSections)
-            val = i * (180 / (numFacesEnds))
-            rad = (val * math.pi) / 180
-            #print "vrt %d, %f %f" % (i, val, rad)
-            x = radius * math.cos(starting_rotation + rad + rotation)
-            y = radius * math.sin(starting_rotation + rad + rotation)
-            vtx.append(OpenMaya.MFloatPoint(x,
-                            start_pos + (numMiddleSections + 1) * rise - gap,
-                            y))
-        #print "vtx length %d"  % len(vtx)
+        # The verts are the rings of helixmesh.halfCylinderVertices: the
+        # starting endcap, the middle sections with the helical rotation
+        # added, and the closing endcap, each ring starting with its
+        # center vert.
+        vtx = helixmesh.halfCylinderVertices(startVal, endVal, totalNumBases,
+                                             radius, rotationAttr,
+                                             rotationOffset, riseAttr,
+                                             edgesPerBase, parity,
+                                             strandType).tolist()
+        self.end3DPos = OpenMaya.MFloatPoint(*vtx[0])
+        self.start3DPos = OpenMaya.MFloatPoint(*vtx[-numVerticesEnds])
         points = OpenMaya.MFloatPointArray()
         points.setLength(numVerticesTotal)
 
         for i in range(0, numVerticesTotal):
-            points.set(vtx[i], i)
+            points.set(i, vtx[i][0], vtx[i][1], vtx[i][2])
 
         faceConnects = OpenMaya.MIntArray()
         faceConnects.setLength(numFaceConnects)
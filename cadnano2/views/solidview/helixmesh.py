@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+helixmesh.py
+
+The half-cylinder helix shape of the solid view, built with NumPy instead
+of Maya. halfCylinderVertices gives the vertices spHalfCylinderHelixNode
+puts in its MFnMesh; partMesh builds the shapes of every strand of a Part
+as one triangle mesh that meshexport.py writes to OBJ, PLY or glTF.
+
+A strand is a stack of rings along the helix axis. A ring is one vertex
+on the axis and the rest on a half circle of the helix radius, turned by
+the twist of the helix; the first and last rings are closed by a fan of
+triangles. partMesh has three levels of detail (MeshDetail):
+
+    Base    the solid view's shape, edgesPerBase twisted rings per base
+    Strand  a straight half cylinder per strand, turned as the middle
+            base of the strand, with a ring at each end
+    Helix   a capsule per helix, over the bases its strands cover
+
+The shape of a strand only depends on its length: strands of the same
+length are the same shape turned about and moved along the helix axis.
+instancedPartMesh builds each shape once, as a prototype, and places it
+once per strand; InstancedMesh.flatten turns that into a HelixMesh.
+"""
+
+import math
+
+import numpy as np
+
+from cadnano2.model.enum import LatticeType, StrandType
+
+RISE = 0.34  # nm per base, the spHalfCylinderHelixNode default
+EDGES_PER_BASE = 2
+RING_SIZE = 20
+STRAND_RING_SIZE = 10  # ring size of the Strand detail
+CAPSULE_SIDES = 12
+CAPSULE_CAP_RINGS = 3
+
+# degrees, as solidview.StrandItem sets rotationOffset on the node
+ROTATION_OFFSET = {LatticeType.Honeycomb: 250,
+                   LatticeType.Square: 125}
+
+
+class MeshDetail:
+    Helix = 0
+    Strand = 1
+    Base = 2
+
+
+def _arc(ringSize):
+    """
+    Returns the angles of the arc vertices of a ring, from 10 to 190
+    degrees as in createMesh.
+    """
+    return np.arange(1, ringSize) * (180. / (ringSize - 2)) * math.pi / 180 \
+           + (math.pi / 18 - math.pi / (ringSize - 2))
+# end def
+
+
+_ARC = _arc(RING_SIZE)
+
+
+def _rings(low, high, middle, startRotation, rotation, rise, edgesPerBase):
+    """
+    Returns (ringStart, ringY, ringAngle) for strands spanning low[i] to
+    high[i]: strand i has rings ringStart[i] to ringStart[i + 1] - 1, ring
+    r sits at ringY[r] along the axis, and its arc starts at ringAngle[r].
+    startRotation[i] is the turn of the strand's first ring, without the
+    twist of its high base.
+    """
+    nRings = (high - low + 1) * edgesPerBase + 1
+    ringStart = np.zeros(len(low) + 1, dtype=np.intp)
+    np.cumsum(nRings, out=ringStart[1:])
+    strandOfRing = np.repeat(np.arange(len(low)), nRings)
+    k = np.arange(ringStart[-1]) - ringStart[strandOfRing]
+    riseStep = float(rise) / edgesPerBase
+    gap = riseStep / 6.0
+    ringY = (middle - high)[strandOfRing] * rise + k * riseStep
+    if len(low):
+        ringY[ringStart[:-1]] += gap
+        ringY[ringStart[1:] - 1] -= gap
+    ringAngle = (high * rotation + startRotation)[strandOfRing] - \
+                k * (float(rotation) / edgesPerBase)
+    return ringStart, ringY, ringAngle
+# end def
+
+
+def _faces(ringStart, ringSize=RING_SIZE):
+    """
+    Returns the triangles of the strands whose rings start at ringStart,
+    as an (m, 3) array of vertex indices wound counter-clockwise seen from
+    outside, and the index of each strand's first triangle.
+    """
+    numStrands = len(ringStart) - 1
+    nRings = np.diff(ringStart)
+    capSize = ringSize - 2
+    nFaces = 2 * ringSize * (nRings - 1) + 2 * capSize
+    faceStart = np.zeros(numStrands + 1, dtype=np.intp)
+    np.cumsum(nFaces, out=faceStart[1:])
+    faces = np.empty((faceStart[-1], 3), dtype=np.uint32)
+
+    # caps: fans around the axis vertex of the first and last rings
+    fan = np.empty((capSize, 3), dtype=np.intp)
+    fan[:, 0] = 0
+    fan[:, 1] = np.arange(1, capSize + 1)
+    fan[:, 2] = fan[:, 1] + 1
+    capIdx = np.arange(capSize)
+    first = ringStart[:-1] * ringSize
+    last = (ringStart[1:] - 1) * ringSize
+    faces[(faceStart[:-1, None] + capIdx).ravel()] = \
+                                (first[:, None, None] + fan).reshape(-1, 3)
+    faces[(faceStart[1:, None] - capSize + capIdx).ravel()] = \
+                        (last[:, None, None] + fan[:, ::-1]).reshape(-1, 3)
+
+    # sides: two triangles for each quad between a ring and the next one
+    a = np.arange(ringSize)
+    b = (a + 1) % ringSize
+    n = ringSize
+    quad = np.concatenate([np.stack([a, a + n, b + n], axis=1),
+                           np.stack([a, b + n, b], axis=1)])
+    strandOfRing = np.repeat(np.arange(numStrands), nRings)
+    isLast = np.zeros(ringStart[-1], dtype=bool)
+    isLast[ringStart[1:] - 1] = True
+    sideRings = np.flatnonzero(~isLast)
+    k = sideRings - ringStart[strandOfRing[sideRings]]
+    sideStart = faceStart[strandOfRing[sideRings]] + capSize + \
+                2 * ringSize * k
+    faces[(sideStart[:, None] + np.arange(2 * ringSize)).ravel()] = \
+                    (sideRings[:, None, None] * ringSize + quad).reshape(-1, 3)
+    return faces, faceStart
+# end def
+
+
+def halfCylinderVertices(startBase, endBase, totalBases, radius, rotation,
+                         rotationOffset, rise, edgesPerBase, parity,
+                         strandType):
+    """
+    Returns the vertices of one half-cylinder as an (n, 3) array, in the
+    order and the local frame of HalfCylinderHelixNode.createMesh, which
+    takes the same arguments (angles in radians).
+    """
+    startRotation = math.pi * (not parity) + rotationOffset + \
+                    math.pi * strandType
+    ringStart, ringY, ringAngle = _rings(np.array([startBase]),
+                                         np.array([endBase]),
+                                         totalBases / 2, startRotation,
+                                         rotation, rise, edgesPerBase)
+    angles = ringAngle[:, None] + _ARC
+    vertices = np.zeros((len(ringY), RING_SIZE, 3))
+    vertices[:, :, 1] = ringY[:, None]
+    vertices[:, 1:, 0] = radius * np.cos(angles)
+    vertices[:, 1:, 2] = radius * np.sin(angles)
+    return vertices.reshape(-1, 3)
+# end def
+
+
+class HelixMesh(object):
+    """
+    A triangle mesh of strands, coordinates in nm.
+
+    vertices:       (n, 3) float32
+    normals:        (n, 3) float32, unit length
+    colors:         (n, 3) uint8, the RGB color of each vertex's oligo, or
+                    None for a prototype
+    faces:          (m, 3) uint32 vertex indices, counter-clockwise seen
+                    from outside
+    vertexStart:    shape i has vertices vertexStart[i] to
+                    vertexStart[i + 1] - 1
+    faceStart:      same for the faces
+    items:          the Strand (or VirtualHelix, for MeshDetail.Helix) of
+                    each shape
+    """
+    def __init__(self, vertices, normals, colors, faces,
+                 vertexStart, faceStart, items):
+        self.vertices = vertices
+        self.normals = normals
+        self.colors = colors
+        self.faces = faces
+        self.vertexStart = vertexStart
+        self.faceStart = faceStart
+        self.items = items
+    # end def
+
+    def numberOfShapes(self):
+        return len(self.vertexStart) - 1
+    # end def
+
+    def bounds(self):
+        """Returns the (min, max) corners of the vertices."""
+        if not len(self.vertices):
+            return np.zeros(3), np.zeros(3)
+        return self.vertices.min(axis=0), self.vertices.max(axis=0)
+    # end def
+# end class
+
+
+class InstancedMesh(object):
+    """
+    Shapes placed by reference: instance i is prototypes[prototype[i]]
+    turned counter-clockwise by angles[i] radians about the z axis, then
+    moved by translations[i]. The prototypes are HelixMeshes without
+    colors, with their axis on the z axis from z = 0 up.
+
+    prototypes:     list of HelixMesh
+    prototype:      (k,) intp
+    translations:   (k, 3) float64
+    angles:         (k,) float64
+    colors:         (k, 3) uint8
+    items:          the Strand (or VirtualHelix) of each instance
+    """
+    def __init__(self, prototypes, prototype, translations, angles, colors,
+                 items):
+        self.prototypes = prototypes
+        self.prototype = prototype
+        self.translations = translations
+        self.angles = angles
+        self.colors = colors
+        self.items = items
+    # end def
+
+    def numberOfInstances(self):
+        return len(self.prototype)
+    # end def
+
+    def numberOfVertices(self, flattened=False):
+        """
+        Returns the number of vertices stored, or with flattened those of
+        the HelixMesh flatten returns.
+        """
+        sizes = np.array([len(p.vertices) for p in self.prototypes],
+                         dtype=np.intp)
+        if flattened:
+            return int(sizes[self.prototype].sum())
+        return int(sizes.sum())
+    # end def
+
+    def flatten(self):
+        """Returns a HelixMesh with a copy of the prototype per instance."""
+        numVertices = np.array([len(p.vertices) for p in self.prototypes],
+                               dtype=np.intp)
+        numFaces = np.array([len(p.faces) for p in self.prototypes],
+                            dtype=np.intp)
+        vertexStart = np.zeros(len(self.prototype) + 1, dtype=np.intp)
+        faceStart = np.zeros(len(self.prototype) + 1, dtype=np.intp)
+        np.cumsum(numVertices[self.prototype], out=vertexStart[1:])
+        np.cumsum(numFaces[self.prototype], out=faceStart[1:])
+        vertices = np.empty((vertexStart[-1], 3), dtype=np.float32)
+        normals = np.empty((vertexStart[-1], 3), dtype=np.float32)
+        colors = np.empty((vertexStart[-1], 3), dtype=np.uint8)
+        faces = np.empty((faceStart[-1], 3), dtype=np.uint32)
+        for p, proto in enumerate(self.prototypes):
+            idx = np.flatnonzero(self.prototype == p)
+            if not len(idx):
+                continue
+            cos = np.cos(self.angles[idx])[:, None]
+            sin = np.sin(self.angles[idx])[:, None]
+            tx, ty, tz = self.translations[idx].T
+            rows = (vertexStart[idx, None] + np.arange(len(proto.vertices)))
+            rows = rows.ravel()
+            vx, vy, vz = proto.vertices.T
+            out = np.empty((len(idx), len(proto.vertices), 3))
+            out[:, :, 0] = cos * vx - sin * vy + tx[:, None]
+            out[:, :, 1] = sin * vx + cos * vy + ty[:, None]
+            out[:, :, 2] = vz + tz[:, None]
+            vertices[rows] = out.reshape(-1, 3)
+            nx, ny, nz = proto.normals.T
+            out[:, :, 0] = cos * nx - sin * ny
+            out[:, :, 1] = sin * nx + cos * ny
+            out[:, :, 2] = nz
+            normals[rows] = out.reshape(-1, 3)
+            colors[rows] = np.repeat(self.colors[idx], len(proto.vertices),
+                                     axis=0)
+            faceRows = (faceStart[idx, None] + np.arange(len(proto.faces)))
+            faces[faceRows.ravel()] = (proto.faces[None].astype(np.intp) +
+                                       vertexStart[idx, None, None]) \
+                                      .reshape(-1, 3)
+        # end for
+        return HelixMesh(vertices, normals, colors, faces,
+                         vertexStart, faceStart, self.items)
+    # end def
+# end class
+
+
+def _halfCylinderPrototype(ringZ, ringAngle, radius, ringSize):
+    """
+    Returns a HelixMesh of one half cylinder with rings at ringZ along
+    the z axis, ring r turned clockwise by ringAngle[r], as the node's
+    local frame ends up after the transform's rotateX 90:
+    (x, y, z) -> (x, -z, y).
+    """
+    arc = _arc(ringSize)
+    flatNormal = (arc[0] + arc[-1]) / 2 + math.pi
+    angles = np.empty((len(ringZ), ringSize))
+    angles[:, 1:] = ringAngle[:, None] + arc
+    angles[:, 0] = ringAngle + flatNormal
+    cos, sin = np.cos(angles), np.sin(angles)
+    vertices = np.zeros((len(ringZ), ringSize, 3), dtype=np.float32)
+    vertices[:, 1:, 0] = radius * cos[:, 1:]
+    vertices[:, 1:, 1] = -radius * sin[:, 1:]
+    vertices[:, :, 2] = ringZ[:, None]
+    # arc vertices get the normal of the curved side, axis vertices the
+    # normal of the flat side
+    normals = np.zeros((len(ringZ), ringSize, 3), dtype=np.float32)
+    normals[:, :, 0] = cos
+    normals[:, :, 1] = -sin
+    ringStart = np.array([0, len(ringZ)], dtype=np.intp)
+    faces, faceStart = _faces(ringStart, ringSize)
+
+    # the caps get their own copies of the end rings, with the normal of
+    # the cap, so they shade flat
+    numVertices = len(ringZ) * ringSize
+    capSize = ringSize - 2
+    caps = vertices[[0, -1]].copy()
+    capNormals = np.zeros_like(caps)
+    capNormals[0, :, 2] = -1
+    capNormals[1, :, 2] = 1
+    faces[:capSize] += numVertices
+    faces[-capSize:] += 2 * ringSize
+    vertices = np.concatenate([vertices.reshape(-1, 3), caps.reshape(-1, 3)])
+    normals = np.concatenate([normals.reshape(-1, 3),
+                              capNormals.reshape(-1, 3)])
+    return HelixMesh(vertices, normals, None, faces,
+                     np.array([0, len(vertices)], dtype=np.intp), faceStart,
+                     None)
+# end def
+
+
+def _capsulePrototype(length, radius, sides=CAPSULE_SIDES,
+                      capRings=CAPSULE_CAP_RINGS):
+    """
+    Returns a HelixMesh of a capsule with its axis on the z axis from
+    z = 0 to length, both ends rounded within that range.
+    """
+    radius = min(radius, length / 2.)
+    # profile of rings from the bottom pole to the top pole: latitude
+    # angle, from -pi/2 to pi/2, and the z of its center
+    lat = np.linspace(-math.pi / 2, 0, capRings + 1)[1:]
+    lat = np.concatenate([lat, -lat[::-1]])
+    center = np.full(len(lat), radius)
+    center[capRings:] = length - radius
+    theta = np.arange(sides) * (2 * math.pi / sides)
+    ringR = np.cos(lat)[:, None]
+    normals = np.empty((len(lat), sides, 3), dtype=np.float32)
+    normals[:, :, 0] = ringR * np.cos(theta)
+    normals[:, :, 1] = ringR * np.sin(theta)
+    normals[:, :, 2] = np.sin(lat)[:, None]
+    vertices = normals * radius
+    vertices[:, :, 2] += center[:, None]
+    poles = np.array([[0, 0, 0], [0, 0, length]], dtype=np.float32)
+    vertices = np.concatenate([poles[:1], vertices.reshape(-1, 3), poles[1:]])
+    normals = np.concatenate([[[0, 0, -1]], normals.reshape(-1, 3),
+                              [[0, 0, 1]]]).astype(np.float32)
+
+    a = np.arange(sides)
+    b = (a + 1) % sides
+    bottom = np.stack([np.zeros(sides, dtype=np.intp), b + 1, a + 1], axis=1)
+    top = len(vertices) - 1
+    topRing = 1 + (len(lat) - 1) * sides
+    top = np.stack([np.full(sides, top), topRing + a, topRing + b], axis=1)
+    ring = 1 + np.arange(len(lat) - 1)[:, None, None] * sides
+    quads = np.concatenate([np.stack([a, b, b + sides], axis=1),
+                            np.stack([a, b + sides, a + sides], axis=1)])
+    side = (ring + quads).reshape(-1, 3)
+    faces = np.concatenate([bottom, side, top]).astype(np.uint32)
+    return HelixMesh(vertices, normals, None, faces,
+                     np.array([0, len(vertices)], dtype=np.intp),
+                     np.array([0, len(faces)], dtype=np.intp), None)
+# end def
+
+
+def _rgb(colors):
+    """Returns an (n, 3) uint8 array of '#rrggbb' color names."""
+    rgb = np.array([int(color[1:7], 16) for color in colors],
+                   dtype=np.uint32)
+    return np.stack([rgb >> 16, (rgb >> 8) & 255, rgb & 255],
+                    axis=1).astype(np.uint8).reshape(-1, 3)
+# end def
+
+
+def partStrands(part, strandTypes=(StrandType.Scaffold, StrandType.Staple)):
+    """
+    Returns the strands of part in order of helix number as a list, and
+    per-strand arrays of what the mesh needs: low, high, helix x and y,
+    starting rotation and oligo color.
+    """
+    rotationOffset = math.radians(ROTATION_OFFSET[part.crossSectionType()])
+    positionXY = part.latticeGeometry().positionXY
+    strands = []
+    data = []
+    colors = []
+    for vh in sorted(part.getVirtualHelices(), key=lambda vh: vh.number()):
+        x, y = positionXY(*vh.coord())
+        flip = 0 if vh.isEvenParity() else math.pi
+        for strandType in strandTypes:
+            if strandType == StrandType.Scaffold:
+                strandSet = vh.scaffoldStrandSet()
+            else:
+                strandSet = vh.stapleStrandSet()
+            startRotation = flip + rotationOffset + math.pi * strandType
+            for strand in strandSet:
+                low, high = strand.idxs()
+                strands.append(strand)
+                data.append((low, high, x, -y, startRotation))
+                colors.append(strand.oligo().color())
+    # end for
+    columns = np.array(data, dtype=np.float64).reshape(-1, 5)
+    low = columns[:, 0].astype(np.intp)
+    high = columns[:, 1].astype(np.intp)
+    return strands, low, high, columns[:, 2], columns[:, 3], \
+           columns[:, 4], _rgb(colors)
+# end def
+
+
+def _helixCapsules(part, rise):
+    """Returns an InstancedMesh of a capsule per helix with strands."""
+    middle = part.maxBaseIdx() / 2
+    positionXY = part.latticeGeometry().positionXY
+    prototypes = []
+    prototypeOfLength = {}
+    prototype, translations, colors, items = [], [], [], []
+    for vh in sorted(part.getVirtualHelices(), key=lambda vh: vh.number()):
+        strandSets = vh.getStrandSets()
+        bounds = [strand.idxs() for strandSet in strandSets
+                  for strand in strandSet]
+        if not bounds:
+            continue
+        low = min(idxs[0] for idxs in bounds)
+        high = max(idxs[1] for idxs in bounds)
+        length = high - low + 1
+        if length not in prototypeOfLength:
+            prototypeOfLength[length] = len(prototypes)
+            prototypes.append(_capsulePrototype(length * rise,
+                                                part.radius()))
+        x, y = positionXY(*vh.coord())
+        strands = list(strandSets[0]) or list(strandSets[1])
+        prototype.append(prototypeOfLength[length])
+        translations.append((x, -y, (middle - high) * rise))
+        colors.append(strands[0].oligo().color())
+        items.append(vh)
+    # end for
+    return InstancedMesh(prototypes, np.array(prototype, dtype=np.intp),
+                         np.array(translations, dtype=np.float64)
+                           .reshape(-1, 3),
+                         np.zeros(len(prototype)), _rgb(colors), items)
+# end def
+
+
+def instancedPartMesh(part, detail=MeshDetail.Base,
+                      edgesPerBase=EDGES_PER_BASE, rise=RISE,
+                      strandTypes=(StrandType.Scaffold, StrandType.Staple)):
+    """
+    Returns an InstancedMesh of part at the given MeshDetail, with a
+    prototype per strand (or helix) length. Helix axes run along z and the
+    lattice lies in the xy plane with rows going down, as in the solid
+    view; base idx is at z = (maxBaseIdx / 2 - idx) * rise.
+    """
+    if detail == MeshDetail.Helix:
+        return _helixCapsules(part, rise)
+    strands, low, high, x, y, startRotation, colors = \
+                                            partStrands(part, strandTypes)
+    rotation = math.radians(part.twistPerBase())
+    radius = part.radius()
+    lengths, prototype = np.unique(high - low + 1, return_inverse=True)
+    prototype = prototype.reshape(-1)
+    prototypes = []
+    for length in lengths:
+        if detail == MeshDetail.Base:
+            ringStart, ringZ, ringAngle = _rings(np.array([0]),
+                                                 np.array([length - 1]),
+                                                 length - 1,
+                                                 -(length - 1) * rotation,
+                                                 rotation, rise, edgesPerBase)
+            ringSize = RING_SIZE
+        else:
+            gap = rise / EDGES_PER_BASE / 6.0
+            ringZ = np.array([gap, length * rise - gap])
+            ringAngle = np.zeros(2)
+            ringSize = STRAND_RING_SIZE
+        prototypes.append(_halfCylinderPrototype(ringZ, ringAngle, radius,
+                                                 ringSize))
+    # end for
+    # the first ring of a strand is at its high base; the Strand detail
+    # is turned as the middle of the strand
+    angles = -(high * rotation + startRotation)
+    if detail == MeshDetail.Strand:
+        angles += (high - low + 1) * (rotation / 2)
+    translations = np.stack([x, y, (part.maxBaseIdx() / 2 - high) * rise],
+                            axis=1)
+    return InstancedMesh(prototypes, prototype, translations, angles,
+                         colors, strands)
+# end def
+
+
+def partMesh(part, detail=MeshDetail.Base, edgesPerBase=EDGES_PER_BASE,
+             rise=RISE,
+             strandTypes=(StrandType.Scaffold, StrandType.Staple)):
+    """
+    Returns a HelixMesh of part at the given MeshDetail, see
+    instancedPartMesh.
+    """
+    return instancedPartMesh(part, detail, edgesPerBase, rise,
+                             strandTypes).flatten()
+# end def
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+meshexport.py
+
+Writes a helixmesh.HelixMesh to Wavefront OBJ, binary PLY or binary glTF
+(.glb). Every writer takes a file opened in binary mode; writeMesh picks
+the writer from the file name. Coordinates are in nm, and each vertex
+carries the color of its strand's oligo:
+
+    OBJ     "v x y z r g b" lines, as read by Blender and MeshLab
+    PLY     red, green and blue vertex properties
+    glTF    a COLOR_0 attribute
+
+glTF can also hold a helixmesh.InstancedMesh as it is: each prototype is
+stored once and every instance is a node that places it, with a material
+per oligo color. OBJ and PLY have no instancing, writeMesh flattens an
+InstancedMesh for them.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from cadnano2.views.solidview.helixmesh import InstancedMesh
+
+CHUNK_ROWS = 1 << 16
+
+
+def _writeRows(f, fmt, rows):
+    """Writes fmt % row for each row of a 2D array, a chunk at a time."""
+    for i in range(0, len(rows), CHUNK_ROWS):
+        chunk = rows[i:i + CHUNK_ROWS]
+        f.write(((fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+                .encode('ascii'))
+# end def
+
+
+def writeObj(mesh, f):
+    f.write(b"# cadnano2 helix mesh, units: nm\n")
+    rows = np.concatenate([mesh.vertices.astype(np.float64),
+                           mesh.colors / 255.], axis=1)
+    _writeRows(f, "v %.4f %.4f %.4f %.3f %.3f %.3f\n", rows)
+    _writeRows(f, "vn %.4f %.4f %.4f\n", mesh.normals)
+    idx = mesh.faces.astype(np.int64) + 1
+    _writeRows(f, "f %d//%d %d//%d %d//%d\n", np.repeat(idx, 2, axis=1))
+# end def
+
+
+def writePly(mesh, f):
+    numVertices, numFaces = len(mesh.vertices), len(mesh.faces)
+    header = ["ply",
+              "format binary_little_endian 1.0",
+              "comment cadnano2 helix mesh, units: nm",
+              "element vertex %d" % numVertices,
+              "property float x", "property float y", "property float z",
+              "property float nx", "property float ny", "property float nz",
+              "property uchar red", "property uchar green",
+              "property uchar blue",
+              "element face %d" % numFaces,
+              "property list uchar uint vertex_indices",
+              "end_header"]
+    f.write(("\n".join(header) + "\n").encode('ascii'))
+    vertexType = np.dtype([('position', '<f4', 3), ('normal', '<f4', 3),
+                           ('color', 'u1', 3)])
+    vertices = np.empty(numVertices, dtype=vertexType)
+    vertices['position'] = mesh.vertices
+    vertices['normal'] = mesh.normals
+    vertices['color'] = mesh.colors
+    f.write(vertices.tobytes())
+    faceType = np.dtype([('count', 'u1'), ('indices', '<u4', 3)])
+    faces = np.empty(numFaces, dtype=faceType)
+    faces['count'] = 3
+    faces['indices'] = mesh.faces
+    f.write(faces.tobytes())
+# end def
+
+
+def _padded(data, pad):
+    return data + pad * (-len(data) % 4)
+# end def
+
+
+def _writeGlbFile(gltf, blobs, f):
+    """Writes the glTF json and the buffer blobs as one .glb file."""
+    binLength = sum(len(data) for data in blobs)
+    gltf['asset'] = {'version': '2.0', 'generator': 'cadnano2'}
+    gltf['buffers'] = [{'byteLength': binLength}]
+    jsonChunk = _padded(json.dumps(gltf, separators=(',', ':'))
+                        .encode('utf-8'), b' ')
+    length = 12 + 8 + len(jsonChunk) + 8 + binLength
+    f.write(struct.pack('<4sII', b'glTF', 2, length))
+    f.write(struct.pack('<I4s', len(jsonChunk), b'JSON'))
+    f.write(jsonChunk)
+    f.write(struct.pack('<I4s', binLength, b'BIN\0'))
+    for data in blobs:
+        f.write(data)
+# end def
+
+
+def _addBufferView(gltf, blobs, array, target):
+    """Appends array to the buffer, returns the index of its bufferView."""
+    offset = sum(len(data) for data in blobs)
+    blobs.append(_padded(array.tobytes(), b'\0'))
+    gltf['bufferViews'].append({'buffer': 0, 'byteOffset': offset,
+                                'byteLength': array.nbytes,
+                                'target': target})
+    return len(gltf['bufferViews']) - 1
+# end def
+
+
+def _addGeometry(gltf, blobs, mesh):
+    """
+    Adds the positions, normals and indices of mesh, returns the
+    primitive attributes and the index accessor.
+    """
+    accessors = gltf['accessors']
+    lo, hi = mesh.bounds()
+    numVertices = len(mesh.vertices)
+    view = _addBufferView(gltf, blobs, mesh.vertices.astype('<f4'), 34962)
+    accessors.append({'bufferView': view, 'componentType': 5126,
+                      'count': numVertices, 'type': 'VEC3',
+                      'min': [float(v) for v in lo],
+                      'max': [float(v) for v in hi]})
+    view = _addBufferView(gltf, blobs, mesh.normals.astype('<f4'), 34962)
+    accessors.append({'bufferView': view, 'componentType': 5126,
+                      'count': numVertices, 'type': 'VEC3'})
+    view = _addBufferView(gltf, blobs, mesh.faces.astype('<u4'), 34963)
+    accessors.append({'bufferView': view, 'componentType': 5125,
+                      'count': mesh.faces.size, 'type': 'SCALAR'})
+    n = len(accessors)
+    return {'POSITION': n - 3, 'NORMAL': n - 2}, n - 1
+# end def
+
+
+def _newGltf():
+    return {'scene': 0, 'scenes': [{'nodes': []}], 'nodes': [],
+            'meshes': [], 'materials': [], 'accessors': [],
+            'bufferViews': []}
+# end def
+
+
+def writeGlb(mesh, f):
+    """
+    Writes a HelixMesh as one glTF 2.0 mesh with a single triangle
+    primitive: float positions and normals, normalized unsigned byte RGBA
+    colors (4 bytes, to keep vertex attributes 4-byte aligned) and uint32
+    indices. An InstancedMesh goes to writeInstancedGlb.
+    """
+    if isinstance(mesh, InstancedMesh):
+        writeInstancedGlb(mesh, f)
+        return
+    gltf, blobs = _newGltf(), []
+    attributes, indices = _addGeometry(gltf, blobs, mesh)
+    colors = np.empty((len(mesh.vertices), 4), dtype=np.uint8)
+    colors[:, :3] = mesh.colors
+    colors[:, 3] = 255
+    view = _addBufferView(gltf, blobs, colors, 34962)
+    gltf['accessors'].append({'bufferView': view, 'componentType': 5121,
+                              'normalized': True, 'count': len(colors),
+                              'type': 'VEC4'})
+    attributes['COLOR_0'] = len(gltf['accessors']) - 1
+    gltf['materials'].append({'pbrMetallicRoughness':
+                                {'metallicFactor': 0.0,
+                                 'roughnessFactor': 0.8}})
+    gltf['meshes'].append({'primitives': [{'attributes': attributes,
+                                           'indices': indices,
+                                           'material': 0, 'mode': 4}]})
+    gltf['nodes'].append({'mesh': 0})
+    gltf['scenes'][0]['nodes'].append(0)
+    _writeGlbFile(gltf, blobs, f)
+# end def
+
+
+def writeInstancedGlb(mesh, f):
+    """
+    Writes an InstancedMesh: the geometry of each prototype once, a glTF
+    mesh for each prototype and color in use, which share the
+    prototype's accessors, and a node per instance with its translation
+    and its rotation about z as a quaternion.
+    """
+    gltf, blobs = _newGltf(), []
+    geometry = [_addGeometry(gltf, blobs, proto)
+                for proto in mesh.prototypes]
+    materialOfColor = {}
+    meshOfKey = {}
+    nodes = gltf['nodes']
+    half = mesh.angles / 2
+    sin, cos = np.sin(half).tolist(), np.cos(half).tolist()
+    for i, (p, color, translation) in enumerate(zip(
+                            mesh.prototype.tolist(),
+                            map(tuple, mesh.colors.tolist()),
+                            mesh.translations.tolist())):
+        if color not in materialOfColor:
+            materialOfColor[color] = len(gltf['materials'])
+            gltf['materials'].append({'pbrMetallicRoughness':
+                    {'baseColorFactor': [_linear(c) for c in color] + [1.0],
+                     'metallicFactor': 0.0,
+                     'roughnessFactor': 0.8}})
+        key = (p, color)
+        if key not in meshOfKey:
+            meshOfKey[key] = len(gltf['meshes'])
+            attributes, indices = geometry[p]
+            gltf['meshes'].append({'primitives': [
+                                    {'attributes': attributes,
+                                     'indices': indices,
+                                     'material': materialOfColor[color],
+                                     'mode': 4}]})
+        node = {'mesh': meshOfKey[key], 'translation': translation}
+        if sin[i]:
+            node['rotation'] = [0.0, 0.0, sin[i], cos[i]]
+        nodes.append(node)
+    # end for
+    gltf['scenes'][0]['nodes'] = list(range(len(nodes)))
+    _writeGlbFile(gltf, blobs, f)
+# end def
+
+
+def _linear(c):
+    """Returns the 0-255 sRGB component c as a linear 0-1 factor."""
+    c = c / 255.
+    if c <= 0.04045:
+        return c / 12.92
+    return ((c + 0.055) / 1.055) ** 2.4
+# end def
+
+
+WRITERS = {'.obj': writeObj,
+           '.ply': writePly,
+           '.glb': writeGlb}
+
+
+def writeMesh(mesh, fname):
+    """
+    Writes mesh, a HelixMesh or an InstancedMesh, to fname in the format
+    of its extension.
+    """
+    ext = os.path.splitext(fname)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError("unknown mesh format %r (choose from %s)" % \
+                         (ext, ', '.join(sorted(WRITERS))))
+    if ext != '.glb' and isinstance(mesh, InstancedMesh):
+        mesh = mesh.flatten()
+    with open(fname, 'wb') as f:
+        WRITERS[ext](mesh, f)
+# end def
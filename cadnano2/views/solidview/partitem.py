@@ -206,7 +206,7 @@ class PartItem(object):
     ### METHODS ###
     def cadnanoToMayaCoords(self, row, col):
         """Converts cadnano row and col to Maya coordinates"""
-        x, y = self.part().latticeCoordToPositionXY(row, col)
+        x, y = self.part().latticeGeometry().positionXY(row, col)
         return x + self.mayaOrigin[0], self.mayaOrigin[1] - y
     # end def
 
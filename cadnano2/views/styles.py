@@ -52,6 +52,10 @@ oligoLenAboveWhichHighlight = 49
 # Path Drawing
 PATH_XOVER_LINE_SCALE_X = 0.035
 PATH_XOVER_LINE_SCALE_Y = 0.035
+# Parts with this many helices only build strand items near the viewport
+PATH_VIRTUALIZE_MIN_HELICES = 200
+PATH_VIRTUALIZE_MARGIN = 0.5  # extra fraction of the view height kept built
+PATH_STRAND_ITEM_POOL_MAX = 500  # idle StrandItems kept for reuse
 
 # Path Colors
 scaffold_bkg_fill = QColor(230, 230, 230)
@@ -123,6 +127,7 @@ PREF_AUTOSCAF_INDEX = 0
 PREF_STARTUP_TOOL_INDEX = 0
 PREF_ZOOM_SPEED = 20#50
 PREF_ZOOM_AFTER_HELIX_ADD = True
+PREF_UNDO_MEMORY_BUDGET = 0  # MB, 0 for no limit
 
 
 #Z values
@@ -131,6 +136,7 @@ ZACTIVESLICEHANDLE = 10
 ZPATHHELIXGROUP = 20
 ZPATHHELIX = 30
 ZPATHSELECTION = 40
+ZSLICELATTICE = 45
 ZSLICEHELIX = 50
 ZDESELECTOR = 60
 ZFOCUSRING = 70
@@ -16,7 +16,11 @@ setup(
     packages=find_packages(),
     package_data={'cadnano2': ['ui/mainwindow/images/*.svg', 'ui/mainwindow/images/*.png']},
     install_requires=['PyQt6'],
-    entry_points = {'console_scripts': ['cadnano2 = cadnano2.main:main']},
+    # numpy speeds up the model when present; mesh export needs it
+    extras_require={'mesh': ['numpy']},
+    entry_points = {'console_scripts': ['cadnano2 = cadnano2.main:main',
+                                        'cadnano2-batch = cadnano2.batch:main',
+                                        'cadnano2-convert = cadnano2.convert:main']},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Science/Research",